@@ -7,7 +7,14 @@ Overview
   point is AnalyticsAgent which orchestrates the pipeline.
 
 Design
-  - **SQL Pipeline**: Planning → Execution → Normalization.
+  - **SQL Pipeline**: Planning → Cost Check → Execution → Normalization.
+  - **Follow-Ups**: Refinements answered locally from the thread's previous result.
+  - **Result Pages**: Results handles page answers (keyset pagination past the row cap).
+  - **Batch Reports**: Many questions answered concurrently over one schema snapshot.
+  - **Query Templates**: Recurring question shapes planned without an LLM call.
+  - **Rollups**: Hot GROUP BY shapes materialised and exposed through the catalog.
+  - **Document Facts**: Commerce extracted fields materialised as a typed catalog table.
+  - **Approximate Mode**: Estimate-only aggregates answered from sample tables.
   - **Modular Components**: Separate classes for each pipeline step.
   - **Base Agent**: AnalyticsAgent inherits from BaseAgent.
   - **Repository Pattern**: Uses AnalyticsRepository for data access.
@@ -26,16 +33,58 @@ Usage
 """
 
 from app.agents.analytics.agent import AnalyticsAgent
+from app.agents.analytics.batch import AnalyticsBatch
+from app.agents.analytics.catalog import SchemaCatalog, get_schema_catalog
+from app.agents.analytics.cost_guard import QueryCostGuard
+from app.agents.analytics.document_facts import (
+    DocumentFactsMaterialiser,
+    project_document,
+    schedule_document_facts,
+)
 from app.agents.analytics.executor import AnalyticsExecutor
+from app.agents.analytics.followup import FollowUpEngine, ThreadResultStore, get_thread_result_store
+from app.agents.analytics.insights import InsightsEngine, get_insights_engine
+from app.agents.analytics.index_advisor import IndexAdvisor, IndexRecommendation
 from app.agents.analytics.normalizer import AnalyticsNormalizer
+from app.agents.analytics.pagination import ResultHandle, ResultPager, get_result_pager
 from app.agents.analytics.planner import AnalyticsPlanner
+from app.agents.analytics.result_cache import ResultCache, get_result_cache
+from app.agents.analytics.rollups import RollupCandidate, RollupManager, detect_rollups
+from app.agents.analytics.sampling import Approximation, approximate_sql
 from app.agents.analytics.schema_builder import AnalyticsSchemaBuilder
+from app.agents.analytics.templates import TemplateLibrary, get_template_library
 
 __all__ = [
     "AnalyticsAgent",
+    "AnalyticsBatch",
     "AnalyticsPlanner",
     "AnalyticsExecutor",
+    "QueryCostGuard",
+    "FollowUpEngine",
+    "IndexAdvisor",
+    "InsightsEngine",
+    "IndexRecommendation",
     "AnalyticsNormalizer",
     "AnalyticsSchemaBuilder",
+    "DocumentFactsMaterialiser",
+    "Approximation",
+    "ResultCache",
+    "ResultHandle",
+    "ResultPager",
+    "RollupCandidate",
+    "RollupManager",
+    "SchemaCatalog",
+    "TemplateLibrary",
+    "ThreadResultStore",
+    "approximate_sql",
+    "detect_rollups",
+    "get_insights_engine",
+    "get_result_cache",
+    "get_result_pager",
+    "get_schema_catalog",
+    "get_template_library",
+    "get_thread_result_store",
+    "project_document",
+    "schedule_document_facts",
 ]
 
@@ -7,13 +7,26 @@ Overview
   functionality (logging, error handling, state validation).
 
 Design
-  - **Pipeline Orchestration**: Coordinates plan → execute → normalize pipeline.
+  - **Pipeline Orchestration**: Coordinates plan → cost check → execute → normalize pipeline.
+  - **Cost Gate**: Rejected plans are regenerated with cost feedback before giving up.
+  - **Query Templates**: Recurring question shapes are planned from parametrised templates
+    (no LLM call); successful LLM plans with slots are promoted into templates.
+  - **Summary Pushdown**: Capped results get exact count/aggregates from the database
+    over the query without its row limit (bounded by it if the question asked for it).
+  - **Result Pages**: Answers carry the first page and a results handle; capped results
+    with a stable ordering are paged past SQL_MAX_ROWS by keyset.
+  - **Follow-Ups**: Refinements computable from the thread's previous (complete) result
+    are answered locally; everything else falls back to the database.
+  - **Column Statistics**: Catalog statistics of result columns inform display suggestions.
+  - **Approximate Mode**: Estimate-only questions (request flag or planner flag) run over
+    sample tables; answers are labelled with the sample fraction and margin columns.
   - **Base Agent**: Inherits from BaseAgent for common functionality.
   - **Dependency Injection**: Receives dependencies via constructor.
   - **Error Handling**: Uses BaseAgent error handling.
 
 Integration
-  - Consumes: BaseAgent, AnalyticsPlanner, AnalyticsExecutor, AnalyticsNormalizer.
+  - Consumes: BaseAgent, SchemaCatalog, AnalyticsPlanner, QueryCostGuard, AnalyticsExecutor,
+    AnalyticsNormalizer, FollowUpEngine, ThreadResultStore, TemplateLibrary, ResultPager.
   - Returns: Updated GraphState with Answer containing SQLMetadata.
   - Used by: LangGraph orchestration layer.
   - Observability: Logs via BaseAgent._log_processing.
@@ -24,18 +37,37 @@ Usage
   >>> state = await agent.process(state)
 """
 
+import hashlib
+import re
 import time
 from typing import Any, Optional
 
+from app.agents.analytics.catalog import SchemaCatalog, get_schema_catalog
+from app.agents.analytics.cost_guard import QueryCostGuard
 from app.agents.analytics.executor import AnalyticsExecutor
+from app.agents.analytics.followup import FOLLOWUP_TABLE, FollowUpEngine, get_thread_result_store
 from app.agents.analytics.normalizer import AnalyticsNormalizer
+from app.agents.analytics.pagination import get_result_pager
 from app.agents.analytics.planner import AnalyticsPlanner
+from app.agents.analytics.result_cache import get_result_cache
+from app.agents.analytics.sampling import Approximation
+from app.agents.analytics.templates import get_template_library
 from app.agents.base import BaseAgent
+from app.config.constants import (
+    ANALYTICS_COST_RETRY_ATTEMPTS,
+    ANALYTICS_SUMMARY_PUSHDOWN,
+    ANALYTICS_TEMPLATE_PROMOTION,
+    ANALYTICS_TEMPLATE_PROMOTION_CONFIDENCE,
+    SCHEMA_PRUNING_TOP_K,
+    SQL_MAX_ROWS,
+)
+from app.config.exceptions import ValidationException
 from app.contracts.answer import Answer, PerformanceMetrics, SQLMetadata
 from app.infrastructure.cache.cache_manager import CacheManager
 from app.infrastructure.database.repositories.analytics_repo import AnalyticsRepository
 from app.infrastructure.llm.client import LLMClient
 from app.routing.allowlist import AllowlistValidator
+from app.routing.sql_analysis import outer_row_limit
 
 
 class AnalyticsAgent(BaseAgent):
@@ -51,30 +83,42 @@ class AnalyticsAgent(BaseAgent):
         repository: AnalyticsRepository,
         allowlist_validator: AllowlistValidator,
         cache: Optional[CacheManager] = None,
+        catalog: Optional[SchemaCatalog] = None,
     ) -> None:
         """Initialize Analytics Agent.
 
-        Creates planner, executor, and normalizer instances with dependencies.
+        Creates planner, cost guard, executor, normalizer, and follow-up engine instances
+        with dependencies.
 
         Args:
             llm_client: LLM client for SQL generation.
             repository: Analytics repository for schema access and SQL execution.
             allowlist_validator: Allowlist validator for SQL validation.
             cache: Cache manager for SQL caching (optional).
+            catalog: Schema catalog (optional, uses process-wide singleton if None).
         """
         super().__init__(llm_client, name="analytics")
 
         # Create pipeline components
         self._planner = AnalyticsPlanner(llm_client, allowlist_validator, cache)
-        self._executor = AnalyticsExecutor(repository)
+        self._cost_guard = QueryCostGuard(repository)
+        self._executor = AnalyticsExecutor(repository, result_cache=get_result_cache())
         self._normalizer = AnalyticsNormalizer(llm_client)
+        self._followup = FollowUpEngine(llm_client)
+        self._result_store = get_thread_result_store()
+        self._pager = get_result_pager()
+        self._templates = get_template_library()
+        self._allowlist_validator = allowlist_validator
         self._repository = repository
+        self._catalog = catalog or get_schema_catalog(repository.engine)
+        self._cache = cache
 
     async def process(self, state: Any) -> Any:
         """Process query and generate answer.
 
         Implements abstract method from BaseAgent. Orchestrates pipeline:
-        plan → execute → normalize. Updates state with Answer.
+        follow-up (previous result) or plan → cost check → execute, then
+        normalize. Updates state with Answer.
 
         Args:
             state: Graph state with query, language, etc.
@@ -91,45 +135,129 @@ class AnalyticsAgent(BaseAgent):
             # Extract query and language from state
             query = getattr(state, "query", "")
             language = getattr(state, "language", "pt-BR")
+            approximate = getattr(state, "approximate", None)
+            defer_insights = bool(getattr(state, "defer_insights", None))
 
-            # Step 2: Get schema info
-            schema_info = await self._get_schema_info()
-
-            # Step 3: Plan SQL
+            # Step 2: Answer refinements locally from the thread's previous result
+            thread_id = getattr(state, "thread_id", None)
+            full_schema_info: Optional[dict[str, Any]] = None
             plan_start = time.time()
-            plan_result = await self._planner.plan(query, schema_info, language)
-            plan_time = (time.time() - plan_start) * 1000
+            followup = await self._followup.answer(
+                query,
+                self._result_store.get(thread_id),
+                language,
+            )
 
-            sql = plan_result["sql"]
+            if followup is not None:
+                plan_time = (time.time() - plan_start) * 1000
+                plan_result = {
+                    "sql": followup["sql"],
+                    "explanation": followup["explanation"],
+                    "tables_used": [FOLLOWUP_TABLE],
+                    "columns_used": followup["columns_used"],
+                    "confidence": 1.0,
+                }
+                cost_check: dict[str, Any] = {
+                    "sql": followup["sql"],
+                    "query_plan": None,
+                    "approximation": None,
+                }
+                exec_result: dict[str, Any] = {
+                    "rows": followup["rows"],
+                    "row_count": len(followup["rows"]),
+                    "execution_time_ms": followup["execution_time_ms"],
+                }
+            else:
+                # Steps 3-4: Schema info, then SQL from a template or the LLM (cost-checked)
+                plan_start = time.time()
+                planned = await self.plan(query, language, approximate)
+                plan_time = (time.time() - plan_start) * 1000
+                plan_result, cost_check = planned["plan"], planned["cost_check"]
+                full_schema_info = planned["schema_info"]
+                query_embedding = planned["query_embedding"]
+
+                # Step 5: Execute SQL
+                exec_result = await self._executor.execute(
+                    cost_check["sql"],
+                    schema_info=full_schema_info,
+                    approximate=cost_check["approximation"] is not None,
+                    query_plan=cost_check.get("query_plan"),
+                )
+
+                # Complete (exact) results become the base for follow-up questions
+                if exec_result["row_count"] < SQL_MAX_ROWS and not cost_check["approximation"]:
+                    self._result_store.retain(
+                        thread_id,
+                        query,
+                        cost_check["sql"],
+                        exec_result["rows"],
+                    )
+                else:
+                    self._result_store.discard(thread_id)
+
+                # Recurring question shapes become templates (no LLM next time)
+                if (
+                    ANALYTICS_TEMPLATE_PROMOTION
+                    and "template" not in plan_result
+                    and exec_result["row_count"] > 0
+                    and plan_result.get("confidence", 0) >= ANALYTICS_TEMPLATE_PROMOTION_CONFIDENCE
+                ):
+                    self._templates.promote(query, query_embedding, plan_result)
+
+            sql = cost_check["sql"]
+            approximation: Optional[Approximation] = cost_check["approximation"]
             explanation = plan_result["explanation"]
             tables_used = plan_result["tables_used"]
             columns_used = plan_result["columns_used"]
-            confidence = plan_result["confidence"]
-
-            # Step 4: Execute SQL
-            exec_start = time.time()
-            exec_result = await self._executor.execute(sql)
-            exec_time = (time.time() - exec_start) * 1000
 
             rows = exec_result["rows"]
             row_count = exec_result["row_count"]
             execution_time_ms = exec_result["execution_time_ms"]
-            query_plan = exec_result.get("query_plan")
+            query_plan = exec_result.get("query_plan") or cost_check.get("query_plan")
+
+            # Step 6: Exact summary in the database if displayed (exact) rows were capped
+            summary = None
+            if (
+                ANALYTICS_SUMMARY_PUSHDOWN
+                and followup is None
+                and approximation is None
+                and row_count >= SQL_MAX_ROWS
+            ):
+                summary = await self._summarize_in_database(plan_result["sql"], rows, query)
+
+            # Results handle: first page inline, further pages through the results endpoint
+            keyset = followup is None and approximation is None
+            results = await self._pager.open(
+                self._repository,
+                rows,
+                truncated=row_count >= SQL_MAX_ROWS,
+                sql=plan_result["sql"] if keyset else None,
+                schema_info=full_schema_info if keyset else None,
+            )
 
-            # Step 5: Normalize results
+            # Step 7: Normalize results
             normalize_start = time.time()
-            normalized = await self._normalizer.normalize(rows, sql, language)
+            column_stats = self._catalog.column_stats(list(rows[0]) if rows else [], tables_used)
+            normalized = await self._normalizer.normalize(
+                rows,
+                sql,
+                language,
+                summary,
+                column_stats,
+                defer_insights,
+            )
             normalize_time = (time.time() - normalize_start) * 1000
 
-            # Step 6: Build answer text
+            # Step 8: Build answer text
             answer_text = self._build_answer_text(
                 normalized,
                 explanation,
                 row_count,
                 language,
+                approximation,
             )
 
-            # Step 7: Create SQLMetadata
+            # Step 9: Create SQLMetadata
             sql_metadata = SQLMetadata(
                 sql=sql,
                 explanation=explanation,
@@ -138,9 +266,10 @@ class AnalyticsAgent(BaseAgent):
                 execution_time_ms=execution_time_ms,
                 rows_returned=row_count,
                 query_plan=query_plan,
+                approximate=approximation is not None,
             )
 
-            # Step 8: Create PerformanceMetrics
+            # Step 10: Create PerformanceMetrics
             total_time_ms = (time.time() - total_start_time) * 1000
             performance_metrics = PerformanceMetrics(
                 total_time_ms=total_time_ms,
@@ -150,22 +279,32 @@ class AnalyticsAgent(BaseAgent):
                 cost_estimate=None,
             )
 
-            # Step 9: Create Answer
+            # Step 11: Create Answer
             answer = Answer(
                 text=answer_text,
                 agent="analytics",
                 language=language,
                 sql_metadata=sql_metadata,
                 performance_metrics=performance_metrics,
+                metadata={
+                    "result_cached": exec_result.get("cached", False),
+                    "answered_from": "previous_result" if followup is not None else "database",
+                    "template": plan_result.get("template"),
+                    "summary": normalized["summary"],
+                    "approximate": approximation.metadata if approximation else None,
+                    "insights_pending": normalized["insights_key"],
+                    "results": results,
+                    "chart": normalized["chart"],
+                },
             )
 
-            # Step 10: Update state
+            # Step 12: Update state
             if hasattr(state, "agent_response"):
                 state.agent_response = answer
             else:
                 setattr(state, "agent_response", answer)
 
-            # Step 11: Log processing
+            # Step 13: Log processing
             await self._log_processing(state, answer)
 
             return state
@@ -173,43 +312,233 @@ class AnalyticsAgent(BaseAgent):
             # Use BaseAgent error handling
             return await self._handle_error(e, state)
 
+    async def plan(
+        self,
+        query: str,
+        language: str,
+        approximate: Optional[bool] = None,
+        schema_info: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        """Plan and cost-check SQL for a question, without executing it.
+
+        Gets schema info (pruned to tables relevant to the query), then plans
+        SQL from a template or the LLM within the cost budget.
+
+        Args:
+            query: User query.
+            language: Query language.
+            approximate: Request approximate mode (None lets the planner decide).
+            schema_info: Full catalog schema info (optional, e.g. a snapshot shared by
+                a batch; loaded from the catalog if None).
+
+        Returns:
+            Dictionary with plan (plan result), cost_check (bounded SQL and approximation),
+            schema_info (full catalog schema info) and query_embedding.
+
+        Raises:
+            ValidationException: If SQL is invalid or still too expensive after retries.
+        """
+        # Step 1: Get schema info (pruned to tables relevant to the query)
+        full_schema_info = schema_info or await self._get_schema_info()
+        await self._templates.refresh(self._repository)
+        table_count = len(full_schema_info.get("tables", []))
+        query_embedding = None
+        if self._templates.size or table_count > SCHEMA_PRUNING_TOP_K:
+            query_embedding = await self._get_query_embedding(query)
+        pruned_schema_info = self._catalog.prune_schema_info(full_schema_info, query_embedding)
+
+        # Step 2: Plan SQL from a template or the LLM (bounded and cost-checked)
+        plan_result, cost_check = await self._plan_within_budget(
+            query,
+            pruned_schema_info,
+            language,
+            query_embedding,
+            full_schema_info,
+            approximate,
+        )
+        return {
+            "plan": plan_result,
+            "cost_check": cost_check,
+            "schema_info": full_schema_info,
+            "query_embedding": query_embedding,
+        }
+
+    async def _plan_within_budget(
+        self,
+        query: str,
+        schema_info: dict[str, Any],
+        language: str,
+        query_embedding: Optional[list[float]] = None,
+        full_schema_info: Optional[dict[str, Any]] = None,
+        approximate: Optional[bool] = None,
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Plan SQL and check its estimated cost before execution.
+
+        Uses a matching query template when one applies (no LLM call).
+        Otherwise, or if the template SQL is rejected, plans with the LLM; if
+        the cost guard rejects the SQL, asks the planner to regenerate it
+        with the rejection as feedback, up to ANALYTICS_COST_RETRY_ATTEMPTS times.
+        In approximate mode the sampled rewrite is what gets cost-checked.
+
+        Args:
+            query: User query.
+            schema_info: Schema info for planning.
+            language: Query language.
+            query_embedding: Query embedding for template matching (optional).
+            full_schema_info: Full catalog schema info (template matching and validation).
+            approximate: Request approximate mode (None lets the planner decide).
+
+        Returns:
+            Tuple of (plan result, cost check result with bounded SQL and approximation).
+
+        Raises:
+            ValidationException: If SQL is still too expensive after retries.
+        """
+        full_schema_info = full_schema_info or schema_info
+        available_tables = {table["name"] for table in full_schema_info.get("tables", [])}
+        template_plan = self._templates.match(query, query_embedding, available_tables)
+        if template_plan is not None:
+            try:
+                self._allowlist_validator.validate_sql(template_plan["sql"], full_schema_info)
+                cost_check = await self._check_cost(
+                    template_plan["sql"],
+                    full_schema_info,
+                    bool(approximate),
+                )
+                return template_plan, cost_check
+            except ValidationException as e:
+                self.logger.info(f"Template {template_plan['template']} rejected: {e.message}")
+
+        feedback: Optional[str] = None
+        for attempt in range(ANALYTICS_COST_RETRY_ATTEMPTS + 1):
+            plan_result = await self._planner.plan(query, schema_info, language, feedback)
+            try:
+                cost_check = await self._check_cost(
+                    plan_result["sql"],
+                    full_schema_info,
+                    plan_result.get("approximate", False) if approximate is None else approximate,
+                )
+                return plan_result, cost_check
+            except ValidationException as e:
+                if attempt >= ANALYTICS_COST_RETRY_ATTEMPTS:
+                    raise
+                self.logger.info(f"Regenerating SQL after cost rejection: {e.message}")
+                feedback = f"SQL: {plan_result['sql']}\nMotivo: {e.message}"
+
+        # Should never reach here, but for type safety
+        raise ValidationException(message="Failed to plan SQL within cost budget")
+
+    async def _check_cost(
+        self,
+        sql: str,
+        schema_info: dict[str, Any],
+        approximate: bool,
+    ) -> dict[str, Any]:
+        """Cost-check SQL, rewritten over a sample table in approximate mode.
+
+        Args:
+            sql: Planned SQL.
+            schema_info: Full catalog schema info (sample fractions).
+            approximate: Whether to run the query approximately.
+
+        Returns:
+            Cost check result with bounded SQL and approximation (None if exact).
+
+        Raises:
+            ValidationException: If SQL is too expensive.
+        """
+        approximation = self._executor.approximate(sql, schema_info) if approximate else None
+        cost_check = await self._cost_guard.check(approximation.sql if approximation else sql)
+        cost_check["approximation"] = approximation
+        return cost_check
+
+    async def _summarize_in_database(
+        self,
+        sql: str,
+        rows: list[dict[str, Any]],
+        query: str,
+    ) -> Optional[dict[str, Any]]:
+        """Compute exact count and numeric aggregates over the full result.
+
+        Wraps the planned SQL in a CTE without its outermost row limit,
+        unless the question itself asked for that many rows; the summary
+        is then marked as bounded. The summary query goes through the cost
+        guard too, since the uncapped query can be far more expensive than
+        the capped one.
+
+        Args:
+            sql: Planned SQL (before row limit enforcement).
+            rows: Displayed rows (used to detect numeric columns).
+            query: User question (to tell requested limits from display caps).
+
+        Returns:
+            Summary dictionary (with "bounded"), or None to keep the client-side summary.
+        """
+        row_limit = outer_row_limit(sql)
+        bounded = row_limit is not None and _limit_requested(row_limit.limit, query)
+        numeric_columns = self._executor.numeric_columns(rows)
+        summary_sql = self._executor.build_summary_sql(sql, numeric_columns, keep_limit=bounded)
+
+        try:
+            cost_check = await self._cost_guard.check(summary_sql)
+        except ValidationException as e:
+            self.logger.info(f"Summary pushdown skipped: {e.message}")
+            return None
+
+        summary = await self._executor.summarize(cost_check["sql"], numeric_columns)
+        if summary is not None:
+            summary["bounded"] = bounded
+        return summary
+
     async def _get_schema_info(self) -> dict[str, Any]:
         """Get schema information for SQL planning.
 
-        Retrieves all analytics tables and their columns to provide
-        schema information for SQL generation.
+        Served from the in-process schema catalog, which reloads tables
+        and columns only when the catalog version changes.
 
         Returns:
-            Dictionary with schema information (tables, columns, types).
+            Dictionary with schema information (tables, columns, types, version).
         """
-        try:
-            tables = await self._repository.get_all_tables()
-
-            schema_tables: list[dict[str, Any]] = []
-            for table in tables:
-                table_info: dict[str, Any] = {
-                    "name": table.name,
-                    "description": table.description,
-                    "columns": [],
-                }
+        return await self._catalog.get_schema_info(self._repository)
 
-                for column in table.columns:
-                    column_info: dict[str, Any] = {
-                        "name": column.name,
-                        "data_type": column.data_type,
-                        "is_nullable": column.is_nullable,
-                        "is_primary_key": column.is_primary_key,
-                        "is_foreign_key": column.is_foreign_key,
-                    }
-                    table_info["columns"].append(column_info)
+    async def _get_query_embedding(self, query: str) -> Optional[list[float]]:
+        """Get query embedding for schema pruning and template matching.
 
-                schema_tables.append(table_info)
+        Reuses the router's cached query embedding.
 
-            return {"tables": schema_tables}
-        except Exception as e:
-            # Return empty schema if retrieval fails
-            self.logger.warning(f"Failed to retrieve schema info: {e}")
-            return {"tables": []}
+        Args:
+            query: User query.
+
+        Returns:
+            Query embedding, or None if embedding fails.
+        """
+        # Same key as the router, so the embedding is usually already cached
+        query_hash = hashlib.sha256(query.encode()).hexdigest()
+        embedding_cache_key = f"query_embedding:{query_hash}"
+
+        query_embedding: Optional[list[float]] = None
+        if self._cache:
+            try:
+                query_embedding = await self._cache.get(embedding_cache_key, "embeddings")
+            except Exception:
+                # Graceful degradation: continue without cache
+                pass
+
+        if query_embedding is None:
+            try:
+                embedding_response = await self.llm_client.generate_embedding(query)
+                query_embedding = embedding_response.embedding
+                if self._cache:
+                    try:
+                        await self._cache.set(embedding_cache_key, query_embedding, "embeddings")
+                    except Exception:
+                        # Graceful degradation: continue without caching
+                        pass
+            except Exception as e:
+                self.logger.warning(f"Query embedding failed (no schema pruning or templates): {e}")
+                return None
+
+        return query_embedding
 
     def _build_answer_text(
         self,
@@ -217,6 +546,7 @@ class AnalyticsAgent(BaseAgent):
         explanation: str,
         row_count: int,
         language: str,
+        approximation: Optional[Approximation] = None,
     ) -> str:
         """Build answer text from normalized results.
 
@@ -227,14 +557,25 @@ class AnalyticsAgent(BaseAgent):
             normalized: Normalized results with formatted data and summary.
             explanation: SQL explanation.
             row_count: Number of rows returned.
+            approximation: Approximate rewrite the rows came from (optional).
 
         Returns:
             Formatted answer text.
         """
+        total_count = normalized.get("summary", {}).get("row_count", row_count)
+
         if language.startswith("pt"):
-            answer_parts: list[str] = [
-                f"Encontrei {row_count} resultado(s).",
-            ]
+            found = f"Encontrei {total_count} resultado(s)."
+            if total_count > row_count:
+                found += f" Exibindo os primeiros {row_count}."
+            answer_parts: list[str] = [found]
+
+            if approximation is not None:
+                answer_parts.append(
+                    f"Resultado aproximado: estimado a partir de uma amostra de "
+                    f"{approximation.fraction:.1%} de {approximation.table} "
+                    f"(margens de erro nas colunas *_margin).",
+                )
 
             if explanation:
                 answer_parts.append(f"\n{explanation}")
@@ -246,9 +587,16 @@ class AnalyticsAgent(BaseAgent):
 
             return "\n".join(answer_parts)
         else:
-            answer_parts = [
-                f"Found {row_count} result(s).",
-            ]
+            found = f"Found {total_count} result(s)."
+            if total_count > row_count:
+                found += f" Showing the first {row_count}."
+            answer_parts = [found]
+
+            if approximation is not None:
+                answer_parts.append(
+                    f"Approximate result: estimated from a {approximation.fraction:.1%} sample "
+                    f"of {approximation.table} (error margins in the *_margin columns).",
+                )
 
             if explanation:
                 answer_parts.append(f"\n{explanation}")
@@ -260,3 +608,19 @@ class AnalyticsAgent(BaseAgent):
 
             return "\n".join(answer_parts)
 
+
+def _limit_requested(limit: Optional[str], query: str) -> bool:
+    """Check whether a SQL row limit was asked for in the question.
+
+    Args:
+        limit: Row limit expression of the SQL (outer_row_limit), if any.
+        query: User question.
+
+    Returns:
+        True if the limit is a number that appears in the question
+        (thousands separators ignored, e.g. "top 1.500").
+    """
+    if limit is None or not limit.isdigit():
+        return False
+    numbers = {re.sub(r"[.,]", "", number) for number in re.findall(r"\d[\d.,]*\d|\d", query)}
+    return str(int(limit)) in numbers
@@ -0,0 +1,294 @@
+"""
+Analytics batch questions (report generation over many questions at once).
+
+Overview
+  Answers a list of analytics questions as one report. All questions share
+  one schema snapshot, identical questions are planned once, identical plans
+  are executed once, and planning and execution run concurrently (bounded),
+  so a report takes about as long as its slowest question instead of the sum
+  of all of them.
+
+Design
+  - **Shared Snapshot**: Schema info loaded once per batch and passed to every plan.
+  - **Question Dedup**: Questions equal up to case and whitespace are answered once.
+  - **Plan Dedup**: Questions whose cost-checked SQL canonicalizes to the same text share
+    one execution (single flight per batch); executions also go through the result cache.
+  - **Bounded Concurrency**: A semaphore (ANALYTICS_BATCH_CONCURRENCY) caps questions
+    planning or executing at once; each holds its own analytics session, so the cap
+    stays below the analytics pool size.
+  - **Pipelining**: Each question executes as soon as it is planned.
+  - **Independent Questions**: A failing question is reported with its error; the rest
+    of the report is unaffected.
+  - **Insights Off by Default**: Per-question LLM insights are opt-in.
+
+Integration
+  - Consumes: AnalyticsAgent (plan), AnalyticsExecutor, AnalyticsNormalizer, SchemaCatalog,
+    ResultCache, analytics sessions, constants.
+  - Returns: Report dictionary (items in question order, dedup and timing counters).
+  - Used by: Analytics batch route.
+  - Observability: Logs batch size, dedup counts, duration and failed questions.
+
+Usage
+  >>> from app.agents.analytics.batch import AnalyticsBatch
+  >>> batch = AnalyticsBatch(llm_client, allowlist_validator, cache)
+  >>> report = await batch.run(["Pedidos por estado", "Receita por mês"], "pt-BR")
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.agents.analytics.agent import AnalyticsAgent
+from app.agents.analytics.catalog import get_schema_catalog
+from app.agents.analytics.executor import AnalyticsExecutor
+from app.agents.analytics.normalizer import AnalyticsNormalizer
+from app.agents.analytics.result_cache import get_result_cache
+from app.config.constants import ANALYTICS_BATCH_CONCURRENCY, SQL_MAX_ROWS
+from app.config.exceptions import AppBaseException
+from app.infrastructure.cache.cache_manager import CacheManager
+from app.infrastructure.database.connection import get_analytics_session
+from app.infrastructure.database.repositories.duckdb_analytics_repo import (
+    create_analytics_repository,
+)
+from app.infrastructure.llm.client import LLMClient
+from app.routing.allowlist import AllowlistValidator
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsBatch:
+    """Concurrent, deduplicated answering of a list of analytics questions."""
+
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        allowlist_validator: AllowlistValidator,
+        cache: Optional[CacheManager] = None,
+        engine: Optional[str] = None,
+        concurrency: int = ANALYTICS_BATCH_CONCURRENCY,
+    ) -> None:
+        """Initialize analytics batch.
+
+        Args:
+            llm_client: LLM client for SQL planning (and optional insights).
+            allowlist_validator: Allowlist validator for SQL validation.
+            cache: Cache manager for SQL planning cache (optional).
+            engine: Analytics engine (optional, uses the deployment default if None).
+            concurrency: Maximum questions planning or executing at once.
+        """
+        self._llm_client = llm_client
+        self._allowlist_validator = allowlist_validator
+        self._cache = cache
+        self._engine = engine
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._result_cache = get_result_cache()
+
+    async def run(
+        self,
+        questions: List[str],
+        language: str,
+        approximate: Optional[bool] = None,
+        insights: bool = False,
+    ) -> Dict[str, Any]:
+        """Answer questions and combine the answers into a report.
+
+        Args:
+            questions: Natural language questions.
+            language: Query language.
+            approximate: Request approximate mode (None lets the planner decide).
+            insights: Whether to generate LLM insights for each answer.
+
+        Returns:
+            Dictionary with items (one per question, in order), question_count,
+            unique_questions, unique_plans, failed and elapsed_ms.
+        """
+        start = time.time()
+
+        unique: Dict[str, str] = {}
+        for question in questions:
+            unique.setdefault(_question_key(question), question)
+
+        # Shared schema snapshot (also fixes the engine for every question)
+        async with get_analytics_session() as session:
+            repository = create_analytics_repository(session, self._engine)
+            engine = repository.engine
+            schema_info = await get_schema_catalog(engine).get_schema_info(repository)
+
+        executions: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+        answers = await asyncio.gather(
+            *(
+                self._answer(
+                    question,
+                    language,
+                    approximate,
+                    insights,
+                    engine,
+                    schema_info,
+                    executions,
+                )
+                for question in unique.values()
+            ),
+        )
+        by_key = dict(zip(unique, answers))
+
+        items = [
+            {"question": question, **by_key[_question_key(question)]} for question in questions
+        ]
+        failed = sum(1 for answer in answers if answer["error"] is not None)
+        elapsed_ms = (time.time() - start) * 1000
+
+        logger.info(
+            f"Analytics batch answered {len(questions)} question(s) "
+            f"({len(unique)} unique, {len(executions)} plan(s), {failed} failed) "
+            f"in {elapsed_ms:.0f}ms",
+        )
+
+        return {
+            "items": items,
+            "question_count": len(questions),
+            "unique_questions": len(unique),
+            "unique_plans": len(executions),
+            "failed": failed,
+            "elapsed_ms": elapsed_ms,
+        }
+
+    async def _answer(
+        self,
+        question: str,
+        language: str,
+        approximate: Optional[bool],
+        insights: bool,
+        engine: str,
+        schema_info: Dict[str, Any],
+        executions: Dict[str, "asyncio.Task[Dict[str, Any]]"],
+    ) -> Dict[str, Any]:
+        """Plan, execute (shared with identical plans) and normalize one question.
+
+        Args:
+            question: Natural language question.
+            language: Query language.
+            approximate: Request approximate mode (None lets the planner decide).
+            insights: Whether to generate LLM insights.
+            engine: Analytics engine.
+            schema_info: Shared schema snapshot.
+            executions: Executions of this batch by plan key (single flight).
+
+        Returns:
+            Report item without the question (error set, other fields None, on failure).
+        """
+        answer: Dict[str, Any] = {
+            "sql": None,
+            "explanation": None,
+            "tables_used": None,
+            "rows": None,
+            "row_count": None,
+            "truncated": None,
+            "summary": None,
+            "display_suggestions": None,
+            "chart": None,
+            "insights": None,
+            "approximate": None,
+            "shared_plan": False,
+            "cached": False,
+            "error": None,
+        }
+
+        try:
+            async with self._semaphore:
+                async with get_analytics_session() as session:
+                    repository = create_analytics_repository(session, engine)
+                    agent = AnalyticsAgent(
+                        self._llm_client,
+                        repository,
+                        self._allowlist_validator,
+                        self._cache,
+                    )
+                    planned = await agent.plan(question, language, approximate, schema_info)
+
+            plan_result, cost_check = planned["plan"], planned["cost_check"]
+            approximation = cost_check["approximation"]
+            sql = cost_check["sql"]
+
+            # Identical plans share one execution
+            key = f"{approximation is not None}:{self._result_cache.canonicalize(sql)}"
+            task = executions.get(key)
+            answer["shared_plan"] = task is not None
+            if task is None:
+                task = asyncio.create_task(
+                    self._execute(sql, engine, schema_info, cost_check),
+                )
+                executions[key] = task
+            exec_result = await task
+
+            rows = exec_result["rows"]
+            normalizer = AnalyticsNormalizer(self._llm_client if insights else None)
+            normalized = await normalizer.normalize(rows, sql, language)
+
+            answer.update(
+                {
+                    "sql": sql,
+                    "explanation": plan_result["explanation"],
+                    "tables_used": plan_result["tables_used"],
+                    "rows": rows,
+                    "row_count": exec_result["row_count"],
+                    "truncated": exec_result["row_count"] >= SQL_MAX_ROWS,
+                    "summary": normalized["summary"],
+                    "display_suggestions": normalized["display_suggestions"],
+                    "chart": normalized["chart"],
+                    "insights": normalized["insights"],
+                    "approximate": approximation.metadata if approximation else None,
+                    "cached": exec_result.get("cached", False),
+                },
+            )
+        except AppBaseException as e:
+            logger.warning(f"Batch question failed: {e.message}", extra={"question": question})
+            answer["error"] = e.message
+        except Exception as e:
+            logger.error(f"Batch question failed: {e}", extra={"question": question}, exc_info=True)
+            answer["error"] = "Internal error answering the question"
+
+        return answer
+
+    async def _execute(
+        self,
+        sql: str,
+        engine: str,
+        schema_info: Dict[str, Any],
+        cost_check: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Execute a plan with its own session (bounded by the batch semaphore).
+
+        Args:
+            sql: Cost-checked SQL.
+            engine: Analytics engine.
+            schema_info: Shared schema snapshot (result cache keys).
+            cost_check: Cost check of sql (approximation, query plan).
+
+        Returns:
+            Execution result (rows, row_count, execution_time_ms, cached).
+        """
+        async with self._semaphore:
+            async with get_analytics_session() as session:
+                executor = AnalyticsExecutor(
+                    create_analytics_repository(session, engine),
+                    result_cache=self._result_cache,
+                )
+                return await executor.execute(
+                    sql,
+                    schema_info=schema_info,
+                    approximate=cost_check["approximation"] is not None,
+                    query_plan=cost_check.get("query_plan"),
+                )
+
+
+def _question_key(question: str) -> str:
+    """Normalize a question for deduplication.
+
+    Args:
+        question: Natural language question.
+
+    Returns:
+        Case-folded question with collapsed whitespace.
+    """
+    return " ".join(question.split()).casefold()
@@ -0,0 +1,366 @@
+"""
+Analytics schema catalog (in-process cache of analytics table metadata).
+
+Overview
+  Keeps the analytics schema (tables and columns) in memory so the planner
+  does not reload and rebuild it on every question. Each snapshot carries the
+  catalog version bumped by AnalyticsSchemaBuilder; the catalog revalidates the
+  version periodically and reloads the full schema only when it changes.
+  Also prunes the schema per question to the tables most similar to the
+  query embedding (plus their join neighbours), keeping planner prompts small.
+
+Design
+  - **Versioned Snapshot**: schema_info includes "version", used by planner cache keys.
+  - **Cheap Revalidation**: One version lookup at most every
+    SCHEMA_CATALOG_REFRESH_INTERVAL seconds.
+  - **Single Flight**: Concurrent requests share one reload (asyncio.Lock).
+  - **Singleton Pattern**: get_schema_catalog() returns one process-wide instance per
+    analytics engine (engines expose different tables, e.g. DuckDB only snapshotted ones).
+  - **Graceful Degradation**: Keeps last snapshot if revalidation fails; with no
+    snapshot to fall back on the failure is raised (never an empty schema).
+  - **Schema Pruning**: Cosine similarity over table/column embeddings built at ingestion;
+    tables without embeddings are always kept.
+  - **Column Statistics**: Ingestion statistics (distinct counts, min/max, top values) are
+    part of the snapshot and indexed by column name for result lookups.
+
+Integration
+  - Consumes: AnalyticsRepository (get_catalog_version, get_all_tables), constants.
+  - Returns: Schema info dictionary ({"tables": [...], "version": int}).
+  - Used by: AnalyticsAgent for SQL planning and display suggestions.
+  - Observability: Logs catalog reloads and failures.
+
+Usage
+  >>> from app.agents.analytics.catalog import get_schema_catalog
+  >>> catalog = get_schema_catalog()
+  >>> schema_info = await catalog.get_schema_info(repository)
+  >>> pruned = catalog.prune_schema_info(schema_info, query_embedding)
+  >>> stats = catalog.column_stats(["order_status", "total"], ["olist_orders"])
+"""
+
+import asyncio
+import logging
+import re
+import time
+from functools import lru_cache
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from app.config.constants import SCHEMA_CATALOG_REFRESH_INTERVAL, SCHEMA_PRUNING_TOP_K
+from app.config.exceptions import DatabaseException
+from app.infrastructure.database.models.analytics import AnalyticsTable
+from app.infrastructure.database.repositories.analytics_repo import AnalyticsRepository
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaCatalog:
+    """In-process, versioned cache of the analytics schema.
+
+    Loads table and column metadata once and serves it from memory until
+    the catalog version stored in the database changes.
+    """
+
+    def __init__(self, refresh_interval: float = SCHEMA_CATALOG_REFRESH_INTERVAL) -> None:
+        """Initialize schema catalog.
+
+        Args:
+            refresh_interval: Seconds between catalog version checks.
+        """
+        self._refresh_interval = refresh_interval
+        self._schema_info: Optional[Dict[str, Any]] = None
+        self._version: Optional[int] = None
+        self._checked_at: float = 0.0
+        self._lock = asyncio.Lock()
+        # Normalized embedding matrix per table (row 0: table, rest: columns)
+        self._embeddings: Dict[str, np.ndarray] = {}
+        self._neighbours: Dict[str, Set[str]] = {}
+        # Column name -> table name -> column info (with statistics)
+        self._columns: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    @property
+    def version(self) -> Optional[int]:
+        """Get version of the cached snapshot.
+
+        Returns:
+            Catalog version, or None if nothing is loaded.
+        """
+        return self._version
+
+    async def get_schema_info(self, repository: AnalyticsRepository) -> Dict[str, Any]:
+        """Get schema information, reloading only if the version changed.
+
+        Args:
+            repository: Analytics repository for version and schema lookups.
+
+        Returns:
+            Dictionary with tables (name, description, columns) and version.
+
+        Raises:
+            DatabaseException: If the schema cannot be loaded and no snapshot is cached.
+        """
+        if self._is_fresh():
+            return self._schema_info  # type: ignore[return-value]
+
+        async with self._lock:
+            # Another coroutine may have revalidated while we waited
+            if self._is_fresh():
+                return self._schema_info  # type: ignore[return-value]
+
+            try:
+                version = await repository.get_catalog_version()
+                if self._schema_info is None or version != self._version:
+                    tables = await repository.get_all_tables()
+                    self._schema_info = self._build_schema_info(tables, version)
+                    self._embeddings = self._build_embedding_index(tables)
+                    self._neighbours = self._build_join_graph(self._schema_info["tables"])
+                    self._columns = self._build_column_index(self._schema_info["tables"])
+                    self._version = version
+                    logger.info(
+                        f"Schema catalog loaded (version: {version}, tables: {len(tables)})",
+                    )
+                self._checked_at = time.monotonic()
+            except Exception as e:
+                if self._schema_info is None:
+                    raise DatabaseException(
+                        message="Analytics schema catalog unavailable",
+                        details={"error": str(e)},
+                    ) from e
+                logger.warning(f"Failed to refresh schema catalog, serving stale snapshot: {e}")
+
+            return self._schema_info
+
+    def prune_schema_info(
+        self,
+        schema_info: Dict[str, Any],
+        query_embedding: Optional[List[float]],
+        top_k: int = SCHEMA_PRUNING_TOP_K,
+    ) -> Dict[str, Any]:
+        """Keep only tables relevant to the query (plus join neighbours).
+
+        Scores each table by the best cosine similarity between the query
+        embedding and the table or any of its columns, keeps the top_k
+        tables and adds their join neighbours. Tables without embeddings
+        are always kept.
+
+        Args:
+            schema_info: Schema info snapshot from get_schema_info.
+            query_embedding: Query embedding (None disables pruning).
+            top_k: Number of most relevant tables to keep.
+
+        Returns:
+            Schema info with pruned tables list (same version).
+        """
+        tables = schema_info.get("tables", [])
+        if query_embedding is None or len(tables) <= top_k or not self._embeddings:
+            return schema_info
+
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query_vector)
+        if query_norm == 0:
+            return schema_info
+        query_vector /= query_norm
+
+        scores = {
+            name: float((matrix @ query_vector).max())
+            for name, matrix in self._embeddings.items()
+        }
+        ranked = sorted(scores, key=scores.__getitem__, reverse=True)[:top_k]
+
+        selected = set(ranked)
+        for name in ranked:
+            selected |= self._neighbours.get(name, set())
+        selected |= {t["name"] for t in tables if t["name"] not in self._embeddings}
+
+        return {
+            **schema_info,
+            "tables": [t for t in tables if t["name"] in selected],
+        }
+
+    def column_stats(
+        self,
+        columns: List[str],
+        tables: Optional[List[str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Look up ingestion statistics of result columns in the cached snapshot.
+
+        Each column name is resolved in the given tables (those the query
+        used) first, then in any table if the name is unambiguous.
+
+        Args:
+            columns: Result column names.
+            tables: Tables used by the query (optional).
+
+        Returns:
+            Dictionary of column name to column info (data_type, distinct_count,
+            min_value, max_value, top_values); unknown or ambiguous columns are omitted.
+        """
+        used = {table.split(".")[-1].strip('"') for table in tables or []}
+        stats: Dict[str, Dict[str, Any]] = {}
+        for column in columns:
+            candidates = self._columns.get(column)
+            if not candidates:
+                continue
+            matches = [info for table, info in candidates.items() if table in used]
+            if not matches and len(candidates) == 1:
+                matches = list(candidates.values())
+            if matches:
+                stats[column] = matches[0]
+        return stats
+
+    def invalidate(self) -> None:
+        """Force reload on next access."""
+        self._schema_info = None
+        self._version = None
+        self._checked_at = 0.0
+        self._embeddings = {}
+        self._neighbours = {}
+        self._columns = {}
+
+    def _is_fresh(self) -> bool:
+        """Check if cached snapshot is within the revalidation interval.
+
+        Returns:
+            True if snapshot can be served without a version check.
+        """
+        return (
+            self._schema_info is not None
+            and time.monotonic() - self._checked_at < self._refresh_interval
+        )
+
+    def _build_schema_info(
+        self,
+        tables: List[AnalyticsTable],
+        version: int,
+    ) -> Dict[str, Any]:
+        """Build schema info dictionary from table metadata.
+
+        Args:
+            tables: AnalyticsTable objects with columns loaded.
+            version: Catalog version of this snapshot.
+
+        Returns:
+            Dictionary with schema information (tables, columns, types, version).
+        """
+        schema_tables: List[Dict[str, Any]] = []
+        for table in tables:
+            table_info: Dict[str, Any] = {
+                "name": table.name,
+                "description": table.description,
+                "data_version": table.data_version,
+                "sample_fraction": table.sample_fraction,
+                "columns": [],
+            }
+
+            for column in table.columns:
+                column_info: Dict[str, Any] = {
+                    "name": column.name,
+                    "data_type": column.data_type,
+                    "is_nullable": column.is_nullable,
+                    "is_primary_key": column.is_primary_key,
+                    "is_foreign_key": column.is_foreign_key,
+                    "foreign_key_reference": column.foreign_key_reference,
+                    "distinct_count": column.distinct_count,
+                    "min_value": column.min_value,
+                    "max_value": column.max_value,
+                    "top_values": column.top_values,
+                }
+                table_info["columns"].append(column_info)
+
+            schema_tables.append(table_info)
+
+        return {"tables": schema_tables, "version": version}
+
+    def _build_embedding_index(self, tables: List[AnalyticsTable]) -> Dict[str, np.ndarray]:
+        """Build normalized embedding matrices for schema pruning.
+
+        Args:
+            tables: AnalyticsTable objects with columns loaded.
+
+        Returns:
+            Dictionary of table name to matrix (table embedding + column embeddings).
+        """
+        index: Dict[str, np.ndarray] = {}
+        for table in tables:
+            if table.embedding is None:
+                continue
+
+            vectors = [table.embedding]
+            vectors.extend(col.embedding for col in table.columns if col.embedding is not None)
+
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            index[table.name] = matrix / norms
+        return index
+
+    def _build_column_index(
+        self,
+        schema_tables: List[Dict[str, Any]],
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Index column info by column name for statistics lookups.
+
+        Args:
+            schema_tables: Tables from schema info.
+
+        Returns:
+            Dictionary of column name to {table name: column info}.
+        """
+        index: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for table in schema_tables:
+            for col in table["columns"]:
+                index.setdefault(col["name"], {})[table["name"]] = col
+        return index
+
+    def _build_join_graph(self, schema_tables: List[Dict[str, Any]]) -> Dict[str, Set[str]]:
+        """Build join neighbour graph between tables.
+
+        Tables are neighbours if a foreign key references the other table or
+        they share a key-like column (primary/foreign key or "*_id").
+
+        Args:
+            schema_tables: Tables from schema info.
+
+        Returns:
+            Dictionary of table name to neighbour table names.
+        """
+        key_columns: Dict[str, Set[str]] = {}
+        neighbours: Dict[str, Set[str]] = {}
+        for table in schema_tables:
+            name = table["name"]
+            neighbours[name] = set()
+            key_columns[name] = {
+                col["name"]
+                for col in table["columns"]
+                if col["is_primary_key"] or col["is_foreign_key"] or col["name"].endswith("_id")
+            }
+
+        for left, right in combinations(key_columns, 2):
+            if key_columns[left] & key_columns[right]:
+                neighbours[left].add(right)
+                neighbours[right].add(left)
+
+        # Explicit references, e.g. "customers(customer_id)"
+        for table in schema_tables:
+            for col in table["columns"]:
+                match = re.match(r"\s*([\w.]+)\s*\(", col.get("foreign_key_reference") or "")
+                referenced = match.group(1).split(".")[-1] if match else None
+                if referenced in neighbours and referenced != table["name"]:
+                    neighbours[table["name"]].add(referenced)
+                    neighbours[referenced].add(table["name"])
+
+        return neighbours
+
+
+@lru_cache()
+def get_schema_catalog(engine: str = "postgres") -> SchemaCatalog:
+    """Get singleton SchemaCatalog instance of an analytics engine.
+
+    Args:
+        engine: Analytics engine of the repository ("postgres" or "duckdb").
+
+    Returns:
+        SchemaCatalog singleton instance.
+    """
+    return SchemaCatalog()
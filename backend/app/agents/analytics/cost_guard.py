@@ -0,0 +1,192 @@
+"""
+Analytics cost guard (pre-execution cost gate for generated SQL).
+
+Overview
+  Checks generated SQL before execution using the planner's estimates
+  (EXPLAIN without ANALYZE). Injects or tightens LIMIT so the database can
+  stop early, and rejects queries whose estimated cost or intermediate row
+  count exceeds configurable thresholds, so a runaway query never holds a
+  connection until statement_timeout.
+
+Design
+  - **Row Bound**: Appends LIMIT SQL_MAX_ROWS when missing (or LIMIT ALL), tightens
+    larger limits (LIMIT or FETCH FIRST, any OFFSET kept); limits that cannot be
+    compared (parameters, expressions, WITH TIES) are bounded by wrapping the query.
+    The outermost clauses are found with the sql_analysis lexer, so comments,
+    literals and subquery limits never confuse it.
+  - **Cost Threshold**: Rejects plans with Total Cost above ANALYTICS_MAX_QUERY_COST.
+  - **Row Threshold**: Rejects plans with any node estimating more than
+    ANALYTICS_MAX_PLAN_ROWS rows (e.g. accidental cross joins).
+  - **Feedback**: Rejections carry cost details so the planner can regenerate.
+  - **Graceful Degradation**: If EXPLAIN fails, the query runs (timeout still applies).
+
+Integration
+  - Consumes: AnalyticsRepository (explain_sql), sql_analysis (outer_row_limit), constants.
+  - Returns: Dictionary with (possibly rewritten) SQL, cost, rows, and plan.
+  - Used by: AnalyticsAgent between planning and execution.
+  - Observability: Logs rewrites and rejections.
+
+Usage
+  >>> from app.agents.analytics.cost_guard import QueryCostGuard
+  >>> guard = QueryCostGuard(repository)
+  >>> checked = await guard.check("SELECT * FROM analytics.orders")
+  >>> checked["sql"].endswith("LIMIT 1000")
+  True
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from app.config.constants import ANALYTICS_MAX_PLAN_ROWS, ANALYTICS_MAX_QUERY_COST, SQL_MAX_ROWS
+from app.config.exceptions import ValidationException
+from app.infrastructure.database.repositories.analytics_repo import AnalyticsRepository
+from app.routing.sql_analysis import outer_row_limit
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCostGuard:
+    """Pre-execution cost gate for analytics SQL.
+
+    Bounds result size with LIMIT and rejects queries the planner
+    estimates to be too expensive.
+    """
+
+    def __init__(
+        self,
+        repository: AnalyticsRepository,
+        max_cost: float = ANALYTICS_MAX_QUERY_COST,
+        max_plan_rows: float = ANALYTICS_MAX_PLAN_ROWS,
+        max_rows: int = SQL_MAX_ROWS,
+    ) -> None:
+        """Initialize cost guard.
+
+        Args:
+            repository: Analytics repository for EXPLAIN.
+            max_cost: Maximum estimated total cost (planner units).
+            max_plan_rows: Maximum estimated rows for any plan node.
+            max_rows: Row limit injected into unbounded queries.
+        """
+        self._repository = repository
+        self._max_cost = max_cost
+        self._max_plan_rows = max_plan_rows
+        self._max_rows = max_rows
+
+    async def check(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Bound and cost-check SQL before execution.
+
+        Args:
+            sql: Validated SQL query.
+            params: Query parameters (optional).
+
+        Returns:
+            Dictionary with sql (possibly rewritten), total_cost, plan_rows,
+            and query_plan (None values if EXPLAIN was unavailable).
+
+        Raises:
+            ValidationException: If estimated cost or rows exceed thresholds.
+        """
+        bounded_sql = self.enforce_limit(sql)
+        if bounded_sql != sql:
+            logger.info(f"Row limit applied to analytics query (limit: {self._max_rows})")
+
+        try:
+            query_plan = await self._repository.explain_sql(bounded_sql, params)
+        except Exception as e:
+            # Graceful degradation: statement_timeout still bounds the query
+            logger.warning(f"Cost check skipped, EXPLAIN failed: {e}")
+            query_plan = None
+
+        plan = (query_plan or {}).get("Plan") or {}
+        total_cost = plan.get("Total Cost")
+        plan_rows = self._max_node_rows(plan) if plan else None
+
+        if total_cost is not None and total_cost > self._max_cost:
+            logger.warning(f"Analytics query rejected (estimated cost: {total_cost:.0f})")
+            raise ValidationException(
+                message=f"Query is too expensive (estimated cost {total_cost:.0f} > {self._max_cost:.0f})",
+                details={
+                    "sql": bounded_sql[:200],
+                    "reason": "cost",
+                    "total_cost": total_cost,
+                    "max_cost": self._max_cost,
+                    "plan_rows": plan_rows,
+                },
+            )
+
+        if plan_rows is not None and plan_rows > self._max_plan_rows:
+            logger.warning(f"Analytics query rejected (estimated rows: {plan_rows:.0f})")
+            raise ValidationException(
+                message=f"Query processes too many rows (estimated {plan_rows:.0f} > {self._max_plan_rows:.0f})",
+                details={
+                    "sql": bounded_sql[:200],
+                    "reason": "rows",
+                    "total_cost": total_cost,
+                    "plan_rows": plan_rows,
+                    "max_plan_rows": self._max_plan_rows,
+                },
+            )
+
+        return {
+            "sql": bounded_sql,
+            "total_cost": total_cost,
+            "plan_rows": plan_rows,
+            "query_plan": query_plan,
+        }
+
+    def enforce_limit(self, sql: str) -> str:
+        """Append LIMIT when missing, or tighten it when above max_rows.
+
+        Only the outermost LIMIT/OFFSET/FETCH FIRST clauses are considered;
+        limits inside subqueries are left untouched. A numeric limit above
+        max_rows (or LIMIT ALL) is replaced by LIMIT max_rows, keeping the
+        OFFSET; a limit that cannot be compared is kept and the query is
+        wrapped in a bounded subquery.
+
+        Args:
+            sql: SQL query.
+
+        Returns:
+            SQL query bounded to max_rows (without terminating semicolon).
+        """
+        row_limit = outer_row_limit(sql)
+        if row_limit is None:
+            return self._wrap(sql.strip().rstrip(";").rstrip())
+
+        limit = (row_limit.limit or "ALL").upper()
+        if row_limit.with_ties or not (limit.isdigit() or limit == "ALL"):
+            return self._wrap(row_limit.statement)
+        if limit.isdigit() and int(limit) <= self._max_rows:
+            return row_limit.statement
+
+        offset = f" OFFSET {row_limit.offset}" if row_limit.offset else ""
+        return f"{row_limit.body}\nLIMIT {self._max_rows}{offset}"
+
+    def _wrap(self, sql: str) -> str:
+        """Bound a query by wrapping it in a subquery with LIMIT max_rows.
+
+        Args:
+            sql: SQL query (without terminating semicolon).
+
+        Returns:
+            Wrapped SQL query (the newline ends any trailing line comment).
+        """
+        return f"SELECT * FROM (\n{sql}\n) AS bounded\nLIMIT {self._max_rows}"
+
+    def _max_node_rows(self, plan: Dict[str, Any]) -> float:
+        """Get the largest row estimate of any node in the plan tree.
+
+        Args:
+            plan: Plan node (EXPLAIN JSON "Plan").
+
+        Returns:
+            Maximum "Plan Rows" across the node and its children.
+        """
+        rows = float(plan.get("Plan Rows") or 0)
+        for child in plan.get("Plans") or []:
+            rows = max(rows, self._max_node_rows(child))
+        return rows
@@ -0,0 +1,747 @@
+"""
+Analytics document facts (commerce extracted fields as a typed, indexed table).
+
+Overview
+  Projects the known fields of processed commerce documents (total, subtotal,
+  tax, issue and due dates, issuer) from the opaque CommerceDocument
+  extracted_data JSON into a typed table in the analytics schema, registered
+  in the schema catalog like any other table. Document-derived metrics
+  (totals per supplier, tax per month) then become plain indexed SQL for the
+  Analytics Agent instead of parsing every document in Python. Documents are
+  materialised in the background as they are processed; a watermark sync
+  catches up on anything missed.
+
+Design
+  - **Field Aliases**: Each fact is looked up under its Portuguese and English field
+    names (e.g. total, valor_total, amount), case and accent insensitive; the issuer
+    may be a nested object (nome/cnpj). Unknown or unparseable values become NULL.
+  - **Typed Values**: Amounts accept numbers and formatted strings ("R$ 1.234,56",
+    "1,234.56") as NUMERIC(18,2); dates accept ISO and day-first (dd/mm/yyyy) strings.
+    CNPJ/CPF-like tax ids are stored as digits only (groupable).
+  - **Incremental**: Documents changed since the newest projected one (minus an overlap
+    window for late commits) are re-projected with an upsert on document_id, in
+    keyset batches of ANALYTICS_DOCUMENT_FACTS_BATCH_SIZE, one transaction each.
+    Documents without extracted data are removed from the table.
+  - **Full Sync**: Re-projects every document and removes facts of deleted documents.
+  - **Catalog Registration**: Table created and registered on first sync (no embedding,
+    so always in planner prompts); data and catalog versions are bumped when rows
+    change (cached results invalidate), rollups over the table are refreshed and the
+    Parquet snapshot is rewritten (DuckDB engine) when a snapshot store is given.
+  - **Background Trigger**: schedule_document_facts runs a sync of the given documents
+    in its own session after the request commits; syncs are serialised per process
+    and failures are logged, never raised to the request.
+
+Integration
+  - Consumes: CommerceDocument, analytics metadata models, RollupManager,
+    AnalyticsSchemaBuilder (snapshots), database session, constants.
+  - Returns: Projected fact rows, sync counters.
+  - Used by: Document routes (after processing), scripts/document_facts.py (backfill).
+  - Observability: Logs synced documents, registration and background failures.
+
+Usage
+  >>> from app.agents.analytics.document_facts import DocumentFactsMaterialiser
+  >>> materialiser = DocumentFactsMaterialiser(session)
+  >>> await materialiser.sync()  # changed since the watermark
+  >>> await materialiser.sync(["0b6f..."])  # specific documents
+  >>> schedule_document_facts([document_id])  # after commit, in the background
+"""
+
+import asyncio
+import datetime
+import json
+import logging
+import re
+import unicodedata
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, text, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.agents.analytics.rollups import RollupManager
+from app.agents.analytics.schema_builder import AnalyticsSchemaBuilder
+from app.config.constants import (
+    ANALYTICS_DOCUMENT_FACTS_BATCH_SIZE,
+    ANALYTICS_DOCUMENT_FACTS_OVERLAP_SECONDS,
+    ANALYTICS_DOCUMENT_FACTS_TABLE,
+)
+from app.infrastructure.database.connection import get_db_session
+from app.infrastructure.database.models.analytics import (
+    AnalyticsCatalogVersion,
+    AnalyticsColumn,
+    AnalyticsTable,
+)
+from app.infrastructure.database.models.commerce import CommerceDocument
+from app.infrastructure.database.repositories.duckdb_analytics_repo import (
+    ParquetSnapshotStore,
+    get_snapshot_store,
+    snapshots_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+# Fact table columns: name, type, nullable
+_COLUMNS: List[Tuple[str, str, bool]] = [
+    ("document_id", "UUID", False),
+    ("user_id", "UUID", True),
+    ("document_type", "TEXT", True),
+    ("issuer_name", "TEXT", True),
+    ("issuer_tax_id", "TEXT", True),
+    ("issue_date", "DATE", True),
+    ("due_date", "DATE", True),
+    ("subtotal", "NUMERIC(18,2)", True),
+    ("tax", "NUMERIC(18,2)", True),
+    ("total", "NUMERIC(18,2)", True),
+    ("confidence_score", "DOUBLE PRECISION", True),
+    ("processed_at", "TIMESTAMPTZ", False),
+]
+
+# Indexed columns (document_id is the primary key)
+_INDEXES = [
+    "issue_date",
+    "due_date",
+    "issuer_tax_id",
+    "issuer_name",
+    "document_type",
+    "processed_at",
+]
+
+_DESCRIPTION = (
+    "Documentos comerciais processados (notas fiscais, pedidos), uma linha por documento "
+    "com os campos extraídos: emitente (issuer_name, issuer_tax_id = CNPJ/CPF só dígitos), "
+    "datas de emissão (issue_date) e vencimento (due_date), valores (subtotal, tax = "
+    "impostos, total) e tipo do documento. Campos não encontrados no documento são NULL."
+)
+
+# Field names per fact, in priority order (normalized, see _normalize_key)
+_AMOUNT_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "total": (
+        "total",
+        "valor_total",
+        "total_amount",
+        "amount",
+        "grand_total",
+        "total_geral",
+        "valor_nota",
+        "invoice_total",
+    ),
+    "subtotal": ("subtotal", "valor_subtotal", "sub_total", "valor_produtos", "net_amount"),
+    "tax": (
+        "tax",
+        "imposto",
+        "impostos",
+        "taxa",
+        "tax_amount",
+        "total_tax",
+        "valor_imposto",
+        "valor_impostos",
+        "total_impostos",
+        "vat",
+    ),
+}
+_DATE_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "issue_date": (
+        "issue_date",
+        "data_emissao",
+        "emission_date",
+        "invoice_date",
+        "order_date",
+        "data_pedido",
+        "date",
+        "data",
+    ),
+    "due_date": ("due_date", "data_vencimento", "vencimento"),
+}
+_ISSUER_ALIASES = (
+    "issuer",
+    "issuer_name",
+    "emitente",
+    "nome_emitente",
+    "fornecedor",
+    "supplier",
+    "supplier_name",
+    "vendor",
+    "vendor_name",
+    "seller",
+    "razao_social",
+)
+_TAX_ID_ALIASES = (
+    "issuer_tax_id",
+    "cnpj_emitente",
+    "emitente_cnpj",
+    "issuer_cnpj",
+    "cnpj_fornecedor",
+    "supplier_tax_id",
+    "cnpj",
+    "cpf_cnpj",
+    "tax_id",
+    "vat_number",
+)
+_NAME_KEYS = ("name", "nome", "razao_social", "legal_name")
+
+# Words dropped from field names ("valor do imposto" matches "valor_imposto")
+_CONNECTORS = frozenset({"de", "da", "do", "das", "dos", "of", "the"})
+_NESTED_TAX_ID_KEYS = ("cnpj", "cpf_cnpj", "tax_id", "cpf", "vat_number")
+
+# Amounts beyond NUMERIC(18,2)
+_MAX_AMOUNT = Decimal(10) ** 16
+
+_ISO_DATE = re.compile(r"^(\d{4})[-/](\d{1,2})[-/](\d{1,2})(?:$|[T\s])")
+_DAY_FIRST_DATE = re.compile(r"^(\d{1,2})[-/.](\d{1,2})[-/.](\d{4}|\d{2})(?:$|\s)")
+
+# Tax ids: digits with CNPJ/CPF punctuation only
+_TAX_ID_FORMAT = re.compile(r"^[\d.\-/\s]+$")
+
+# Background syncs (references kept until done) and their per-process lock
+_background_tasks: Set["asyncio.Task[None]"] = set()
+_sync_lock = asyncio.Lock()
+
+# Table created and registered by this process
+_table_ready = False
+
+
+def project_document(
+    extracted_data: Optional[Dict[str, Any]],
+    schema_definition: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Project the known fields of a document's extracted data.
+
+    Args:
+        extracted_data: CommerceDocument extracted_data.
+        schema_definition: CommerceDocument schema_definition (document type).
+
+    Returns:
+        Dictionary with document_type, issuer_name, issuer_tax_id, issue_date,
+        due_date, subtotal, tax and total (None when missing or unparseable);
+        None if the document has no extracted data.
+    """
+    if not isinstance(extracted_data, dict) or not extracted_data:
+        return None
+    fields = _normalize_fields(extracted_data)
+
+    issuer = _lookup(fields, _ISSUER_ALIASES)
+    issuer_name = _text(issuer)
+    issuer_tax_id = _lookup(fields, _TAX_ID_ALIASES)
+    if isinstance(issuer, dict):
+        nested = _normalize_fields(issuer)
+        issuer_name = _text(_lookup(nested, _NAME_KEYS))
+        issuer_tax_id = _lookup(nested, _NESTED_TAX_ID_KEYS) or issuer_tax_id
+
+    document_type = None
+    if isinstance(schema_definition, dict):
+        document_type = _text(schema_definition.get("document_type"))
+
+    facts: Dict[str, Any] = {
+        "document_type": document_type.lower() if document_type else None,
+        "issuer_name": issuer_name,
+        "issuer_tax_id": _tax_id(issuer_tax_id),
+    }
+    for name, aliases in _DATE_ALIASES.items():
+        facts[name] = _parse_date(_lookup(fields, aliases))
+    for name, aliases in _AMOUNT_ALIASES.items():
+        facts[name] = _parse_amount(_lookup(fields, aliases))
+    return facts
+
+
+class DocumentFactsMaterialiser:
+    """Maintains the document facts table and its catalog registration.
+
+    Every operation runs in its own transaction, like the RollupManager.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        snapshot_store: Optional[ParquetSnapshotStore] = None,
+        batch_size: int = ANALYTICS_DOCUMENT_FACTS_BATCH_SIZE,
+    ) -> None:
+        """Initialize document facts materialiser.
+
+        Args:
+            session: Async database session (writable).
+            snapshot_store: Parquet snapshot store for the DuckDB engine (optional,
+                no snapshot if None).
+            batch_size: Documents projected per transaction.
+        """
+        self._session = session
+        self._snapshot_store = snapshot_store
+        self._batch_size = batch_size
+
+    async def ensure_table(self) -> None:
+        """Create the facts table and register it in the catalog (if needed)."""
+        global _table_ready
+        if _table_ready:
+            return
+
+        name = ANALYTICS_DOCUMENT_FACTS_TABLE
+        async with self._session.begin():
+            columns_sql = ", ".join(
+                f'"{column}" {data_type} {"NULL" if nullable else "NOT NULL"}'
+                for column, data_type, nullable in _COLUMNS
+            )
+            await self._session.execute(text("CREATE SCHEMA IF NOT EXISTS analytics"))
+            await self._session.execute(
+                text(
+                    f'CREATE TABLE IF NOT EXISTS analytics."{name}" '
+                    f'({columns_sql}, PRIMARY KEY ("document_id"))',
+                ),
+            )
+            for column in _INDEXES:
+                await self._session.execute(
+                    text(
+                        f'CREATE INDEX IF NOT EXISTS idx_{name}_{column} '
+                        f'ON analytics."{name}" ("{column}")',
+                    ),
+                )
+
+            result = await self._session.execute(
+                select(AnalyticsTable).where(AnalyticsTable.name == name),
+            )
+            if result.scalar_one_or_none() is None:
+                await self._register_table()
+                await self._bump_catalog_version()
+                logger.info(f"Registered document facts table {name} in the analytics catalog")
+
+        _table_ready = True
+
+    async def sync(
+        self,
+        document_ids: Optional[Iterable[str]] = None,
+        full: bool = False,
+    ) -> Dict[str, int]:
+        """Project changed documents into the facts table.
+
+        Args:
+            document_ids: Documents to project (optional, None projects documents
+                changed since the watermark).
+            full: If True, project every document and remove facts of deleted ones.
+
+        Returns:
+            Dictionary with projected (rows upserted) and removed (rows deleted).
+        """
+        await self.ensure_table()
+
+        ids: Optional[List[UUID]] = None
+        if document_ids is not None:
+            ids = [UUID(str(document_id)) for document_id in document_ids]
+            if not ids:
+                return {"projected": 0, "removed": 0}
+        since = None if full or ids is not None else await self._watermark()
+
+        projected = removed = 0
+        cursor: Optional[Tuple[datetime.datetime, UUID]] = None
+        while True:
+            async with self._session.begin():
+                documents = await self._fetch(ids, since, cursor)
+                rows: List[Dict[str, Any]] = []
+                empty: List[UUID] = []
+                for document in documents:
+                    facts = project_document(document.extracted_data, document.schema_definition)
+                    if facts is None:
+                        empty.append(document.id)
+                        continue
+                    rows.append(
+                        {
+                            "document_id": document.id,
+                            "user_id": document.user_id,
+                            **facts,
+                            "confidence_score": document.confidence_score,
+                            "processed_at": document.updated_at,
+                        },
+                    )
+                if rows:
+                    await self._upsert(rows)
+                    projected += len(rows)
+                if empty:
+                    removed += await self._delete(empty)
+
+            if len(documents) < self._batch_size:
+                break
+            cursor = (documents[-1].updated_at, documents[-1].id)
+
+        if full:
+            async with self._session.begin():
+                result = await self._session.execute(
+                    text(
+                        f'DELETE FROM analytics."{ANALYTICS_DOCUMENT_FACTS_TABLE}" f '
+                        f"WHERE NOT EXISTS (SELECT 1 FROM {CommerceDocument.__tablename__} d "
+                        "WHERE d.id = f.document_id)",
+                    ),
+                )
+                removed += max(result.rowcount or 0, 0)
+
+        if projected or removed:
+            await self._publish()
+            logger.info(
+                f"Document facts synced: {projected} projected, {removed} removed",
+                extra={"table": ANALYTICS_DOCUMENT_FACTS_TABLE},
+            )
+
+        return {"projected": projected, "removed": removed}
+
+    async def _watermark(self) -> Optional[datetime.datetime]:
+        """Get the re-projection start (newest projected document minus the overlap).
+
+        Returns:
+            Lower bound of document updated_at, or None if the table is empty.
+        """
+        async with self._session.begin():
+            result = await self._session.execute(
+                text(f'SELECT MAX(processed_at) FROM analytics."{ANALYTICS_DOCUMENT_FACTS_TABLE}"'),
+            )
+            newest = result.scalar()
+        if newest is None:
+            return None
+        return newest - datetime.timedelta(seconds=ANALYTICS_DOCUMENT_FACTS_OVERLAP_SECONDS)
+
+    async def _fetch(
+        self,
+        ids: Optional[List[UUID]],
+        since: Optional[datetime.datetime],
+        cursor: Optional[Tuple[datetime.datetime, UUID]],
+    ) -> List[Any]:
+        """Fetch the next keyset batch of documents to project.
+
+        Must be called inside the caller's transaction.
+
+        Args:
+            ids: Document ids to fetch (optional).
+            since: Lower bound of updated_at (optional).
+            cursor: (updated_at, id) of the last document of the previous batch.
+
+        Returns:
+            Rows with id, user_id, extracted_data, schema_definition,
+            confidence_score and updated_at, ordered by (updated_at, id).
+        """
+        query = select(
+            CommerceDocument.id,
+            CommerceDocument.user_id,
+            CommerceDocument.extracted_data,
+            CommerceDocument.schema_definition,
+            CommerceDocument.confidence_score,
+            CommerceDocument.updated_at,
+        )
+        if ids is not None:
+            query = query.where(CommerceDocument.id.in_(ids))
+        if since is not None:
+            query = query.where(CommerceDocument.updated_at >= since)
+        if cursor is not None:
+            query = query.where(
+                tuple_(CommerceDocument.updated_at, CommerceDocument.id) > tuple_(*cursor),
+            )
+        query = query.order_by(CommerceDocument.updated_at, CommerceDocument.id).limit(
+            self._batch_size,
+        )
+        result = await self._session.execute(query)
+        return list(result.all())
+
+    async def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert or update fact rows by document_id.
+
+        Must be called inside the caller's transaction.
+
+        Args:
+            rows: Fact rows (every column of the table).
+        """
+        names = [column for column, _, _ in _COLUMNS]
+        columns = ", ".join(f'"{name}"' for name in names)
+        values = ", ".join(f":{name}" for name in names)
+        updates = ", ".join(f'"{name}" = EXCLUDED."{name}"' for name in names[1:])
+        await self._session.execute(
+            text(
+                f'INSERT INTO analytics."{ANALYTICS_DOCUMENT_FACTS_TABLE}" ({columns}) '
+                f'VALUES ({values}) ON CONFLICT ("document_id") DO UPDATE SET {updates}',
+            ),
+            rows,
+        )
+
+    async def _delete(self, ids: List[UUID]) -> int:
+        """Delete fact rows of documents without extracted data.
+
+        Must be called inside the caller's transaction.
+
+        Args:
+            ids: Document ids.
+
+        Returns:
+            Number of deleted rows.
+        """
+        result = await self._session.execute(
+            text(
+                f'DELETE FROM analytics."{ANALYTICS_DOCUMENT_FACTS_TABLE}" '
+                "WHERE document_id = ANY(:ids)",
+            ),
+            {"ids": ids},
+        )
+        return max(result.rowcount or 0, 0)
+
+    async def _publish(self) -> None:
+        """Bump versions, refresh dependent rollups and rewrite the snapshot."""
+        name = ANALYTICS_DOCUMENT_FACTS_TABLE
+        async with self._session.begin():
+            await self._session.execute(text(f'ANALYZE analytics."{name}"'))
+            await self._session.execute(
+                update(AnalyticsTable)
+                .where(AnalyticsTable.name == name)
+                .values(is_active=True, data_version=AnalyticsTable.data_version + 1),
+            )
+            await self._bump_catalog_version()
+
+        await RollupManager(self._session).refresh([name])
+
+        if self._snapshot_store is not None:
+            async with self._session.begin():
+                result = await self._session.execute(
+                    select(AnalyticsTable)
+                    .where(AnalyticsTable.name == name)
+                    .options(selectinload(AnalyticsTable.columns)),
+                )
+                analytics_table = result.scalar_one()
+            builder = AnalyticsSchemaBuilder(self._session, snapshot_store=self._snapshot_store)
+            await builder.write_snapshot(analytics_table)
+
+    async def _register_table(self) -> None:
+        """Create the facts table and column metadata.
+
+        Must be called inside the caller's transaction.
+        """
+        schema_definition = {
+            "columns": [
+                {
+                    "name": column,
+                    "data_type": data_type,
+                    "is_nullable": nullable,
+                    "is_primary_key": column == "document_id",
+                    "is_indexed": column == "document_id" or column in _INDEXES,
+                }
+                for column, data_type, nullable in _COLUMNS
+            ],
+            "primary_keys": ["document_id"],
+            "indexes": _INDEXES,
+            "source": CommerceDocument.__tablename__,
+        }
+        analytics_table = AnalyticsTable(
+            name=ANALYTICS_DOCUMENT_FACTS_TABLE,
+            description=_DESCRIPTION,
+            schema_definition=json.dumps(schema_definition),
+            source_csv=None,
+            is_active=True,
+            data_version=1,
+        )
+        analytics_table.columns = [
+            AnalyticsColumn(
+                name=column["name"],
+                data_type=column["data_type"],
+                is_nullable=column["is_nullable"],
+                is_primary_key=column["is_primary_key"],
+                is_indexed=column["is_indexed"],
+            )
+            for column in schema_definition["columns"]
+        ]
+        self._session.add(analytics_table)
+        await self._session.flush()
+
+    async def _bump_catalog_version(self) -> None:
+        """Bump schema catalog version so cached catalogs reload.
+
+        Must be called inside the caller's transaction.
+        """
+        result = await self._session.execute(select(AnalyticsCatalogVersion).limit(1))
+        catalog_version = result.scalar_one_or_none()
+
+        if catalog_version is None:
+            self._session.add(AnalyticsCatalogVersion(version=1))
+        else:
+            catalog_version.version = AnalyticsCatalogVersion.version + 1
+
+        await self._session.flush()
+
+
+def schedule_document_facts(document_ids: Iterable[str]) -> None:
+    """Materialise documents into the facts table in the background.
+
+    Call after the documents are committed (the sync uses its own session).
+
+    Args:
+        document_ids: Processed document ids.
+    """
+    task = asyncio.create_task(_sync_in_background([str(i) for i in document_ids]))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _sync_in_background(document_ids: List[str]) -> None:
+    """Sync documents in a dedicated session (background task).
+
+    Args:
+        document_ids: Document ids.
+    """
+    try:
+        async with _sync_lock:
+            async with get_db_session() as session:
+                materialiser = DocumentFactsMaterialiser(
+                    session,
+                    snapshot_store=get_snapshot_store() if snapshots_enabled() else None,
+                )
+                await materialiser.sync(document_ids)
+    except Exception as e:
+        logger.warning(f"Document facts materialisation failed: {e}")
+
+
+def _normalize_key(key: Any) -> str:
+    """Normalize a field name for alias lookup.
+
+    Args:
+        key: Field name.
+
+    Returns:
+        Lowercase name without accents and connector words ("Data de Emissão" becomes
+        "data_emissao"), non-word characters replaced by "_".
+    """
+    decomposed = unicodedata.normalize("NFKD", str(key))
+    ascii_key = "".join(c for c in decomposed if not unicodedata.combining(c))
+    words = re.sub(r"\W+", "_", ascii_key).lower().split("_")
+    return "_".join(word for word in words if word and word not in _CONNECTORS)
+
+
+def _normalize_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Index fields by normalized name (first occurrence wins).
+
+    Args:
+        data: Extracted fields.
+
+    Returns:
+        Dictionary of normalized name to value.
+    """
+    fields: Dict[str, Any] = {}
+    for key, value in data.items():
+        fields.setdefault(_normalize_key(key), value)
+    return fields
+
+
+def _lookup(fields: Dict[str, Any], aliases: Tuple[str, ...]) -> Any:
+    """Get the first non-empty value among aliases.
+
+    Args:
+        fields: Normalized fields.
+        aliases: Field names in priority order.
+
+    Returns:
+        Value, or None if no alias has a value.
+    """
+    for alias in aliases:
+        value = fields.get(alias)
+        if value is not None and value != "":
+            return value
+    return None
+
+
+def _text(value: Any) -> Optional[str]:
+    """Convert a scalar to text with collapsed whitespace.
+
+    Args:
+        value: Field value.
+
+    Returns:
+        Text, or None for empty values and non-scalars.
+    """
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return None
+    return " ".join(str(value).split()) or None
+
+
+def _tax_id(value: Any) -> Optional[str]:
+    """Normalize a tax id (CNPJ/CPF punctuation removed).
+
+    Args:
+        value: Field value.
+
+    Returns:
+        Digits for punctuated numeric ids, the text otherwise, None if empty.
+    """
+    tax_id = _text(value)
+    if tax_id is not None and _TAX_ID_FORMAT.match(tax_id):
+        return re.sub(r"\D", "", tax_id) or None
+    return tax_id
+
+
+def _parse_amount(value: Any) -> Optional[Decimal]:
+    """Parse an amount from a number or a formatted string.
+
+    The last of "," and "." is the decimal separator when both appear; a lone
+    separator followed by exactly three digits is a thousands separator.
+
+    Args:
+        value: Field value (e.g. 1234.5, "R$ 1.234,56", "1,234.56").
+
+    Returns:
+        Amount rounded to cents, or None if missing, unparseable or out of range.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        cleaned = str(value)
+    elif isinstance(value, str):
+        cleaned = re.sub(r"[^\d,.\-]", "", value)
+        if not re.search(r"\d", cleaned):
+            return None
+        separators = [s for s in (",", ".") if s in cleaned]
+        if len(separators) == 2:
+            decimal_separator: Optional[str] = max(separators, key=cleaned.rfind)
+        elif separators:
+            separator = separators[0]
+            digits_after = len(cleaned) - cleaned.rfind(separator) - 1
+            single = cleaned.count(separator) == 1
+            decimal_separator = separator if single and digits_after != 3 else None
+        else:
+            decimal_separator = None
+        for separator in separators:
+            if separator != decimal_separator:
+                cleaned = cleaned.replace(separator, "")
+        if decimal_separator is not None:
+            cleaned = cleaned.replace(decimal_separator, ".")
+    else:
+        return None
+
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        return None
+    if not amount.is_finite() or abs(amount) >= _MAX_AMOUNT:
+        return None
+    return amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def _parse_date(value: Any) -> Optional[datetime.date]:
+    """Parse a date from ISO (yyyy-mm-dd) or day-first (dd/mm/yyyy) text.
+
+    Args:
+        value: Field value.
+
+    Returns:
+        Date, or None if missing or unparseable.
+    """
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if not isinstance(value, str):
+        return None
+
+    value = value.strip()
+    match = _ISO_DATE.match(value)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+    else:
+        match = _DAY_FIRST_DATE.match(value)
+        if not match:
+            return None
+        day, month, year = (int(part) for part in match.groups())
+        if year < 100:
+            year += 2000
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
@@ -0,0 +1,214 @@
+"""
+Analytics time-series downsampling (chart-ready payloads for line charts).
+
+Overview
+  Builds the chart payload of time-series answers: the temporal column and
+  the numeric series, sorted by time. Series longer than
+  ANALYTICS_CHART_MAX_POINTS are downsampled with Largest-Triangle-Three-
+  Buckets (LTTB), which keeps the visual shape (peaks, troughs, trend
+  changes) with a fixed number of points, so chart payloads and rendering
+  time stay bounded. Full-resolution rows remain available through the
+  results API.
+
+Design
+  - **Shape Check**: Only "wide" time series (one temporal column, every other column
+    numeric) are charted; mixed category/series results keep the table.
+  - **LTTB**: One point per bucket, the one forming the largest triangle with the
+    previously kept point and the next bucket's average; first and last points kept.
+  - **Vectorised Series**: Each numeric column is scaled to its range and the triangle
+    areas of all columns are summed (NumPy, per bucket), so one selection fits every
+    series and no column dominates.
+  - **Time Axis**: Dates, datetimes and ISO date strings become seconds; unparseable
+    values fall back to evenly spaced positions.
+
+Integration
+  - Consumes: NumPy, constants.
+  - Returns: Chart dictionary (x, series, points, downsampled, source_points, method).
+  - Used by: AnalyticsNormalizer (line chart suggestions).
+  - Observability: N/A (pure functions).
+
+Usage
+  >>> from app.agents.analytics.downsampling import build_chart, is_time_series
+  >>> chart = build_chart(rows, "purchase_day", max_points=500)
+  >>> chart["points"][:2], chart["downsampled"]
+"""
+
+import datetime
+import decimal
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.config.constants import ANALYTICS_CHART_MAX_POINTS
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Select the points kept by Largest-Triangle-Three-Buckets.
+
+    Args:
+        x: Sorted x values (n).
+        y: Series values (n x columns, NaN for missing values).
+        threshold: Number of points to keep.
+
+    Returns:
+        Sorted indices of the kept points (all points if n <= threshold).
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Scale each series (and x) to [0, 1] so areas are comparable across columns
+    valid = ~np.isnan(y).all(axis=0)
+    y = y[:, valid]
+    low = np.nanmin(y, axis=0)
+    span = np.nanmax(y, axis=0) - low
+    span[span == 0] = 1.0
+    y = np.nan_to_num((y - low) / span, nan=0.0)
+    x = (x - x[0]) / ((x[-1] - x[0]) or 1.0)
+
+    # threshold - 2 buckets over the inner points; first and last points always kept
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        average_x = x[end:next_end].mean()
+        average_y = y[end:next_end].mean(axis=0)
+
+        areas = np.abs(
+            (x[previous] - average_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end])[:, None] * (average_y - y[previous]),
+        ).sum(axis=1)
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def build_chart(
+    rows: List[Dict[str, Any]],
+    x_column: str,
+    max_points: int = ANALYTICS_CHART_MAX_POINTS,
+) -> Optional[Dict[str, Any]]:
+    """Build the (downsampled) line chart payload of a time-series result.
+
+    Args:
+        rows: Query results.
+        x_column: Temporal column.
+        max_points: Largest number of points sent (LTTB above it).
+
+    Returns:
+        Dictionary with x (column), series (numeric columns), points ([x, *series]
+        rows sorted by time, JSON values), downsampled, source_points and method;
+        None if the result is not a wide time series.
+    """
+    if not is_time_series(rows, x_column):
+        return None
+    series = [column for column in rows[0] if column != x_column]
+
+    rows = [row for row in rows if row.get(x_column) is not None]
+    if not rows:
+        return None
+
+    x = _time_axis([row[x_column] for row in rows])
+    order = np.argsort(x, kind="stable")
+    y = np.array(
+        [[np.nan if row.get(c) is None else float(row[c]) for c in series] for row in rows],
+        dtype=np.float64,
+    ).reshape(len(rows), len(series))
+
+    indices = order[lttb_indices(x[order], y[order], max_points)]
+    downsampled = len(indices) < len(rows)
+
+    return {
+        "x": x_column,
+        "series": series,
+        "points": [
+            [_json_value(rows[i][x_column]), *(_json_value(rows[i].get(c)) for c in series)]
+            for i in indices
+        ],
+        "downsampled": downsampled,
+        "source_points": len(rows),
+        "method": "lttb" if downsampled else None,
+    }
+
+
+def is_time_series(rows: List[Dict[str, Any]], x_column: str) -> bool:
+    """Check whether a result is a wide time series over a temporal column.
+
+    Args:
+        rows: Query results.
+        x_column: Temporal column.
+
+    Returns:
+        True if every other column is numeric.
+    """
+    if not rows or x_column not in rows[0]:
+        return False
+    series = [column for column in rows[0] if column != x_column]
+    return bool(series) and all(_is_numeric_column(rows, column) for column in series)
+
+
+def _is_numeric_column(rows: List[Dict[str, Any]], column: str) -> bool:
+    """Check whether every non-null value of a column is a number.
+
+    Args:
+        rows: Query results.
+        column: Column name.
+
+    Returns:
+        True if the column has numeric values only (booleans excluded).
+    """
+    values = [row.get(column) for row in rows if row.get(column) is not None]
+    return bool(values) and all(
+        isinstance(value, (int, float, decimal.Decimal)) and not isinstance(value, bool)
+        for value in values
+    )
+
+
+def _time_axis(values: List[Any]) -> np.ndarray:
+    """Convert temporal values to seconds.
+
+    Args:
+        values: Dates, datetimes or ISO date strings (non-null).
+
+    Returns:
+        Float array of seconds, or row positions if any value is not temporal.
+    """
+    seconds: List[float] = []
+    for value in values:
+        if isinstance(value, str):
+            try:
+                value = datetime.datetime.fromisoformat(value)
+            except ValueError:
+                return np.arange(len(values), dtype=np.float64)
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=datetime.timezone.utc)
+            seconds.append(value.timestamp())
+        elif isinstance(value, datetime.date):
+            seconds.append(value.toordinal() * 86400.0)
+        elif isinstance(value, (int, float, decimal.Decimal)) and not isinstance(value, bool):
+            seconds.append(float(value))
+        else:
+            return np.arange(len(values), dtype=np.float64)
+    return np.asarray(seconds, dtype=np.float64)
+
+
+def _json_value(value: Any) -> Any:
+    """Convert a chart value to its JSON representation.
+
+    Args:
+        value: Database value.
+
+    Returns:
+        ISO string for dates, float for decimals, the value otherwise.
+    """
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return value
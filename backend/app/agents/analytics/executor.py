@@ -3,18 +3,35 @@ Analytics executor (secure SQL execution).
 
 Overview
   Executes SQL queries securely with read-only transactions, timeout,
-  and row limits. Measures execution time and optionally provides query plans.
+  and row limits. Measures execution time and captures query plans
+  according to a configurable policy, off the response path.
 
 Design
   - **Secure Execution**: Always via repository (read-only, timeout, row limit).
   - **Performance Measurement**: Tracks execution time.
-  - **Query Plans**: Optional query plan generation for analysis.
+  - **Summary Pushdown**: Exact COUNT(*) and SUM/AVG/MIN/MAX of numeric columns computed
+    in the database (query wrapped in a CTE) when the displayed rows are capped.
+  - **Result Cache**: Repeated SQL over unchanged tables is served from ResultCache
+    (keyed by canonical SQL + table data versions) without touching the database.
+  - **Plan Capture Policy**: "off", "sampled" (N%), "slow" (above threshold) or
+    "pre" (EXPLAIN before execution, for cost gating). A plan already fetched by
+    QueryCostGuard.check is reused instead of explaining the same SQL again.
+  - **Asynchronous Recording**: Sampled/slow plans are explained in a background
+    task with its own session, so they never add latency to the answer.
+  - **Query Log**: Off by default. When enabled, a sample of executed SQL
+    (unparameterized) is buffered in process with timing, row count and plan (when
+    captured), and written in batches every ANALYTICS_QUERY_LOG_FLUSH_INTERVAL seconds
+    (one primary-pool session per flush), as the workload for the index advisor. The
+    buffer is bounded; entries beyond it are dropped.
+  - **Approximate Mode**: Aggregate SQL rewritten to read sample tables (scaled
+    COUNT/SUM with margin columns); approximate runs are not recorded as workload.
 
 Integration
-  - Consumes: AnalyticsRepository, constants.
-  - Returns: Query results with metadata (rows, count, time, plan).
+  - Consumes: AnalyticsRepository, ResultCache, sampling (approximate rewrites), database
+    connection (background plans and query log flushes), constants.
+  - Returns: Query results with metadata (rows, count, time, plan, cached).
   - Used by: AnalyticsAgent for SQL execution.
-  - Observability: Logs execution time and results.
+  - Observability: Logs execution time and captured query plans.
 
 Usage
   >>> from app.agents.analytics.executor import AnalyticsExecutor
@@ -22,48 +39,132 @@ Usage
   >>> result = await executor.execute("SELECT * FROM analytics.orders LIMIT 10")
 """
 
+import asyncio
+import logging
+import random
 import time
-from typing import Any, Dict, List, Optional
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set
 
-from app.config.exceptions import DatabaseException
+from app.agents.analytics.result_cache import ResultCache
+from app.agents.analytics.sampling import Approximation, approximate_sql
+from app.config.constants import (
+    ANALYTICS_QUERY_LOG_BATCH_SIZE,
+    ANALYTICS_QUERY_LOG_ENABLED,
+    ANALYTICS_QUERY_LOG_FLUSH_INTERVAL,
+    ANALYTICS_QUERY_LOG_MAX_PENDING,
+    ANALYTICS_QUERY_LOG_SAMPLE_RATE,
+    QUERY_PLAN_CAPTURE_MODE,
+    QUERY_PLAN_CAPTURE_MODES,
+    QUERY_PLAN_SAMPLE_RATE,
+    SLOW_QUERY_THRESHOLD_MS,
+)
+from app.config.exceptions import DatabaseException, ValidationException
 from app.infrastructure.database.repositories.analytics_repo import AnalyticsRepository
+from app.routing.sql_analysis import outer_row_limit
+
+logger = logging.getLogger(__name__)
+
+# Strong references to in-flight background plan captures (avoid GC)
+_background_tasks: Set["asyncio.Task[None]"] = set()
 
 
 class AnalyticsExecutor:
     """SQL executor for analytics queries.
 
     Executes SQL queries securely via repository with performance measurement
-    and optional query plan generation.
+    and policy-driven query plan capture.
     """
 
-    def __init__(self, repository: AnalyticsRepository) -> None:
+    def __init__(
+        self,
+        repository: AnalyticsRepository,
+        plan_capture_mode: str = QUERY_PLAN_CAPTURE_MODE,
+        plan_sample_rate: float = QUERY_PLAN_SAMPLE_RATE,
+        slow_query_threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+        result_cache: Optional[ResultCache] = None,
+        query_log: bool = ANALYTICS_QUERY_LOG_ENABLED,
+        query_log_sample_rate: float = ANALYTICS_QUERY_LOG_SAMPLE_RATE,
+    ) -> None:
         """Initialize analytics executor.
 
         Args:
             repository: Analytics repository for SQL execution.
+            plan_capture_mode: Plan capture policy ("off", "sampled", "slow", "pre").
+            plan_sample_rate: Fraction of queries explained in "sampled" mode.
+            slow_query_threshold_ms: Execution time that triggers capture in "slow" mode.
+            result_cache: Result cache for repeated queries (optional).
+            query_log: Whether executed queries are recorded in the query log.
+            query_log_sample_rate: Fraction of executed queries recorded.
+
+        Raises:
+            ValidationException: If plan_capture_mode is invalid.
         """
+        if plan_capture_mode not in QUERY_PLAN_CAPTURE_MODES:
+            raise ValidationException(
+                message=f"Invalid plan capture mode: {plan_capture_mode}",
+                details={"mode": plan_capture_mode, "allowed_modes": QUERY_PLAN_CAPTURE_MODES},
+            )
+
         self._repository = repository
+        self._plan_capture_mode = plan_capture_mode
+        self._plan_sample_rate = plan_sample_rate
+        self._slow_query_threshold_ms = slow_query_threshold_ms
+        self._result_cache = result_cache
+        self._query_log = query_log
+        self._query_log_sample_rate = query_log_sample_rate
 
     async def execute(
         self,
         sql: str,
         params: Optional[Dict[str, Any]] = None,
+        schema_info: Optional[Dict[str, Any]] = None,
+        approximate: bool = False,
+        query_plan: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Execute SQL query securely.
 
         Executes SQL via repository (which implements read-only, timeout,
-        row limits) and measures execution time.
+        row limits) and measures execution time. In "pre" mode the plan is
+        fetched before execution (unless given) and returned; otherwise it
+        is captured in the background when the policy selects the query
+        (logging the given plan instead of explaining again). When a result
+        cache and schema_info are given, results for unchanged tables are
+        served from (and stored in) the cache.
 
         Args:
             sql: SQL query to execute (already validated).
             params: Query parameters (optional).
+            schema_info: Catalog snapshot with table data versions (optional).
+            approximate: Whether sql is an approximate rewrite (not recorded in the query log).
+            query_plan: Plan already fetched for sql, e.g. cost_check["query_plan"]
+                (optional).
 
         Returns:
-            Dictionary with rows, row_count, execution_time_ms, query_plan (optional).
+            Dictionary with rows, row_count, execution_time_ms, query_plan (optional),
+            cached.
 
         Raises:
             DatabaseException: If execution fails.
         """
+        # Check result cache (only for queries with known table dependencies)
+        cache_key = self._result_cache_key(sql, params, schema_info)
+        if cache_key is not None:
+            cached_rows = self._result_cache.get(cache_key)  # type: ignore[union-attr]
+            if cached_rows is not None:
+                return {
+                    "rows": cached_rows,
+                    "row_count": len(cached_rows),
+                    "execution_time_ms": 0.0,
+                    "query_plan": None,
+                    "cached": True,
+                }
+
+        # Get query plan before execution (cost gating), unless the cost guard already did
+        if self._plan_capture_mode == "pre" and query_plan is None:
+            query_plan = await self.explain(sql, params)
+
         # Measure execution time
         start_time = time.time()
 
@@ -74,19 +175,31 @@ class AnalyticsExecutor:
             # Measure execution time
             execution_time_ms = (time.time() - start_time) * 1000
 
-            # Get query plan (optional, for analysis)
-            query_plan = None
-            try:
-                query_plan = await self.explain(sql)
-            except Exception:
-                # Graceful degradation: continue without query plan
-                pass
+            # Capture plan and record the query off the response path
+            capture_plan = self._should_capture_plan(execution_time_ms)
+            record = self._should_record(params, approximate)
+            if capture_plan:
+                self._schedule_background(
+                    sql,
+                    params,
+                    execution_time_ms,
+                    len(rows),
+                    query_plan,
+                    capture_plan,
+                    record,
+                )
+            elif record:
+                get_query_log_buffer().add(sql, execution_time_ms, len(rows), query_plan)
+
+            if cache_key is not None:
+                self._result_cache.set(cache_key, rows)  # type: ignore[union-attr]
 
             return {
                 "rows": rows,
                 "row_count": len(rows),
                 "execution_time_ms": execution_time_ms,
-                "query_plan": query_plan,
+                "query_plan": query_plan if self._plan_capture_mode == "pre" else None,
+                "cached": False,
             }
         except DatabaseException:
             raise
@@ -96,36 +209,436 @@ class AnalyticsExecutor:
                 details={"sql": sql[:200], "error": str(e)},
             ) from e
 
-    async def explain(self, sql: str) -> Optional[Dict[str, Any]]:
+    def approximate(
+        self,
+        sql: str,
+        schema_info: Dict[str, Any],
+    ) -> Optional[Approximation]:
+        """Rewrite SQL to read a sample table (approximate mode).
+
+        Args:
+            sql: SQL query (already validated).
+            schema_info: Catalog snapshot with table sample fractions.
+
+        Returns:
+            Approximation, or None if the query must run exactly (not an eligible
+            aggregate, or no referenced table has a sample).
+        """
+        approximation = approximate_sql(sql, schema_info)
+        if approximation is None:
+            logger.info("Approximate mode not applicable, running exact query")
+        else:
+            logger.info(
+                f"Approximate query over {approximation.sample_table} "
+                f"({approximation.fraction:.2%} sample)",
+            )
+        return approximation
+
+    async def explain(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
         """Get query execution plan.
 
-        Executes EXPLAIN ANALYZE to get query execution plan without
+        Executes EXPLAIN (without ANALYZE) to get the query plan without
         executing the actual query.
 
         Args:
             sql: SQL query to explain.
+            params: Query parameters (optional).
 
         Returns:
             Query plan dictionary, or None if unavailable.
+        """
+        try:
+            return await self._repository.explain_sql(sql, params)
+        except Exception as e:
+            # Graceful degradation: return None if explain fails
+            logger.warning(f"Failed to explain SQL: {e}")
+            return None
 
-        Raises:
-            DatabaseException: If explain fails.
+    def numeric_columns(self, rows: List[Dict[str, Any]]) -> List[str]:
+        """Get numeric columns of a result (first non-null value per column).
+
+        Args:
+            rows: Query results.
+
+        Returns:
+            Names of numeric columns.
+        """
+        if not rows:
+            return []
+
+        numeric: List[str] = []
+        for column in rows[0].keys():
+            value = next((row[column] for row in rows if row.get(column) is not None), None)
+            if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+                numeric.append(column)
+        return numeric
+
+    def build_summary_sql(
+        self,
+        sql: str,
+        numeric_columns: List[str],
+        keep_limit: bool = False,
+    ) -> str:
+        """Wrap query in a CTE computing exact count and numeric aggregates.
+
+        The outermost LIMIT/FETCH FIRST (normally the planner's display cap)
+        is removed, keeping any OFFSET, so the aggregates cover the full
+        result; keep_limit preserves a limit the user asked for.
+
+        Args:
+            sql: Planned SQL query.
+            numeric_columns: Numeric columns to aggregate.
+            keep_limit: Whether to keep the outermost row limit.
+
+        Returns:
+            Summary SQL returning one row (row_count, sum_i, avg_i, min_i, max_i).
+        """
+        row_limit = outer_row_limit(sql)
+        if row_limit is None:
+            inner_sql = sql.strip().rstrip(";").rstrip()
+        elif keep_limit or row_limit.limit is None:
+            inner_sql = row_limit.statement
+        else:
+            offset = f"\nOFFSET {row_limit.offset}" if row_limit.offset else ""
+            inner_sql = f"{row_limit.body}{offset}"
+        aggregates = ["COUNT(*) AS row_count"]
+        for index, column in enumerate(numeric_columns):
+            quoted = '"' + column.replace('"', '""') + '"'
+            aggregates.extend(
+                [
+                    f"SUM({quoted}) AS sum_{index}",
+                    f"AVG({quoted}) AS avg_{index}",
+                    f"MIN({quoted}) AS min_{index}",
+                    f"MAX({quoted}) AS max_{index}",
+                ]
+            )
+        return f"WITH result AS (\n{inner_sql}\n)\nSELECT {', '.join(aggregates)} FROM result"
+
+    async def summarize(
+        self,
+        summary_sql: str,
+        numeric_columns: List[str],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Execute summary SQL built by build_summary_sql.
+
+        Args:
+            summary_sql: Summary SQL (possibly bounded by the cost guard).
+            numeric_columns: Numeric columns aggregated (same order as in build_summary_sql).
+            params: Query parameters (optional).
+
+        Returns:
+            Summary dictionary (row_count, numeric_columns, source), or None if it failed.
         """
         try:
-            explain_sql = f"EXPLAIN (FORMAT JSON) {sql}"
-            result = await self._repository.execute_sql(explain_sql)
+            rows = await self._repository.execute_sql(summary_sql, params)
+        except Exception as e:
+            # Graceful degradation: caller keeps the client-side summary
+            logger.warning(f"Summary pushdown failed: {e}")
+            return None
+
+        if not rows:
+            return None
 
-            if result and len(result) > 0:
-                # EXPLAIN returns JSON in first row
-                plan_data = result[0].get("QUERY PLAN", {})
-                if isinstance(plan_data, str):
-                    import json
+        aggregates = rows[0]
+        summary: Dict[str, Any] = {
+            "row_count": int(aggregates["row_count"]),
+            "source": "database",
+        }
+
+        numeric_summary: Dict[str, Dict[str, float]] = {}
+        for index, column in enumerate(numeric_columns):
+            if aggregates.get(f"sum_{index}") is None:
+                continue
+            numeric_summary[column] = {
+                stat: float(aggregates[f"{stat}_{index}"])
+                for stat in ("sum", "avg", "min", "max")
+            }
+        if numeric_summary:
+            summary["numeric_columns"] = numeric_summary
 
-                    plan_data = json.loads(plan_data)
-                return plan_data
+        return summary
 
+    def _result_cache_key(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]],
+        schema_info: Optional[Dict[str, Any]],
+    ) -> Optional[str]:
+        """Build result cache key if the query is cacheable.
+
+        Args:
+            sql: SQL query.
+            params: Query parameters (optional).
+            schema_info: Catalog snapshot with table data versions (optional).
+
+        Returns:
+            Cache key, or None if caching is disabled or no catalog table is referenced.
+        """
+        if self._result_cache is None or schema_info is None:
             return None
-        except Exception as e:
-            # Graceful degradation: return None if explain fails
+
+        table_versions = self._result_cache.referenced_versions(sql, schema_info)
+        if not table_versions:
             return None
 
+        return self._result_cache.make_key(sql, params, table_versions)
+
+    def _should_capture_plan(self, execution_time_ms: float) -> bool:
+        """Decide whether to capture the plan after execution.
+
+        Args:
+            execution_time_ms: Query execution time in milliseconds.
+
+        Returns:
+            True if the plan should be captured in the background.
+        """
+        if self._plan_capture_mode == "sampled":
+            return random.random() < self._plan_sample_rate
+        if self._plan_capture_mode == "slow":
+            return execution_time_ms >= self._slow_query_threshold_ms
+        return False
+
+    def _should_record(self, params: Optional[Dict[str, Any]], approximate: bool) -> bool:
+        """Decide whether the execution is recorded in the query log.
+
+        Args:
+            params: Query parameters (parameterized SQL is not recorded).
+            approximate: Whether the SQL is an approximate rewrite (not recorded).
+
+        Returns:
+            True if the query log is enabled and the execution is sampled.
+        """
+        if not self._query_log or params or approximate:
+            return False
+        return random.random() < self._query_log_sample_rate
+
+    def _schedule_background(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]],
+        execution_time_ms: float,
+        row_count: int,
+        query_plan: Optional[Dict[str, Any]],
+        capture_plan: bool,
+        record: bool,
+    ) -> None:
+        """Schedule background plan capture and query recording.
+
+        Args:
+            sql: SQL query executed.
+            params: Query parameters (optional).
+            execution_time_ms: Query execution time in milliseconds.
+            row_count: Rows returned.
+            query_plan: Plan fetched before execution, if any.
+            capture_plan: Whether to capture (explain, unless known) and log the plan.
+            record: Whether to record the query in the query log.
+        """
+        task = asyncio.create_task(
+            _after_execution(
+                sql,
+                params,
+                execution_time_ms,
+                row_count,
+                query_plan,
+                capture_plan,
+                record,
+            ),
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+
+async def _after_execution(
+    sql: str,
+    params: Optional[Dict[str, Any]],
+    execution_time_ms: float,
+    row_count: int,
+    query_plan: Optional[Dict[str, Any]],
+    capture_plan: bool,
+    record: bool,
+) -> None:
+    """Capture the plan and/or record the query (background task).
+
+    Args:
+        sql: SQL query executed.
+        params: Query parameters (optional).
+        execution_time_ms: Query execution time in milliseconds.
+        row_count: Rows returned.
+        query_plan: Plan fetched before execution, if any.
+        capture_plan: Whether to capture (explain, unless known) and log the plan.
+        record: Whether to record the query in the query log.
+    """
+    if capture_plan:
+        if query_plan is None:
+            query_plan = await _capture_plan(sql, params)
+        if query_plan is not None:
+            _log_plan(sql, execution_time_ms, query_plan)
+    if record:
+        get_query_log_buffer().add(sql, execution_time_ms, row_count, query_plan)
+
+
+async def _capture_plan(
+    sql: str,
+    params: Optional[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    """Explain query in a dedicated session.
+
+    Uses its own session because the request session may be closed (or in
+    use) by the time the background task runs.
+
+    Args:
+        sql: SQL query executed.
+        params: Query parameters (optional).
+
+    Returns:
+        Query plan, or None if explain failed.
+    """
+    from app.infrastructure.database.connection import get_analytics_session
+    from app.infrastructure.database.repositories.analytics_repo import (
+        PostgreSQLAnalyticsRepository,
+    )
+
+    try:
+        async with get_analytics_session() as session:
+            return await PostgreSQLAnalyticsRepository(session).explain_sql(sql, params)
+    except Exception as e:
+        logger.warning(f"Background plan capture failed: {e}")
+        return None
+
+
+def _log_plan(sql: str, execution_time_ms: float, query_plan: Dict[str, Any]) -> None:
+    """Log a captured query plan.
+
+    Args:
+        sql: SQL query executed.
+        execution_time_ms: Query execution time in milliseconds.
+        query_plan: Query plan.
+    """
+    plan = query_plan.get("Plan", {})
+    logger.info(
+        f"Query plan captured ({execution_time_ms:.0f}ms)",
+        extra={
+            "sql": sql[:200],
+            "execution_time_ms": execution_time_ms,
+            "total_cost": plan.get("Total Cost"),
+            "plan_rows": plan.get("Plan Rows"),
+            "query_plan": query_plan,
+        },
+    )
+
+
+class QueryLogBuffer:
+    """Bounded in-process buffer of query log entries, written in batches.
+
+    The first entry after a flush schedules the next flush in
+    flush_interval seconds, so an idle process holds no timer and a busy
+    one writes at most once per interval.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = ANALYTICS_QUERY_LOG_FLUSH_INTERVAL,
+        batch_size: int = ANALYTICS_QUERY_LOG_BATCH_SIZE,
+        max_pending: int = ANALYTICS_QUERY_LOG_MAX_PENDING,
+    ) -> None:
+        """Initialize query log buffer.
+
+        Args:
+            flush_interval: Seconds between the first buffered entry and the flush.
+            batch_size: Entries per INSERT batch.
+            max_pending: Maximum buffered entries (newer entries dropped beyond).
+        """
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._max_pending = max_pending
+        self._entries: List[Dict[str, Any]] = []
+        self._flush_task: Optional["asyncio.Task[None]"] = None
+        self._dropped = 0
+
+    @property
+    def pending(self) -> int:
+        """Get number of buffered entries.
+
+        Returns:
+            Entries waiting for the next flush.
+        """
+        return len(self._entries)
+
+    def add(
+        self,
+        sql: str,
+        execution_time_ms: float,
+        row_count: int,
+        query_plan: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Buffer an executed query and schedule a flush if none is pending.
+
+        Args:
+            sql: SQL query executed.
+            execution_time_ms: Query execution time in milliseconds.
+            row_count: Rows returned.
+            query_plan: Query plan, if captured.
+        """
+        if len(self._entries) >= self._max_pending:
+            self._dropped += 1
+            return
+
+        self._entries.append(
+            {
+                "sql": sql,
+                "execution_time_ms": execution_time_ms,
+                "row_count": row_count,
+                "query_plan": query_plan,
+            },
+        )
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> int:
+        """Write buffered entries in batches (one session per flush).
+
+        Returns:
+            Number of entries written.
+        """
+        if not self._entries:
+            return 0
+
+        from app.infrastructure.database.connection import get_db_session
+        from app.infrastructure.database.repositories.analytics_repo import (
+            PostgreSQLAnalyticsRepository,
+        )
+
+        entries, self._entries = self._entries, []
+        if self._dropped:
+            logger.warning(f"Query log buffer full, {self._dropped} execution(s) not recorded")
+            self._dropped = 0
+
+        try:
+            async with get_db_session() as session:
+                repository = PostgreSQLAnalyticsRepository(session)
+                for start in range(0, len(entries), self._batch_size):
+                    await repository.record_queries(entries[start : start + self._batch_size])
+        except Exception as e:
+            logger.warning(f"Query log flush failed ({len(entries)} entries dropped): {e}")
+            return 0
+        return len(entries)
+
+    async def _flush_later(self) -> None:
+        """Flush after the flush interval (background task)."""
+        await asyncio.sleep(self._flush_interval)
+        await self.flush()
+
+
+@lru_cache()
+def get_query_log_buffer() -> QueryLogBuffer:
+    """Get singleton QueryLogBuffer instance.
+
+    Returns:
+        QueryLogBuffer singleton instance.
+    """
+    return QueryLogBuffer()
@@ -0,0 +1,501 @@
+"""
+Analytics follow-up engine (answers refinements from the previous result).
+
+Overview
+  Retains the last complete analytics result per conversation thread
+  (columnar, size-capped, with TTL) and answers conversational refinements
+  ("e por estado?", "ordene pelo maior") locally, by running LLM-generated
+  SQL over that result in an embedded SQLite database. Anything that cannot
+  be computed from the retained result falls back to the regular pipeline.
+
+Design
+  - **Per-Thread Retention**: One result per thread, LRU over threads, TTL per entry.
+  - **Complete Results Only**: Capped (truncated) results are never retained, since
+    refinements over them would be wrong.
+  - **Columnar Storage**: Column names plus one list per column.
+  - **Embedded Engine**: sqlite3 (stdlib) in-memory table "previous_result", with an
+    authorizer that only allows reading that table.
+  - **Cheap Gate**: The LLM is only asked when the question looks like a refinement
+    (refinement/anaphora keywords or a column name of the retained result), so new
+    questions go to the planner without an extra LLM round trip.
+  - **Graceful Degradation**: Any failure (LLM, SQL, engine) means "not answerable".
+
+Integration
+  - Consumes: LLMClient (structured outputs), constants.
+  - Returns: Refinement result (sql, explanation, rows) or None.
+  - Used by: AnalyticsAgent before planning against the database.
+  - Observability: Logs local answers and fallbacks.
+
+Usage
+  >>> from app.agents.analytics.followup import FollowUpEngine, get_thread_result_store
+  >>> store = get_thread_result_store()
+  >>> store.retain(thread_id, query, sql, rows)
+  >>> engine = FollowUpEngine(llm_client)
+  >>> result = await engine.answer(query, store.get(thread_id), "pt-BR")
+"""
+
+import asyncio
+import logging
+import pickle
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.config.constants import (
+    ANALYTICS_FOLLOWUP_MAX_BYTES,
+    ANALYTICS_FOLLOWUP_MAX_QUERY_WORDS,
+    ANALYTICS_FOLLOWUP_MAX_THREADS,
+    ANALYTICS_FOLLOWUP_TTL_SECONDS,
+)
+from app.infrastructure.llm.client import LLMClient
+
+logger = logging.getLogger(__name__)
+
+FOLLOWUP_TABLE = "previous_result"
+
+_SELECT_PATTERN = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+# Words (accent-folded) that mark a question as a refinement of the previous result
+_REFINEMENT_WORDS = frozenset(
+    {
+        # pt-BR
+        "ordene", "ordena", "ordenar", "ordenado", "classifique", "filtre", "filtra",
+        "filtrar", "apenas", "somente", "so", "exceto", "sem", "agrupe", "reagrupe",
+        "agrupar", "primeiros", "primeiras", "ultimos", "ultimas", "desses", "dessas",
+        "destes", "destas", "deles", "delas", "esses", "essas", "estes", "estas", "isso",
+        "disso", "agora", "mesmo", "mesma", "resultado", "lista", "tabela",
+        # en
+        "sort", "sorted", "order", "filter", "only", "just", "except", "exclude", "group",
+        "regroup", "first", "last", "these", "those", "them", "it", "now", "same",
+        "instead", "result", "list", "table",
+    }
+)
+
+# Questions opening with a connective ("e por estado?", "and by city?") continue the thread
+_CONTINUATION_PATTERN = re.compile(r"^(e|and|mas|but|entao|so|what about)\b")
+
+# SQLite authorizer actions allowed for follow-up queries
+_ALLOWED_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    getattr(sqlite3, "SQLITE_RECURSIVE", 33),
+}
+
+
+@dataclass
+class RetainedResult:
+    """Analytics result retained for follow-up questions.
+
+    Attributes:
+        query: Question that produced the result.
+        sql: SQL that produced the result.
+        columns: Column names (in order).
+        data: Column values (one list per column).
+        row_count: Number of rows.
+        size_bytes: Approximate size (serialized bytes).
+        created_at: Monotonic creation time.
+    """
+
+    query: str
+    sql: str
+    columns: List[str]
+    data: Dict[str, List[Any]]
+    row_count: int
+    size_bytes: int
+    created_at: float
+
+
+class ThreadResultStore:
+    """In-process store of the last analytics result per thread.
+
+    Keeps at most max_threads entries (least recently used evicted) and
+    drops entries older than ttl_seconds.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = ANALYTICS_FOLLOWUP_TTL_SECONDS,
+        max_threads: int = ANALYTICS_FOLLOWUP_MAX_THREADS,
+        max_bytes: int = ANALYTICS_FOLLOWUP_MAX_BYTES,
+    ) -> None:
+        """Initialize thread result store.
+
+        Args:
+            ttl_seconds: Seconds a retained result stays valid.
+            max_threads: Maximum number of threads retained.
+            max_bytes: Largest result retained (serialized bytes).
+        """
+        self._ttl_seconds = ttl_seconds
+        self._max_threads = max_threads
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, RetainedResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def retain(
+        self,
+        thread_id: Optional[str],
+        query: str,
+        sql: str,
+        rows: List[Dict[str, Any]],
+    ) -> bool:
+        """Retain a complete result for the thread (replaces previous one).
+
+        Args:
+            thread_id: Conversation thread ID.
+            query: Question that produced the result.
+            sql: SQL that produced the result.
+            rows: Complete (uncapped) result rows.
+
+        Returns:
+            True if retained, False if there is no thread, or the result is empty
+            or above the size cap.
+        """
+        if not thread_id:
+            return False
+        if not rows:
+            self.discard(thread_id)
+            return False
+
+        columns = list(rows[0].keys())
+        data = {column: [row.get(column) for row in rows] for column in columns}
+
+        try:
+            size_bytes = len(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            size_bytes = self._max_bytes + 1
+
+        if size_bytes > self._max_bytes:
+            self.discard(thread_id)
+            return False
+
+        with self._lock:
+            self._entries.pop(thread_id, None)
+            self._entries[thread_id] = RetainedResult(
+                query=query,
+                sql=sql,
+                columns=columns,
+                data=data,
+                row_count=len(rows),
+                size_bytes=size_bytes,
+                created_at=time.monotonic(),
+            )
+            while len(self._entries) > self._max_threads:
+                self._entries.popitem(last=False)
+        return True
+
+    def get(self, thread_id: Optional[str]) -> Optional[RetainedResult]:
+        """Get the thread's retained result if still fresh.
+
+        Args:
+            thread_id: Conversation thread ID.
+
+        Returns:
+            RetainedResult, or None if missing or expired.
+        """
+        if not thread_id:
+            return None
+
+        with self._lock:
+            retained = self._entries.get(thread_id)
+            if retained is None:
+                return None
+            if time.monotonic() - retained.created_at > self._ttl_seconds:
+                del self._entries[thread_id]
+                return None
+            self._entries.move_to_end(thread_id)
+            return retained
+
+    def discard(self, thread_id: Optional[str]) -> None:
+        """Drop the thread's retained result.
+
+        Args:
+            thread_id: Conversation thread ID.
+        """
+        if not thread_id:
+            return
+        with self._lock:
+            self._entries.pop(thread_id, None)
+
+
+class FollowUpEngine:
+    """Local engine answering refinements over a retained result.
+
+    Asks the LLM whether the question can be answered from the previous
+    result and, if so, for SQLite SQL over it; runs that SQL locally.
+    """
+
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        max_query_words: int = ANALYTICS_FOLLOWUP_MAX_QUERY_WORDS,
+    ) -> None:
+        """Initialize follow-up engine.
+
+        Args:
+            llm_client: LLM client for refinement SQL generation.
+            max_query_words: Longer questions skip the follow-up attempt.
+        """
+        self._llm_client = llm_client
+        self._max_query_words = max_query_words
+
+    async def answer(
+        self,
+        query: str,
+        retained: Optional[RetainedResult],
+        language: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Answer a refinement from the retained result, if possible.
+
+        Args:
+            query: User question.
+            retained: Thread's retained result (None skips the attempt).
+            language: Query language.
+
+        Returns:
+            Dictionary with sql, explanation, columns_used, rows, execution_time_ms,
+            or None if the question needs the database.
+        """
+        if retained is None or len(query.split()) > self._max_query_words:
+            return None
+        if not looks_like_refinement(query, retained):
+            logger.debug("Follow-up skipped (question does not refer to the previous result)")
+            return None
+
+        try:
+            decision = await self._llm_client.generate_structured(
+                self._build_prompt(query, retained, language),
+                self._build_json_schema(),
+            )
+        except Exception as e:
+            logger.warning(f"Follow-up classification failed: {e}")
+            return None
+
+        sql = (decision.get("sql") or "").strip()
+        if not decision.get("answerable") or not sql:
+            return None
+
+        if not _SELECT_PATTERN.match(sql) or ";" in sql.rstrip().rstrip(";"):
+            logger.info("Follow-up SQL rejected (not a single SELECT)")
+            return None
+
+        start_time = time.time()
+        try:
+            rows = await asyncio.to_thread(self._run_local, sql.rstrip().rstrip(";"), retained)
+        except Exception as e:
+            logger.info(f"Follow-up SQL failed locally, using database: {e}")
+            return None
+        execution_time_ms = (time.time() - start_time) * 1000
+
+        logger.info(
+            f"Follow-up answered from previous result ({len(rows)} row(s), {execution_time_ms:.1f}ms)",
+        )
+        return {
+            "sql": sql,
+            "explanation": decision.get("explanation", ""),
+            "columns_used": [
+                column
+                for column in retained.columns
+                if re.search(rf"\b{re.escape(column)}\b", sql, re.IGNORECASE)
+            ],
+            "rows": rows,
+            "execution_time_ms": execution_time_ms,
+        }
+
+    def _run_local(self, sql: str, retained: RetainedResult) -> List[Dict[str, Any]]:
+        """Run SQL over the retained result in an in-memory SQLite database.
+
+        Args:
+            sql: SQLite SELECT over previous_result.
+            retained: Retained result.
+
+        Returns:
+            Result rows as list of dictionaries.
+        """
+        connection = sqlite3.connect(":memory:")
+        try:
+            column_defs = ", ".join(_quote(column) for column in retained.columns)
+            connection.execute(f"CREATE TABLE {FOLLOWUP_TABLE} ({column_defs})")
+
+            placeholders = ", ".join("?" for _ in retained.columns)
+            columns_data = [
+                [_to_sqlite(value) for value in retained.data[column]]
+                for column in retained.columns
+            ]
+            connection.executemany(
+                f"INSERT INTO {FOLLOWUP_TABLE} VALUES ({placeholders})",
+                zip(*columns_data),
+            )
+
+            # Only reads of previous_result from here on
+            connection.set_authorizer(_authorize)
+            cursor = connection.execute(sql)
+            names = [description[0] for description in cursor.description or []]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+        finally:
+            connection.close()
+
+    def _build_prompt(self, query: str, retained: RetainedResult, language: str) -> str:
+        """Build prompt for refinement SQL generation.
+
+        Args:
+            query: User question.
+            retained: Retained result.
+            language: Query language.
+
+        Returns:
+            Prompt string.
+        """
+        sample = [
+            {column: retained.data[column][i] for column in retained.columns}
+            for i in range(min(3, retained.row_count))
+        ]
+        return f"""Existe um resultado anterior nesta conversa, disponível como a tabela SQLite "{FOLLOWUP_TABLE}".
+
+PERGUNTA ANTERIOR: {retained.query}
+SQL ANTERIOR: {retained.sql}
+COLUNAS DE {FOLLOWUP_TABLE}: {", ".join(retained.columns)}
+LINHAS: {retained.row_count}
+AMOSTRA: {sample}
+
+NOVA PERGUNTA ({language}):
+{query}
+
+Se a nova pergunta puder ser respondida APENAS com os dados de "{FOLLOWUP_TABLE}" (filtrar, ordenar,
+limitar, reagrupar ou agregar essas colunas), responda answerable=true e gere um SELECT em SQL SQLite
+usando somente a tabela "{FOLLOWUP_TABLE}". Caso precise de colunas, tabelas ou linhas que não estão no
+resultado anterior, responda answerable=false."""
+
+    def _build_json_schema(self) -> Dict[str, Any]:
+        """Build JSON Schema for structured output.
+
+        Returns:
+            JSON Schema dictionary.
+        """
+        return {
+            "type": "object",
+            "properties": {
+                "answerable": {
+                    "type": "boolean",
+                    "description": "Whether the question can be answered from the previous result",
+                },
+                "sql": {
+                    "type": "string",
+                    "description": f"SQLite SELECT over {FOLLOWUP_TABLE} (empty if not answerable)",
+                },
+                "explanation": {
+                    "type": "string",
+                    "description": "Explanation of the SQL query",
+                },
+            },
+            "required": ["answerable", "sql", "explanation"],
+        }
+
+
+def looks_like_refinement(query: str, retained: RetainedResult) -> bool:
+    """Cheaply check whether a question may refine the retained result.
+
+    True when the question opens with a connective, uses a refinement or
+    anaphora keyword, or names a column of the retained result (whole name
+    or a word of it, e.g. "state" for customer_state).
+
+    Args:
+        query: User question.
+        retained: Retained result.
+
+    Returns:
+        True if the LLM should be asked; False sends the question to the planner.
+    """
+    folded = _fold(query)
+    if _CONTINUATION_PATTERN.match(folded):
+        return True
+
+    words = set(re.findall(r"\w+", folded))
+    if words & _REFINEMENT_WORDS:
+        return True
+
+    for column in retained.columns:
+        name = _fold(column)
+        parts = {part for part in name.split("_") if len(part) >= 4}
+        if name in words or words & parts:
+            return True
+    return False
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents.
+
+    Args:
+        text: Input text.
+
+    Returns:
+        Folded text.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).strip()
+
+
+def _quote(identifier: str) -> str:
+    """Quote SQLite identifier.
+
+    Args:
+        identifier: Column name.
+
+    Returns:
+        Quoted identifier.
+    """
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _to_sqlite(value: Any) -> Any:
+    """Convert value to a SQLite-compatible type.
+
+    Args:
+        value: Result value.
+
+    Returns:
+        Value storable by sqlite3.
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _authorize(action: int, arg1: Optional[str], arg2: Optional[str], *_: Any) -> int:
+    """SQLite authorizer: allow only reading previous_result.
+
+    Args:
+        action: SQLite action code.
+        arg1: Action argument (table name for reads).
+        arg2: Action argument (column name for reads).
+
+    Returns:
+        sqlite3.SQLITE_OK or sqlite3.SQLITE_DENY.
+    """
+    if action not in _ALLOWED_ACTIONS:
+        return sqlite3.SQLITE_DENY
+    if action == sqlite3.SQLITE_READ and arg1 not in (FOLLOWUP_TABLE, None, ""):
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+@lru_cache()
+def get_thread_result_store() -> ThreadResultStore:
+    """Get singleton ThreadResultStore instance.
+
+    Returns:
+        ThreadResultStore singleton instance.
+    """
+    return ThreadResultStore()
@@ -0,0 +1,451 @@
+"""
+Index advisor (workload-driven index recommendations for analytics tables).
+
+Overview
+  Recommends indexes for the analytics data tables from the executed query
+  log instead of guessing them up front. Generated SQL keeps changing, so
+  recommendations follow the actual workload: predicate and join columns
+  are aggregated across logged queries, weighted by their execution time,
+  and each candidate index is evaluated against the queries it would serve.
+
+Design
+  - **Workload**: Query log entries grouped by SQL (executions, total time). The log is
+    a uniform sample of executions, so relative weights are preserved.
+  - **Candidates**: WHERE columns (single and composite, most frequent first) and
+    JOIN ... ON columns of tables above ANALYTICS_INDEX_ADVISOR_MIN_ROWS, skipping
+    columns already leading an existing index.
+  - **Hypothetical Evaluation**: With the HypoPG extension, each query is explained
+    with and without the hypothetical index (never built).
+  - **Heuristic Fallback**: Without HypoPG, sequential scans filtering on the leading
+    column are costed as index scans over their estimated selectivity (join
+    candidates need HypoPG).
+  - **Estimated Benefit**: Sum over queries of total time x relative cost reduction
+    (queries below ANALYTICS_INDEX_ADVISOR_MIN_IMPROVEMENT do not count).
+
+Integration
+  - Consumes: AnalyticsRepository (query log, table statistics, EXPLAIN), sql_analysis,
+    constants.
+  - Returns: IndexRecommendation list (with CREATE INDEX CONCURRENTLY statements).
+  - Used by: scripts/index_advisor.py (administrative command).
+  - Observability: Logs candidate counts and evaluation method.
+
+Usage
+  >>> from app.agents.analytics.index_advisor import IndexAdvisor
+  >>> advisor = IndexAdvisor(repository)
+  >>> for recommendation in await advisor.recommend():
+  ...     print(recommendation.ddl, recommendation.estimated_benefit_ms)
+"""
+
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Sequence, Set, Tuple
+
+from app.config.constants import (
+    ANALYTICS_INDEX_ADVISOR_LOG_LIMIT,
+    ANALYTICS_INDEX_ADVISOR_MAX_CANDIDATES,
+    ANALYTICS_INDEX_ADVISOR_MAX_COLUMNS,
+    ANALYTICS_INDEX_ADVISOR_MIN_IMPROVEMENT,
+    ANALYTICS_INDEX_ADVISOR_MIN_ROWS,
+)
+from app.config.exceptions import DatabaseException, ValidationException
+from app.infrastructure.database.models.analytics import AnalyticsQueryLog
+from app.infrastructure.database.repositories.analytics_repo import AnalyticsRepository
+from app.routing.sql_analysis import SQLAnalysis, analyze_sql
+
+logger = logging.getLogger(__name__)
+
+# Distinct queries explained per candidate (most expensive first)
+QUERIES_PER_CANDIDATE = 10
+
+# Random vs sequential page cost (PostgreSQL defaults), heuristic index scan cost
+RANDOM_PAGE_FACTOR = 4.0
+
+
+@dataclass
+class WorkloadQuery:
+    """Logged SQL aggregated over its executions."""
+
+    sql: str
+    analysis: SQLAnalysis
+    executions: int = 0
+    total_time_ms: float = 0.0
+
+
+@dataclass
+class IndexRecommendation:
+    """Recommended index with its estimated benefit."""
+
+    table: str
+    columns: List[str]
+    kind: str  # "filter" or "join"
+    query_count: int  # executions of the queries that improve
+    workload_time_ms: float  # total time of those executions
+    cost_before: float  # summed planner cost of the improving queries
+    cost_after: float
+    estimated_benefit_ms: float
+    method: str  # "hypopg" or "heuristic"
+    queries: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        """Index name (PostgreSQL identifier limit)."""
+        return f"ix_{self.table}_{'_'.join(self.columns)}"[:63]
+
+    @property
+    def ddl(self) -> str:
+        """CREATE INDEX statement (concurrent, idempotent)."""
+        return (
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{self.name}" '
+            f'ON analytics."{self.table}" ({_column_list(self.columns)})'
+        )
+
+
+@dataclass
+class _Candidate:
+    """Candidate index and the workload queries it may serve."""
+
+    table: str
+    columns: Tuple[str, ...]
+    kind: str
+    queries: Dict[str, WorkloadQuery] = field(default_factory=dict)
+
+    @property
+    def workload_time_ms(self) -> float:
+        """Total execution time of the candidate's queries."""
+        return sum(query.total_time_ms for query in self.queries.values())
+
+
+class IndexAdvisor:
+    """Workload-driven index advisor for analytics tables.
+
+    Aggregates the query log into candidate indexes and estimates their
+    benefit with hypothetical indexes (HypoPG) or plan heuristics.
+    """
+
+    def __init__(
+        self,
+        repository: AnalyticsRepository,
+        max_candidates: int = ANALYTICS_INDEX_ADVISOR_MAX_CANDIDATES,
+        max_columns: int = ANALYTICS_INDEX_ADVISOR_MAX_COLUMNS,
+        min_rows: int = ANALYTICS_INDEX_ADVISOR_MIN_ROWS,
+        min_improvement: float = ANALYTICS_INDEX_ADVISOR_MIN_IMPROVEMENT,
+    ) -> None:
+        """Initialize index advisor.
+
+        Args:
+            repository: Analytics repository (query log, statistics, EXPLAIN).
+            max_candidates: Candidates evaluated (by workload time).
+            max_columns: Columns in a composite candidate.
+            min_rows: Minimum table size (estimated rows) for candidates.
+            min_improvement: Minimum relative cost reduction of a query.
+        """
+        self._repository = repository
+        self._max_candidates = max_candidates
+        self._max_columns = max_columns
+        self._min_rows = min_rows
+        self._min_improvement = min_improvement
+        self._hypopg_available = True
+        self._plans: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    async def recommend(
+        self,
+        log_limit: int = ANALYTICS_INDEX_ADVISOR_LOG_LIMIT,
+    ) -> List[IndexRecommendation]:
+        """Recommend indexes for the logged workload.
+
+        Args:
+            log_limit: Most recent query log entries analyzed.
+
+        Returns:
+            Recommendations, highest estimated benefit first.
+        """
+        entries = await self._repository.get_query_log(log_limit)
+        workload = self.aggregate(entries)
+        statistics = await self._repository.get_table_statistics()
+        table_columns = {
+            table.name: {column.name for column in table.columns}
+            for table in await self._repository.get_all_tables()
+        }
+
+        candidates = self.candidates(workload, statistics, table_columns)
+        logger.info(
+            f"Index advisor: {len(workload)} distinct queries, {len(candidates)} candidates",
+        )
+
+        recommendations = []
+        for candidate in candidates[: self._max_candidates]:
+            recommendation = await self._evaluate(candidate, statistics)
+            if recommendation is not None:
+                recommendations.append(recommendation)
+
+        # An index also serves queries on its leading columns
+        recommendations = [
+            r
+            for r in recommendations
+            if not any(
+                other.table == r.table
+                and len(other.columns) > len(r.columns)
+                and other.columns[: len(r.columns)] == r.columns
+                for other in recommendations
+            )
+        ]
+        return sorted(recommendations, key=lambda r: r.estimated_benefit_ms, reverse=True)
+
+    def aggregate(self, entries: List[AnalyticsQueryLog]) -> List[WorkloadQuery]:
+        """Group query log entries by SQL.
+
+        Args:
+            entries: Query log entries.
+
+        Returns:
+            Workload queries (unparseable SQL skipped).
+        """
+        workload: Dict[str, WorkloadQuery] = {}
+        for entry in entries:
+            query = workload.get(entry.sql_hash)
+            if query is None:
+                try:
+                    analysis = analyze_sql(entry.sql)
+                except ValidationException:
+                    continue
+                query = workload[entry.sql_hash] = WorkloadQuery(entry.sql, analysis)
+            query.executions += 1
+            query.total_time_ms += entry.execution_time_ms
+        return list(workload.values())
+
+    def candidates(
+        self,
+        workload: List[WorkloadQuery],
+        statistics: Dict[str, Dict[str, Any]],
+        table_columns: Dict[str, Set[str]],
+    ) -> List[_Candidate]:
+        """Build candidate indexes from predicate and join columns.
+
+        Args:
+            workload: Workload queries.
+            statistics: Table statistics (row estimates, existing indexes).
+            table_columns: Catalog columns per table.
+
+        Returns:
+            Candidates not covered by existing indexes, most workload time first.
+        """
+        # Filter column frequency orders composite candidates
+        frequency: Counter[Tuple[str, str]] = Counter()
+        for query in workload:
+            for table, column in self._resolve(query.analysis, query.analysis.filter_columns):
+                frequency[(table, column)] += query.executions
+
+        candidates: Dict[Tuple[str, Tuple[str, ...]], _Candidate] = {}
+
+        def add(table: str, columns: Tuple[str, ...], kind: str, query: WorkloadQuery) -> None:
+            stats = statistics.get(table)
+            if stats is None or stats["row_estimate"] < self._min_rows:
+                return
+            if not set(columns) <= table_columns.get(table, set()):
+                return
+            if any(tuple(index[: len(columns)]) == columns for index in stats["indexes"]):
+                return
+            candidate = candidates.setdefault(
+                (table, columns),
+                _Candidate(table, columns, kind),
+            )
+            candidate.queries[query.sql] = query
+
+        for query in workload:
+            filters: Dict[str, List[str]] = {}
+            for table, column in self._resolve(query.analysis, query.analysis.filter_columns):
+                filters.setdefault(table, []).append(column)
+                add(table, (column,), "filter", query)
+            for table, columns in filters.items():
+                if len(columns) > 1:
+                    ordered = sorted(set(columns), key=lambda c: (-frequency[(table, c)], c))
+                    add(table, tuple(ordered[: self._max_columns]), "filter", query)
+            for table, column in self._resolve(query.analysis, query.analysis.join_columns):
+                add(table, (column,), "join", query)
+
+        return sorted(candidates.values(), key=lambda c: c.workload_time_ms, reverse=True)
+
+    async def _evaluate(
+        self,
+        candidate: _Candidate,
+        statistics: Dict[str, Dict[str, Any]],
+    ) -> Optional[IndexRecommendation]:
+        """Estimate the benefit of a candidate index.
+
+        Args:
+            candidate: Candidate index.
+            statistics: Table statistics (row estimates).
+
+        Returns:
+            IndexRecommendation, or None if no query improves enough.
+        """
+        recommendation = IndexRecommendation(
+            table=candidate.table,
+            columns=list(candidate.columns),
+            kind=candidate.kind,
+            query_count=0,
+            workload_time_ms=0.0,
+            cost_before=0.0,
+            cost_after=0.0,
+            estimated_benefit_ms=0.0,
+            method="hypopg" if self._hypopg_available else "heuristic",
+        )
+        hypothetical_sql = (
+            f'CREATE INDEX ON analytics."{candidate.table}" ({_column_list(candidate.columns)})'
+        )
+
+        queries = sorted(candidate.queries.values(), key=lambda q: q.total_time_ms, reverse=True)
+        for query in queries[:QUERIES_PER_CANDIDATE]:
+            plan_before = await self._explain(query.sql)
+            if plan_before is None:
+                continue
+            cost_before = float(plan_before["Plan"].get("Total Cost", 0.0))
+            if cost_before <= 0:
+                continue
+
+            cost_after = await self._hypothetical_cost(query.sql, hypothetical_sql)
+            if cost_after is None:
+                recommendation.method = "heuristic"
+                if candidate.kind != "filter":
+                    continue
+                cost_after = _heuristic_cost(
+                    plan_before,
+                    candidate.table,
+                    candidate.columns[0],
+                    statistics[candidate.table]["row_estimate"],
+                )
+
+            improvement = (cost_before - cost_after) / cost_before
+            if improvement < self._min_improvement:
+                continue
+
+            recommendation.query_count += query.executions
+            recommendation.workload_time_ms += query.total_time_ms
+            recommendation.cost_before += cost_before
+            recommendation.cost_after += cost_after
+            recommendation.estimated_benefit_ms += query.total_time_ms * improvement
+            recommendation.queries.append(query.sql)
+
+        return recommendation if recommendation.queries else None
+
+    async def _explain(self, sql: str) -> Optional[Dict[str, Any]]:
+        """Explain SQL once per advisor run.
+
+        Args:
+            sql: SQL query.
+
+        Returns:
+            Query plan, or None if explain failed (e.g. dropped table).
+        """
+        if sql not in self._plans:
+            try:
+                self._plans[sql] = await self._repository.explain_sql(sql)
+            except DatabaseException as e:
+                logger.debug(f"Skipping query that cannot be explained: {e.message}")
+                self._plans[sql] = None
+        return self._plans[sql]
+
+    async def _hypothetical_cost(self, sql: str, index_sql: str) -> Optional[float]:
+        """Get query cost with a hypothetical index (HypoPG).
+
+        Args:
+            sql: SQL query.
+            index_sql: CREATE INDEX statement of the hypothetical index.
+
+        Returns:
+            Total cost, or None if HypoPG is unavailable.
+        """
+        if not self._hypopg_available:
+            return None
+        try:
+            plan = await self._repository.explain_with_hypothetical_index(sql, index_sql)
+        except DatabaseException as e:
+            logger.info(f"HypoPG unavailable, using heuristic estimates: {e.message}")
+            self._hypopg_available = False
+            return None
+        return float((plan or {}).get("Plan", {}).get("Total Cost", 0.0))
+
+    @staticmethod
+    def _resolve(
+        analysis: SQLAnalysis,
+        columns: FrozenSet[Tuple[Optional[str], str]],
+    ) -> Iterator[Tuple[str, str]]:
+        """Resolve column references to (table, column).
+
+        Unqualified columns resolve only in single-table queries.
+
+        Args:
+            analysis: SQL analysis.
+            columns: Column references (table or None, column).
+
+        Yields:
+            (table, column) tuples.
+        """
+        single_table = next(iter(analysis.tables)) if len(analysis.tables) == 1 else None
+        for table, column in columns:
+            table = table or single_table
+            if table is not None:
+                yield table, column
+
+
+def _heuristic_cost(
+    plan: Dict[str, Any],
+    table: str,
+    column: str,
+    row_estimate: float,
+) -> float:
+    """Estimate query cost if filtering scans on the column used an index.
+
+    Each sequential scan of the table whose filter references the column is
+    replaced by an index scan costing its selectivity x RANDOM_PAGE_FACTOR
+    (capped at the scan cost); the difference is removed from the total.
+
+    Args:
+        plan: Query plan (EXPLAIN FORMAT JSON, top level).
+        table: Table name.
+        column: Leading index column.
+        row_estimate: Estimated table rows.
+
+    Returns:
+        Estimated total cost with the index.
+    """
+    pattern = re.compile(rf"\b{re.escape(column)}\b")
+    savings = 0.0
+    for node in _plan_nodes(plan["Plan"]):
+        if (
+            node.get("Node Type") == "Seq Scan"
+            and node.get("Relation Name") == table
+            and pattern.search(node.get("Filter", ""))
+        ):
+            scan_cost = float(node.get("Total Cost", 0.0))
+            selectivity = float(node.get("Plan Rows", 0.0)) / max(row_estimate, 1.0)
+            savings += scan_cost * (1.0 - min(1.0, selectivity * RANDOM_PAGE_FACTOR))
+    return float(plan["Plan"].get("Total Cost", 0.0)) - savings
+
+
+def _column_list(columns: Sequence[str]) -> str:
+    """Format quoted index column list.
+
+    Args:
+        columns: Column names.
+
+    Returns:
+        Comma-separated quoted identifiers.
+    """
+    return ", ".join(f'"{column}"' for column in columns)
+
+
+def _plan_nodes(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Iterate over a plan node and its descendants.
+
+    Args:
+        node: Plan node.
+
+    Yields:
+        Plan nodes (depth first).
+    """
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
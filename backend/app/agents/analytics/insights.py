@@ -0,0 +1,312 @@
+"""
+Analytics insights (LLM commentary on query results, elided when not useful).
+
+Overview
+  Generates the descriptive insights shown with analytics answers. The LLM
+  call costs about as much as planning, so it is skipped for trivial results
+  (empty, or a single row of one or two values the answer already states),
+  cached per result hash, and either run concurrently with result formatting
+  or deferred: the answer goes out first and the insights follow as a
+  separate WebSocket frame.
+
+Design
+  - **Policy**: needs_insights() rejects trivial results before any prompt is built.
+  - **Compact Prompt**: Row count, columns, numeric summary and a few rows as JSON
+    (not a Python repr).
+  - **Result Hash**: SHA-256 of the language, full SQL, every row and the summary;
+    identical results share one entry.
+  - **LRU + TTL Cache**: In-process, ANALYTICS_INSIGHTS_CACHE_SIZE entries.
+  - **Single Flight**: Concurrent requests for one result share one LLM call; deferred
+    calls stay registered until consumed by wait() or cached.
+  - **Graceful Degradation**: LLM failures yield None (answers never fail on insights).
+  - **Singleton Pattern**: get_insights_engine() returns process-wide instance.
+
+Integration
+  - Consumes: LLMClient, constants.
+  - Returns: Insights dictionary ({"descriptive", "interpretive", "actionable"}) or None.
+  - Used by: AnalyticsNormalizer (inline and deferred insights), chat WebSocket route
+    (deferred insights frame).
+  - Observability: Logs skipped calls and cache hits at debug level, failures as warnings.
+
+Usage
+  >>> from app.agents.analytics.insights import get_insights_engine
+  >>> engine = get_insights_engine()
+  >>> insights = await engine.generate(llm_client, rows, sql, "pt-BR")
+  >>> key = engine.start(llm_client, rows, sql, "pt-BR")
+  >>> insights = await engine.wait(key)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.constants import (
+    ANALYTICS_INSIGHTS_CACHE_SIZE,
+    ANALYTICS_INSIGHTS_SAMPLE_ROWS,
+    ANALYTICS_INSIGHTS_TRIVIAL_MAX_COLUMNS,
+    ANALYTICS_INSIGHTS_TTL_SECONDS,
+    ANALYTICS_INSIGHTS_WAIT_SECONDS,
+)
+from app.infrastructure.llm.client import LLMClient
+
+logger = logging.getLogger(__name__)
+
+
+def needs_insights(rows: List[Dict[str, Any]]) -> bool:
+    """Check whether a result is worth an insights LLM call.
+
+    Args:
+        rows: Query results.
+
+    Returns:
+        False for empty results and single rows of at most
+        ANALYTICS_INSIGHTS_TRIVIAL_MAX_COLUMNS values.
+    """
+    if not rows:
+        return False
+    return len(rows) > 1 or len(rows[0]) > ANALYTICS_INSIGHTS_TRIVIAL_MAX_COLUMNS
+
+
+class InsightsEngine:
+    """Cached, single-flight generator of analytics result insights."""
+
+    def __init__(
+        self,
+        max_entries: int = ANALYTICS_INSIGHTS_CACHE_SIZE,
+        ttl_seconds: float = ANALYTICS_INSIGHTS_TTL_SECONDS,
+    ) -> None:
+        """Initialize insights engine.
+
+        Args:
+            max_entries: Maximum number of cached insights.
+            ttl_seconds: Seconds cached insights stay valid.
+        """
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._pending: Dict[str, "asyncio.Task[Optional[Dict[str, Any]]]"] = {}
+        self._lock = threading.Lock()
+
+    async def generate(
+        self,
+        llm_client: LLMClient,
+        rows: List[Dict[str, Any]],
+        sql: str,
+        language: str,
+        summary: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Get insights of a result (cached, shared with in-flight calls).
+
+        Args:
+            llm_client: LLM client.
+            rows: Query results.
+            sql: SQL query executed.
+            language: Language for insights.
+            summary: Result summary (optional, row count and numeric statistics).
+
+        Returns:
+            Insights dictionary, or None for trivial results or on failure.
+        """
+        key = self.start(llm_client, rows, sql, language, summary)
+        if key is None:
+            return None
+        return await self.wait(key)
+
+    def start(
+        self,
+        llm_client: LLMClient,
+        rows: List[Dict[str, Any]],
+        sql: str,
+        language: str,
+        summary: Optional[Dict[str, Any]] = None,
+    ) -> Optional[str]:
+        """Start generating insights of a result in the background.
+
+        Args:
+            llm_client: LLM client.
+            rows: Query results.
+            sql: SQL query executed.
+            language: Language for insights.
+            summary: Result summary (optional, row count and numeric statistics).
+
+        Returns:
+            Result hash to pass to wait(), or None for trivial results.
+        """
+        if not needs_insights(rows):
+            logger.debug("Insights skipped for trivial result")
+            return None
+
+        key = self._result_key(rows, sql, language, summary)
+
+        with self._lock:
+            if self._cached(key) is not None or key in self._pending:
+                logger.debug(f"Insights shared for result {key[:12]}")
+                return key
+            self._pending[key] = asyncio.create_task(
+                self._analyze(llm_client, key, self._payload(rows, sql, summary), language),
+            )
+        return key
+
+    async def wait(
+        self,
+        key: str,
+        timeout: float = ANALYTICS_INSIGHTS_WAIT_SECONDS,
+    ) -> Optional[Dict[str, Any]]:
+        """Wait for the insights of a result started with start().
+
+        Args:
+            key: Result hash returned by start().
+            timeout: Maximum seconds to wait (generation keeps running).
+
+        Returns:
+            Insights dictionary, or None if unknown, failed or timed out.
+        """
+        with self._lock:
+            cached = self._cached(key)
+            task = self._pending.get(key)
+        if cached is not None:
+            return cached[1]
+        if task is None:
+            return None
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Insights not ready after {timeout:.0f}s")
+            return None
+
+    async def _analyze(
+        self,
+        llm_client: LLMClient,
+        key: str,
+        payload: str,
+        language: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Generate insights with the LLM and cache them.
+
+        Args:
+            llm_client: LLM client.
+            key: Result hash.
+            payload: JSON description of the result.
+            language: Language for insights.
+
+        Returns:
+            Insights dictionary, or None if generation fails (not cached).
+        """
+        prompt = f"""Analise o resultado de uma query SQL e forneça insights:
+
+{payload}
+
+Forneça:
+1. Insights descritivos (o que os dados mostram)
+2. Insights interpretativos (o que isso significa)
+3. Insights acionáveis (o que fazer com essa informação)
+
+Responda em {language}."""
+
+        insights: Optional[Dict[str, Any]] = None
+        try:
+            response = await llm_client.generate(prompt)
+            insights = {
+                "descriptive": response.text,
+                "interpretive": None,  # Could be extracted from LLM response
+                "actionable": None,  # Could be extracted from LLM response
+            }
+        except Exception as e:
+            logger.warning(f"Semantic analysis failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+                if insights is not None:
+                    self._entries[key] = (time.monotonic(), insights)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self._max_entries:
+                        self._entries.popitem(last=False)
+        return insights
+
+    def _cached(self, key: str) -> Optional[Tuple[float, Optional[Dict[str, Any]]]]:
+        """Get a live cache entry (caller holds the lock).
+
+        Args:
+            key: Result hash.
+
+        Returns:
+            Tuple of (created time, insights), or None if missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self._ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _result_key(
+        self,
+        rows: List[Dict[str, Any]],
+        sql: str,
+        language: str,
+        summary: Optional[Dict[str, Any]],
+    ) -> str:
+        """Hash a whole result (not just the prompt sample).
+
+        Args:
+            rows: Query results.
+            sql: SQL query executed.
+            language: Language for insights.
+            summary: Result summary (optional).
+
+        Returns:
+            SHA-256 hex digest of the language, SQL, every row and the summary.
+        """
+        hasher = hashlib.sha256(f"{language}\n{sql}\n".encode())
+        for row in rows:
+            hasher.update(json.dumps(list(row.items()), ensure_ascii=False, default=str).encode())
+            hasher.update(b"\n")
+        hasher.update(json.dumps(summary, ensure_ascii=False, default=str, sort_keys=True).encode())
+        return hasher.hexdigest()
+
+    def _payload(
+        self,
+        rows: List[Dict[str, Any]],
+        sql: str,
+        summary: Optional[Dict[str, Any]],
+    ) -> str:
+        """Describe a result compactly for the prompt.
+
+        Args:
+            rows: Query results (non-empty).
+            sql: SQL query executed.
+            summary: Result summary (optional).
+
+        Returns:
+            JSON text with SQL, row count, columns, numeric summary and sample rows.
+        """
+        summary = summary or {}
+        description = {
+            "sql": sql[:200],
+            "row_count": summary.get("row_count", len(rows)),
+            "columns": list(rows[0].keys()),
+            "numeric_summary": summary.get("numeric_columns"),
+            "sample_rows": [
+                list(row.values()) for row in rows[:ANALYTICS_INSIGHTS_SAMPLE_ROWS]
+            ],
+        }
+        return json.dumps(description, ensure_ascii=False, default=str, sort_keys=True)
+
+
+@lru_cache()
+def get_insights_engine() -> InsightsEngine:
+    """Get singleton InsightsEngine instance.
+
+    Returns:
+        InsightsEngine singleton instance.
+    """
+    return InsightsEngine()
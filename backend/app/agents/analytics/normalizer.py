@@ -7,14 +7,22 @@ Overview
   degradation if LLM analysis is unavailable.
 
 Design
-  - **Intelligent Formatting**: Formats numbers, dates, booleans by language.
-  - **Semantic Analysis**: Optional LLM-based analysis for insights.
-  - **Visualization Suggestions**: Suggests best display format.
-  - **Statistical Summary**: Calculates basic statistics when applicable.
+  - **Columnar Formatting**: Infers each column's kind once from a sample and applies
+    precompiled locale formatters (numbers, dates, booleans) to the whole column.
+  - **Single Pass**: Numeric summary accumulated while formatting.
+  - **Semantic Analysis**: Optional LLM insights (InsightsEngine: skipped for trivial
+    results, cached per result hash) prompted with the numeric summary, generated
+    while display suggestions are built, or deferred so the answer is not held back
+    by the LLM.
+  - **Visualization Suggestions**: Suggests best display format, using catalog column
+    statistics (types, low-cardinality categories) when available.
+  - **Chart Payloads**: Line chart suggestions carry the time series, downsampled (LTTB)
+    above ANALYTICS_CHART_MAX_POINTS.
 
 Integration
-  - Consumes: LLMClient (optional), date utilities, constants.
-  - Returns: Formatted results with summary, insights, and suggestions.
+  - Consumes: LLMClient (optional), InsightsEngine, downsampling, catalog column
+    statistics (optional), constants.
+  - Returns: Formatted results with summary, insights, suggestions and chart payload.
   - Used by: AnalyticsAgent for result normalization.
   - Observability: Logs normalization operations.
 
@@ -24,22 +32,26 @@ Usage
   >>> result = await normalizer.normalize(rows, sql, "pt-BR")
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from app.agents.analytics.downsampling import build_chart, is_time_series
+from app.agents.analytics.insights import InsightsEngine, get_insights_engine
+from app.config.constants import ANALYTICS_CATEGORICAL_MAX_DISTINCT, NORMALIZER_TYPE_SAMPLE_SIZE
 from app.infrastructure.llm.client import LLMClient
-from app.utils.date import format_date, format_date_relative
 
 logger = logging.getLogger(__name__)
 
-# Try to import pandas (optional, for analysis)
-try:
-    import pandas as pd
+# Date string formats recognized in results (tried once per column, on a sample)
+_DATE_INPUT_FORMATS: Tuple[str, ...] = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y")
 
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
-    pd = None  # type: ignore
+# Swap thousands/decimal separators in one pass (1,234.56 -> 1.234,56)
+_PT_SEPARATORS = str.maketrans({",": ".", ".": ","})
+
+Formatter = Callable[[Any], Any]
 
 
 class AnalyticsNormalizer:
@@ -49,254 +61,399 @@ class AnalyticsNormalizer:
     semantic analysis, and visualization suggestions.
     """
 
-    def __init__(self, llm_client: Optional[LLMClient] = None) -> None:
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        insights: Optional[InsightsEngine] = None,
+    ) -> None:
         """Initialize analytics normalizer.
 
         Args:
             llm_client: LLM client for semantic analysis (optional).
+            insights: Insights engine (optional, uses process-wide engine if None).
         """
         self._llm_client = llm_client
+        self._insights = insights or get_insights_engine()
 
     async def normalize(
         self,
         rows: List[Dict[str, Any]],
         sql: str,
         language: str,
+        summary: Optional[Dict[str, Any]] = None,
+        column_stats: Optional[Dict[str, Dict[str, Any]]] = None,
+        defer_insights: bool = False,
     ) -> Dict[str, Any]:
         """Normalize and format query results.
 
-        Formats results, performs semantic analysis (if LLM available),
-        calculates statistics, and suggests visualization format.
+        Formats results column by column (computing the statistical summary
+        in the same pass), then starts semantic analysis (if LLM available and
+        the result is not trivial) with that summary and suggests the
+        visualization format while it runs.
 
         Args:
             rows: Query results (list of dictionaries).
             sql: SQL query executed.
             language: Language for formatting.
+            summary: Summary computed in the database over the full result
+                (optional, replaces the summary of the displayed rows).
+            column_stats: Catalog statistics of result columns by name (optional,
+                from SchemaCatalog.column_stats).
+            defer_insights: If True, insights are only started; "insights_key" identifies
+                them for InsightsEngine.wait.
 
         Returns:
-            Dictionary with formatted_data, summary, insights, display_suggestions.
+            Dictionary with formatted_data, summary, insights, insights_key,
+            display_suggestions, chart (line charts only, otherwise None).
         """
         if not rows:
             return {
                 "formatted_data": [],
-                "summary": {"row_count": 0},
+                "summary": summary or {"row_count": 0},
                 "insights": None,
+                "insights_key": None,
                 "display_suggestions": {"type": "table", "reason": "Empty result set"},
+                "chart": None,
             }
 
-        # Step 1: Basic formatting
-        formatted_data = self._format_rows(rows, language)
+        # Step 1: Columnar formatting + statistical summary (single pass)
+        formatted_data, rows_summary = self._format_columns(rows, language)
+        summary = summary or rows_summary
 
-        # Step 2: Statistical summary
-        summary = self._calculate_summary(rows)
-
-        # Step 3: Semantic analysis (if LLM available)
-        insights = None
+        # Step 2: Start semantic analysis (if LLM available; skipped for trivial results)
+        insights_key = None
         if self._llm_client:
-            try:
-                insights = await self._analyze_semantically(rows, sql, language)
-            except Exception as e:
-                logger.warning(f"Semantic analysis failed: {e}")
-                # Graceful degradation: continue without insights
+            insights_key = self._insights.start(self._llm_client, rows, sql, language, summary)
+            # Let the LLM request go out before the suggestions below
+            await asyncio.sleep(0)
 
-        # Step 4: Visualization suggestions
-        display_suggestions = self._suggest_display(rows, sql)
+        # Step 3: Visualization suggestions (and the chart-ready time series)
+        display_suggestions = self._suggest_display(rows, sql, column_stats)
+        chart = None
+        if display_suggestions["type"] == "line_chart":
+            chart = build_chart(rows, display_suggestions["x"])
+
+        # Step 4: Insights (inline), or left for the caller to deliver later
+        insights = None
+        if insights_key is not None and not defer_insights:
+            insights = await self._insights.wait(insights_key)
+            insights_key = None
 
         return {
             "formatted_data": formatted_data,
             "summary": summary,
             "insights": insights,
+            "insights_key": insights_key,
             "display_suggestions": display_suggestions,
+            "chart": chart,
         }
 
-    def _format_rows(
+    def _format_columns(
         self,
         rows: List[Dict[str, Any]],
         language: str,
-    ) -> List[Dict[str, Any]]:
-        """Format rows with language-specific formatting.
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Format results column by column and summarize numeric columns.
 
-        Formats numbers, dates, and booleans according to language.
+        Infers each column's kind once from a sample, then applies a
+        precompiled formatter to the whole column. Numeric statistics are
+        accumulated while formatting, so rows are traversed only once.
 
         Args:
             rows: Query results.
             language: Language for formatting.
 
         Returns:
-            List of formatted row dictionaries.
+            Tuple of (formatted row dictionaries, summary dictionary).
         """
-        formatted: List[Dict[str, Any]] = []
+        columns = list(rows[0].keys())
+        formatters = self._build_formatters(language)
+
+        summary: Dict[str, Any] = {"row_count": len(rows)}
+        numeric_summary: Dict[str, Dict[str, float]] = {}
+        formatted_columns: List[List[Any]] = []
+
+        for column in columns:
+            values = [row.get(column) for row in rows]
+            kind, date_format = self._infer_column_kind(values)
+
+            if kind in ("int", "float"):
+                formatted, stats = self._format_numeric_column(
+                    values,
+                    kind,
+                    formatters,
+                    language,
+                )
+                if stats is not None:
+                    numeric_summary[column] = stats
+            elif kind == "date_str":
+                formatted = [
+                    self._format_date_string(value, date_format, formatters, language)  # type: ignore[arg-type]
+                    for value in values
+                ]
+            elif kind in formatters:
+                formatter = formatters[kind]
+                formatted = [
+                    None if value is None else self._apply(formatter, value, language)
+                    for value in values
+                ]
+            else:
+                formatted = [self._format_value(value, language, formatters) for value in values]
 
-        for row in rows:
-            formatted_row: Dict[str, Any] = {}
-            for key, value in row.items():
-                formatted_row[key] = self._format_value(value, language)
-            formatted.append(formatted_row)
+            formatted_columns.append(formatted)
 
-        return formatted
+        if numeric_summary:
+            summary["numeric_columns"] = numeric_summary
 
-    def _format_value(self, value: Any, language: str) -> Any:
-        """Format single value according to type and language.
+        formatted_data = [dict(zip(columns, values)) for values in zip(*formatted_columns)]
+        return formatted_data, summary
 
-        Formats numbers, dates, and booleans with language-specific formatting.
+    def _infer_column_kind(self, values: List[Any]) -> Tuple[str, Optional[str]]:
+        """Infer column kind from a sample of non-null values.
 
         Args:
-            value: Value to format.
-            language: Language for formatting.
+            values: Column values.
 
         Returns:
-            Formatted value.
+            Tuple of (kind, date format for "date_str" columns). Kind is one of
+            "bool", "int", "float", "datetime", "date", "date_str", "text" or "raw".
         """
-        if value is None:
-            return None
+        sample: List[Any] = []
+        for value in values:
+            if value is not None:
+                sample.append(value)
+                if len(sample) >= NORMALIZER_TYPE_SAMPLE_SIZE:
+                    break
+
+        if not sample:
+            return "raw", None
+
+        if all(isinstance(v, bool) for v in sample):
+            return "bool", None
+        if all(isinstance(v, int) and not isinstance(v, bool) for v in sample):
+            return "int", None
+        if all(isinstance(v, (int, float, Decimal)) and not isinstance(v, bool) for v in sample):
+            return "float", None
+        if all(isinstance(v, datetime) for v in sample):
+            return "datetime", None
+        if all(isinstance(v, date) and not isinstance(v, datetime) for v in sample):
+            return "date", None
+        if all(isinstance(v, str) for v in sample):
+            for date_format in _DATE_INPUT_FORMATS:
+                try:
+                    for value in sample:
+                        datetime.strptime(value, date_format)
+                except ValueError:
+                    continue
+                return "date_str", date_format
+            return "text", None
+
+        return "raw", None
+
+    def _build_formatters(self, language: str) -> Dict[str, Formatter]:
+        """Build per-kind formatters for a language (once per result).
 
-        # Format booleans
-        if isinstance(value, bool):
-            if language.startswith("pt"):
-                return "Sim" if value else "Não"
-            return "Yes" if value else "No"
-
-        # Format dates
-        if isinstance(value, (str, int, float)):
-            # Try to parse as date
-            try:
-                from datetime import datetime
-
-                if isinstance(value, str):
-                    # Try common date formats
-                    for fmt in ["%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y"]:
-                        try:
-                            dt = datetime.strptime(value, fmt)
-                            return format_date(dt, language)
-                        except ValueError:
-                            continue
-            except Exception:
-                pass
-
-        # Format numbers
-        if isinstance(value, (int, float)):
-            if language.startswith("pt"):
-                # Portuguese formatting: 1.234,56
-                if isinstance(value, float):
-                    return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                return f"{value:,}".replace(",", ".")
-            else:
-                # English formatting: 1,234.56
-                if isinstance(value, float):
-                    return f"{value:,.2f}"
+        Args:
+            language: Language for formatting.
+
+        Returns:
+            Dictionary of kind to formatter.
+        """
+        is_pt = language.startswith("pt")
+        true_label, false_label = ("Sim", "Não") if is_pt else ("Yes", "No")
+        date_format = "%d/%m/%Y" if is_pt else "%Y-%m-%d"
+        datetime_format = f"{date_format} %H:%M:%S"
+
+        if is_pt:
+            # Portuguese formatting: 1.234,56
+            def format_int(value: Any) -> str:
+                return f"{value:,}".translate(_PT_SEPARATORS)
+
+            def format_float(value: Any) -> str:
+                return f"{value:,.2f}".translate(_PT_SEPARATORS)
+        else:
+            # English formatting: 1,234.56
+            def format_int(value: Any) -> str:
                 return f"{value:,}"
 
-        return value
+            def format_float(value: Any) -> str:
+                return f"{value:,.2f}"
 
-    def _calculate_summary(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate statistical summary.
+        return {
+            "bool": lambda value: true_label if value else false_label,
+            "int": format_int,
+            "float": format_float,
+            "datetime": lambda value: value.strftime(datetime_format),
+            "date": lambda value: value.strftime(date_format),
+            # Strings without a date format: passed through unchanged
+            "text": lambda value: value,
+        }
 
-        Calculates basic statistics (count, sum, avg, min, max) when applicable.
+    def _format_numeric_column(
+        self,
+        values: List[Any],
+        kind: str,
+        formatters: Dict[str, Formatter],
+        language: str,
+    ) -> Tuple[List[Any], Optional[Dict[str, float]]]:
+        """Format numeric column and accumulate its statistics.
 
         Args:
-            rows: Query results.
+            values: Column values.
+            kind: Column kind ("int" or "float").
+            formatters: Per-kind formatters.
+            language: Language for fallback formatting.
 
         Returns:
-            Summary dictionary with statistics.
+            Tuple of (formatted values, statistics or None if no numeric values).
         """
-        summary: Dict[str, Any] = {
-            "row_count": len(rows),
+        formatter = formatters[kind]
+        formatted: List[Any] = []
+        total = 0.0
+        count = 0
+        minimum = float("inf")
+        maximum = float("-inf")
+
+        for value in values:
+            if value is None:
+                formatted.append(None)
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+                # Sample missed this value's type
+                formatted.append(self._format_value(value, language, formatters))
+                continue
+
+            number = float(value)
+            total += number
+            count += 1
+            if number < minimum:
+                minimum = number
+            if number > maximum:
+                maximum = number
+            formatted.append(formatter(value))
+
+        if count == 0:
+            return formatted, None
+
+        return formatted, {
+            "sum": total,
+            "avg": total / count,
+            "min": minimum,
+            "max": maximum,
         }
 
-        if not rows:
-            return summary
-
-        # Use pandas if available for better analysis
-        if PANDAS_AVAILABLE and pd:
-            try:
-                df = pd.DataFrame(rows)
-                numeric_cols = df.select_dtypes(include=["number"]).columns
-
-                if len(numeric_cols) > 0:
-                    summary["numeric_columns"] = {}
-                    for col in numeric_cols:
-                        summary["numeric_columns"][col] = {
-                            "sum": float(df[col].sum()),
-                            "avg": float(df[col].mean()),
-                            "min": float(df[col].min()),
-                            "max": float(df[col].max()),
-                        }
-            except Exception:
-                # Graceful degradation: continue without pandas analysis
-                pass
-
-        return summary
-
-    async def _analyze_semantically(
+    def _format_date_string(
         self,
-        rows: List[Dict[str, Any]],
-        sql: str,
+        value: Any,
+        date_format: str,
+        formatters: Dict[str, Formatter],
         language: str,
-    ) -> Optional[Dict[str, Any]]:
-        """Perform semantic analysis using LLM.
-
-        Analyzes results to detect patterns and generate insights.
+    ) -> Any:
+        """Format date string using the column's detected input format.
 
         Args:
-            rows: Query results.
-            sql: SQL query executed.
-            language: Language for insights.
+            value: Column value.
+            date_format: Input format detected for the column.
+            formatters: Per-kind formatters.
+            language: Language for fallback formatting.
 
         Returns:
-            Dictionary with insights, or None if analysis fails.
+            Formatted date string (or fallback-formatted value).
         """
-        if not self._llm_client:
+        if value is None:
             return None
-
         try:
-            # Prepare data summary for LLM
-            row_count = len(rows)
-            sample_rows = rows[:5]  # Sample for analysis
-            columns = list(rows[0].keys()) if rows else []
+            parsed = datetime.strptime(value, date_format)
+        except (TypeError, ValueError):
+            return self._format_value(value, language, formatters)
 
-            prompt = f"""Analise os resultados da seguinte query SQL e forneça insights:
+        if date_format == "%Y-%m-%d %H:%M:%S":
+            return formatters["datetime"](parsed)
+        return formatters["date"](parsed)
 
-Query SQL: {sql[:200]}
+    def _apply(self, formatter: Formatter, value: Any, language: str) -> Any:
+        """Apply column formatter, falling back to per-value formatting.
 
-Resultados:
-- Total de linhas: {row_count}
-- Colunas: {', '.join(columns)}
-- Amostra (primeiras 5 linhas): {sample_rows}
+        Args:
+            formatter: Column formatter.
+            value: Non-null value.
+            language: Language for fallback formatting.
 
-Forneça:
-1. Insights descritivos (o que os dados mostram)
-2. Insights interpretativos (o que isso significa)
-3. Insights acionáveis (o que fazer com essa informação)
+        Returns:
+            Formatted value.
+        """
+        try:
+            return formatter(value)
+        except Exception:
+            return self._format_value(value, language)
 
-Responda em {language}."""
+    def _format_value(
+        self,
+        value: Any,
+        language: str,
+        formatters: Optional[Dict[str, Formatter]] = None,
+    ) -> Any:
+        """Format single value according to type and language.
 
-            response = await self._llm_client.generate(prompt)
-            insights_text = response.text
+        Per-value fallback for mixed-type columns (and values the column
+        sample did not anticipate).
 
-            return {
-                "descriptive": insights_text,
-                "interpretive": None,  # Could be extracted from LLM response
-                "actionable": None,  # Could be extracted from LLM response
-            }
-        except Exception as e:
-            logger.warning(f"Semantic analysis failed: {e}")
+        Args:
+            value: Value to format.
+            language: Language for formatting.
+            formatters: Per-kind formatters (built if not given).
+
+        Returns:
+            Formatted value.
+        """
+        if value is None:
             return None
 
+        if formatters is None:
+            formatters = self._build_formatters(language)
+
+        if isinstance(value, bool):
+            return formatters["bool"](value)
+        if isinstance(value, int):
+            return formatters["int"](value)
+        if isinstance(value, (float, Decimal)):
+            return formatters["float"](value)
+        if isinstance(value, datetime):
+            return formatters["datetime"](value)
+        if isinstance(value, date):
+            return formatters["date"](value)
+        if isinstance(value, str):
+            for date_format in _DATE_INPUT_FORMATS:
+                try:
+                    parsed = datetime.strptime(value, date_format)
+                except ValueError:
+                    continue
+                if date_format == "%Y-%m-%d %H:%M:%S":
+                    return formatters["datetime"](parsed)
+                return formatters["date"](parsed)
+
+        return value
+
     def _suggest_display(
         self,
         rows: List[Dict[str, Any]],
         sql: str,
+        column_stats: Optional[Dict[str, Dict[str, Any]]] = None,
     ) -> Dict[str, Any]:
         """Suggest visualization format.
 
         Suggests best display format based on data structure and query type.
+        Catalog statistics, when known, decide which columns are temporal
+        (instead of column names) and which are low-cardinality categories.
 
         Args:
             rows: Query results.
             sql: SQL query executed.
+            column_stats: Catalog statistics of result columns by name (optional).
 
         Returns:
-            Dictionary with display suggestion (type, reason).
+            Dictionary with display suggestion (type, reason; x, the temporal
+            column, for line charts).
         """
         if not rows:
             return {"type": "table", "reason": "Empty result set"}
@@ -309,19 +466,40 @@ Responda em {language}."""
             for agg in ["COUNT", "SUM", "AVG", "MAX", "MIN", "GROUP BY"]
         )
 
-        # Check for time series (date columns)
-        has_date = any(
-            "date" in key.lower() or "time" in key.lower()
-            for key in rows[0].keys()
-            if rows
+        column_stats = column_stats or {}
+
+        # Check for time series (catalog type when known, else column name)
+        time_column = None
+        for key in rows[0].keys():
+            stats = column_stats.get(key)
+            if stats is not None:
+                data_type = (stats.get("data_type") or "").upper()
+                is_date = "TIMESTAMP" in data_type or "DATE" in data_type
+            else:
+                is_date = "date" in key.lower() or "time" in key.lower()
+            if is_date:
+                time_column = key
+                break
+
+        # Check for a low-cardinality category (values known from ingestion)
+        category = next(
+            (key for key in rows[0].keys() if (column_stats.get(key) or {}).get("top_values")),
+            None,
         )
 
         # Suggest based on query type
         if has_aggregation and len(rows) <= 20:
-            if has_date:
-                return {"type": "line_chart", "reason": "Time series aggregation"}
+            if time_column:
+                return {"type": "line_chart", "reason": "Time series aggregation", "x": time_column}
             return {"type": "bar_chart", "reason": "Aggregation results"}
 
+        # Long time series are still charted (downsampled), not tabulated
+        if has_aggregation and time_column and is_time_series(rows, time_column):
+            return {"type": "line_chart", "reason": "Time series aggregation", "x": time_column}
+
+        if has_aggregation and category and len(rows) <= ANALYTICS_CATEGORICAL_MAX_DISTINCT:
+            return {"type": "bar_chart", "reason": f"Aggregation by category ({category})"}
+
         if len(rows) > 100:
             return {"type": "table", "reason": "Large result set"}
 
@@ -0,0 +1,776 @@
+"""
+Analytics result pagination (result handles with keyset-paginated pages).
+
+Overview
+  Answers carry a results handle and the first page of rows instead of the
+  whole result. Further pages are fetched through the results endpoint:
+  complete results (below SQL_MAX_ROWS) are served from the rows fetched with
+  the answer; truncated results are re-executed one page at a time with a
+  bound keyset cursor over a stable, unique ordering, so paging continues past
+  SQL_MAX_ROWS without OFFSET scans.
+
+Design
+  - **Two Modes**: "rows" (stored, compressed rows, offset cursor) and "keyset"
+    (planned SQL wrapped with a WHERE over the last row's key, ORDER BY and LIMIT).
+  - **Stable Ordering**: The query's ORDER BY (mapped to output columns) followed by
+    a unique key: GROUP BY output columns, all columns of a DISTINCT query, or the
+    primary key of a single-table query. Queries with no derivable key or ORDER BY,
+    an inner LIMIT/OFFSET, CTEs or set operations fall back to stored rows
+    (complete=False).
+  - **NULL Handling**: Pages keep the query's NULLS FIRST/LAST (or the engine default:
+    PostgreSQL sorts NULLs first in DESC); cursor terms place NULL rows accordingly.
+  - **Opaque Cursors**: URL-safe base64 JSON; keyset values keep their type (dates,
+    decimals) so they bind like the column they compare with.
+  - **Data Versions**: Keyset handles expire when a referenced table is reloaded.
+  - **First Page From Fetched Rows**: The answer's page ends where the ORDER BY values
+    change, so opening a handle runs no query; page queries start from page two.
+  - **Cost Gate**: Page queries go through QueryCostGuard like any analytics query.
+  - **LRU + TTL Store**: In-process, ANALYTICS_RESULT_MAX_HANDLES handles.
+  - **Singleton Pattern**: get_result_pager() returns process-wide instance.
+
+Integration
+  - Consumes: sql_analysis helpers, SchemaCatalog, ResultCache (referenced versions),
+    QueryCostGuard, AnalyticsRepository, constants.
+  - Returns: Page dictionaries (handle, columns, rows, next_cursor, mode, complete).
+  - Used by: AnalyticsAgent (first page in answer metadata), analytics results route.
+  - Observability: Logs keyset fallbacks and expired handles.
+
+Usage
+  >>> from app.agents.analytics.pagination import get_result_pager
+  >>> pager = get_result_pager()
+  >>> page = await pager.open(repository, rows, truncated=True, sql=sql, schema_info=info)
+  >>> handle = pager.get(page["handle"])
+  >>> next_page = await pager.page(handle, page["next_cursor"], 100, repository)
+"""
+
+import base64
+import datetime
+import decimal
+import json
+import logging
+import pickle
+import re
+import secrets
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.agents.analytics.catalog import get_schema_catalog
+from app.agents.analytics.cost_guard import QueryCostGuard
+from app.agents.analytics.result_cache import get_result_cache
+from app.config.constants import (
+    ANALYTICS_RESULT_HANDLE_TTL_SECONDS,
+    ANALYTICS_RESULT_MAX_HANDLES,
+    ANALYTICS_RESULT_PAGE_SIZE,
+)
+from app.config.exceptions import ValidationException
+from app.infrastructure.database.repositories.analytics_repo import AnalyticsRepository
+from app.routing.sql_analysis import (
+    analyze_sql,
+    normalize_sql,
+    split_alias,
+    split_clauses,
+    split_list,
+)
+
+logger = logging.getLogger(__name__)
+
+# "expression [ASC|DESC] [NULLS FIRST|LAST]" ORDER BY item
+_ORDER_ITEM_PATTERN = re.compile(
+    r"^(?P<expression>.+?)(?:\s+(?P<direction>ASC|DESC))?(?:\s+NULLS\s+(?P<nulls>FIRST|LAST))?$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Plain (optionally qualified) column reference, as normalized by normalize_sql
+_COLUMN_REFERENCE_PATTERN = re.compile(r"^(?:\w+ \. )?(?P<column>\w+)$")
+
+# GROUP BY forms whose rows are not unique on the grouped columns
+_GROUPING_SETS_PATTERN = re.compile(r"\b(ROLLUP|CUBE|GROUPING\s+SETS)\b", re.IGNORECASE)
+
+# Engines sorting NULLs first by default in descending order (DuckDB sorts them last)
+_DESC_NULLS_FIRST_ENGINES = frozenset({"postgres"})
+
+# (column, descending, nulls first) keyset items
+Order = List[Tuple[str, bool, bool]]
+
+
+@dataclass
+class ResultHandle:
+    """Paginated analytics result.
+
+    Attributes:
+        handle: Opaque handle ID.
+        mode: "rows" (stored rows) or "keyset" (re-executed with a bound cursor).
+        engine: Analytics engine the result came from.
+        columns: Column names (in order).
+        complete: Whether paging reaches every row of the result.
+        sql: Planned SQL before the row cap (keyset mode).
+        order: Keyset ordering as (column, descending, nulls first) items (keyset mode).
+        versions: Data versions of referenced tables when opened (keyset mode).
+        payload: Compressed stored rows (rows mode).
+        row_count: Number of stored rows (rows mode).
+        created_at: Monotonic creation time.
+    """
+
+    handle: str
+    mode: str
+    engine: str
+    columns: List[str]
+    complete: bool
+    sql: Optional[str] = None
+    order: Optional[Order] = None
+    versions: Optional[Dict[str, int]] = None
+    payload: Optional[bytes] = None
+    row_count: int = 0
+    created_at: float = 0.0
+
+
+def keyset_order(
+    sql: str,
+    columns: List[str],
+    schema_info: Dict[str, Any],
+    engine: str = "postgres",
+) -> Optional[Order]:
+    """Derive a stable, unique ordering of a query's output columns.
+
+    Args:
+        sql: Planned SQL (before the row cap).
+        columns: Result column names (in order).
+        schema_info: Catalog schema info (primary keys).
+        engine: Analytics engine (default NULLS placement).
+
+    Returns:
+        List of (column, descending, nulls first): the query's ORDER BY items
+        (keeping their NULLS placement, or the engine's default), then the
+        columns of a unique key; None if no unique key can be derived.
+    """
+    derived = _keyset_order(sql, columns, schema_info, engine)
+    return derived[0] if derived else None
+
+
+def _keyset_order(
+    sql: str,
+    columns: List[str],
+    schema_info: Dict[str, Any],
+    engine: str = "postgres",
+) -> Optional[Tuple[Order, int]]:
+    """Derive the keyset ordering and how many of its items the query orders by.
+
+    Args:
+        sql: Planned SQL (before the row cap).
+        columns: Result column names (in order).
+        schema_info: Catalog schema info (primary keys).
+        engine: Analytics engine (default NULLS placement).
+
+    Returns:
+        Tuple of (ordering, number of leading ORDER BY items), or None if no
+        unique key can be derived.
+    """
+    clauses = split_clauses(sql)
+    if (
+        not clauses
+        or not columns
+        or "LIMIT" in clauses
+        or "OFFSET" in clauses
+        or len({column.lower() for column in columns}) != len(columns)
+    ):
+        return None
+
+    select = clauses["SELECT"]
+    distinct = re.match(r"DISTINCT\s+(?P<on>ON\b)?", select, re.IGNORECASE)
+    if distinct:
+        if distinct.group("on"):
+            return None
+        select = select[distinct.end() :]
+
+    items = split_list(select)
+    if len(items) != len(columns) or any(item == "*" or item.endswith(".*") for item in items):
+        return None
+    expressions = [normalize_sql(split_alias(item)[0]) for item in items]
+
+    def output_column(text: str, aliases: bool = True) -> Optional[str]:
+        """Map an ORDER BY/GROUP BY item to the output column it denotes.
+
+        GROUP BY resolves bare names to input columns first, so without
+        aliases a name only matches an output column selecting that column.
+        """
+        text = text.strip()
+        if text.isdigit():
+            position = int(text) - 1
+            return columns[position] if 0 <= position < len(columns) else None
+        quoted = len(text) > 1 and text[0] == text[-1] == '"'
+        name = text[1:-1] if quoted else text.lower()
+        for column, expression in zip(columns, expressions):
+            if (column if quoted else column.lower()) != name:
+                continue
+            reference = _COLUMN_REFERENCE_PATTERN.match(expression)
+            if aliases or (reference and reference.group("column") == name.lower()):
+                return column
+        normalized = normalize_sql(text)
+        for column, expression in zip(columns, expressions):
+            if expression == normalized:
+                return column
+        return None
+
+    order: Order = []
+    for item in split_list(clauses.get("ORDER BY", "")):
+        match = _ORDER_ITEM_PATTERN.match(item)
+        column = output_column(match.group("expression")) if match else None
+        if column is None:
+            return None
+        if column not in (ordered for ordered, _, _ in order):
+            descending = (match.group("direction") or "").upper() == "DESC"
+            nulls = (match.group("nulls") or "").upper()
+            nulls_first = (
+                nulls == "FIRST"
+                if nulls
+                else descending and engine in _DESC_NULLS_FIRST_ENGINES
+            )
+            order.append((column, descending, nulls_first))
+
+    if distinct:
+        key: Optional[List[str]] = list(columns)
+    elif "GROUP BY" in clauses:
+        if _GROUPING_SETS_PATTERN.search(clauses["GROUP BY"]):
+            return None
+        grouped = [
+            output_column(item, aliases=False) for item in split_list(clauses["GROUP BY"])
+        ]
+        key = None if None in grouped else grouped  # type: ignore[assignment]
+    else:
+        key = _primary_key(clauses["FROM"], sql, columns, expressions, schema_info)
+
+    if not key:
+        return None
+    ordered = {column for column, _, _ in order}
+    key_order = [(column, False, False) for column in key if column not in ordered]
+    return order + key_order, len(order)
+
+
+def build_page_sql(
+    sql: str,
+    order: Order,
+    after: Optional[List[Any]],
+    limit: int,
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the keyset page query over a planned SQL.
+
+    Args:
+        sql: Planned SQL (before the row cap).
+        order: Keyset ordering from keyset_order().
+        after: Key values of the previous page's last row (None for the first page).
+        limit: Rows to fetch.
+
+    Returns:
+        Tuple of (page SQL, bound parameters).
+    """
+    params: Dict[str, Any] = {}
+    where = ""
+    if after is not None:
+        # Rows after the cursor in lexicographic order (NULLs placed as in order)
+        terms: List[str] = []
+        equal: List[str] = []
+        for i, ((column, descending, nulls_first), value) in enumerate(zip(order, after)):
+            quoted = _quote(column)
+            if value is None:
+                if nulls_first:
+                    terms.append(" AND ".join([*equal, f"{quoted} IS NOT NULL"]))
+                equal.append(f"{quoted} IS NULL")
+                continue
+            params[f"after_{i}"] = value
+            after_value = f"{quoted} {'<' if descending else '>'} :after_{i}"
+            if not nulls_first:
+                after_value = f"({after_value} OR {quoted} IS NULL)"
+            terms.append(" AND ".join([*equal, after_value]))
+            equal.append(f"{quoted} = :after_{i}")
+        where = "\nWHERE " + (" OR ".join(f"({term})" for term in terms) if terms else "FALSE")
+
+    order_by = ", ".join(
+        f"{_quote(column)} {'DESC' if descending else 'ASC'} NULLS {'FIRST' if first else 'LAST'}"
+        for column, descending, first in order
+    )
+    inner = sql.strip().rstrip(";").strip()
+    return (
+        f"SELECT * FROM (\n{inner}\n) AS result{where}\nORDER BY {order_by}\nLIMIT {limit}",
+        params,
+    )
+
+
+class ResultPager:
+    """In-process store of paginated analytics results.
+
+    Keeps at most max_handles handles (least recently used evicted) and
+    drops handles older than ttl_seconds.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = ANALYTICS_RESULT_HANDLE_TTL_SECONDS,
+        max_handles: int = ANALYTICS_RESULT_MAX_HANDLES,
+    ) -> None:
+        """Initialize result pager.
+
+        Args:
+            ttl_seconds: Seconds a handle stays valid.
+            max_handles: Maximum number of open handles.
+        """
+        self._ttl_seconds = ttl_seconds
+        self._max_handles = max_handles
+        self._handles: "OrderedDict[str, ResultHandle]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def open(
+        self,
+        repository: AnalyticsRepository,
+        rows: List[Dict[str, Any]],
+        truncated: bool = False,
+        sql: Optional[str] = None,
+        schema_info: Optional[Dict[str, Any]] = None,
+        page_size: int = ANALYTICS_RESULT_PAGE_SIZE,
+    ) -> Dict[str, Any]:
+        """Open a handle for a result and get its first page.
+
+        Truncated results are paged by keyset over the planned SQL when a
+        stable ordering exists. The first page always comes from the fetched
+        rows; it ends at a change of the query's ORDER BY values, so the
+        keyset query of the next page resumes exactly after it. Results whose
+        first page cannot end that way (no ORDER BY, or ties longer than a
+        page) only page the fetched rows.
+
+        Args:
+            repository: Analytics repository the result came from.
+            rows: Fetched rows.
+            truncated: Whether rows were capped at SQL_MAX_ROWS.
+            sql: Planned SQL before the row cap (keyset paging, optional).
+            schema_info: Full catalog schema info (keyset paging, optional).
+            page_size: Rows in the first page.
+
+        Returns:
+            First page dictionary.
+        """
+        columns = list(rows[0]) if rows else []
+        engine = repository.engine
+
+        derived = None
+        if truncated and sql and schema_info:
+            derived = _keyset_order(sql, columns, schema_info, engine)
+        if derived is not None:
+            order, ordered = derived
+            end = _first_page_end(rows, order, ordered, page_size)
+            if end:
+                handle = ResultHandle(
+                    handle=secrets.token_urlsafe(16),
+                    mode="keyset",
+                    engine=engine,
+                    columns=columns,
+                    complete=True,
+                    sql=sql,
+                    order=order,
+                    versions=get_result_cache().referenced_versions(sql or "", schema_info or {}),
+                    created_at=time.monotonic(),
+                )
+                self._store(handle)
+                return self._keyset_page(handle, rows[:end], ordered)
+            logger.info("Keyset paging unavailable (no ORDER BY boundary), paging fetched rows")
+
+        values = [[_jsonable(value) for value in row.values()] for row in rows]
+        handle = ResultHandle(
+            handle=secrets.token_urlsafe(16),
+            mode="rows",
+            engine=engine,
+            columns=columns,
+            complete=not truncated,
+            payload=zlib.compress(pickle.dumps(values, pickle.HIGHEST_PROTOCOL)),
+            row_count=len(values),
+            created_at=time.monotonic(),
+        )
+        self._store(handle)
+        return self._rows_page(handle, values, 0, page_size)
+
+    def get(self, handle_id: str) -> Optional[ResultHandle]:
+        """Get an open handle and mark it as recently used.
+
+        Args:
+            handle_id: Handle ID from a page.
+
+        Returns:
+            ResultHandle, or None if unknown or expired.
+        """
+        with self._lock:
+            handle = self._handles.get(handle_id)
+            if handle is None:
+                return None
+            if time.monotonic() - handle.created_at > self._ttl_seconds:
+                del self._handles[handle_id]
+                return None
+            self._handles.move_to_end(handle_id)
+            return handle
+
+    async def page(
+        self,
+        handle: ResultHandle,
+        cursor: Optional[str],
+        page_size: int,
+        repository: Optional[AnalyticsRepository] = None,
+    ) -> Dict[str, Any]:
+        """Get the page of a result starting at a cursor.
+
+        Args:
+            handle: Open result handle.
+            cursor: Cursor from the previous page (None for the first page).
+            page_size: Rows in the page.
+            repository: Analytics repository for the handle's engine (keyset mode).
+
+        Returns:
+            Page dictionary.
+
+        Raises:
+            ValidationException: If the cursor is invalid, or the data changed since
+                the result was produced.
+        """
+        position = _decode_cursor(cursor) if cursor else None
+
+        if handle.mode == "rows":
+            offset = position.get("o") if position else 0
+            if not isinstance(offset, int) or offset < 0:
+                raise ValidationException(message="Invalid cursor", details={"cursor": cursor})
+            values = pickle.loads(zlib.decompress(handle.payload or b""))
+            return self._rows_page(handle, values, offset, page_size)
+
+        # The first page's cursor only holds its ORDER BY values (a prefix of the key)
+        after = position.get("k") if position else None
+        if after is not None and (
+            not isinstance(after, list) or not 0 < len(after) <= len(handle.order or [])
+        ):
+            raise ValidationException(message="Invalid cursor", details={"cursor": cursor})
+        if repository is None:
+            raise ValidationException(message="Repository required for keyset pages")
+
+        schema_info = await get_schema_catalog(handle.engine).get_schema_info(repository)
+        versions = get_result_cache().referenced_versions(handle.sql or "", schema_info)
+        if versions != handle.versions:
+            logger.info(f"Result handle {handle.handle[:8]} expired (data changed)")
+            raise ValidationException(
+                message="Result expired: the underlying data changed, ask the question again",
+                details={"handle": handle.handle, "reason": "data_changed"},
+            )
+
+        return await self._fetch_keyset(
+            handle,
+            [_decode_value(value) for value in after] if after is not None else None,
+            page_size,
+            repository,
+        )
+
+    async def _fetch_keyset(
+        self,
+        handle: ResultHandle,
+        after: Optional[List[Any]],
+        page_size: int,
+        repository: AnalyticsRepository,
+    ) -> Dict[str, Any]:
+        """Run a keyset page query (cost-checked) and build the page.
+
+        Args:
+            handle: Keyset handle.
+            after: Key values (or leading ORDER BY values) the page starts after.
+            page_size: Rows in the page.
+            repository: Analytics repository.
+
+        Returns:
+            Page dictionary.
+
+        Raises:
+            ValidationException: If the page query is too expensive.
+            DatabaseException: If the page query fails.
+        """
+        order = handle.order or []
+        # One extra row tells whether another page follows
+        page_sql, params = build_page_sql(handle.sql or "", order, after, page_size + 1)
+        checked = await QueryCostGuard(repository).check(page_sql, params or None)
+        rows = await repository.execute_sql(checked["sql"], params or None)
+
+        if len(rows) > page_size:
+            return self._keyset_page(handle, rows[:page_size], len(order))
+        return self._keyset_page(handle, rows, None)
+
+    def _keyset_page(
+        self,
+        handle: ResultHandle,
+        rows: List[Dict[str, Any]],
+        cursor_length: Optional[int],
+    ) -> Dict[str, Any]:
+        """Build a keyset page.
+
+        Args:
+            handle: Keyset handle.
+            rows: Page rows.
+            cursor_length: Leading order columns of the last row in the next
+                cursor (None for the last page).
+
+        Returns:
+            Page dictionary.
+        """
+        next_cursor = None
+        if cursor_length is not None:
+            last = rows[-1]
+            next_cursor = _encode_cursor(
+                {"k": [_encode_value(last[c]) for c, _, _ in (handle.order or [])[:cursor_length]]},
+            )
+
+        return {
+            "handle": handle.handle,
+            "mode": handle.mode,
+            "columns": handle.columns,
+            "rows": [[_jsonable(value) for value in row.values()] for row in rows],
+            "next_cursor": next_cursor,
+            "complete": handle.complete,
+            "total_rows": None,
+        }
+
+    def _rows_page(
+        self,
+        handle: ResultHandle,
+        values: List[List[Any]],
+        offset: int,
+        page_size: int,
+    ) -> Dict[str, Any]:
+        """Build a page from stored rows.
+
+        Args:
+            handle: Rows handle.
+            values: Stored row values.
+            offset: First row of the page.
+            page_size: Rows in the page.
+
+        Returns:
+            Page dictionary.
+        """
+        end = offset + page_size
+        return {
+            "handle": handle.handle,
+            "mode": handle.mode,
+            "columns": handle.columns,
+            "rows": values[offset:end],
+            "next_cursor": _encode_cursor({"o": end}) if end < len(values) else None,
+            "complete": handle.complete,
+            "total_rows": handle.row_count if handle.complete else None,
+        }
+
+    def _store(self, handle: ResultHandle) -> None:
+        """Register a handle, evicting the least recently used ones.
+
+        Args:
+            handle: Handle to register.
+        """
+        with self._lock:
+            self._handles[handle.handle] = handle
+            while len(self._handles) > self._max_handles:
+                self._handles.popitem(last=False)
+
+
+def _first_page_end(
+    rows: List[Dict[str, Any]],
+    order: Order,
+    ordered: int,
+    page_size: int,
+) -> int:
+    """Find where the first keyset page of fetched rows can end.
+
+    Fetched rows follow the query's ORDER BY, but rows tied on it may be
+    split by the row cap in any order. A page ending where the ORDER BY
+    values change holds every row up to them, so the next page can resume
+    after those values; with a fully ordered unique key every row is such
+    a boundary.
+
+    Args:
+        rows: Fetched rows (query order).
+        order: Keyset ordering.
+        ordered: Number of leading ORDER BY items in order.
+        page_size: Maximum rows in the page.
+
+    Returns:
+        Rows in the first page (0 if no boundary fits in a page).
+    """
+    if ordered == 0:
+        return 0
+    columns = [column for column, _, _ in order[:ordered]]
+    end = 0
+    for i in range(1, min(page_size, len(rows) - 1) + 1):
+        if [rows[i][c] for c in columns] != [rows[i - 1][c] for c in columns]:
+            end = i
+    return end
+
+
+def _primary_key(
+    from_clause: str,
+    sql: str,
+    columns: List[str],
+    expressions: List[str],
+    schema_info: Dict[str, Any],
+) -> Optional[List[str]]:
+    """Get the output columns holding the primary key of a single-table query.
+
+    Args:
+        from_clause: FROM clause text.
+        sql: Planned SQL.
+        columns: Result column names.
+        expressions: Normalized SELECT expressions (same order as columns).
+        schema_info: Catalog schema info.
+
+    Returns:
+        Output columns of every primary key column, or None if the query
+        reads several tables or does not select the whole primary key.
+    """
+    if (
+        len(split_list(from_clause)) != 1
+        or from_clause.lstrip().startswith("(")
+        or re.search(r"\bJOIN\b", from_clause, re.IGNORECASE)
+    ):
+        return None
+    tables = analyze_sql(sql).tables
+    if len(tables) != 1:
+        return None
+
+    (name,) = tables
+    table = next((t for t in schema_info.get("tables", []) if t["name"].lower() == name), None)
+    primary_key = [c["name"] for c in (table or {}).get("columns", []) if c.get("is_primary_key")]
+    if not primary_key:
+        return None
+
+    selected: Dict[str, str] = {}
+    for column, expression in zip(columns, expressions):
+        match = _COLUMN_REFERENCE_PATTERN.match(expression)
+        if match:
+            selected.setdefault(match.group("column"), column)
+    key = [selected.get(column.lower()) for column in primary_key]
+    return None if None in key else key  # type: ignore[return-value]
+
+
+def _quote(identifier: str) -> str:
+    """Quote an output column name.
+
+    Args:
+        identifier: Column name.
+
+    Returns:
+        Double-quoted identifier.
+    """
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert a result value to its JSON representation.
+
+    Args:
+        value: Database value.
+
+    Returns:
+        JSON-serializable value (ISO dates, float decimals, strings otherwise).
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return str(value)
+
+
+def _encode_value(value: Any) -> Any:
+    """Encode a key value for a cursor, keeping its type.
+
+    Args:
+        value: Database value.
+
+    Returns:
+        JSON value, or {"<type>": text} for dates, times, decimals and UUIDs.
+    """
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"d": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {"t": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"n": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"u": str(value)}
+    return _jsonable(value)
+
+
+def _decode_value(value: Any) -> Any:
+    """Decode a cursor key value.
+
+    Args:
+        value: Value from _encode_value().
+
+    Returns:
+        Python value to bind.
+
+    Raises:
+        ValidationException: If the value is malformed.
+    """
+    if not isinstance(value, dict):
+        return value
+    try:
+        ((kind, text),) = value.items()
+        decoders = {
+            "dt": datetime.datetime.fromisoformat,
+            "d": datetime.date.fromisoformat,
+            "t": datetime.time.fromisoformat,
+            "n": decimal.Decimal,
+            "u": uuid.UUID,
+        }
+        return decoders[kind](text)
+    except Exception as e:
+        raise ValidationException(message="Invalid cursor", details={"value": str(value)}) from e
+
+
+def _encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode a page position as an opaque cursor.
+
+    Args:
+        position: {"o": offset} or {"k": encoded key values}.
+
+    Returns:
+        URL-safe cursor string.
+    """
+    payload = json.dumps(position, separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode an opaque cursor.
+
+    Args:
+        cursor: Cursor from a page.
+
+    Returns:
+        Page position dictionary.
+
+    Raises:
+        ValidationException: If the cursor is malformed.
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as e:
+        raise ValidationException(message="Invalid cursor", details={"cursor": cursor}) from e
+    if not isinstance(position, dict):
+        raise ValidationException(message="Invalid cursor", details={"cursor": cursor})
+    return position
+
+
+@lru_cache()
+def get_result_pager() -> ResultPager:
+    """Get singleton ResultPager instance.
+
+    Returns:
+        ResultPager singleton instance.
+    """
+    return ResultPager()
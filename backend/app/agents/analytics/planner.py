@@ -9,8 +9,12 @@ Overview
 Design
   - **Structured Outputs**: Uses JSON Schema for guaranteed structure.
   - **Allowlist Validation**: Validates against allowed tables/columns.
-  - **Syntax Validation**: Validates SQL syntax.
-  - **Caching**: Caches generated SQL (TTL short, can change with context).
+  - **Syntax Validation**: Validates SQL syntax from the shared, cached SQL analysis.
+  - **Caching**: Caches generated SQL keyed by query and schema catalog version.
+  - **Feedback Regeneration**: Accepts feedback (e.g. cost guard rejection) to regenerate SQL.
+  - **Column Values**: Prompt lists the top values of categorical columns and min/max of the
+    others (ingestion statistics), so literals match the data.
+  - **Approximate Flag**: Flags questions that only ask for an estimate (sampled execution).
 
 Integration
   - Consumes: LLMClient, AllowlistValidator, CacheManager, constants.
@@ -22,6 +26,7 @@ Usage
   >>> from app.agents.analytics.planner import AnalyticsPlanner
   >>> planner = AnalyticsPlanner(llm_client, allowlist_validator, cache)
   >>> result = await planner.plan("How many orders?", schema_info, "pt-BR")
+  >>> planner.validate("SELECT COUNT(*) FROM orders", schema_info)
 """
 
 import hashlib
@@ -33,18 +38,10 @@ from app.config.exceptions import LLMException, ValidationException
 from app.infrastructure.cache.cache_manager import CacheManager
 from app.infrastructure.llm.client import LLMClient
 from app.routing.allowlist import AllowlistValidator
+from app.routing.sql_analysis import analyze_sql
 
 logger = logging.getLogger(__name__)
 
-# Try to import sqlparse for syntax validation (optional)
-try:
-    import sqlparse
-
-    SQLPARSE_AVAILABLE = True
-except ImportError:
-    SQLPARSE_AVAILABLE = False
-    sqlparse = None  # type: ignore
-
 
 class AnalyticsPlanner:
     """SQL planner for natural language to SQL generation.
@@ -75,16 +72,20 @@ class AnalyticsPlanner:
         query: str,
         schema_info: Dict[str, Any],
         language: str,
+        feedback: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Generate SQL from natural language query.
 
         Generates SQL using LLM with structured outputs, validates against
-        allowlist and syntax, and caches result.
+        allowlist and syntax, and caches result. When feedback is given
+        (a previous SQL was rejected), the cache is bypassed and the feedback
+        is added to the prompt; the regenerated SQL replaces the cached entry.
 
         Args:
             query: User query in natural language.
             schema_info: Schema information (tables, columns, types).
             language: Query language.
+            feedback: Reason the previous SQL was rejected (optional).
 
         Returns:
             Dictionary with sql, explanation, tables_used, columns_used, confidence.
@@ -95,7 +96,7 @@ class AnalyticsPlanner:
         """
         # Step 1: Check cache
         cache_key = self._generate_cache_key(query, schema_info)
-        if self._cache:
+        if self._cache and not feedback:
             try:
                 cached_result = await self._cache.get(cache_key, "llm_responses")
                 if cached_result:
@@ -106,7 +107,7 @@ class AnalyticsPlanner:
                 pass
 
         # Step 2: Build prompt
-        prompt = self._build_prompt(query, schema_info, language)
+        prompt = self._build_prompt(query, schema_info, language, feedback)
 
         # Step 3: Build JSON Schema for structured output
         json_schema = self._build_json_schema()
@@ -128,7 +129,7 @@ class AnalyticsPlanner:
 
                 # Step 5: Validate allowlist
                 try:
-                    self._allowlist_validator.validate_sql(sql)
+                    self._allowlist_validator.validate_sql(sql, schema_info)
                 except ValidationException:
                     raise
                 except Exception as e:
@@ -145,6 +146,7 @@ class AnalyticsPlanner:
                     "tables_used": tables_used,
                     "columns_used": columns_used,
                     "confidence": confidence,
+                    "approximate": bool(structured_result.get("approximate", False)),
                 }
 
                 if self._cache:
@@ -180,6 +182,7 @@ class AnalyticsPlanner:
         query: str,
         schema_info: Dict[str, Any],
         language: str,
+        feedback: Optional[str] = None,
     ) -> str:
         """Build prompt for LLM SQL generation.
 
@@ -190,6 +193,7 @@ class AnalyticsPlanner:
             query: User query.
             schema_info: Schema information.
             language: Query language.
+            feedback: Reason the previous SQL was rejected (optional).
 
         Returns:
             Complete prompt string.
@@ -207,6 +211,9 @@ REGRAS IMPORTANTES:
 5. Use JOINs quando necessário para relacionar tabelas
 6. Use agregações (COUNT, SUM, AVG, etc.) quando apropriado
 7. Formate SQL de forma clara e legível
+8. Prefira tabelas rollup_* (pré-agregadas) quando cobrirem a pergunta; siga a descrição da tabela
+9. Se a pergunta pedir só uma estimativa ("aproximadamente", "mais ou menos"), marque approximate=true
+10. Em filtros, use literais exatamente como nos valores listados no schema (mesma grafia e idioma)
 
 SCHEMA DISPONÍVEL:
 {schema_description}
@@ -215,13 +222,19 @@ PERGUNTA DO USUÁRIO ({language}):
 {query}
 
 Gere uma query SQL válida seguindo as regras acima."""
+        if feedback:
+            prompt += f"""
+
+A QUERY ANTERIOR FOI REJEITADA:
+{feedback}
+Gere uma query mais barata: evite produtos cartesianos, filtre e agregue antes de juntar tabelas grandes."""
         return prompt
 
     def _format_schema_info(self, schema_info: Dict[str, Any]) -> str:
         """Format schema information for prompt.
 
-        Formats schema information (tables, columns, types) into
-        readable format for LLM prompt.
+        Formats schema information (tables, descriptions, columns, types and
+        ingestion statistics) into readable format for LLM prompt.
 
         Args:
             schema_info: Schema information dictionary.
@@ -238,12 +251,14 @@ Gere uma query SQL válida seguindo as regras acima."""
             columns = table_info.get("columns", [])
 
             table_desc = f"Tabela: {table_name}\n"
+            if table_info.get("description"):
+                table_desc += f"  Descrição: {table_info['description']}\n"
             if columns:
                 table_desc += "  Colunas:\n"
                 for col in columns:
                     col_name = col.get("name", "unknown")
                     col_type = col.get("data_type", "unknown")
-                    table_desc += f"    - {col_name} ({col_type})\n"
+                    table_desc += f"    - {col_name} ({col_type}){self._format_column_stats(col)}\n"
             else:
                 table_desc += "  (sem colunas definidas)\n"
 
@@ -251,6 +266,36 @@ Gere uma query SQL válida seguindo as regras acima."""
 
         return "\n".join(schema_parts)
 
+    def _format_column_stats(self, column: Dict[str, Any]) -> str:
+        """Format a column's ingestion statistics for the prompt.
+
+        Args:
+            column: Column info from schema info.
+
+        Returns:
+            Suffix with the column's values (categorical) or range (numbers and
+            dates), or "" if unknown.
+        """
+        top_values = column.get("top_values")
+        if top_values:
+            values = ", ".join(f"'{value}'" for value in top_values)
+            if (column.get("distinct_count") or 0) > len(top_values):
+                values += ", ..."
+            return f" valores: {values}"
+
+        # Ranges only help for numbers and dates (not free text or keys)
+        min_value, max_value = column.get("min_value"), column.get("max_value")
+        is_key = column.get("is_primary_key") or column.get("is_foreign_key")
+        if (
+            min_value is None
+            or max_value is None
+            or is_key
+            or column.get("name", "").endswith("_id")
+            or column.get("data_type", "").upper() in ("TEXT", "BOOLEAN")
+        ):
+            return ""
+        return f" de {min_value} a {max_value}"
+
     def _build_json_schema(self) -> Dict[str, Any]:
         """Build JSON Schema for structured output.
 
@@ -286,14 +331,44 @@ Gere uma query SQL válida seguindo as regras acima."""
                     "maximum": 1.0,
                     "description": "Confidence score (0.0-1.0)",
                 },
+                "approximate": {
+                    "type": "boolean",
+                    "description": "Whether an estimate from a sample answers the question",
+                },
             },
             "required": ["sql", "explanation", "tables_used", "columns_used", "confidence"],
         }
 
+    def validate(self, sql: str, schema_info: Dict[str, Any]) -> None:
+        """Validate SQL that did not come from the planner (e.g. client-provided SQL).
+
+        Applies the checks generated SQL goes through: allowlist (tables,
+        columns, functions, single SELECT) and syntax. Unlike plan(), an
+        allowlist failure of any kind rejects the SQL.
+
+        Args:
+            sql: SQL query to validate.
+            schema_info: Schema information from the catalog.
+
+        Raises:
+            ValidationException: If the SQL is not allowed or invalid.
+        """
+        try:
+            self._allowlist_validator.validate_sql(sql, schema_info)
+        except ValidationException:
+            raise
+        except Exception as e:
+            raise ValidationException(
+                message="SQL could not be validated",
+                details={"sql": sql[:200], "error": str(e)},
+            ) from e
+        self._validate_syntax(sql)
+
     def _validate_syntax(self, sql: str) -> None:
         """Validate SQL syntax.
 
-        Validates SQL syntax using sqlparse if available, or basic validation.
+        Reuses the cached SQLAnalysis produced by allowlist validation, so the
+        SQL is tokenized once per statement.
 
         Args:
             sql: SQL query to validate.
@@ -307,45 +382,39 @@ Gere uma query SQL válida seguindo as regras acima."""
                 details={"sql": sql},
             )
 
-        # Basic validation: check for dangerous operations
-        sql_upper = sql.upper().strip()
-        dangerous_ops = ["DROP", "DELETE", "TRUNCATE", "ALTER", "CREATE", "INSERT", "UPDATE"]
-        for op in dangerous_ops:
-            if sql_upper.startswith(op) or f" {op} " in sql_upper:
-                raise ValidationException(
-                    message=f"SQL contains dangerous operation: {op}",
-                    details={"sql": sql[:200], "operation": op},
-                )
+        analysis = analyze_sql(sql)
+        if analysis.dangerous_keywords:
+            op = analysis.dangerous_keywords[0]
+            raise ValidationException(
+                message=f"SQL contains dangerous operation: {op}",
+                details={"sql": sql[:200], "operation": op},
+            )
 
-        # Use sqlparse if available for syntax validation
-        if SQLPARSE_AVAILABLE and sqlparse:
-            try:
-                parsed = sqlparse.parse(sql)
-                if not parsed:
-                    raise ValidationException(
-                        message="SQL syntax is invalid (failed to parse)",
-                        details={"sql": sql[:200]},
-                    )
-            except Exception as e:
-                raise ValidationException(
-                    message=f"SQL syntax validation failed: {str(e)}",
-                    details={"sql": sql[:200], "error": str(e)},
-                ) from e
+        if analysis.statement_type != "SELECT":
+            raise ValidationException(
+                message="SQL syntax is invalid (not a SELECT statement)",
+                details={"sql": sql[:200], "statement_type": analysis.statement_type},
+            )
 
     def _generate_cache_key(self, query: str, schema_info: Dict[str, Any]) -> str:
         """Generate cache key for SQL generation.
 
-        Creates cache key from query and schema info hash.
+        Creates cache key from query and schema catalog version. Falls back
+        to hashing the full schema when no version is available.
 
         Args:
             query: User query.
-            schema_info: Schema information.
+            schema_info: Schema information (with "version" from SchemaCatalog).
 
         Returns:
             Cache key string.
         """
-        # Create hash from query + schema
-        key_data = json.dumps({"query": query, "schema": schema_info}, sort_keys=True)
-        key_hash = hashlib.sha256(key_data.encode()).hexdigest()
-        return f"sql_generation:{key_hash}"
-
+        version = schema_info.get("version")
+        if version is not None:
+            schema_key = f"v{version}"
+        else:
+            schema_data = json.dumps(schema_info, sort_keys=True)
+            schema_key = hashlib.sha256(schema_data.encode()).hexdigest()
+
+        query_hash = hashlib.sha256(query.encode()).hexdigest()
+        return f"sql_generation:{schema_key}:{query_hash}"
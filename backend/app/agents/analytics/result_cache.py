@@ -0,0 +1,248 @@
+"""
+Analytics result cache (in-process cache of SQL query results).
+
+Overview
+  Caches analytics query results in memory so repeated (dashboard-style)
+  questions never reach the database. Entries are keyed by a canonicalized
+  SQL hash plus the data version of every referenced table, which the
+  ingestion pipeline bumps on each load; new data is picked up as soon as the
+  schema catalog revalidates (SCHEMA_CATALOG_REFRESH_INTERVAL).
+
+Design
+  - **Canonical Key**: Comments stripped, whitespace collapsed and unquoted words
+    lower-cased outside literals (sql_analysis lexer, no optional dependencies, so
+    keys are identical in every environment) before hashing.
+  - **Data Versions**: Referenced tables resolved against the catalog snapshot;
+    queries referencing no known table are not cached.
+  - **Compact Storage**: Rows stored column-wise (names once, tuples per row),
+    pickled and zlib-compressed.
+  - **Size Limits**: Per-entry and total byte budgets.
+  - **LRU Eviction**: Least recently used entries evicted first.
+  - **Singleton Pattern**: get_result_cache() returns process-wide instance.
+
+Integration
+  - Consumes: Schema info from SchemaCatalog (table data versions), sql_analysis
+    (normalize_sql), constants.
+  - Returns: Cached rows (list of dictionaries) or None.
+  - Used by: AnalyticsExecutor.
+  - Observability: Logs cache hits and evictions at debug level.
+
+Usage
+  >>> from app.agents.analytics.result_cache import get_result_cache
+  >>> cache = get_result_cache()
+  >>> key = cache.make_key(sql, None, cache.referenced_versions(sql, schema_info))
+  >>> rows = cache.get(key)
+"""
+
+import hashlib
+import json
+import logging
+import pickle
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.config.constants import (
+    ANALYTICS_RESULT_CACHE_MAX_BYTES,
+    ANALYTICS_RESULT_CACHE_MAX_ENTRY_BYTES,
+)
+from app.config.exceptions import ValidationException
+from app.routing.sql_analysis import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+# String literal (kept verbatim) or whitespace run (collapsed)
+_WHITESPACE_OUTSIDE_LITERALS = re.compile(r"('(?:[^']|'')*')|\s+")
+_IDENTIFIER_PATTERN = re.compile(r"[a-z_][a-z0-9_]*")
+
+
+class ResultCache:
+    """In-process LRU cache of analytics query results.
+
+    Stores compressed, column-wise serialized rows keyed by canonical SQL
+    and referenced table data versions, within a total byte budget.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = ANALYTICS_RESULT_CACHE_MAX_BYTES,
+        max_entry_bytes: int = ANALYTICS_RESULT_CACHE_MAX_ENTRY_BYTES,
+    ) -> None:
+        """Initialize result cache.
+
+        Args:
+            max_bytes: Total size budget for all entries (compressed bytes).
+            max_entry_bytes: Largest single entry accepted (compressed bytes).
+        """
+        self._max_bytes = max_bytes
+        self._max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Get total size of cached entries.
+
+        Returns:
+            Compressed bytes currently stored.
+        """
+        return self._size
+
+    def canonicalize(self, sql: str) -> str:
+        """Canonicalize SQL so equivalent formatting maps to one key.
+
+        Args:
+            sql: SQL query.
+
+        Returns:
+            Canonical SQL string.
+        """
+        try:
+            canonical = normalize_sql(sql)
+        except ValidationException:
+            # Unterminated quote: whitespace normalization only
+            canonical = _WHITESPACE_OUTSIDE_LITERALS.sub(lambda m: m.group(1) or " ", sql)
+        return canonical.strip().rstrip(";").strip()
+
+    def referenced_versions(
+        self,
+        sql: str,
+        schema_info: Dict[str, Any],
+    ) -> Dict[str, int]:
+        """Get data versions of catalog tables referenced by SQL.
+
+        Matches identifiers in the SQL against catalog table names. Over-
+        matching (e.g. a column named like a table) only makes the key more
+        specific, never stale.
+
+        Args:
+            sql: SQL query.
+            schema_info: Catalog snapshot (tables with "data_version").
+
+        Returns:
+            Dictionary of table name to data version.
+        """
+        identifiers = set(_IDENTIFIER_PATTERN.findall(sql.lower()))
+        return {
+            table["name"]: table.get("data_version") or 0
+            for table in schema_info.get("tables", [])
+            if table["name"].lower() in identifiers
+        }
+
+    def make_key(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]],
+        table_versions: Dict[str, int],
+    ) -> str:
+        """Build cache key from canonical SQL, parameters and table versions.
+
+        Args:
+            sql: SQL query.
+            params: Query parameters (optional).
+            table_versions: Data version per referenced table.
+
+        Returns:
+            Cache key string.
+        """
+        payload = json.dumps(
+            {
+                "sql": self.canonicalize(sql),
+                "params": params or {},
+                "versions": table_versions,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return f"sql_result:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Get cached rows and mark entry as recently used.
+
+        Args:
+            key: Cache key from make_key.
+
+        Returns:
+            Rows as list of dictionaries, or None on miss.
+        """
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                return None
+            self._entries.move_to_end(key)
+
+        try:
+            columns, values = pickle.loads(zlib.decompress(payload))
+        except Exception as e:
+            logger.warning(f"Discarding unreadable result cache entry: {e}")
+            self.delete(key)
+            return None
+
+        logger.debug("SQL result cache hit")
+        return [dict(zip(columns, row)) for row in values]
+
+    def set(self, key: str, rows: List[Dict[str, Any]]) -> None:
+        """Store rows, evicting least recently used entries if needed.
+
+        Entries larger than max_entry_bytes are not cached.
+
+        Args:
+            key: Cache key from make_key.
+            rows: Rows as list of dictionaries.
+        """
+        columns = list(rows[0].keys()) if rows else []
+        values = [tuple(row.values()) for row in rows]
+
+        try:
+            payload = zlib.compress(pickle.dumps((columns, values), pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            logger.warning(f"Result not cacheable: {e}")
+            return
+
+        if len(payload) > self._max_entry_bytes:
+            logger.debug(f"Result too large to cache ({len(payload)} bytes)")
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            self._entries[key] = payload
+            self._size += len(payload)
+
+            while self._size > self._max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                logger.debug(f"Evicted result cache entry ({len(evicted)} bytes)")
+
+    def delete(self, key: str) -> None:
+        """Remove entry from cache.
+
+        Args:
+            key: Cache key.
+        """
+        with self._lock:
+            payload = self._entries.pop(key, None)
+            if payload is not None:
+                self._size -= len(payload)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+@lru_cache()
+def get_result_cache() -> ResultCache:
+    """Get singleton ResultCache instance.
+
+    Returns:
+        ResultCache singleton instance.
+    """
+    return ResultCache()
@@ -0,0 +1,816 @@
+"""
+Analytics rollups (materialised pre-aggregations for hot GROUP BY shapes).
+
+Overview
+  Detects GROUP BY query shapes that recur in the executed query log and
+  maintains them as materialised views in the analytics schema. Each rollup
+  is registered in the schema catalog like any other table, with a
+  description of its keys and measures, so the planner answers matching
+  questions from pre-aggregated rows instead of scanning the source tables.
+  Rollups are refreshed after every ingestion into their source tables.
+
+Design
+  - **Shapes**: Plain SELECT ... GROUP BY queries (no CTEs, set operations or window
+    aggregates). Grouping keys plus the columns of equality/IN filters form the rollup
+    keys; range filters are allowed on columns a key truncates (date_trunc/EXTRACT).
+    The rollup itself is unfiltered.
+  - **Additive Measures**: COUNT(*), COUNT(x), SUM, MIN and MAX; AVG is stored as SUM
+    and COUNT. COUNT(DISTINCT), FILTER and window aggregates make a query ineligible
+    (they cannot be re-aggregated).
+  - **Detection**: Shapes with the same source (FROM clause) and keys share a rollup,
+    and shapes whose keys are a subset of another's fold into it. Kept when executed
+    at least ANALYTICS_ROLLUP_MIN_EXECUTIONS times, ordered by workload time.
+  - **Size Check**: A rollup larger than ANALYTICS_ROLLUP_MAX_RATIO of its largest
+    source table is rolled back (keys too selective to pay off).
+  - **Catalog Registration**: AnalyticsTable/AnalyticsColumn rows (no embedding, so
+    always in planner prompts) and a catalog version bump.
+  - **Refresh**: REFRESH MATERIALIZED VIEW CONCURRENTLY (unique index on the keys, so
+    reads never block); views dropped by a replace load are recreated from their
+    definition. The table data version is bumped (cached results invalidate).
+
+Integration
+  - Consumes: Database session, sql_analysis (clause splitting), query log entries,
+    constants.
+  - Returns: RollupCandidate list, AnalyticsRollup models.
+  - Used by: scripts/rollups.py (detection and creation), scripts/ingest_csvs.py
+    (refresh), AnalyticsSchemaBuilder (replace loads detach dependent rollups).
+  - Observability: Logs created, refreshed and skipped rollups.
+
+Usage
+  >>> from app.agents.analytics.rollups import RollupManager, detect_rollups
+  >>> candidates = detect_rollups(await repository.get_query_log(5000))
+  >>> manager = RollupManager(session)
+  >>> rollup = await manager.create(candidates[0])
+  >>> await manager.refresh(["olist_orders"])
+"""
+
+import hashlib
+import json
+import logging
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config.constants import (
+    ANALYTICS_ROLLUP_MAX,
+    ANALYTICS_ROLLUP_MAX_RATIO,
+    ANALYTICS_ROLLUP_MIN_EXECUTIONS,
+    ANALYTICS_ROLLUP_PREFIX,
+)
+from app.config.exceptions import ValidationException
+from app.infrastructure.database.models.analytics import (
+    AnalyticsCatalogVersion,
+    AnalyticsColumn,
+    AnalyticsQueryLog,
+    AnalyticsRollup,
+    AnalyticsTable,
+)
+from app.routing.sql_analysis import (
+    aggregate_calls,
+    analyze_sql,
+    normalize_sql,
+    split_alias,
+    split_clauses,
+    split_list,
+)
+
+logger = logging.getLogger(__name__)
+
+# Plain (optionally qualified) column reference
+_COLUMN = re.compile(r'^(?:(?:"[^"]+"|[A-Za-z_]\w*)\s*\.\s*)?(?P<column>"[^"]+"|[A-Za-z_]\w*)$')
+
+# Unqualified name (GROUP BY output alias)
+_NAME = re.compile(r'^(?:"[^"]+"|[A-Za-z_]\w*)$')
+
+# Truncations of a column: date_trunc('unit', col), date_part('unit', col), EXTRACT(unit FROM col)
+_TRUNCATIONS = (
+    re.compile(r"^date_trunc\s*\(\s*'(?P<unit>\w+)'\s*,\s*(?P<column>.+)\)$", re.I | re.S),
+    re.compile(r"^date_part\s*\(\s*'(?P<unit>\w+)'\s*,\s*(?P<column>.+)\)$", re.I | re.S),
+    re.compile(r"^extract\s*\(\s*(?P<unit>\w+)\s+FROM\s+(?P<column>.+)\)$", re.I | re.S),
+)
+
+# Comparison condition: left side has no comparison characters
+_COMPARISON = re.compile(
+    r"^(?P<left>[^<>=!]+?)\s*(?P<op><>|!=|<=|>=|=|<|>)\s*(?P<right>.+)$",
+    re.S,
+)
+
+# Keyword condition (IN, LIKE, BETWEEN, IS)
+_KEYWORD_CONDITION = re.compile(
+    r"^(?P<left>.+?)\s+(?P<op>(?:NOT\s+)?(?:IN|BETWEEN|I?LIKE)|IS)\b\s*(?P<right>.+)$",
+    re.I | re.S,
+)
+
+# Operators filtering on a range (need a key truncating the column instead of a new key)
+_RANGE_OPERATORS = frozenset({"<", ">", "<=", ">=", "BETWEEN", "NOT BETWEEN"})
+
+
+@dataclass(frozen=True)
+class RollupKey:
+    """Grouping key of a rollup."""
+
+    name: str
+    expression: str
+
+
+@dataclass(frozen=True)
+class RollupMeasure:
+    """Additive measure of a rollup."""
+
+    name: str
+    function: str  # COUNT, SUM, MIN or MAX
+    argument: str  # "*" or a column reference
+
+
+@dataclass
+class RollupCandidate:
+    """Rollup shape detected in the workload."""
+
+    source: str  # FROM clause, verbatim
+    keys: List[RollupKey]
+    measures: Dict[str, RollupMeasure]
+    tables: List[str]
+    executions: int = 0
+    total_time_ms: float = 0.0
+    queries: List[str] = field(default_factory=list)
+
+    @property
+    def source_id(self) -> str:
+        """Normalized source (shapes over the same FROM clause are comparable)."""
+        return normalize_sql(self.source)
+
+    @property
+    def key_ids(self) -> FrozenSet[str]:
+        """Normalized key expressions."""
+        return frozenset(normalize_sql(key.expression) for key in self.keys)
+
+    @property
+    def identity(self) -> Tuple[str, FrozenSet[str]]:
+        """Shape identity (source and keys)."""
+        return self.source_id, self.key_ids
+
+    @property
+    def name(self) -> str:
+        """Materialised view name (PostgreSQL identifier limit)."""
+        base = "_".join(sorted(self.tables))
+        keys = "_".join(key.name for key in self.keys)
+        name = re.sub(r"\W+", "_", f"{ANALYTICS_ROLLUP_PREFIX}{base}_by_{keys}").lower()
+        if len(name) <= 63:
+            return name
+        digest = hashlib.sha1(repr(sorted(self.key_ids) + [self.source_id]).encode()).hexdigest()
+        return f"{name[:54]}_{digest[:8]}"
+
+    @property
+    def sql(self) -> str:
+        """Defining SELECT statement."""
+        items = [f'{key.expression} AS "{key.name}"' for key in self.keys]
+        items.extend(
+            f'{measure.function}({measure.argument}) AS "{measure.name}"'
+            for measure in sorted(self.measures.values(), key=lambda measure: measure.name)
+        )
+        positions = ", ".join(str(i) for i in range(1, len(self.keys) + 1))
+        return f"SELECT {', '.join(items)} FROM {self.source} GROUP BY {positions}"
+
+    @property
+    def description(self) -> str:
+        """Catalog description (tells the planner how to query the rollup)."""
+        keys = ", ".join(f"{key.name} = {key.expression}" for key in self.keys)
+        measures = ", ".join(
+            f"{measure.name} = {measure.function}({measure.argument})"
+            for measure in sorted(self.measures.values(), key=lambda measure: measure.name)
+        )
+        return (
+            f"Rollup pré-agregado (prefira a {', '.join(sorted(self.tables))} quando "
+            f"as chaves cobrirem a pergunta). Uma linha por combinação de: {keys}. "
+            f"Medidas: {measures}. Dados de FROM {self.source}, sem filtros: filtre pelas "
+            f"chaves e reagregue com SUM (row_count, sum_*, count_*), MIN (min_*) e "
+            f"MAX (max_*); média = SUM(sum_x) / SUM(count_x)."
+        )
+
+    def absorb(self, other: "RollupCandidate") -> None:
+        """Merge another shape served by this rollup (same source, subset of keys).
+
+        Args:
+            other: Shape to merge.
+        """
+        for name, measure in other.measures.items():
+            self.measures.setdefault(name, measure)
+        self.executions += other.executions
+        self.total_time_ms += other.total_time_ms
+        self.queries.extend(other.queries)
+
+
+def rollup_shape(sql: str) -> Optional[RollupCandidate]:
+    """Extract the rollup shape of a query.
+
+    Args:
+        sql: Executed SQL.
+
+    Returns:
+        RollupCandidate (no executions yet), or None if the query cannot be
+        answered from a rollup.
+    """
+    clauses = split_clauses(sql)
+    if not clauses or not clauses.get("GROUP BY") or not clauses.get("FROM"):
+        return None
+    if clauses["SELECT"].upper().startswith("DISTINCT"):
+        return None
+
+    try:
+        tables = sorted(analyze_sql(sql).tables)
+    except ValidationException:
+        return None
+    if not tables or any(table.startswith(ANALYTICS_ROLLUP_PREFIX) for table in tables):
+        return None
+
+    # SELECT items: (expression, alias)
+    items: List[Tuple[str, Optional[str]]] = []
+    for item in split_list(clauses["SELECT"]):
+        expression, alias = split_alias(item)
+        items.append((expression, _identifier(alias) if alias else None))
+
+    # Measures: aggregates in SELECT, HAVING and ORDER BY
+    measures: Dict[str, RollupMeasure] = {
+        "row_count": RollupMeasure("row_count", "COUNT", "*"),
+    }
+    for clause in ("SELECT", "HAVING", "ORDER BY"):
+        for function, argument, plain in aggregate_calls(clauses.get(clause, "")):
+            if not plain:
+                return None
+            added = _measures(function, argument)
+            if added is None:
+                return None
+            for measure in added:
+                name = measure.name
+                while name in measures and measures[name] != measure:
+                    name = f"{name}_{len(measures)}"
+                    measure = RollupMeasure(name, measure.function, measure.argument)
+                measures[name] = measure
+
+    # Keys: GROUP BY items (ordinals and aliases resolved)
+    aliases = {alias: expression for expression, alias in items if alias}
+    keys: List[RollupKey] = []
+    for entry in split_list(clauses["GROUP BY"]):
+        if entry.isdigit():
+            position = int(entry) - 1
+            if not 0 <= position < len(items):
+                return None
+            expression, alias = items[position]
+        elif _identifier(entry) in aliases and _NAME.match(entry):
+            alias = _identifier(entry)
+            expression = aliases[alias]
+        else:
+            expression, alias = entry, None
+        _add_key(keys, expression, alias)
+
+    # Non-aggregate SELECT items must be keys
+    key_ids = {normalize_sql(key.expression) for key in keys}
+    for expression, _ in items:
+        if not aggregate_calls(expression) and normalize_sql(expression) not in key_ids:
+            if not _is_constant(expression):
+                return None
+
+    # WHERE: equality-style filters add keys, range filters need a truncating key
+    for condition in split_list(clauses.get("WHERE", ""), "AND"):
+        filtered = _filter(condition)
+        if filtered is None:
+            return None
+        left, op = filtered
+        if op in _RANGE_OPERATORS:
+            if not _covered(left, keys):
+                return None
+        else:
+            _add_key(keys, left, None)
+
+    return RollupCandidate(
+        source=clauses["FROM"],
+        keys=keys,
+        measures=measures,
+        tables=tables,
+    )
+
+
+def detect_rollups(
+    entries: Sequence[AnalyticsQueryLog],
+    min_executions: int = ANALYTICS_ROLLUP_MIN_EXECUTIONS,
+    max_rollups: int = ANALYTICS_ROLLUP_MAX,
+) -> List[RollupCandidate]:
+    """Detect rollup candidates in the query log.
+
+    Args:
+        entries: Query log entries.
+        min_executions: Minimum logged executions of a (folded) shape.
+        max_rollups: Maximum number of candidates returned.
+
+    Returns:
+        Candidates ordered by workload time (most expensive first).
+    """
+    workload: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+    for entry in entries:
+        workload[entry.sql][0] += 1
+        workload[entry.sql][1] += entry.execution_time_ms or 0.0
+
+    shapes: Dict[Tuple[str, FrozenSet[str]], RollupCandidate] = {}
+    for sql, (executions, total_time_ms) in workload.items():
+        shape = rollup_shape(sql)
+        if shape is None:
+            continue
+        shape.executions = int(executions)
+        shape.total_time_ms = total_time_ms
+        shape.queries.append(sql)
+        existing = shapes.get(shape.identity)
+        if existing is None:
+            shapes[shape.identity] = shape
+        else:
+            existing.absorb(shape)
+
+    # Fold shapes into shapes over the same source with a superset of keys
+    kept: List[RollupCandidate] = []
+    for shape in sorted(shapes.values(), key=lambda shape: -len(shape.keys)):
+        target = next(
+            (
+                candidate
+                for candidate in kept
+                if candidate.source_id == shape.source_id and shape.key_ids < candidate.key_ids
+            ),
+            None,
+        )
+        if target is None:
+            kept.append(shape)
+        else:
+            target.absorb(shape)
+
+    candidates = [candidate for candidate in kept if candidate.executions >= min_executions]
+    candidates.sort(key=lambda candidate: candidate.total_time_ms, reverse=True)
+    logger.info(
+        f"Rollup detection: {len(workload)} queries, {len(shapes)} shapes, "
+        f"{len(candidates)} candidate(s)",
+    )
+    return candidates[:max_rollups]
+
+
+class RollupManager:
+    """Maintains rollup materialised views and their catalog registration.
+
+    Creates, refreshes and drops rollups. Every operation runs in its own
+    transaction, like the AnalyticsSchemaBuilder.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        max_ratio: float = ANALYTICS_ROLLUP_MAX_RATIO,
+    ) -> None:
+        """Initialize rollup manager.
+
+        Args:
+            session: Async database session.
+            max_ratio: Maximum rollup rows relative to its largest source table.
+        """
+        self._session = session
+        self._max_ratio = max_ratio
+
+    async def list_rollups(self) -> List[AnalyticsRollup]:
+        """Get all rollup definitions.
+
+        Returns:
+            List of AnalyticsRollup models ordered by name.
+        """
+        async with self._session.begin():
+            result = await self._session.execute(
+                select(AnalyticsRollup).order_by(AnalyticsRollup.name),
+            )
+            return list(result.scalars().all())
+
+    async def create(self, candidate: RollupCandidate) -> AnalyticsRollup:
+        """Create (or rebuild) a rollup and register it in the catalog.
+
+        Args:
+            candidate: Detected rollup candidate.
+
+        Returns:
+            AnalyticsRollup model created or updated.
+
+        Raises:
+            ValidationException: If the rollup is too large to pay off.
+            DBAPIError: If the materialised view cannot be created.
+        """
+        name = candidate.name
+        keys = [key.name for key in candidate.keys]
+
+        async with self._session.begin():
+            await self._session.execute(
+                text(f'DROP MATERIALIZED VIEW IF EXISTS analytics."{name}"'),
+            )
+            await self._materialise(name, candidate.sql, keys)
+            await self._check_size(name, candidate.tables)
+            await self._register_table(name, candidate.description, keys)
+
+            result = await self._session.execute(
+                select(AnalyticsRollup).where(AnalyticsRollup.name == name),
+            )
+            rollup = result.scalar_one_or_none()
+            if rollup is None:
+                rollup = AnalyticsRollup(name=name)
+                self._session.add(rollup)
+            rollup.sql = candidate.sql
+            rollup.source_tables = candidate.tables
+            rollup.keys = [
+                {"name": key.name, "expression": key.expression} for key in candidate.keys
+            ]
+            rollup.measures = [
+                {"name": measure.name, "function": measure.function, "argument": measure.argument}
+                for measure in candidate.measures.values()
+            ]
+            rollup.executions = candidate.executions
+            await self._bump_catalog_version()
+
+        logger.info(f"Created rollup {name} ({len(keys)} keys, {len(candidate.measures)} measures)")
+        return rollup
+
+    async def refresh(self, tables: Optional[Iterable[str]] = None) -> List[str]:
+        """Refresh rollups after their source tables changed.
+
+        Views dropped by a replace load are recreated from their definition;
+        a rollup that no longer builds (source schema changed) stays inactive.
+
+        Args:
+            tables: Source tables that changed (optional, None refreshes all rollups).
+
+        Returns:
+            Names of the refreshed rollups.
+        """
+        changed = set(tables) if tables is not None else None
+        refreshed: List[str] = []
+
+        for rollup in await self.list_rollups():
+            if changed is not None and not changed & set(rollup.source_tables):
+                continue
+            try:
+                async with self._session.begin():
+                    result = await self._session.execute(
+                        text("SELECT to_regclass(:name) IS NOT NULL"),
+                        {"name": f'analytics."{rollup.name}"'},
+                    )
+                    view = f'analytics."{rollup.name}"'
+                    if result.scalar():
+                        await self._session.execute(
+                            text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"),
+                        )
+                        await self._session.execute(text(f"ANALYZE {view}"))
+                    else:
+                        await self._materialise(
+                            rollup.name,
+                            rollup.sql,
+                            [key["name"] for key in rollup.keys],
+                        )
+                        await self._bump_catalog_version()
+                    await self._session.execute(
+                        update(AnalyticsTable)
+                        .where(AnalyticsTable.name == rollup.name)
+                        .values(is_active=True, data_version=AnalyticsTable.data_version + 1),
+                    )
+                refreshed.append(rollup.name)
+            except Exception as e:
+                logger.warning(f"Failed to refresh rollup {rollup.name}: {e}")
+
+        return refreshed
+
+    async def drop(self, name: str) -> bool:
+        """Drop a rollup and its catalog registration.
+
+        Args:
+            name: Rollup name.
+
+        Returns:
+            True if the rollup existed.
+        """
+        async with self._session.begin():
+            result = await self._session.execute(
+                select(AnalyticsRollup).where(AnalyticsRollup.name == name),
+            )
+            rollup = result.scalar_one_or_none()
+            await self._session.execute(
+                text(f'DROP MATERIALIZED VIEW IF EXISTS analytics."{name}"'),
+            )
+            result = await self._session.execute(
+                select(AnalyticsTable)
+                .where(AnalyticsTable.name == name)
+                .options(selectinload(AnalyticsTable.columns)),
+            )
+            analytics_table = result.scalar_one_or_none()
+            if analytics_table is not None:
+                await self._session.delete(analytics_table)
+            if rollup is not None:
+                await self._session.delete(rollup)
+            await self._bump_catalog_version()
+
+        return rollup is not None
+
+    async def detach(self, table_name: str) -> List[str]:
+        """Deactivate rollups over a table that is about to be dropped.
+
+        Replace loads drop the source table with CASCADE (dropping dependent
+        views); the rollups stay out of the catalog until refresh() rebuilds
+        them. Must be called inside the caller's transaction.
+
+        Args:
+            table_name: Source table name.
+
+        Returns:
+            Names of the deactivated rollups.
+        """
+        result = await self._session.execute(select(AnalyticsRollup))
+        names = [
+            rollup.name
+            for rollup in result.scalars().all()
+            if table_name in (rollup.source_tables or [])
+        ]
+        if names:
+            await self._session.execute(
+                update(AnalyticsTable)
+                .where(AnalyticsTable.name.in_(names))
+                .values(is_active=False),
+            )
+        return names
+
+    async def _materialise(self, name: str, sql: str, keys: List[str]) -> None:
+        """Create the materialised view with its unique key index.
+
+        Must be called inside the caller's transaction.
+
+        Args:
+            name: View name.
+            sql: Defining SELECT statement.
+            keys: Key column names (unique index, required by concurrent refresh).
+        """
+        key_columns = ", ".join(f'"{key}"' for key in keys)
+        await self._session.execute(
+            text(f'CREATE MATERIALIZED VIEW analytics."{name}" AS {sql} WITH DATA'),
+        )
+        await self._session.execute(
+            text(f'CREATE UNIQUE INDEX "{name[:58]}_keys" ON analytics."{name}" ({key_columns})'),
+        )
+        await self._session.execute(text(f'ANALYZE analytics."{name}"'))
+
+    async def _check_size(self, name: str, tables: List[str]) -> None:
+        """Reject a rollup that is not much smaller than its sources.
+
+        Must be called inside the caller's transaction (raising rolls it back).
+
+        Args:
+            name: View name.
+            tables: Source tables.
+
+        Raises:
+            ValidationException: If the rollup exceeds max_ratio of its largest source.
+        """
+        result = await self._session.execute(text(f'SELECT COUNT(*) FROM analytics."{name}"'))
+        rows = int(result.scalar() or 0)
+        result = await self._session.execute(
+            text(
+                "SELECT COALESCE(MAX(c.reltuples), 0) FROM pg_class c "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = 'analytics' AND c.relname = ANY(:tables)",
+            ),
+            {"tables": tables},
+        )
+        source_rows = float(result.scalar() or 0)
+        if source_rows > 0 and rows > source_rows * self._max_ratio:
+            raise ValidationException(
+                message=f"Rollup {name} is too large for its sources",
+                details={"name": name, "rows": rows, "source_rows": source_rows},
+            )
+
+    async def _register_table(self, name: str, description: str, keys: List[str]) -> None:
+        """Create or update the rollup's table and column metadata.
+
+        Must be called inside the caller's transaction.
+
+        Args:
+            name: View name.
+            description: Catalog description.
+            keys: Key column names.
+        """
+        result = await self._session.execute(
+            text(
+                "SELECT a.attname, format_type(a.atttypid, a.atttypmod), NOT a.attnotnull "
+                "FROM pg_attribute a WHERE a.attrelid = to_regclass(:name) "
+                "AND a.attnum > 0 AND NOT a.attisdropped ORDER BY a.attnum",
+            ),
+            {"name": f'analytics."{name}"'},
+        )
+        columns: List[Dict[str, Any]] = [
+            {
+                "name": column_name,
+                "data_type": data_type.upper(),
+                "is_nullable": bool(is_nullable),
+                "is_primary_key": column_name in keys,
+                "is_indexed": column_name in keys,
+            }
+            for column_name, data_type, is_nullable in result.all()
+        ]
+        schema_definition = {"columns": columns, "primary_keys": keys, "rollup": True}
+
+        result = await self._session.execute(
+            select(AnalyticsTable)
+            .where(AnalyticsTable.name == name)
+            .options(selectinload(AnalyticsTable.columns)),
+        )
+        analytics_table = result.scalar_one_or_none()
+        if analytics_table is None:
+            analytics_table = AnalyticsTable(name=name, data_version=1)
+            self._session.add(analytics_table)
+        else:
+            analytics_table.data_version = AnalyticsTable.data_version + 1
+
+        analytics_table.description = description
+        analytics_table.schema_definition = json.dumps(schema_definition)
+        analytics_table.source_csv = None
+        analytics_table.is_active = True
+        analytics_table.embedding = None
+        # delete-orphan cascade removes previous column metadata
+        analytics_table.columns = [
+            AnalyticsColumn(
+                name=column["name"],
+                data_type=column["data_type"],
+                is_nullable=column["is_nullable"],
+                is_primary_key=column["is_primary_key"],
+                is_indexed=column["is_indexed"],
+            )
+            for column in columns
+        ]
+        await self._session.flush()
+
+    async def _bump_catalog_version(self) -> None:
+        """Bump schema catalog version so cached catalogs reload.
+
+        Must be called inside the caller's transaction.
+        """
+        result = await self._session.execute(select(AnalyticsCatalogVersion).limit(1))
+        catalog_version = result.scalar_one_or_none()
+
+        if catalog_version is None:
+            self._session.add(AnalyticsCatalogVersion(version=1))
+        else:
+            catalog_version.version = AnalyticsCatalogVersion.version + 1
+
+        await self._session.flush()
+
+
+def _identifier(name: str) -> str:
+    """Unquote and lowercase an identifier.
+
+    Args:
+        name: Identifier (optionally double-quoted).
+
+    Returns:
+        Lowercase identifier with non-word characters replaced by "_".
+    """
+    return re.sub(r"\W+", "_", name.strip().strip('"')).lower()
+
+
+def _column_name(expression: str) -> Optional[str]:
+    """Get the column name of a plain column reference.
+
+    Args:
+        expression: SQL expression.
+
+    Returns:
+        Column name, or None if the expression is not a column reference.
+    """
+    match = _COLUMN.match(expression.strip())
+    if not match or match.group("column").upper() in ("NULL", "TRUE", "FALSE"):
+        return None
+    return _identifier(match.group("column"))
+
+
+def _truncated_column(expression: str) -> Optional[Tuple[str, str]]:
+    """Get the column and unit of a date truncation.
+
+    Args:
+        expression: SQL expression.
+
+    Returns:
+        (column expression, unit), or None if not a truncation of a column.
+    """
+    for pattern in _TRUNCATIONS:
+        match = pattern.match(expression.strip())
+        if match and _column_name(match.group("column")):
+            return match.group("column").strip(), match.group("unit").lower()
+    return None
+
+
+def _add_key(keys: List[RollupKey], expression: str, alias: Optional[str]) -> None:
+    """Add a grouping key unless already present (unique names).
+
+    Args:
+        keys: Keys so far (modified in place).
+        expression: Key expression.
+        alias: SELECT alias (optional).
+    """
+    normalized = normalize_sql(expression)
+    if any(normalize_sql(key.expression) == normalized for key in keys):
+        return
+
+    name = alias or _column_name(expression)
+    if name is None:
+        truncated = _truncated_column(expression)
+        if truncated is not None:
+            name = f"{_column_name(truncated[0])}_{truncated[1]}"
+    name = name or f"key_{len(keys) + 1}"
+    if name in {key.name for key in keys} or name == "row_count":
+        name = f"{name}_{len(keys) + 1}"
+    keys.append(RollupKey(name=name, expression=expression.strip()))
+
+
+def _measures(function: str, argument: str) -> Optional[List[RollupMeasure]]:
+    """Get the additive measures an aggregate is computed from.
+
+    Args:
+        function: Aggregate function (uppercase).
+        argument: Argument text.
+
+    Returns:
+        List of measures, or None if the argument is not a column reference.
+    """
+    if function == "COUNT" and argument in ("*", "1"):
+        return [RollupMeasure("row_count", "COUNT", "*")]
+
+    column = _column_name(argument)
+    if column is None:
+        return None
+
+    if function == "AVG":
+        return [
+            RollupMeasure(f"sum_{column}", "SUM", argument),
+            RollupMeasure(f"count_{column}", "COUNT", argument),
+        ]
+    return [RollupMeasure(f"{function.lower()}_{column}", function, argument)]
+
+
+def _filter(condition: str) -> Optional[Tuple[str, str]]:
+    """Parse a WHERE condition filtering an expression by constants.
+
+    Args:
+        condition: Top-level AND-ed condition.
+
+    Returns:
+        (filtered expression, operator), or None if the condition is not a
+        comparison of an expression with constants.
+    """
+    for pattern in (_KEYWORD_CONDITION, _COMPARISON):
+        match = pattern.match(condition.strip())
+        if match is None:
+            continue
+        left = match.group("left").strip()
+        op = " ".join(match.group("op").upper().split())
+        try:
+            if aggregate_calls(left) or not _is_constant(match.group("right")):
+                return None
+        except ValidationException:
+            # Split inside a literal ("x LIKE '%=%'")
+            return None
+        return left, op
+    return None
+
+
+def _is_constant(expression: str) -> bool:
+    """Check whether an expression references no columns or tables.
+
+    Args:
+        expression: SQL expression.
+
+    Returns:
+        True if the expression is constant (literals, parameters, functions of them).
+    """
+    try:
+        analysis = analyze_sql(f"SELECT {expression}")
+    except ValidationException:
+        return False
+    return not analysis.columns and not analysis.tables and analysis.statement_count == 1
+
+
+def _covered(left: str, keys: List[RollupKey]) -> bool:
+    """Check whether a range filter can be applied through the keys.
+
+    Args:
+        left: Filtered expression.
+        keys: Rollup keys.
+
+    Returns:
+        True if left is a key or a key truncates it.
+    """
+    normalized = normalize_sql(left)
+    for key in keys:
+        if normalize_sql(key.expression) == normalized:
+            return True
+        truncated = _truncated_column(key.expression)
+        if truncated is not None and normalize_sql(truncated[0]) == normalized:
+            return True
+    return False
@@ -0,0 +1,270 @@
+"""
+Approximate query rewriting (answers from sample tables with error bounds).
+
+Overview
+  Rewrites aggregate analytics SQL to read a table's sample instead of the
+  full table, for exploratory questions that only need an estimate
+  ("qual a média de frete aproximadamente?"). Sample tables are Bernoulli
+  samples rebuilt by the AnalyticsSchemaBuilder on every load; their
+  realized fraction is published in the schema catalog.
+
+Design
+  - **Eligible Queries**: Plain SELECTs whose aggregates are COUNT, SUM and AVG (no
+    DISTINCT, FILTER, window, MIN or MAX aggregates, which samples cannot estimate).
+  - **One Sampled Table**: The referenced table with the smallest sample fraction
+    (the largest one) is read from its sample; joined tables stay complete.
+  - **Scaling**: COUNT and SUM are divided by the sample fraction (Horvitz-Thompson);
+    AVG and ratios of scaled aggregates need no scaling.
+  - **Error Bounds**: Each COUNT/SUM/AVG output column gets a "<column>_margin" column
+    (ANALYTICS_APPROXIMATE_Z standard errors, assuming independently sampled rows).
+  - **Fallback**: None when the query is not eligible; the caller runs it exactly.
+
+Integration
+  - Consumes: sql_analysis (clause splitting, aggregate calls), constants.
+  - Returns: Approximation (rewritten SQL and labelling metadata).
+  - Used by: AnalyticsExecutor (approximate mode).
+  - Observability: N/A (pure function).
+
+Usage
+  >>> from app.agents.analytics.sampling import approximate_sql
+  >>> approximation = approximate_sql(sql, schema_info)
+  >>> if approximation is not None:
+  ...     rows = await repository.execute_sql(approximation.sql)
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.constants import ANALYTICS_APPROXIMATE_Z, ANALYTICS_SAMPLE_SUFFIX
+from app.config.exceptions import ValidationException
+from app.routing.sql_analysis import (
+    aggregate_calls,
+    analyze_sql,
+    split_alias,
+    split_clauses,
+    split_list,
+)
+
+# Aggregates a sample can estimate (COUNT/SUM scaled, AVG unchanged)
+_ESTIMABLE = frozenset({"COUNT", "SUM", "AVG"})
+
+# Words that may follow a table reference without being its alias
+_NOT_ALIASES = frozenset(
+    {
+        "JOIN", "LEFT", "RIGHT", "INNER", "FULL", "CROSS", "NATURAL", "ON", "USING",
+        "WHERE", "LATERAL", "TABLESAMPLE",
+    },
+)  # fmt: skip
+
+# Clauses in SQL order (rebuilding the rewritten statement)
+_CLAUSE_ORDER = ("SELECT", "FROM", "WHERE", "GROUP BY", "HAVING", "ORDER BY", "LIMIT", "OFFSET")
+
+
+@dataclass
+class Approximation:
+    """Approximate rewrite of a query over a sample table."""
+
+    sql: str
+    table: str
+    sample_table: str
+    fraction: float
+    margins: Dict[str, str] = field(default_factory=dict)  # output column -> margin column
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Answer metadata labelling the result as approximate."""
+        return {
+            "table": self.table,
+            "sample_fraction": self.fraction,
+            "confidence_z": ANALYTICS_APPROXIMATE_Z,
+            "margins": self.margins,
+        }
+
+
+def approximate_sql(
+    sql: str,
+    schema_info: Dict[str, Any],
+    z: float = ANALYTICS_APPROXIMATE_Z,
+) -> Optional[Approximation]:
+    """Rewrite an aggregate query to read a sample table.
+
+    Args:
+        sql: Validated SQL.
+        schema_info: Catalog schema info (tables with sample_fraction).
+        z: Normal quantile of the margin columns.
+
+    Returns:
+        Approximation, or None if the query is not eligible or no referenced
+        table has a sample.
+    """
+    clauses = split_clauses(sql)
+    if not clauses or not clauses.get("FROM") or clauses["SELECT"].upper().startswith("DISTINCT"):
+        return None
+
+    calls = [
+        call
+        for clause in ("SELECT", "HAVING", "ORDER BY")
+        for call in aggregate_calls(clauses.get(clause, ""))
+    ]
+    if not calls or any(not plain or function not in _ESTIMABLE for function, _, plain in calls):
+        return None
+
+    try:
+        tables = analyze_sql(sql).tables
+    except ValidationException:
+        return None
+    fractions = {
+        table["name"]: table.get("sample_fraction")
+        for table in schema_info.get("tables", [])
+        if table.get("sample_fraction")
+    }
+    sampled = [table for table in tables if table in fractions]
+    if not sampled:
+        return None
+    table = min(sampled, key=lambda name: fractions[name])
+    fraction = float(fractions[table])
+    sample_table = f"{table}{ANALYTICS_SAMPLE_SUFFIX}"
+
+    source = _sample_source(clauses["FROM"], table, sample_table)
+    if source is None:
+        return None
+
+    rewritten = dict(clauses)
+    rewritten["FROM"] = source
+    for clause in ("HAVING", "ORDER BY"):
+        if rewritten.get(clause):
+            rewritten[clause] = _scale(rewritten[clause], fraction)
+
+    margins: Dict[str, str] = {}
+    items: List[str] = []
+    margin_items: List[str] = []
+    for item in split_list(clauses["SELECT"]):
+        expression, alias = split_alias(item)
+        item_calls = aggregate_calls(expression)
+        if len(item_calls) != 1 or not _is_single_call(expression):
+            items.append(_scale(item, fraction))
+            continue
+        function, argument, _ = item_calls[0]
+        # Keep the output column name of unaliased calls ("count", not "round")
+        column = alias or function.lower()
+        items.append(f'{_scale(expression, fraction)} AS "{column}"')
+        margins[column] = f"{column}_margin"
+        margin_items.append(f'{_margin(function, argument, fraction, z)} AS "{column}_margin"')
+    rewritten["SELECT"] = ", ".join(items + margin_items)
+
+    approximate = " ".join(
+        f"{clause} {rewritten[clause]}" for clause in _CLAUSE_ORDER if rewritten.get(clause)
+    )
+    return Approximation(
+        sql=approximate,
+        table=table,
+        sample_table=sample_table,
+        fraction=fraction,
+        margins=margins,
+    )
+
+
+def _sample_source(source: str, table: str, sample_table: str) -> Optional[str]:
+    """Replace the table reference in a FROM clause with its sample.
+
+    The sample keeps the table's alias (or gets the table name as alias),
+    so qualified column references still resolve.
+
+    Args:
+        source: FROM clause text.
+        table: Table to replace.
+        sample_table: Sample table name.
+
+    Returns:
+        Rewritten FROM clause, or None unless the table is referenced exactly once.
+    """
+    pattern = re.compile(
+        r'(?<![\w."])(?P<table>(?:"?analytics"?\s*\.\s*)?(?:"' + re.escape(table) + r'"|'
+        + re.escape(table) + r'\b))(?![\w".])'
+        r"(?:\s+(?:AS\s+)?(?P<alias>[A-Za-z_]\w*))?",
+        re.IGNORECASE,
+    )
+    matches = list(pattern.finditer(source))
+    if len(matches) != 1:
+        return None
+
+    match = matches[0]
+    alias = match.group("alias")
+    if alias and alias.upper() not in _NOT_ALIASES:
+        replacement = f'analytics."{sample_table}" AS {alias}'
+    else:
+        replacement = f'analytics."{sample_table}" AS "{table}"' + source[
+            match.end("table") : match.end()
+        ]
+    return source[: match.start()] + replacement + source[match.end() :]
+
+
+def _scale(text: str, fraction: float) -> str:
+    """Scale COUNT and SUM calls by the inverse sample fraction.
+
+    Args:
+        text: Clause text.
+        fraction: Sample fraction.
+
+    Returns:
+        Text with COUNT(x) replaced by ROUND(COUNT(x) / f) and SUM(x) by (SUM(x) / f).
+    """
+    calls: List[Tuple[str, str]] = []
+    for function, argument, _ in aggregate_calls(text):
+        if function in ("COUNT", "SUM") and (function, argument) not in calls:
+            calls.append((function, argument))
+
+    for function, argument in calls:
+        pattern = re.compile(
+            rf"\b{function}\s*\(\s*{re.escape(argument)}\s*\)",
+            re.IGNORECASE,
+        )
+        if function == "COUNT":
+            replacement = f"ROUND(COUNT({argument}) / {fraction!r})"
+        else:
+            replacement = f"(SUM({argument}) / {fraction!r})"
+        text = pattern.sub(lambda _: replacement, text)
+    return text
+
+
+def _margin(function: str, argument: str, fraction: float, z: float) -> str:
+    """Build the margin (z standard errors) of a sampled aggregate.
+
+    Args:
+        function: COUNT, SUM or AVG.
+        argument: Aggregate argument.
+        fraction: Sample fraction.
+        z: Normal quantile.
+
+    Returns:
+        SQL expression of the margin.
+    """
+    if function == "COUNT":
+        return f"{z!r} * SQRT(COUNT({argument}) * (1 - {fraction!r})) / {fraction!r}"
+    if function == "SUM":
+        return (
+            f"{z!r} * SQRT((1 - {fraction!r}) * SUM(POWER(({argument})::float8, 2))) "
+            f"/ {fraction!r}"
+        )
+    return f"{z!r} * STDDEV_SAMP(({argument})::float8) / SQRT(NULLIF(COUNT({argument}), 0))"
+
+
+def _is_single_call(expression: str) -> bool:
+    """Check whether an expression is exactly one aggregate call.
+
+    Args:
+        expression: SELECT item expression (alias removed).
+
+    Returns:
+        True for "FUNC(...)" with nothing around it.
+    """
+    match = re.match(r"^[A-Za-z_]+\s*\((?P<body>.*)\)$", expression.strip(), re.DOTALL)
+    if match is None:
+        return False
+    depth = 0
+    for char in match.group("body"):
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if depth < 0:
+            return False
+    return depth == 0
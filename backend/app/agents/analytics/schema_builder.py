@@ -4,17 +4,33 @@ Analytics schema builder (CSV ingestion for administrative scripts).
 Overview
   Builds analytics schemas from CSV files for administrative scripts.
   Infers schema automatically or uses predefined schemas (Olist dataset).
-  Creates tables in PostgreSQL and metadata records. Updates allowlist.
+  Loads data via staging tables and upserts metadata records. Updates allowlist.
 
 Design
   - **Schema Inference**: Automatically infers types from CSV data.
   - **Predefined Schemas**: Recognizes known schemas (Olist) and applies them.
   - **Table Creation**: Creates tables in PostgreSQL schema 'analytics'.
+  - **Staged Loads**: COPY into an unlogged per-run staging table, then swap (replace)
+    or merge (append/upsert via ON CONFLICT) in one transaction. Upserts keep the
+    last CSV row of duplicate keys (staging rows carry their ingest ordinal).
   - **Metadata Storage**: Stores schema metadata in AnalyticsTable/AnalyticsColumn.
+  - **Catalog Version**: Bumps AnalyticsCatalogVersion so schema caches reload.
+  - **Rollups**: Replace loads detach dependent rollups (rebuilt on refresh).
+  - **Sample Tables**: Large tables get a Bernoulli sample (approximate answers), built
+    under a temporary name and swapped in at the end of its own transaction.
+  - **Column Statistics**: Distinct counts, min/max and top values of low-cardinality
+    columns (planner literals).
+  - **Statistics Refresh**: Sample and column statistics are refreshed after the merge
+    commits, on replace or once the rows loaded since the last refresh exceed
+    ANALYTICS_STATS_REFRESH_FRACTION of the table; smaller loads rely on ANALYZE.
+  - **Schema Embeddings**: Embeds table/column descriptions for planner schema pruning.
+  - **Parquet Snapshots**: With a snapshot store, each load exports the table (and its
+    sample) to Parquet for the DuckDB engine; failures remove the snapshot, never the load.
   - **Allowlist Update**: Updates allowlist with new tables/columns.
 
 Integration
-  - Consumes: Database session, pandas, SQLAlchemy, storage.
+  - Consumes: Database session, LLMClient (optional), ParquetSnapshotStore (optional),
+    pandas, SQLAlchemy, storage.
   - Returns: AnalyticsTable models created.
   - Used by: Administrative scripts for CSV ingestion.
   - Observability: Logs schema building progress and errors.
@@ -23,18 +39,43 @@ Usage
   >>> from app.agents.analytics.schema_builder import AnalyticsSchemaBuilder
   >>> builder = AnalyticsSchemaBuilder(session)
   >>> table = await builder.build_schema_from_csv(Path("data.csv"))
+  >>> table = await builder.build_schema_from_csv(Path("delta.csv"), mode="upsert")
 """
 
+import asyncio
 import json
 import logging
+import tempfile
+import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import text
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
-
+from sqlalchemy.orm import selectinload
+
+from app.agents.analytics.rollups import RollupManager
+from app.config.constants import (
+    ANALYTICS_CATEGORICAL_MAX_DISTINCT,
+    ANALYTICS_COLUMN_TOP_VALUES,
+    ANALYTICS_COLUMN_VALUE_MAX_LENGTH,
+    ANALYTICS_SAMPLE_FRACTION,
+    ANALYTICS_SAMPLE_MIN_ROWS,
+    ANALYTICS_SAMPLE_SUFFIX,
+    ANALYTICS_STATS_REFRESH_FRACTION,
+    DEFAULT_INGESTION_MODE,
+    INGESTION_MODES,
+    INGESTION_ORDINAL_COLUMN,
+    INGESTION_STAGING_SUFFIX,
+)
 from app.config.exceptions import DatabaseException, ValidationException
-from app.infrastructure.database.models.analytics import AnalyticsColumn, AnalyticsTable
+from app.infrastructure.database.models.analytics import (
+    AnalyticsCatalogVersion,
+    AnalyticsColumn,
+    AnalyticsTable,
+)
+from app.infrastructure.database.repositories.duckdb_analytics_repo import ParquetSnapshotStore
+from app.infrastructure.llm.client import LLMClient
 
 logger = logging.getLogger(__name__)
 
@@ -55,34 +96,48 @@ class AnalyticsSchemaBuilder:
     and stores metadata. Used by administrative scripts.
     """
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        llm_client: Optional[LLMClient] = None,
+        snapshot_store: Optional[ParquetSnapshotStore] = None,
+    ) -> None:
         """Initialize analytics schema builder.
 
         Args:
             session: Async database session.
+            llm_client: LLM client for schema embeddings (optional).
+            snapshot_store: Parquet snapshot store for the DuckDB engine (optional,
+                no snapshots if None).
         """
         self._session = session
+        self._llm_client = llm_client
+        self._snapshot_store = snapshot_store
 
     async def build_schema_from_csv(
         self,
         file_path: Path,
         table_name: Optional[str] = None,
+        mode: str = DEFAULT_INGESTION_MODE,
     ) -> AnalyticsTable:
-        """Build schema and create table from CSV.
+        """Build schema and load table from CSV.
 
-        Processes CSV: infers or uses predefined schema, creates table
-        in PostgreSQL, inserts data, and stores metadata.
+        Processes CSV: infers or reuses schema, bulk loads rows into an
+        unlogged staging table via COPY, then swaps or merges them into
+        the target table and updates metadata in a single transaction,
+        so readers never see a half-loaded table.
 
         Args:
             file_path: Path to CSV file.
             table_name: Table name (optional, uses filename if None).
+            mode: Load mode ("replace", "append", or "upsert").
 
         Returns:
-            AnalyticsTable model created (metadata).
+            AnalyticsTable model created or updated (metadata).
 
         Raises:
-            ValidationException: If CSV is invalid.
-            DatabaseException: If table creation fails.
+            ValidationException: If CSV or mode is invalid.
+            DatabaseException: If loading fails.
         """
         if not PANDAS_AVAILABLE:
             raise ValidationException(
@@ -90,57 +145,652 @@ class AnalyticsSchemaBuilder:
                 details={"file_path": str(file_path)},
             )
 
-        # Step 1: Read CSV
-        try:
-            df = pd.read_csv(file_path)
-        except Exception as e:
+        if mode not in INGESTION_MODES:
             raise ValidationException(
-                message=f"Failed to read CSV: {str(e)}",
-                details={"file_path": str(file_path), "error": str(e)},
-            ) from e
+                message=f"Invalid ingestion mode: {mode}",
+                details={"mode": mode, "allowed_modes": INGESTION_MODES},
+            )
 
-        # Step 2: Determine table name
+        # Step 1: Determine table name
         if table_name is None:
             table_name = file_path.stem.lower().replace(" ", "_")
 
-        # Step 3: Check if schema is known (Olist dataset)
-        # For now, we'll infer schema automatically
-        # In production, you would check against known schemas
+        # Step 2: Resolve schema (reuse existing schema for incremental loads)
+        existing_table = await self._get_existing_table(table_name)
+
+        if existing_table is not None and mode != "replace":
+            schema_definition = self._load_schema_definition(existing_table)
+            csv_columns = self._read_csv_columns(file_path)
+            known_columns = {col["name"] for col in schema_definition["columns"]}
+            unknown_columns = [col for col in csv_columns if col not in known_columns]
+            if unknown_columns:
+                raise ValidationException(
+                    message=f"CSV has columns not present in table '{table_name}'",
+                    details={"table_name": table_name, "unknown_columns": unknown_columns},
+                )
+        else:
+            try:
+                df = pd.read_csv(file_path)
+            except Exception as e:
+                raise ValidationException(
+                    message=f"Failed to read CSV: {str(e)}",
+                    details={"file_path": str(file_path), "error": str(e)},
+                ) from e
+            schema_definition = self._infer_schema(df)
+            csv_columns = [str(col) for col in df.columns]
+
+        if mode == "upsert" and (
+            not schema_definition["primary_keys"]
+            or not set(schema_definition["primary_keys"]).issubset(csv_columns)
+        ):
+            raise ValidationException(
+                message=f"Upsert requires primary key columns on table '{table_name}'",
+                details={
+                    "table_name": table_name,
+                    "mode": mode,
+                    "primary_keys": schema_definition["primary_keys"],
+                },
+            )
 
-        # Step 4: Infer schema
-        schema_definition = self._infer_schema(df)
+        # Step 3: Embed table and column descriptions (new or changed schema only)
+        embeddings: Optional[Dict[str, Any]] = None
+        if mode == "replace" or existing_table is None or existing_table.embedding is None:
+            description = (
+                existing_table.description
+                if existing_table is not None and existing_table.description
+                else f"Table created from CSV: {file_path.name}"
+            )
+            embeddings = await self._embed_schema(table_name, description, schema_definition)
 
-        # Step 5: Create table in PostgreSQL
+        # Step 4: Bulk load CSV into unlogged staging table (unique per run)
+        staging_name = self._staging_name(table_name)
         try:
-            await self._create_table(table_name, schema_definition, df)
+            await self._load_staging_table(staging_name, csv_columns, file_path)
         except Exception as e:
+            await self._drop_staging_table(staging_name)
             raise DatabaseException(
-                message=f"Failed to create table: {str(e)}",
+                message=f"Failed to load staging table: {str(e)}",
                 details={"table_name": table_name, "error": str(e)},
             ) from e
 
-        # Step 6: Insert data
+        # Step 5: Swap/merge into target and update metadata atomically
         try:
-            await self._insert_data(table_name, df)
+            analytics_table = await self._merge_staging_table(
+                table_name,
+                staging_name,
+                schema_definition,
+                csv_columns,
+                mode,
+                file_path,
+                embeddings,
+            )
         except Exception as e:
             raise DatabaseException(
-                message=f"Failed to insert data: {str(e)}",
-                details={"table_name": table_name, "error": str(e)},
+                message=f"Failed to merge data: {str(e)}",
+                details={"table_name": table_name, "mode": mode, "error": str(e)},
             ) from e
+        finally:
+            await self._drop_staging_table(staging_name)
 
-        # Step 7: Create metadata records
+        # Step 6: Refresh sample and column statistics (replace, or enough new rows)
         try:
-            analytics_table = await self._create_metadata(table_name, schema_definition, file_path)
+            if await self._needs_stats_refresh(analytics_table, mode):
+                analytics_table = await self.refresh_statistics(analytics_table)
         except Exception as e:
-            raise DatabaseException(
-                message=f"Failed to create metadata: {str(e)}",
-                details={"table_name": table_name, "error": str(e)},
-            ) from e
+            # The load is committed; rows_since_stats keeps the refresh due for the next load
+            logger.error(f"Failed to refresh statistics of {table_name}: {e}", exc_info=True)
+
+        # Step 7: Refresh the Parquet snapshot (DuckDB engine)
+        if self._snapshot_store is not None:
+            await self.write_snapshot(analytics_table)
 
-        logger.info(f"Schema built successfully: {table_name}")
+        logger.info(f"Schema built successfully: {table_name} (mode: {mode})")
 
         return analytics_table
 
+    async def write_snapshot(self, analytics_table: AnalyticsTable) -> bool:
+        """Export a table (and its sample) to its Parquet snapshot.
+
+        Rows are exported as CSV through the raw asyncpg connection in one
+        transaction, then converted to Parquet off the event loop. On failure
+        the snapshot is removed (the DuckDB engine then hides the table)
+        instead of failing the load.
+
+        Args:
+            analytics_table: Table metadata with columns loaded.
+
+        Returns:
+            True if the snapshot was written.
+        """
+        if self._snapshot_store is None:
+            return False
+
+        table_name = analytics_table.name
+        relations = [table_name]
+        if analytics_table.sample_fraction:
+            relations.append(f"{table_name}{ANALYTICS_SAMPLE_SUFFIX}")
+
+        try:
+            with tempfile.TemporaryDirectory(prefix="analytics_snapshot_") as directory:
+                csv_paths = {
+                    relation: Path(directory) / f"{relation}.csv" for relation in relations
+                }
+
+                async with self._session.begin():
+                    connection = await self._session.connection()
+                    raw_connection = await connection.get_raw_connection()
+                    for relation, csv_path in csv_paths.items():
+                        await raw_connection.driver_connection.copy_from_query(
+                            f'SELECT * FROM analytics."{relation}"',
+                            output=str(csv_path),
+                            format="csv",
+                            header=True,
+                        )
+
+                await asyncio.to_thread(self._snapshot_store.write, analytics_table, csv_paths)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to write Parquet snapshot of {table_name}: {e}", exc_info=True)
+            self._snapshot_store.remove(table_name)
+            return False
+
+    async def refresh_statistics(self, analytics_table: AnalyticsTable) -> AnalyticsTable:
+        """Rebuild the table's sample and column statistics.
+
+        Runs in its own transaction after the load has committed. Column
+        statistics are computed first (reads only); the sample is built
+        under a temporary name and swapped in last, so the exclusive lock
+        on the sample table is held only until commit. Bumps the table data
+        version and the catalog version, and resets rows_since_stats.
+
+        Args:
+            analytics_table: Table metadata with columns loaded.
+
+        Returns:
+            AnalyticsTable metadata reloaded with columns.
+        """
+        table_name = analytics_table.name
+        schema_definition = self._load_schema_definition(analytics_table)
+
+        async with self._session.begin():
+            column_stats = await self._compute_column_stats(table_name, schema_definition)
+            sample_fraction = await self._build_sample(table_name)
+
+            result = await self._session.execute(
+                select(AnalyticsTable)
+                .where(AnalyticsTable.id == analytics_table.id)
+                .options(selectinload(AnalyticsTable.columns)),
+            )
+            refreshed = result.scalar_one()
+            refreshed.sample_fraction = sample_fraction
+            refreshed.rows_since_stats = 0
+            refreshed.data_version = AnalyticsTable.data_version + 1
+            for column in refreshed.columns:
+                stats = column_stats.get(column.name, {})
+                column.distinct_count = stats.get("distinct_count")
+                column.min_value = stats.get("min_value")
+                column.max_value = stats.get("max_value")
+                column.top_values = stats.get("top_values")
+            await self._bump_catalog_version()
+
+        logger.info(f"Refreshed sample and column statistics of {table_name}")
+
+        async with self._session.begin():
+            reloaded = await self._session.execute(
+                select(AnalyticsTable)
+                .where(AnalyticsTable.id == analytics_table.id)
+                .options(selectinload(AnalyticsTable.columns)),
+            )
+            return reloaded.scalar_one()
+
+    async def _needs_stats_refresh(self, analytics_table: AnalyticsTable, mode: str) -> bool:
+        """Decide whether a load refreshes the sample and column statistics.
+
+        Replace loads always refresh. Incremental loads refresh once the
+        rows loaded since the last refresh exceed
+        ANALYTICS_STATS_REFRESH_FRACTION of the table (estimated rows after
+        ANALYZE); until then ANALYZE keeps the planner statistics current.
+
+        Args:
+            analytics_table: Table metadata after the load.
+            mode: Load mode.
+
+        Returns:
+            True if refresh_statistics should run.
+        """
+        if mode == "replace":
+            return True
+
+        async with self._session.begin():
+            result = await self._session.execute(
+                text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": f'analytics."{analytics_table.name}"'},
+            )
+            table_rows = max(float(result.scalar() or 0), 0.0)
+        return analytics_table.rows_since_stats > ANALYTICS_STATS_REFRESH_FRACTION * table_rows
+
+    async def _get_existing_table(self, table_name: str) -> Optional[AnalyticsTable]:
+        """Get existing table metadata by name (active or not).
+
+        Args:
+            table_name: Table name.
+
+        Returns:
+            AnalyticsTable with columns loaded, or None if not found.
+        """
+        async with self._session.begin():
+            result = await self._session.execute(
+                select(AnalyticsTable)
+                .where(AnalyticsTable.name == table_name)
+                .options(selectinload(AnalyticsTable.columns)),
+            )
+            return result.scalar_one_or_none()
+
+    def _load_schema_definition(self, analytics_table: AnalyticsTable) -> Dict[str, Any]:
+        """Load stored schema definition from table metadata.
+
+        Args:
+            analytics_table: Table metadata.
+
+        Returns:
+            Schema definition dictionary.
+        """
+        schema_definition = analytics_table.schema_definition
+        if isinstance(schema_definition, str):
+            schema_definition = json.loads(schema_definition)
+        return schema_definition
+
+    def _read_csv_columns(self, file_path: Path) -> List[str]:
+        """Read CSV header without loading the data.
+
+        Args:
+            file_path: Path to CSV file.
+
+        Returns:
+            List of column names in file order.
+
+        Raises:
+            ValidationException: If CSV cannot be read.
+        """
+        try:
+            header = pd.read_csv(file_path, nrows=0)
+        except Exception as e:
+            raise ValidationException(
+                message=f"Failed to read CSV: {str(e)}",
+                details={"file_path": str(file_path), "error": str(e)},
+            ) from e
+        return [str(col) for col in header.columns]
+
+    async def _load_staging_table(
+        self,
+        staging_name: str,
+        csv_columns: List[str],
+        file_path: Path,
+    ) -> None:
+        """Bulk load CSV into an unlogged staging table.
+
+        Staging columns are TEXT so COPY never fails on type drift between
+        exports; values are cast to target types during the merge. An identity
+        column (INGESTION_ORDINAL_COLUMN, not in the COPY column list) records
+        file order so duplicate keys resolve to the last row.
+
+        Args:
+            staging_name: Staging table name.
+            csv_columns: CSV column names in file order.
+            file_path: Path to CSV file.
+        """
+        columns_sql = ", ".join(
+            [f'"{col}" TEXT' for col in csv_columns]
+            + [f'"{INGESTION_ORDINAL_COLUMN}" BIGINT GENERATED ALWAYS AS IDENTITY'],
+        )
+
+        async with self._session.begin():
+            await self._session.execute(text("CREATE SCHEMA IF NOT EXISTS analytics;"))
+            await self._session.execute(
+                text(f'DROP TABLE IF EXISTS analytics."{staging_name}";'),
+            )
+            await self._session.execute(
+                text(f'CREATE UNLOGGED TABLE analytics."{staging_name}" ({columns_sql});'),
+            )
+
+            # COPY through the raw asyncpg connection (same transaction)
+            connection = await self._session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_to_table(
+                staging_name,
+                source=str(file_path),
+                columns=csv_columns,
+                schema_name="analytics",
+                format="csv",
+                header=True,
+            )
+
+    async def _merge_staging_table(
+        self,
+        table_name: str,
+        staging_name: str,
+        schema_definition: Dict[str, Any],
+        csv_columns: List[str],
+        mode: str,
+        file_path: Path,
+        embeddings: Optional[Dict[str, Any]] = None,
+    ) -> AnalyticsTable:
+        """Swap or merge staging rows into target and update metadata.
+
+        Runs in a single transaction: "replace" recreates the target from
+        staging, "append" inserts new rows (skipping existing keys), and
+        "upsert" inserts or updates rows by primary key. Only ANALYZE runs
+        in the transaction; the sample and column statistics are refreshed
+        afterwards (refresh_statistics), and loaded rows are counted in
+        rows_since_stats.
+
+        Args:
+            table_name: Target table name.
+            staging_name: Staging table name.
+            schema_definition: Schema definition dictionary.
+            csv_columns: Columns present in staging.
+            mode: Load mode.
+            file_path: Source CSV file path.
+            embeddings: Table/column embeddings from _embed_schema (optional).
+
+        Returns:
+            AnalyticsTable metadata created or updated.
+        """
+        insert_sql = self._build_merge_sql(
+            table_name,
+            staging_name,
+            schema_definition,
+            csv_columns,
+            mode,
+        )
+
+        async with self._session.begin():
+            if mode == "replace":
+                # Dependent rollups go with the table until RollupManager.refresh rebuilds them
+                detached = await RollupManager(self._session).detach(table_name)
+                if detached:
+                    logger.info(f"Detached rollup(s) over {table_name}: {', '.join(detached)}")
+                await self._session.execute(
+                    text(f'DROP TABLE IF EXISTS analytics."{table_name}" CASCADE;'),
+                )
+            await self._create_table(table_name, schema_definition)
+
+            result = await self._session.execute(text(insert_sql))
+            await self._session.execute(text(f'ANALYZE analytics."{table_name}";'))
+
+            analytics_table = await self._upsert_metadata(
+                table_name,
+                schema_definition,
+                file_path,
+                replace_columns=(mode == "replace"),
+                embeddings=embeddings,
+            )
+            if mode == "replace":
+                analytics_table.rows_since_stats = result.rowcount
+            else:
+                analytics_table.rows_since_stats = (
+                    AnalyticsTable.rows_since_stats + result.rowcount
+                )
+            await self._bump_catalog_version()
+
+        logger.info(f"Loaded {result.rowcount} row(s) into {table_name} (mode: {mode})")
+
+        # Reload with columns relationship for callers
+        async with self._session.begin():
+            reloaded = await self._session.execute(
+                select(AnalyticsTable)
+                .where(AnalyticsTable.id == analytics_table.id)
+                .options(selectinload(AnalyticsTable.columns)),
+            )
+            return reloaded.scalar_one()
+
+    def _build_merge_sql(
+        self,
+        table_name: str,
+        staging_name: str,
+        schema_definition: Dict[str, Any],
+        csv_columns: List[str],
+        mode: str,
+    ) -> str:
+        """Build the INSERT moving staging rows into the target table.
+
+        Staging values are cast to their target types. Upserts keep one row
+        per primary key (ON CONFLICT cannot touch a row twice): the one with
+        the highest ingest ordinal, i.e. the last in the CSV. Appends skip
+        rows whose key already exists.
+
+        Args:
+            table_name: Target table name.
+            staging_name: Staging table name.
+            schema_definition: Schema definition dictionary.
+            csv_columns: Columns present in staging.
+            mode: Load mode.
+
+        Returns:
+            INSERT statement.
+        """
+        column_types = {col["name"]: col["data_type"] for col in schema_definition["columns"]}
+        primary_keys: List[str] = schema_definition["primary_keys"]
+
+        target_columns = ", ".join(f'"{col}"' for col in csv_columns)
+        select_columns = ", ".join(
+            self._cast_staging_column(col, column_types[col]) for col in csv_columns
+        )
+        select_sql = f'SELECT {select_columns} FROM analytics."{staging_name}"'
+
+        conflict_sql = ""
+        if mode == "upsert":
+            pk_cols = ", ".join(f'"{pk}"' for pk in primary_keys)
+            ordinal = f'"{INGESTION_ORDINAL_COLUMN}"'
+            select_sql = (
+                f"SELECT DISTINCT ON ({pk_cols}) {target_columns} "
+                f'FROM (SELECT {select_columns}, {ordinal} FROM analytics."{staging_name}") '
+                f"AS delta ORDER BY {pk_cols}, {ordinal} DESC"
+            )
+            update_columns = [col for col in csv_columns if col not in primary_keys]
+            if update_columns:
+                updates = ", ".join(f'"{col}" = EXCLUDED."{col}"' for col in update_columns)
+                conflict_sql = f" ON CONFLICT ({pk_cols}) DO UPDATE SET {updates}"
+            else:
+                conflict_sql = f" ON CONFLICT ({pk_cols}) DO NOTHING"
+        elif mode == "append" and primary_keys:
+            conflict_sql = " ON CONFLICT DO NOTHING"
+
+        return (
+            f'INSERT INTO analytics."{table_name}" ({target_columns}) {select_sql}{conflict_sql};'
+        )
+
+    async def _build_sample(self, table_name: str) -> Optional[float]:
+        """Rebuild the table's sample table for approximate answers.
+
+        Keeps a Bernoulli sample of ANALYTICS_SAMPLE_FRACTION of the rows
+        in analytics."<table>__sample" for tables with at least
+        ANALYTICS_SAMPLE_MIN_ROWS rows (smaller tables lose their sample).
+        The sample is built under a temporary name; the old one is dropped
+        and the new one renamed at the end, so readers keep the old sample
+        until then. Must be called inside the caller's transaction, after
+        ANALYZE, as its last statements.
+
+        Args:
+            table_name: Table name.
+
+        Returns:
+            Realized fraction of rows in the sample, or None if no sample was built.
+        """
+        sample_name = f"{table_name}{ANALYTICS_SAMPLE_SUFFIX}"
+
+        result = await self._session.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": f'analytics."{table_name}"'},
+        )
+        if (result.scalar() or 0) < ANALYTICS_SAMPLE_MIN_ROWS:
+            await self._session.execute(text(f'DROP TABLE IF EXISTS analytics."{sample_name}";'))
+            return None
+
+        token = uuid.uuid4().hex[:8]
+        building_name = f"{sample_name[: 63 - len(token) - 1]}_{token}"
+        await self._session.execute(
+            text(
+                f'CREATE TABLE analytics."{building_name}" AS '
+                f'SELECT * FROM analytics."{table_name}" '
+                f"TABLESAMPLE BERNOULLI ({ANALYTICS_SAMPLE_FRACTION * 100});",
+            ),
+        )
+        await self._session.execute(text(f'ANALYZE analytics."{building_name}";'))
+
+        # Realized fraction (exact counts), so full-table COUNT(*) scales back exactly
+        result = await self._session.execute(
+            text(
+                f'SELECT (SELECT COUNT(*) FROM analytics."{building_name}"), '
+                f'(SELECT COUNT(*) FROM analytics."{table_name}")',
+            ),
+        )
+        sample_rows, table_rows = result.one()
+
+        # Swap last: the exclusive lock on the sample is held only until commit
+        await self._session.execute(text(f'DROP TABLE IF EXISTS analytics."{sample_name}";'))
+        if not sample_rows or not table_rows:
+            await self._session.execute(text(f'DROP TABLE analytics."{building_name}";'))
+            return None
+        await self._session.execute(
+            text(f'ALTER TABLE analytics."{building_name}" RENAME TO "{sample_name}";'),
+        )
+
+        logger.info(f"Built sample of {table_name}: {sample_rows}/{table_rows} row(s)")
+        return sample_rows / table_rows
+
+    async def _compute_column_stats(
+        self,
+        table_name: str,
+        schema_definition: Dict[str, Any],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Compute per-column statistics for planner prompts and display hints.
+
+        One aggregate scan computes distinct counts and min/max (as text) of
+        every column; TEXT/BOOLEAN columns with at most
+        ANALYTICS_CATEGORICAL_MAX_DISTINCT values then get their most
+        frequent values (one grouped scan each), so the planner can use
+        exact literals. Must be called inside the caller's transaction.
+
+        Args:
+            table_name: Table name.
+            schema_definition: Schema definition dictionary.
+
+        Returns:
+            Dictionary of column name to statistics (distinct_count, min_value,
+            max_value, top_values).
+        """
+        columns = schema_definition["columns"]
+        if not columns:
+            return {}
+
+        max_length = ANALYTICS_COLUMN_VALUE_MAX_LENGTH
+        aggregates: List[str] = []
+        for col_def in columns:
+            quoted = f'"{col_def["name"]}"'
+            if col_def["data_type"].upper() == "BOOLEAN":
+                # No MIN/MAX for booleans
+                minimum, maximum = f"BOOL_AND({quoted})", f"BOOL_OR({quoted})"
+            else:
+                minimum, maximum = f"MIN({quoted})", f"MAX({quoted})"
+            aggregates.extend(
+                [
+                    f"COUNT(DISTINCT {quoted})",
+                    f"LEFT(({minimum})::text, {max_length})",
+                    f"LEFT(({maximum})::text, {max_length})",
+                ],
+            )
+
+        result = await self._session.execute(
+            text(f'SELECT {", ".join(aggregates)} FROM analytics."{table_name}"'),
+        )
+        values = result.one()
+
+        stats: Dict[str, Dict[str, Any]] = {}
+        for index, col_def in enumerate(columns):
+            distinct_count, min_value, max_value = values[3 * index : 3 * index + 3]
+            stats[col_def["name"]] = {
+                "distinct_count": distinct_count,
+                "min_value": min_value,
+                "max_value": max_value,
+                "top_values": None,
+            }
+
+            categorical = col_def["data_type"].upper() in ("TEXT", "BOOLEAN")
+            if categorical and 0 < distinct_count <= ANALYTICS_CATEGORICAL_MAX_DISTINCT:
+                quoted = f'"{col_def["name"]}"'
+                top = await self._session.execute(
+                    text(
+                        f'SELECT {quoted}::text FROM analytics."{table_name}" '
+                        f"WHERE {quoted} IS NOT NULL AND LENGTH({quoted}::text) <= {max_length} "
+                        f"GROUP BY {quoted} ORDER BY COUNT(*) DESC, {quoted} "
+                        f"LIMIT {ANALYTICS_COLUMN_TOP_VALUES}",
+                    ),
+                )
+                stats[col_def["name"]]["top_values"] = [row[0] for row in top]
+
+        return stats
+
+    async def _bump_catalog_version(self) -> None:
+        """Bump schema catalog version so cached catalogs reload.
+
+        Must be called inside the caller's transaction.
+        """
+        result = await self._session.execute(select(AnalyticsCatalogVersion).limit(1))
+        catalog_version = result.scalar_one_or_none()
+
+        if catalog_version is None:
+            self._session.add(AnalyticsCatalogVersion(version=1))
+        else:
+            catalog_version.version = AnalyticsCatalogVersion.version + 1
+
+        await self._session.flush()
+
+    def _staging_name(self, table_name: str) -> str:
+        """Build a staging table name unique to this load.
+
+        Concurrent loads of the same table each get their own staging table
+        (the target is then serialized by its own locks). The table name is
+        truncated so the result fits PostgreSQL's 63-byte identifier limit.
+
+        Args:
+            table_name: Target table name.
+
+        Returns:
+            Staging table name.
+        """
+        token = uuid.uuid4().hex[:8]
+        prefix = table_name[: 63 - len(INGESTION_STAGING_SUFFIX) - len(token) - 1]
+        return f"{prefix}{INGESTION_STAGING_SUFFIX}_{token}"
+
+    def _cast_staging_column(self, column_name: str, data_type: str) -> str:
+        """Build SELECT expression casting a TEXT staging column to its type.
+
+        Args:
+            column_name: Column name.
+            data_type: Target PostgreSQL data type.
+
+        Returns:
+            SQL expression for the column.
+        """
+        if data_type.upper() == "TEXT":
+            return f'"{column_name}"'
+        return f'NULLIF(btrim("{column_name}"), \'\')::{data_type} AS "{column_name}"'
+
+    async def _drop_staging_table(self, staging_name: str) -> None:
+        """Drop staging table (best effort).
+
+        Args:
+            staging_name: Staging table name.
+        """
+        try:
+            async with self._session.begin():
+                await self._session.execute(
+                    text(f'DROP TABLE IF EXISTS analytics."{staging_name}";'),
+                )
+        except Exception as e:
+            logger.warning(f"Failed to drop staging table {staging_name}: {e}")
+
     def _infer_schema(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Infer schema from DataFrame.
 
@@ -173,10 +823,10 @@ class AnalyticsSchemaBuilder:
                 pg_type = "TEXT"
 
             # Check nullability
-            is_nullable = col_data.isna().any()
+            is_nullable = bool(col_data.isna().any())
 
             # Check if might be primary key (unique, not null)
-            is_unique = col_data.nunique() == len(col_data)
+            is_unique = bool(col_data.nunique() == len(col_data))
             if is_unique and not is_nullable and len(primary_keys) == 0:
                 primary_keys.append(col_name)
                 indexes.append(col_name)
@@ -203,170 +853,167 @@ class AnalyticsSchemaBuilder:
         self,
         table_name: str,
         schema_definition: Dict[str, Any],
-        df: pd.DataFrame,
     ) -> None:
-        """Create table in PostgreSQL.
+        """Create table in PostgreSQL if it does not exist.
 
         Creates table in 'analytics' schema with inferred structure.
+        Must be called inside the caller's transaction.
 
         Args:
             table_name: Table name.
             schema_definition: Schema definition dictionary.
-            df: DataFrame for data insertion.
-
-        Raises:
-            DatabaseException: If table creation fails.
         """
-        try:
-            # Build CREATE TABLE SQL
-            columns_sql: List[str] = []
-            for col_def in schema_definition["columns"]:
-                col_name = col_def["name"]
-                col_type = col_def["data_type"]
-                nullable = "NULL" if col_def["is_nullable"] else "NOT NULL"
-                columns_sql.append(f'"{col_name}" {col_type} {nullable}')
-
-            # Add primary key constraint if exists
-            constraints_sql = ""
-            if schema_definition["primary_keys"]:
-                pk_cols = ", ".join(f'"{pk}"' for pk in schema_definition["primary_keys"])
-                constraints_sql = f", PRIMARY KEY ({pk_cols})"
-
-            # Create schema if not exists
-            create_schema_sql = "CREATE SCHEMA IF NOT EXISTS analytics;"
-
-            # Create table SQL
-            create_table_sql = f"""
-            CREATE TABLE IF NOT EXISTS analytics."{table_name}" (
-                {', '.join(columns_sql)}{constraints_sql}
-            );
-            """
-
-            # Execute SQL
-            async with self._session.begin():
-                await self._session.execute(text(create_schema_sql))
-                await self._session.execute(text(create_table_sql))
+        # Build CREATE TABLE SQL
+        columns_sql: List[str] = []
+        for col_def in schema_definition["columns"]:
+            col_name = col_def["name"]
+            col_type = col_def["data_type"]
+            nullable = "NULL" if col_def["is_nullable"] else "NOT NULL"
+            columns_sql.append(f'"{col_name}" {col_type} {nullable}')
+
+        # Add primary key constraint if exists
+        constraints_sql = ""
+        if schema_definition["primary_keys"]:
+            pk_cols = ", ".join(f'"{pk}"' for pk in schema_definition["primary_keys"])
+            constraints_sql = f", PRIMARY KEY ({pk_cols})"
+
+        # Create table SQL
+        create_table_sql = f"""
+        CREATE TABLE IF NOT EXISTS analytics."{table_name}" (
+            {', '.join(columns_sql)}{constraints_sql}
+        );
+        """
 
-                # Create indexes
-                for index_col in schema_definition["indexes"]:
-                    index_sql = f'CREATE INDEX IF NOT EXISTS idx_{table_name}_{index_col} ON analytics."{table_name}" ("{index_col}");'
-                    await self._session.execute(text(index_sql))
+        await self._session.execute(text("CREATE SCHEMA IF NOT EXISTS analytics;"))
+        await self._session.execute(text(create_table_sql))
 
-        except Exception as e:
-            raise DatabaseException(
-                message=f"Failed to create table: {str(e)}",
-                details={"table_name": table_name, "error": str(e)},
-            ) from e
+        # Create indexes
+        for index_col in schema_definition["indexes"]:
+            index_sql = f'CREATE INDEX IF NOT EXISTS idx_{table_name}_{index_col} ON analytics."{table_name}" ("{index_col}");'
+            await self._session.execute(text(index_sql))
 
-    async def _insert_data(self, table_name: str, df: pd.DataFrame) -> None:
-        """Insert data from DataFrame into table.
+    async def _upsert_metadata(
+        self,
+        table_name: str,
+        schema_definition: Dict[str, Any],
+        file_path: Path,
+        replace_columns: bool = True,
+        embeddings: Optional[Dict[str, Any]] = None,
+    ) -> AnalyticsTable:
+        """Create or update metadata records in place.
 
-        Inserts all rows from DataFrame into created table.
+        Creates AnalyticsTable and AnalyticsColumn records, or updates the
+        existing ones (unique name) instead of failing on re-ingestion, and
+        bumps the table data version (invalidates cached query results).
+        Must be called inside the caller's transaction.
 
         Args:
             table_name: Table name.
-            df: DataFrame with data to insert.
+            schema_definition: Schema definition dictionary.
+            file_path: Source CSV file path.
+            replace_columns: If True, replace column metadata from schema.
+            embeddings: Table/column embeddings from _embed_schema (optional).
 
-        Raises:
-            DatabaseException: If data insertion fails.
+        Returns:
+            AnalyticsTable model created or updated.
         """
-        try:
-            # Convert DataFrame to list of dictionaries
-            records = df.to_dict("records")
-
-            if not records:
-                return
-
-            # Build INSERT SQL
-            columns = list(df.columns)
-            columns_str = ", ".join(f'"{col}"' for col in columns)
-            placeholders = ", ".join(f":{col}" for col in columns)
-
-            insert_sql = f'INSERT INTO analytics."{table_name}" ({columns_str}) VALUES ({placeholders});'
+        result = await self._session.execute(
+            select(AnalyticsTable)
+            .where(AnalyticsTable.name == table_name)
+            .options(selectinload(AnalyticsTable.columns)),
+        )
+        analytics_table = result.scalar_one_or_none()
+
+        if analytics_table is None:
+            analytics_table = AnalyticsTable(
+                name=table_name,
+                description=f"Table created from CSV: {file_path.name}",
+                schema_definition=json.dumps(schema_definition),
+                source_csv=str(file_path),
+                is_active=True,
+                data_version=1,
+            )
+            self._session.add(analytics_table)
+            replace_columns = True
+        else:
+            analytics_table.schema_definition = json.dumps(schema_definition)
+            analytics_table.source_csv = str(file_path)
+            analytics_table.is_active = True
+            analytics_table.data_version = AnalyticsTable.data_version + 1
+
+        if replace_columns:
+            # delete-orphan cascade removes previous column metadata
+            analytics_table.columns = [
+                AnalyticsColumn(
+                    name=col_def["name"],
+                    data_type=col_def["data_type"],
+                    is_nullable=col_def["is_nullable"],
+                    is_primary_key=col_def["is_primary_key"],
+                    is_foreign_key=col_def.get("is_foreign_key", False),
+                    foreign_key_reference=col_def.get("foreign_key_reference"),
+                    is_indexed=col_def.get("is_indexed", False),
+                )
+                for col_def in schema_definition["columns"]
+            ]
 
-            # Insert data in batches
-            batch_size = 1000
-            async with self._session.begin():
-                for i in range(0, len(records), batch_size):
-                    batch = records[i : i + batch_size]
-                    for record in batch:
-                        # Convert NaN to None
-                        clean_record = {
-                            k: (None if pd.isna(v) else v) for k, v in record.items()
-                        }
-                        await self._session.execute(text(insert_sql), clean_record)
+        if embeddings is not None:
+            analytics_table.embedding = embeddings["table"]
+            for column in analytics_table.columns:
+                column.embedding = embeddings["columns"].get(column.name)
 
-        except Exception as e:
-            raise DatabaseException(
-                message=f"Failed to insert data: {str(e)}",
-                details={"table_name": table_name, "error": str(e)},
-            ) from e
+        await self._session.flush()
+        return analytics_table
 
-    async def _create_metadata(
+    async def _embed_schema(
         self,
         table_name: str,
+        description: str,
         schema_definition: Dict[str, Any],
-        file_path: Path,
-    ) -> AnalyticsTable:
-        """Create metadata records in database.
+    ) -> Optional[Dict[str, Any]]:
+        """Embed table and column descriptions for schema pruning.
 
-        Creates AnalyticsTable and AnalyticsColumn records for schema metadata.
+        Generates all embeddings for a table in one batch call. Returns
+        None (graceful degradation) if no LLM client is configured or the
+        call fails; such tables are always kept in planner prompts.
 
         Args:
             table_name: Table name.
+            description: Table description.
             schema_definition: Schema definition dictionary.
-            file_path: Source CSV file path.
 
         Returns:
-            AnalyticsTable model created.
-
-        Raises:
-            DatabaseException: If metadata creation fails.
+            Dictionary with "table" embedding and "columns" embeddings by name,
+            or None if unavailable.
         """
-        try:
-            async with self._session.begin():
-                # Create AnalyticsTable
-                analytics_table = AnalyticsTable(
-                    name=table_name,
-                    description=f"Table created from CSV: {file_path.name}",
-                    schema_definition=json.dumps(schema_definition),
-                    source_csv=str(file_path),
-                    is_active=True,
-                )
+        if self._llm_client is None:
+            return None
 
-                self._session.add(analytics_table)
-                await self._session.flush()  # Get ID
-
-                # Create AnalyticsColumn records
-                for col_def in schema_definition["columns"]:
-                    column = AnalyticsColumn(
-                        table_id=analytics_table.id,
-                        name=col_def["name"],
-                        data_type=col_def["data_type"],
-                        is_nullable=col_def["is_nullable"],
-                        is_primary_key=col_def["is_primary_key"],
-                        is_foreign_key=col_def.get("is_foreign_key", False),
-                        foreign_key_reference=col_def.get("foreign_key_reference"),
-                        is_indexed=col_def.get("is_indexed", False),
-                    )
-                    self._session.add(column)
-
-                await self._session.commit()
-
-                # Refresh to load relationships
-                await self._session.refresh(analytics_table)
-                return analytics_table
+        columns = schema_definition["columns"]
+        column_names = ", ".join(col["name"] for col in columns)
+        texts = [f"Tabela {table_name}: {description}. Colunas: {column_names}"]
+        texts.extend(
+            f"Coluna {col['name']} ({col['data_type']}) da tabela {table_name}"
+            for col in columns
+        )
 
+        try:
+            responses = await self._llm_client.generate_embeddings_batch(texts)
         except Exception as e:
-            await self._session.rollback()
-            raise DatabaseException(
-                message=f"Failed to create metadata: {str(e)}",
-                details={"table_name": table_name, "error": str(e)},
-            ) from e
+            logger.warning(f"Failed to embed schema for {table_name}: {e}")
+            return None
+
+        return {
+            "table": responses[0].embedding,
+            "columns": {
+                col["name"]: response.embedding
+                for col, response in zip(columns, responses[1:])
+            },
+        }
 
     async def build_schemas_from_csvs_batch(
         self,
         file_paths: List[Path],
+        mode: str = DEFAULT_INGESTION_MODE,
     ) -> List[AnalyticsTable]:
         """Build schemas from multiple CSVs in batch.
 
@@ -375,6 +1022,7 @@ class AnalyticsSchemaBuilder:
 
         Args:
             file_paths: List of CSV file paths.
+            mode: Load mode ("replace", "append", or "upsert").
 
         Returns:
             List of AnalyticsTable models created (may be fewer than input if some failed).
@@ -383,7 +1031,7 @@ class AnalyticsSchemaBuilder:
 
         for file_path in file_paths:
             try:
-                table = await self.build_schema_from_csv(file_path)
+                table = await self.build_schema_from_csv(file_path, mode=mode)
                 tables.append(table)
             except Exception as e:
                 logger.error(
@@ -0,0 +1,612 @@
+"""
+Analytics template library (parametrised SQL for recurring question shapes).
+
+Overview
+  Answers recurring analytics questions ("pedidos por mês em 2017", "top 10
+  produtos") without an LLM round trip. Templates are validated SQL with
+  named slots plus exemplar questions with embeddings. A question is matched
+  to the nearest exemplar, slots (dates, limits, categories) are extracted
+  from the question, and the SQL is rendered locally. Successful LLM plans
+  can be promoted into templates.
+
+Design
+  - **Nearest Neighbour**: Cosine similarity between the query embedding and all
+    exemplar embeddings (in-memory matrix), above ANALYTICS_TEMPLATE_MATCH_THRESHOLD.
+  - **Slot Extraction**: Regex extraction of periods (ISO dates, month/year, years),
+    limits ("top 10", "5 maiores") and categories (values declared by the template).
+  - **Conservative Matching**: Numbers left unconsumed by slots, or slot values the
+    template cannot express, reject the match (falls back to the LLM planner).
+  - **Promoted Templates**: Require the question shape (text with slots masked) to
+    equal an exemplar shape, since literals outside slots stay fixed.
+  - **Safe Rendering**: Slot values rendered as literals from typed values only
+    (integers, ISO dates, declared category values).
+  - **Periodic Reload**: Templates reloaded every ANALYTICS_TEMPLATE_REFRESH_INTERVAL.
+  - **Singleton Pattern**: get_template_library() returns process-wide instance.
+
+Integration
+  - Consumes: AnalyticsRepository (get_query_templates, save_query_template), constants.
+  - Returns: Plan result dictionaries (same shape as AnalyticsPlanner.plan) or None.
+  - Used by: AnalyticsAgent before LLM planning; scripts/load_templates.py.
+  - Observability: Logs template matches, reloads and promotions.
+
+Usage
+  >>> from app.agents.analytics.templates import get_template_library
+  >>> library = get_template_library()
+  >>> await library.refresh(repository)
+  >>> plan_result = library.match(query, query_embedding, {"olist_orders"})
+"""
+
+import asyncio
+import calendar
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config.constants import (
+    ANALYTICS_TEMPLATE_MATCH_THRESHOLD,
+    ANALYTICS_TEMPLATE_REFRESH_INTERVAL,
+    SQL_MAX_ROWS,
+)
+from app.infrastructure.database.models.analytics import AnalyticsQueryTemplate
+from app.infrastructure.database.repositories.analytics_repo import AnalyticsRepository
+from app.routing.sql_analysis import outer_row_limit
+
+logger = logging.getLogger(__name__)
+
+# Month names (accents stripped) in Portuguese and English
+_MONTH_NAMES = [
+    "janeiro fevereiro marco abril maio junho julho agosto setembro outubro novembro dezembro",
+    "january february march april may june july august september october november december",
+]
+_MONTHS = {name: month for names in _MONTH_NAMES for month, name in enumerate(names.split(), 1)}
+
+_ISO_DATE_PATTERN = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_MONTH_YEAR_PATTERN = re.compile(rf"\b({'|'.join(_MONTHS)})\s+(?:de\s+|of\s+)?(\d{{4}})\b")
+_YEAR_PATTERN = re.compile(r"\b((?:19|20)\d{2})\b")
+_LIMIT_PATTERN = re.compile(
+    r"\b(?:top|primeir[oa]s|first)\s+(\d{1,4})\b"
+    r"|\b(\d{1,4})\s+(?:maiores|menores|principais|primeir[oa]s|melhores|piores|mais|"
+    r"largest|biggest|best|worst|most|top)\b",
+)
+# Named placeholder (":limit"), not a cast ("::date") or time literal ("10:30")
+_PLACEHOLDER_PATTERN = re.compile(r"(?<![:\w]):([a-z_][a-z0-9_]*)\b")
+_SQL_DATE_LITERAL = re.compile(r"'(\d{4}-\d{2}-\d{2})'")
+
+# Strong references to background promotion tasks (avoid garbage collection)
+_background_tasks: Set["asyncio.Task[None]"] = set()
+
+
+@dataclass
+class QueryTemplate:
+    """Query template loaded for matching.
+
+    Attributes:
+        name: Template name.
+        sql_template: SQL with named slot placeholders.
+        slots: Slot definitions ({name: {"type", "default", "values"}}).
+        explanation: Explanation shown with answers.
+        tables_used: Tables referenced by the SQL.
+        columns_used: Columns referenced by the SQL.
+        source: "curated" or "promoted".
+        shapes: Exemplar question shapes (slots masked).
+    """
+
+    name: str
+    sql_template: str
+    slots: Dict[str, Dict[str, Any]]
+    explanation: str
+    tables_used: List[str]
+    columns_used: List[str]
+    source: str
+    shapes: Set[str] = field(default_factory=set)
+
+
+class TemplateLibrary:
+    """In-process library of parametrised analytics SQL templates.
+
+    Matches questions to templates by exemplar embeddings and renders
+    SQL from slots extracted from the question.
+    """
+
+    def __init__(
+        self,
+        match_threshold: float = ANALYTICS_TEMPLATE_MATCH_THRESHOLD,
+        refresh_interval: float = ANALYTICS_TEMPLATE_REFRESH_INTERVAL,
+    ) -> None:
+        """Initialize template library.
+
+        Args:
+            match_threshold: Minimum cosine similarity to an exemplar.
+            refresh_interval: Seconds between template reloads.
+        """
+        self._match_threshold = match_threshold
+        self._refresh_interval = refresh_interval
+        self._templates: List[QueryTemplate] = []
+        # Normalized exemplar embeddings and owning template index per row
+        self._matrix: Optional[np.ndarray] = None
+        self._owners: List[int] = []
+        self._checked_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def size(self) -> int:
+        """Get number of loaded templates.
+
+        Returns:
+            Number of templates available for matching.
+        """
+        return len(self._templates)
+
+    async def refresh(self, repository: AnalyticsRepository) -> None:
+        """Reload templates if the refresh interval elapsed.
+
+        Args:
+            repository: Analytics repository for template lookups.
+        """
+        if time.monotonic() - self._checked_at < self._refresh_interval:
+            return
+
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self._refresh_interval:
+                return
+
+            try:
+                self.load(await repository.get_query_templates())
+            except Exception as e:
+                # Graceful degradation: keep previous templates
+                logger.warning(f"Failed to load query templates: {e}")
+            self._checked_at = time.monotonic()
+
+    def load(self, templates: List[AnalyticsQueryTemplate]) -> None:
+        """Replace loaded templates and rebuild the exemplar index.
+
+        Args:
+            templates: AnalyticsQueryTemplate objects with exemplars loaded.
+        """
+        loaded: List[QueryTemplate] = []
+        vectors: List[Any] = []
+        owners: List[int] = []
+
+        for model in templates:
+            template = QueryTemplate(
+                name=model.name,
+                sql_template=model.sql_template,
+                slots=model.slots or {},
+                explanation=model.explanation or "",
+                tables_used=list(model.tables_used or []),
+                columns_used=list(model.columns_used or []),
+                source=model.source,
+            )
+            for exemplar in model.exemplars:
+                template.shapes.add(self._shape(exemplar.question, template)[1])
+                if exemplar.embedding is not None:
+                    vectors.append(exemplar.embedding)
+                    owners.append(len(loaded))
+            loaded.append(template)
+
+        matrix = None
+        if vectors:
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+
+        self._templates, self._matrix, self._owners = loaded, matrix, owners
+        logger.info(
+            f"Query templates loaded ({len(loaded)} template(s), {len(owners)} exemplar(s))",
+        )
+
+    def invalidate(self) -> None:
+        """Force reload on next refresh."""
+        self._checked_at = 0.0
+
+    def match(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]],
+        available_tables: Set[str],
+    ) -> Optional[Dict[str, Any]]:
+        """Match question to a template and render its SQL.
+
+        Tries exemplars above the similarity threshold, best first; the
+        first template whose slots can be filled from the question wins.
+
+        Args:
+            query: User question.
+            query_embedding: Query embedding (None disables matching).
+            available_tables: Tables in the current schema catalog.
+
+        Returns:
+            Plan result (sql, explanation, tables_used, columns_used, confidence,
+            template), or None if no template applies.
+        """
+        if query_embedding is None or self._matrix is None:
+            return None
+
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query_vector)
+        if query_norm == 0:
+            return None
+
+        scores = self._matrix @ (query_vector / query_norm)
+        tried: Set[int] = set()
+        for row in np.argsort(-scores):
+            score = float(scores[row])
+            if score < self._match_threshold:
+                break
+
+            index = self._owners[row]
+            if index in tried:
+                continue
+            tried.add(index)
+
+            template = self._templates[index]
+            if not set(template.tables_used) <= available_tables:
+                continue
+
+            sql = self._fill(query, template)
+            if sql is not None:
+                logger.info(f"Query template matched: {template.name} (similarity: {score:.3f})")
+                return {
+                    "sql": sql,
+                    "explanation": template.explanation,
+                    "tables_used": template.tables_used,
+                    "columns_used": template.columns_used,
+                    "confidence": score,
+                    "template": template.name,
+                }
+
+        return None
+
+    def parametrize(self, query: str, sql: str) -> Optional[Tuple[str, Dict[str, Dict[str, Any]]]]:
+        """Turn a planned SQL into a template using the question's slot values.
+
+        Only limits and periods are parametrised, and only when the SQL uses
+        exactly the values found in the question; other literals stay fixed.
+
+        Args:
+            query: Question the SQL was planned for.
+            sql: Planned SQL.
+
+        Returns:
+            Tuple of (sql_template, slots), or None if the SQL cannot be
+            parametrised safely (or has no slots).
+        """
+        values, shape = extract_slots(query)
+        if not values or re.search(r"\d", shape):
+            return None
+
+        row_limit = outer_row_limit(sql)
+        if row_limit is None:
+            return None
+        sql_template = row_limit.statement
+        slots: Dict[str, Dict[str, Any]] = {}
+
+        if "limit" in values:
+            # Outermost LIMIT/FETCH FIRST only (not subqueries, strings or comments)
+            if (
+                row_limit.limit is None
+                or not row_limit.limit.isdigit()
+                or int(row_limit.limit) != values["limit"]
+                or row_limit.offset is not None
+                or row_limit.with_ties
+            ):
+                return None
+            sql_template = f"{row_limit.body}\nLIMIT :limit"
+            slots["limit"] = {"type": "limit"}
+
+        if "date_from" in values:
+            bounds = {
+                values["date_from"].isoformat(): "date_from",
+                values["date_to"].isoformat(): "date_to",
+            }
+            literals = set(_SQL_DATE_LITERAL.findall(sql_template))
+            if not literals or not literals <= set(bounds):
+                return None
+            sql_template = _SQL_DATE_LITERAL.sub(lambda m: f":{bounds[m.group(1)]}", sql_template)
+            for literal in literals:
+                slots[bounds[literal]] = {"type": bounds[literal]}
+            # Years used any other way (e.g. EXTRACT(YEAR ...) = 2017) cannot be filled
+            if re.search(rf"\b{values['date_from'].year}\b", sql_template):
+                return None
+
+        return sql_template, slots
+
+    def promote(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]],
+        plan_result: Dict[str, Any],
+    ) -> None:
+        """Promote a successful LLM plan into a template (in the background).
+
+        Args:
+            query: Question the SQL was planned for.
+            query_embedding: Query embedding (exemplar embedding).
+            plan_result: Plan result from AnalyticsPlanner.plan.
+        """
+        if query_embedding is None:
+            return
+
+        parametrized = self.parametrize(query, plan_result["sql"])
+        if parametrized is None:
+            return
+
+        sql_template, slots = parametrized
+        task = asyncio.create_task(
+            self._save_promoted(query, query_embedding, plan_result, sql_template, slots),
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    def render(self, template: QueryTemplate, values: Dict[str, Any]) -> str:
+        """Render template SQL with slot values as literals.
+
+        Args:
+            template: Query template.
+            values: Slot name to typed value.
+
+        Returns:
+            SQL with placeholders replaced.
+        """
+
+        def _literal(match: "re.Match[str]") -> str:
+            name = match.group(1)
+            if name not in values:
+                return match.group(0)
+            return _to_literal(template.slots[name]["type"], values[name])
+
+        return _PLACEHOLDER_PATTERN.sub(_literal, template.sql_template)
+
+    async def _save_promoted(
+        self,
+        query: str,
+        query_embedding: List[float],
+        plan_result: Dict[str, Any],
+        sql_template: str,
+        slots: Dict[str, Dict[str, Any]],
+    ) -> None:
+        """Save promoted template in a dedicated session.
+
+        Uses its own session because the request session may be closed (or in
+        use) by the time the background task runs.
+
+        Args:
+            query: Exemplar question.
+            query_embedding: Exemplar embedding.
+            plan_result: Plan result (explanation, tables and columns used).
+            sql_template: Parametrised SQL.
+            slots: Slot definitions.
+        """
+        from app.infrastructure.database.connection import get_db_session
+        from app.infrastructure.database.repositories.analytics_repo import (
+            PostgreSQLAnalyticsRepository,
+        )
+
+        try:
+            async with get_db_session() as session:
+                template = await PostgreSQLAnalyticsRepository(session).save_query_template(
+                    name=template_name(sql_template),
+                    sql_template=sql_template,
+                    slots=slots,
+                    question=query,
+                    embedding=query_embedding,
+                    explanation=plan_result.get("explanation", ""),
+                    tables_used=plan_result.get("tables_used"),
+                    columns_used=plan_result.get("columns_used"),
+                    source="promoted",
+                )
+                name = template.name
+            self.invalidate()
+            logger.info(f"LLM plan promoted to query template: {name}")
+        except Exception as e:
+            logger.warning(f"Query template promotion failed: {e}")
+
+    def _fill(self, query: str, template: QueryTemplate) -> Optional[str]:
+        """Fill template slots from the question.
+
+        Args:
+            query: User question.
+            template: Candidate template.
+
+        Returns:
+            Rendered SQL, or None if the question does not fit the template.
+        """
+        values, shape = self._shape(query, template)
+
+        # Numbers the template cannot express (e.g. "acima de 500")
+        if re.search(r"\d", shape):
+            return None
+        if template.source != "curated" and shape not in template.shapes:
+            return None
+
+        slot_types = {spec.get("type") for spec in template.slots.values()}
+        if any(slot_type not in slot_types for slot_type in values):
+            return None
+
+        filled: Dict[str, Any] = {}
+        for name, spec in template.slots.items():
+            value = values.get(spec.get("type"))
+            if value is None:
+                if "default" not in spec:
+                    return None
+                value = spec["default"]
+            try:
+                filled[name] = _coerce(spec, value)
+            except (TypeError, ValueError):
+                return None
+
+        return self.render(template, filled)
+
+    def _shape(self, question: str, template: QueryTemplate) -> Tuple[Dict[str, Any], str]:
+        """Extract slot values (including template categories) and question shape.
+
+        Args:
+            question: Question text.
+            template: Template declaring category values.
+
+        Returns:
+            Tuple of (slot values by type, shape).
+        """
+        values, shape = extract_slots(question)
+
+        for spec in template.slots.values():
+            if spec.get("type") != "category":
+                continue
+            for value in spec.get("values") or []:
+                pattern = rf"\b{re.escape(_normalize(str(value)))}\b"
+                if re.search(pattern, shape):
+                    shape = re.sub(pattern, "<category>", shape)
+                    values["category"] = value
+                    break
+
+        return values, shape
+
+
+def extract_slots(question: str) -> Tuple[Dict[str, Any], str]:
+    """Extract limit and period slot values from a question.
+
+    Periods are half-open ranges [date_from, date_to), so templates compare
+    with ">= :date_from AND < :date_to".
+
+    Args:
+        question: Question text.
+
+    Returns:
+        Tuple of (slot values by type, normalized question with slots masked).
+    """
+    text = _normalize(question)
+    values: Dict[str, Any] = {}
+    ranges: List[Tuple[date, date]] = []
+
+    def _iso_date(match: "re.Match[str]") -> str:
+        try:
+            day = date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        except ValueError:
+            return match.group(0)
+        ranges.append((day, day + timedelta(days=1)))
+        return "<period>"
+
+    def _month_year(match: "re.Match[str]") -> str:
+        year, month = int(match.group(2)), _MONTHS[match.group(1)]
+        last_day = calendar.monthrange(year, month)[1]
+        ranges.append((date(year, month, 1), date(year, month, last_day) + timedelta(days=1)))
+        return "<period>"
+
+    def _year(match: "re.Match[str]") -> str:
+        year = int(match.group(1))
+        ranges.append((date(year, 1, 1), date(year + 1, 1, 1)))
+        return "<period>"
+
+    def _limit(match: "re.Match[str]") -> str:
+        values["limit"] = int(match.group(1) or match.group(2))
+        return match.group(0).replace(match.group(1) or match.group(2), "<limit>")
+
+    text = _ISO_DATE_PATTERN.sub(_iso_date, text)
+    text = _MONTH_YEAR_PATTERN.sub(_month_year, text)
+    text = _YEAR_PATTERN.sub(_year, text)
+    text = _LIMIT_PATTERN.sub(_limit, text)
+
+    if ranges:
+        values["date_from"] = min(start for start, _ in ranges)
+        values["date_to"] = max(end for _, end in ranges)
+
+    return values, text
+
+
+def placeholders(sql_template: str) -> Set[str]:
+    """Get named slot placeholders used by template SQL.
+
+    Args:
+        sql_template: Template SQL.
+
+    Returns:
+        Placeholder names (without ":").
+    """
+    return set(_PLACEHOLDER_PATTERN.findall(sql_template))
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace.
+
+    Args:
+        text: Input text.
+
+    Returns:
+        Normalized text.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^\w\s-]", " ", stripped).split())
+
+
+def _coerce(spec: Dict[str, Any], value: Any) -> Any:
+    """Coerce slot value to its slot type.
+
+    Args:
+        spec: Slot definition.
+        value: Extracted or default value.
+
+    Returns:
+        Typed value (int, date or declared category value).
+
+    Raises:
+        ValueError: If the value is invalid for the slot.
+    """
+    slot_type = spec.get("type")
+    if slot_type == "limit":
+        return max(1, min(int(value), SQL_MAX_ROWS))
+    if slot_type in ("date_from", "date_to"):
+        return value if isinstance(value, date) else date.fromisoformat(str(value))
+    if slot_type == "category":
+        if value not in (spec.get("values") or []) and value != spec.get("default"):
+            raise ValueError(f"Undeclared category value: {value}")
+        return value
+    raise ValueError(f"Unknown slot type: {slot_type}")
+
+
+def _to_literal(slot_type: str, value: Any) -> str:
+    """Render typed slot value as a SQL literal.
+
+    Args:
+        slot_type: Slot type.
+        value: Typed value from _coerce.
+
+    Returns:
+        SQL literal.
+    """
+    if slot_type == "limit":
+        return str(int(value))
+    if isinstance(value, date):
+        return f"'{value.isoformat()}'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def template_name(sql_template: str) -> str:
+    """Build a stable name for a promoted template.
+
+    Args:
+        sql_template: Template SQL.
+
+    Returns:
+        Template name.
+    """
+    return f"promoted_{hashlib.sha256(sql_template.encode()).hexdigest()[:12]}"
+
+
+@lru_cache()
+def get_template_library() -> TemplateLibrary:
+    """Get singleton TemplateLibrary instance.
+
+    Returns:
+        TemplateLibrary singleton instance.
+    """
+    return TemplateLibrary()
@@ -97,11 +97,10 @@ async def shutdown_event() -> None:
     try:
         logger.info("Application shutting down...")
 
-        # Close database connections
-        from app.infrastructure.database.connection import get_db_engine
+        # Close database connections (primary and analytics pools)
+        from app.infrastructure.database.connection import close_db_engines
 
-        engine = await get_db_engine()
-        await engine.dispose()
+        await close_db_engines()
         logger.info("Database connections closed")
 
         # Close cache connections (if available)
@@ -276,9 +275,10 @@ async def general_exception_handler(request: Request, exc: Exception) -> Respons
 
 
 # Register routes
-from app.api.routes import chat, documents, health
+from app.api.routes import analytics, chat, documents, health
 
 app.include_router(chat.chat_router, prefix="/api/v1", tags=["chat"])
 app.include_router(documents.documents_router, prefix="/api/v1", tags=["documents"])
 app.include_router(health.health_router, prefix="/api/v1", tags=["health"])
+app.include_router(analytics.analytics_router, prefix="/api/v1", tags=["analytics"])
 
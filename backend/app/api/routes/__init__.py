@@ -3,10 +3,11 @@ API routes module (FastAPI routers for API endpoints).
 
 Overview
   Provides FastAPI routers for all API endpoints. Includes chat routes (REST and WebSocket),
-  document routes, and health check routes. Routes are organized by domain.
+  document routes, health check routes, and analytics result and export routes. Routes are
+  organized by domain.
 
 Design
-  - **Router Organization**: Separate routers for each domain (chat, documents, health).
+  - **Router Organization**: Separate routers for each domain (chat, documents, health, analytics).
   - **Prefix and Tags**: Consistent prefix and tags for OpenAPI documentation.
   - **Dependency Injection**: Uses FastAPI Depends for service injection.
 
@@ -21,11 +22,13 @@ Usage
   >>> app.include_router(chat_router, prefix="/api/v1")
 """
 
+from app.api.routes.analytics import analytics_router
 from app.api.routes.chat import chat_router
 from app.api.routes.documents import documents_router
 from app.api.routes.health import health_router
 
 __all__ = [
+    "analytics_router",
     "chat_router",
     "documents_router",
     "health_router",
@@ -0,0 +1,291 @@
+"""
+Analytics API routes (result pages, batch reports and streaming export of analytics results).
+
+Overview
+  Provides REST endpoints for paging and exporting analytics query results,
+  and for answering many questions at once as a report.
+  Answers carry a results handle with their first page; further pages are
+  fetched by cursor. Exports are streamed to the client as NDJSON or CSV while
+  rows arrive from a server-side cursor, so large exports have bounded memory
+  and an early first byte. The interactive SQL_MAX_ROWS cap is replaced by
+  ANALYTICS_EXPORT_MAX_ROWS.
+
+Design
+  - **Planning**: Natural language questions go through AnalyticsPlanner; provided SQL
+    goes through the planner's validation (allowlist and syntax) all the same.
+  - **Cost Gate**: QueryCostGuard bounds rows (export cap) and rejects expensive plans,
+    for planned and provided SQL alike.
+  - **Streaming**: Repository.stream_sql batches rows; each batch is encoded and sent.
+  - **Error Trailer**: A failure after streaming started cannot change the 200 status,
+    so the stream ends with an explicit error record instead of silently stopping:
+    an NDJSON line {"error": {"message", "rows_sent"}}, or a CSV line starting with
+    "# error:". Complete exports never end with one.
+  - **Dedicated Session**: The stream opens its own session (read-only analytics pool),
+    since request-scoped dependencies may be closed before the response body is sent.
+  - **Batch Reports**: AnalyticsBatch answers questions concurrently over one schema
+    snapshot, planning identical questions and executing identical plans once.
+  - **Result Pages**: ResultPager serves stored rows or keyset pages (re-executed on the
+    engine the answer came from); unknown or expired handles return 404.
+
+Integration
+  - Consumes: AnalyticsPlanner, QueryCostGuard, SchemaCatalog, AnalyticsRepository,
+    AllowlistValidator, ResultPager, AnalyticsBatch, dependencies.
+  - Returns: AnalyticsResultPage, AnalyticsBatchResponse, StreamingResponse
+    (application/x-ndjson or text/csv).
+  - Used by: Frontend Next.js application (export), API clients.
+  - Observability: Logs exports and streaming errors.
+
+Usage
+  >>> GET /api/v1/analytics/results/{handle}?cursor=...&page_size=100
+  >>> POST /api/v1/analytics/batch
+  >>> {"questions": ["Pedidos por estado", "Receita por mês"]}
+  >>> POST /api/v1/analytics/export
+  >>> {"query": "Pedidos por estado", "format": "csv"}
+"""
+
+import csv
+import io
+import json
+import logging
+from typing import AsyncGenerator, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.agents.analytics.batch import AnalyticsBatch
+from app.agents.analytics.catalog import get_schema_catalog
+from app.agents.analytics.cost_guard import QueryCostGuard
+from app.agents.analytics.pagination import get_result_pager
+from app.agents.analytics.planner import AnalyticsPlanner
+from app.api.dependencies import CacheDep, LLMDep
+from app.api.schemas.analytics import (
+    AnalyticsBatchRequest,
+    AnalyticsBatchResponse,
+    AnalyticsExportRequest,
+    AnalyticsResultPage,
+)
+from app.config.constants import (
+    ANALYTICS_EXPORT_MAX_ROWS,
+    ANALYTICS_EXPORT_TIMEOUT_MS,
+    ANALYTICS_RESULT_MAX_PAGE_SIZE,
+    ANALYTICS_RESULT_PAGE_SIZE,
+    ANALYTICS_STREAM_BATCH_SIZE,
+)
+from app.config.exceptions import NotFoundException, ValidationException
+from app.infrastructure.database.connection import get_analytics_session
+from app.infrastructure.database.repositories.duckdb_analytics_repo import (
+    create_analytics_repository,
+)
+from app.routing.allowlist import get_allowlist_validator
+
+logger = logging.getLogger(__name__)
+
+# Create router
+analytics_router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+@analytics_router.get("/results/{handle}", response_model=AnalyticsResultPage)
+async def get_result_page(
+    handle: str,
+    cursor: Optional[str] = None,
+    page_size: int = ANALYTICS_RESULT_PAGE_SIZE,
+) -> AnalyticsResultPage:
+    """Get a page of an analytics result.
+
+    Args:
+        handle: Results handle from the answer metadata.
+        cursor: Cursor from the previous page (omit for the first page).
+        page_size: Rows per page (default: ANALYTICS_RESULT_PAGE_SIZE).
+
+    Returns:
+        AnalyticsResultPage with rows and the next cursor.
+
+    Raises:
+        NotFoundException: If the handle is unknown or expired.
+        ValidationException: If page_size or cursor is invalid, the data changed,
+            or the page query is too expensive.
+    """
+    if not 1 <= page_size <= ANALYTICS_RESULT_MAX_PAGE_SIZE:
+        raise ValidationException(
+            message=f"page_size must be between 1 and {ANALYTICS_RESULT_MAX_PAGE_SIZE}",
+            details={"page_size": page_size},
+        )
+
+    pager = get_result_pager()
+    result = pager.get(handle)
+    if result is None:
+        raise NotFoundException(
+            message="Result not found or expired",
+            details={"handle": handle},
+        )
+
+    if result.mode == "rows":
+        page = await pager.page(result, cursor, page_size)
+    else:
+        async with get_analytics_session() as session:
+            repository = create_analytics_repository(session, result.engine)
+            page = await pager.page(result, cursor, page_size, repository)
+
+    return AnalyticsResultPage(**page)
+
+
+@analytics_router.post("/batch", response_model=AnalyticsBatchResponse)
+async def answer_batch(
+    request_body: AnalyticsBatchRequest,
+    llm_client: LLMDep = None,  # type: ignore
+    cache: CacheDep = None,  # type: ignore
+) -> AnalyticsBatchResponse:
+    """Answer a list of analytics questions as one report.
+
+    Questions share one schema snapshot and run concurrently (bounded);
+    identical questions are planned once and identical plans executed once.
+    A failing question is reported with its error instead of failing the batch.
+
+    Args:
+        request_body: Batch request with questions and options.
+        llm_client: LLM client for SQL planning (and optional insights).
+        cache: Cache manager for SQL planning cache.
+
+    Returns:
+        AnalyticsBatchResponse with one item per question, in order.
+    """
+    batch = AnalyticsBatch(
+        llm_client,
+        get_allowlist_validator(),
+        cache,
+        engine=request_body.analytics_engine,
+    )
+    report = await batch.run(
+        request_body.questions,
+        request_body.language,
+        approximate=request_body.approximate,
+        insights=request_body.insights,
+    )
+    return AnalyticsBatchResponse(**report)
+
+
+@analytics_router.post("/export")
+async def export_results(
+    request_body: AnalyticsExportRequest,
+    llm_client: LLMDep = None,  # type: ignore
+    cache: CacheDep = None,  # type: ignore
+) -> StreamingResponse:
+    """Stream analytics query results as NDJSON or CSV.
+
+    Resolves SQL (planning the question, or validating provided SQL as the
+    planner validates generated SQL), applies the cost gate with the export
+    row cap, then streams rows. A failure mid-stream ends the body with an
+    error trailer (see module docstring).
+
+    Args:
+        request_body: Export request with query or sql, and format.
+        llm_client: LLM client for SQL planning.
+        cache: Cache manager for SQL planning cache.
+
+    Returns:
+        StreamingResponse with encoded rows.
+
+    Raises:
+        ValidationException: If SQL is invalid or too expensive.
+    """
+    allowlist_validator = get_allowlist_validator()
+
+    async with get_analytics_session() as session:
+        repository = create_analytics_repository(session)
+        schema_info = await get_schema_catalog(repository.engine).get_schema_info(repository)
+
+        planner = AnalyticsPlanner(llm_client, allowlist_validator, cache)
+        if request_body.query is not None:
+            plan_result = await planner.plan(request_body.query, schema_info, request_body.language)
+            sql = plan_result["sql"]
+        else:
+            sql = request_body.sql  # type: ignore[assignment]
+            planner.validate(sql, schema_info)
+
+        cost_guard = QueryCostGuard(repository, max_rows=ANALYTICS_EXPORT_MAX_ROWS)
+        sql = (await cost_guard.check(sql))["sql"]
+
+    logger.info(
+        f"Streaming analytics export (format: {request_body.format})",
+        extra={"sql": sql[:200], "format": request_body.format},
+    )
+
+    return StreamingResponse(
+        _stream_rows(sql, request_body.format),
+        media_type=_MEDIA_TYPES[request_body.format],
+        headers={
+            "Content-Disposition": f'attachment; filename="analytics_export.{request_body.format}"',
+        },
+    )
+
+
+async def _stream_rows(sql: str, output_format: str) -> AsyncGenerator[str, None]:
+    """Stream encoded rows from a server-side cursor.
+
+    Errors after the response started cannot change the status code; they
+    are logged and end the stream with an error trailer.
+
+    Args:
+        sql: Validated, bounded SQL query.
+        output_format: "ndjson" or "csv".
+
+    Yields:
+        Encoded chunks (one per batch).
+    """
+    rows_sent = 0
+    try:
+        async with get_analytics_session() as session:
+            repository = create_analytics_repository(session)
+            header_sent = False
+
+            async for columns, rows in repository.stream_sql(
+                sql,
+                batch_size=ANALYTICS_STREAM_BATCH_SIZE,
+                timeout_ms=ANALYTICS_EXPORT_TIMEOUT_MS,
+            ):
+                if output_format == "csv":
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+                    if not header_sent:
+                        writer.writerow(columns)
+                        header_sent = True
+                    writer.writerows(rows)
+                    chunk = buffer.getvalue()
+                else:
+                    chunk = "".join(
+                        json.dumps(dict(zip(columns, row)), default=str, ensure_ascii=False) + "\n"
+                        for row in rows
+                    )
+
+                rows_sent += len(rows)
+                yield chunk
+    except Exception as e:
+        logger.error(f"Analytics export failed after {rows_sent} row(s): {e}", exc_info=True)
+        yield _error_trailer(output_format, rows_sent)
+        return
+
+    logger.info(f"Analytics export complete ({rows_sent} row(s))")
+
+
+def _error_trailer(output_format: str, rows_sent: int) -> str:
+    """Encode the record ending a failed export.
+
+    The cause is only logged; clients learn that the export is incomplete
+    and how many rows they received.
+
+    Args:
+        output_format: "ndjson" or "csv".
+        rows_sent: Rows streamed before the failure.
+
+    Returns:
+        NDJSON error line, or CSV comment line.
+    """
+    message = f"Export failed after {rows_sent} row(s); the data above is incomplete"
+    if output_format == "csv":
+        return f"# error: {message}\n"
+    return json.dumps({"error": {"message": message, "rows_sent": rows_sent}}) + "\n"
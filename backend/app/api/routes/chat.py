@@ -8,8 +8,11 @@ Overview
 
 Design
   - **REST Endpoints**: POST /message, GET /history, DELETE /history.
-  - **WebSocket Endpoint**: /stream for real-time streaming.
+  - **WebSocket Endpoint**: /stream for real-time streaming; analytics insights follow
+    the answer as a separate "insights" frame.
   - **LangGraph Integration**: Uses assistant.invoke() for message processing.
+  - **Cancellation**: Graph runs are cancelled when the client disconnects (REST polling,
+    WebSocket disconnect frame), so abandoned queries release their connections.
   - **Message Persistence**: Saves all messages to database for history.
   - **Thread Management**: Generates thread_id automatically if not provided.
 
@@ -25,17 +28,21 @@ Usage
   >>> {"message_id": "...", "thread_id": "...", "response": {...}}
 """
 
+import asyncio
+import contextlib
 import json
 import logging
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.agents.analytics.insights import get_insights_engine
 from app.api.dependencies import AssistantDep, DBDep, LanguageDetectorDep
 from app.api.schemas.chat import ChatHistoryResponse, ChatRequest, ChatResponse
+from app.config.constants import REQUEST_DISCONNECT_POLL_INTERVAL
 from app.config.exceptions import ValidationException
 from app.graph.state import GraphState
 from app.infrastructure.database.models.conversation import Conversation, Message
@@ -127,6 +134,8 @@ async def send_message(
             "user_id": None,  # TODO: Get from authentication when implemented
             "query": request_body.query,
             "language": language,
+            "approximate": request_body.approximate,
+            "analytics_engine": request_body.analytics_engine,
             "conversation_history": conversation_history,
             "router_decision": None,
             "agent_response": None,
@@ -140,13 +149,17 @@ async def send_message(
             extra={"message_id": message_id, "thread_id": thread_id, "query": request_body.query[:100]},
         )
 
-        # Invoke LangGraph (use ainvoke if available, otherwise invoke)
-        if hasattr(assistant, "ainvoke"):
-            final_state = await assistant.ainvoke(state)
-        else:
-            # Fallback for sync invoke (shouldn't happen, but graceful degradation)
-            import asyncio
-            final_state = await asyncio.to_thread(assistant.invoke, state)
+        # Invoke LangGraph, cancelled if the client goes away (queries release connections)
+        final_state = await _invoke_until_disconnected(
+            assistant,
+            state,
+            lambda: _wait_http_disconnect(request),
+        )
+        if final_state is None:
+            raise ValidationException(
+                message="Request cancelled: client disconnected",
+                details={"thread_id": thread_id, "message_id": message_id},
+            )
 
         # Step 7: Get response from state
         agent_response = final_state.get("agent_response")
@@ -309,6 +322,9 @@ async def stream_chat(
             "user_id": None,
             "query": query,
             "language": language,
+            "approximate": request_data.get("approximate"),
+            "analytics_engine": request_data.get("analytics_engine"),
+            "defer_insights": True,
             "conversation_history": conversation_history,
             "router_decision": None,
             "agent_response": None,
@@ -319,13 +335,15 @@ async def stream_chat(
         # Send status: routing
         await websocket.send_json({"status": "routing", "thread_id": thread_id})
 
-        # Execute graph (use ainvoke if available, otherwise invoke)
-        if hasattr(assistant, "ainvoke"):
-            final_state = await assistant.ainvoke(state)
-        else:
-            # Fallback for sync invoke
-            import asyncio
-            final_state = await asyncio.to_thread(assistant.invoke, state)
+        # Execute graph, cancelled if the client disconnects meanwhile
+        final_state = await _invoke_until_disconnected(
+            assistant,
+            state,
+            lambda: _wait_websocket_disconnect(websocket),
+        )
+        if final_state is None:
+            logger.info(f"WebSocket disconnected, cancelled message: {message_id}")
+            return
 
         # Send status: complete
         await websocket.send_json({"status": "complete", "thread_id": thread_id})
@@ -376,6 +394,21 @@ async def stream_chat(
                 logger.error(f"Failed to save messages: {e}", exc_info=True)
                 await db.rollback()
 
+            # Send deferred analytics insights (generated while the answer was sent)
+            insights_key = (getattr(agent_response, "metadata", None) or {}).get(
+                "insights_pending",
+            )
+            if insights_key:
+                insights = await get_insights_engine().wait(insights_key)
+                await websocket.send_json(
+                    {
+                        "status": "insights",
+                        "message_id": message_id,
+                        "thread_id": thread_id,
+                        "insights": insights,
+                    },
+                )
+
         await websocket.close()
 
     except WebSocketDisconnect:
@@ -522,3 +555,64 @@ async def delete_history(
 
     return {"success": True}
 
+
+async def _invoke_until_disconnected(
+    assistant: Any,
+    state: GraphState,
+    disconnected: Callable[[], Awaitable[None]],
+) -> Optional[Dict[str, Any]]:
+    """Run the graph, cancelling it if the client disconnects first.
+
+    Cancellation reaches the running node: in-flight analytics queries are
+    cancelled on the server (asyncpg cancel request) and their connections
+    return to the pool instead of running until statement_timeout.
+
+    Args:
+        assistant: LangGraph assistant instance.
+        state: Initial graph state.
+        disconnected: Coroutine function returning when the client is gone.
+
+    Returns:
+        Final graph state, or None if the client disconnected.
+    """
+    if hasattr(assistant, "ainvoke"):
+        graph_run = asyncio.ensure_future(assistant.ainvoke(state))
+    else:
+        # Fallback for sync invoke (shouldn't happen, but graceful degradation)
+        graph_run = asyncio.ensure_future(asyncio.to_thread(assistant.invoke, state))
+    watcher = asyncio.ensure_future(disconnected())
+
+    try:
+        await asyncio.wait({graph_run, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not graph_run.done():
+            graph_run.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await graph_run
+
+    if graph_run.cancelled():
+        return None
+    return graph_run.result()
+
+
+async def _wait_http_disconnect(request: Request) -> None:
+    """Return when the HTTP client disconnects (polled).
+
+    Args:
+        request: FastAPI request.
+    """
+    while not await request.is_disconnected():
+        await asyncio.sleep(REQUEST_DISCONNECT_POLL_INTERVAL)
+
+
+async def _wait_websocket_disconnect(websocket: WebSocket) -> None:
+    """Return when the WebSocket client disconnects (other frames are ignored).
+
+    Args:
+        websocket: WebSocket connection.
+    """
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
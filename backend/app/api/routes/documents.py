@@ -12,9 +12,11 @@ Design
   - **Storage Integration**: Saves files to local storage before processing.
   - **Commerce Agent Integration**: Uses Commerce Agent for document processing.
   - **Database Persistence**: Stores document metadata in database.
+  - **Document Facts**: Processed documents are materialised into the analytics
+    document facts table in the background (after commit).
 
 Integration
-  - Consumes: Commerce Agent, storage, database models, dependencies.
+  - Consumes: Commerce Agent, storage, database models, document facts, dependencies.
   - Returns: DocumentResponse, DocumentListResponse.
   - Used by: Frontend Next.js application.
   - Observability: Logs all uploads, processing, and errors.
@@ -33,6 +35,7 @@ from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, Uplo
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.agents.analytics.document_facts import schedule_document_facts
 from app.api.dependencies import AssistantDep, DBDep
 from app.api.schemas.documents import DocumentListResponse, DocumentResponse, DocumentUploadRequest
 from app.config.constants import MAX_FILE_SIZE_MB, SUPPORTED_FILE_TYPES
@@ -183,8 +186,9 @@ async def upload_document(
             document.processing_metadata = {"error": str(e)}
             # Continue to save document with error in metadata
 
-        # Step 6: Save document
+        # Step 6: Save document, then materialise its analytics facts
         await db.commit()
+        schedule_document_facts([document_id])
 
         # Step 7: Create response
         # Determine status based on extracted_data
@@ -358,6 +362,7 @@ async def analyze_document(
         document.confidence_score = final_state.get("confidence_score")
 
         await db.commit()
+        schedule_document_facts([document_id])
 
         # Determine status
         status = "processed" if document.extracted_data and len(document.extracted_data) > 0 else "pending"
@@ -4,7 +4,7 @@ API schemas module (Pydantic models for request/response validation).
 Overview
   Provides Pydantic models for API request and response validation. All schemas
   use Pydantic for automatic validation, type safety, and JSON serialization.
-  Schemas are organized by domain (chat, documents, health).
+  Schemas are organized by domain (chat, documents, health, analytics).
 
 Design
   - **Pydantic Models**: Type-safe request/response models with automatic validation.
@@ -24,6 +24,15 @@ Usage
   >>> response = ChatResponse(message_id="...", thread_id="...", response=answer)
 """
 
+# Analytics schemas
+from app.api.schemas.analytics import (
+    AnalyticsBatchItem,
+    AnalyticsBatchRequest,
+    AnalyticsBatchResponse,
+    AnalyticsExportRequest,
+    AnalyticsResultPage,
+)
+
 # Chat schemas
 from app.api.schemas.chat import (
     ChatHistoryResponse,
@@ -46,6 +55,12 @@ from app.api.schemas.health import (
 )
 
 __all__ = [
+    # Analytics schemas
+    "AnalyticsBatchItem",
+    "AnalyticsBatchRequest",
+    "AnalyticsBatchResponse",
+    "AnalyticsExportRequest",
+    "AnalyticsResultPage",
     # Chat schemas
     "ChatRequest",
     "ChatResponse",
@@ -0,0 +1,200 @@
+"""
+Analytics API schemas (request/response models for analytics endpoints).
+
+Overview
+  Provides Pydantic models for analytics API endpoints. Defines request
+  structures for streaming exports of analytics query results, either from
+  a natural language question or from SQL previously generated (and shown)
+  by the Analytics Agent, batch question reports, and the response structure
+  of result pages.
+
+Design
+  - **Request Models**: AnalyticsExportRequest for streamed exports (NDJSON/CSV),
+    AnalyticsBatchRequest for batch question reports.
+  - **Response Models**: AnalyticsResultPage for paginated results (results handles),
+    AnalyticsBatchResponse (with AnalyticsBatchItem) for batch reports.
+  - **Validation**: Exactly one of query or sql; format restricted to supported values;
+    1 to ANALYTICS_BATCH_MAX_QUESTIONS non-empty questions per batch.
+  - **Serialization**: Automatic JSON serialization for API responses.
+
+Integration
+  - Consumes: constants (default language, batch size).
+  - Returns: Validated request and response models.
+  - Used by: Analytics API routes.
+  - Observability: N/A (validation only).
+
+Usage
+  >>> from app.api.schemas.analytics import AnalyticsExportRequest
+  >>> request = AnalyticsExportRequest(query="Orders per state", format="csv")
+"""
+
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.config.constants import ANALYTICS_BATCH_MAX_QUESTIONS, DEFAULT_LANGUAGE
+
+
+class AnalyticsExportRequest(BaseModel):
+    """Request model for streamed analytics exports.
+
+    Attributes:
+        query: Natural language question (planned into SQL, optional).
+        sql: SQL generated by the Analytics Agent (optional).
+        format: Output format ("ndjson" or "csv").
+        language: Query language (used for planning).
+
+    Validation:
+        - exactly one of query or sql must be provided
+    """
+
+    query: Optional[str] = Field(None, description="Natural language question", min_length=1)
+    sql: Optional[str] = Field(None, description="SQL query (SELECT only)", min_length=1)
+    format: Literal["ndjson", "csv"] = Field(default="ndjson", description="Output format")
+    language: str = Field(default=DEFAULT_LANGUAGE, description="Query language")
+
+    @model_validator(mode="after")
+    def validate_source(self) -> "AnalyticsExportRequest":
+        """Validate that exactly one of query or sql is provided.
+
+        Returns:
+            Validated request.
+
+        Raises:
+            ValueError: If neither or both are provided.
+        """
+        if (self.query is None) == (self.sql is None):
+            raise ValueError("Provide exactly one of 'query' or 'sql'")
+        return self
+
+
+class AnalyticsResultPage(BaseModel):
+    """Response model for a page of an analytics result.
+
+    Attributes:
+        handle: Results handle (from the answer metadata).
+        mode: "rows" (stored result) or "keyset" (re-executed past the row cap).
+        columns: Column names.
+        rows: Row values (same order as columns).
+        next_cursor: Cursor of the next page (None on the last page).
+        complete: Whether paging reaches every row of the result.
+        total_rows: Total number of rows (None if unknown).
+    """
+
+    handle: str = Field(..., description="Results handle")
+    mode: Literal["rows", "keyset"] = Field(..., description="Pagination mode")
+    columns: List[str] = Field(..., description="Column names")
+    rows: List[List[Any]] = Field(..., description="Row values (same order as columns)")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page")
+    complete: bool = Field(..., description="Whether paging reaches every row of the result")
+    total_rows: Optional[int] = Field(None, description="Total number of rows (if known)", ge=0)
+
+
+class AnalyticsBatchRequest(BaseModel):
+    """Request model for batch analytics questions (reports).
+
+    Attributes:
+        questions: Natural language questions (answered concurrently).
+        language: Query language.
+        approximate: Answer from sample tables (optional, None lets the planner decide).
+        analytics_engine: Engine running analytics SQL (optional, None uses the
+            deployment default).
+        insights: Generate LLM insights for each answer (one LLM call per question).
+
+    Validation:
+        - 1 to ANALYTICS_BATCH_MAX_QUESTIONS questions
+        - questions must be non-empty strings
+    """
+
+    questions: List[str] = Field(
+        ...,
+        description="Natural language questions",
+        min_length=1,
+        max_length=ANALYTICS_BATCH_MAX_QUESTIONS,
+    )
+    language: str = Field(default=DEFAULT_LANGUAGE, description="Query language")
+    approximate: Optional[bool] = Field(
+        None,
+        description="Answer questions approximately from sample tables",
+    )
+    analytics_engine: Optional[Literal["postgres", "duckdb"]] = Field(
+        None,
+        description="Engine running analytics SQL (postgres or duckdb Parquet snapshots)",
+    )
+    insights: bool = Field(default=False, description="Generate LLM insights per answer")
+
+    @field_validator("questions")
+    @classmethod
+    def validate_questions(cls, v: List[str]) -> List[str]:
+        """Validate that every question is non-empty.
+
+        Args:
+            v: Questions.
+
+        Returns:
+            Validated questions.
+
+        Raises:
+            ValueError: If a question is empty or whitespace only.
+        """
+        if any(not question.strip() for question in v):
+            raise ValueError("questions must be non-empty")
+        return v
+
+
+class AnalyticsBatchItem(BaseModel):
+    """Answer to one question of a batch report.
+
+    Attributes:
+        question: Question as submitted.
+        sql: Executed SQL (bounded by the row cap).
+        explanation: SQL explanation.
+        tables_used: Tables used by the SQL.
+        rows: Result rows (up to SQL_MAX_ROWS).
+        row_count: Number of rows returned.
+        truncated: Whether rows were capped at SQL_MAX_ROWS.
+        summary: Result summary (row count, numeric statistics).
+        display_suggestions: Suggested visualization.
+        chart: Chart-ready time series (line charts only).
+        insights: LLM insights (if requested).
+        approximate: Approximation details (approximate answers only).
+        shared_plan: Whether the execution was shared with an identical plan.
+        cached: Whether rows came from the result cache.
+        error: Error message if the question failed.
+    """
+
+    question: str = Field(..., description="Question as submitted")
+    sql: Optional[str] = Field(None, description="Executed SQL")
+    explanation: Optional[str] = Field(None, description="SQL explanation")
+    tables_used: Optional[List[str]] = Field(None, description="Tables used by the SQL")
+    rows: Optional[List[Dict[str, Any]]] = Field(None, description="Result rows")
+    row_count: Optional[int] = Field(None, description="Number of rows returned", ge=0)
+    truncated: Optional[bool] = Field(None, description="Whether rows were capped")
+    summary: Optional[Dict[str, Any]] = Field(None, description="Result summary")
+    display_suggestions: Optional[Dict[str, Any]] = Field(None, description="Visualization")
+    chart: Optional[Dict[str, Any]] = Field(None, description="Chart-ready time series")
+    insights: Optional[Dict[str, Any]] = Field(None, description="LLM insights")
+    approximate: Optional[Dict[str, Any]] = Field(None, description="Approximation details")
+    shared_plan: bool = Field(default=False, description="Execution shared with another question")
+    cached: bool = Field(default=False, description="Rows served from the result cache")
+    error: Optional[str] = Field(None, description="Error message if the question failed")
+
+
+class AnalyticsBatchResponse(BaseModel):
+    """Response model for batch analytics questions (combined report).
+
+    Attributes:
+        items: Answers, in question order.
+        question_count: Number of questions submitted.
+        unique_questions: Questions answered after deduplication.
+        unique_plans: Distinct SQL plans executed.
+        failed: Number of unique questions that failed.
+        elapsed_ms: Total report time in milliseconds.
+    """
+
+    items: List[AnalyticsBatchItem] = Field(..., description="Answers, in question order")
+    question_count: int = Field(..., description="Questions submitted", ge=0)
+    unique_questions: int = Field(..., description="Questions after deduplication", ge=0)
+    unique_plans: int = Field(..., description="Distinct SQL plans executed", ge=0)
+    failed: int = Field(..., description="Unique questions that failed", ge=0)
+    elapsed_ms: float = Field(..., description="Total report time in milliseconds", ge=0)
@@ -25,7 +25,7 @@ Usage
 """
 
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -43,6 +43,10 @@ class ChatRequest(BaseModel):
         thread_id: Conversation thread ID (optional, generates new if not provided).
         attachment: Optional file attachment for commerce documents.
             Structure: {"filename": str, "content": str, "mime_type": str}
+        approximate: Answer analytics questions from sample tables (optional,
+            None lets the planner decide).
+        analytics_engine: Engine running analytics SQL (optional, None uses the
+            deployment default).
 
     Validation:
         - query must be non-empty string
@@ -55,6 +59,14 @@ class ChatRequest(BaseModel):
         None,
         description="Optional file attachment for commerce documents",
     )
+    approximate: Optional[bool] = Field(
+        None,
+        description="Answer analytics questions approximately from sample tables",
+    )
+    analytics_engine: Optional[Literal["postgres", "duckdb"]] = Field(
+        None,
+        description="Engine running analytics SQL (postgres or duckdb Parquet snapshots)",
+    )
 
     @field_validator("thread_id")
     @classmethod
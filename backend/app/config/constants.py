@@ -57,6 +57,116 @@ SIMILARITY_THRESHOLD: float = 0.7
 # SQL Execution Configuration
 SQL_TIMEOUT_MS: int = 30000  # 30 seconds
 SQL_MAX_ROWS: int = 1000
+ANALYTICS_ASYNCPG_FAST_PATH: bool = True  # unparameterized analytics SQL bypasses SQLAlchemy
+ANALYTICS_SUMMARY_PUSHDOWN: bool = True  # exact COUNT/SUM/AVG/MIN/MAX in SQL when rows are capped
+SQL_ANALYSIS_CACHE_SIZE: int = 1024  # analyzed SQL statements kept (shared by validators)
+SQL_ALLOWED_SCHEMAS: list[str] = ["analytics"]  # schemas that may qualify table references
+REQUEST_DISCONNECT_POLL_INTERVAL: float = 0.5  # seconds between client disconnect checks (REST)
+
+# Analytics Streaming Export Configuration (server-side cursor, bounded memory)
+ANALYTICS_STREAM_BATCH_SIZE: int = 1000  # rows fetched per cursor round-trip
+ANALYTICS_EXPORT_MAX_ROWS: int = 1_000_000  # row cap for streamed exports (replaces SQL_MAX_ROWS)
+ANALYTICS_EXPORT_TIMEOUT_MS: int = 300000  # 5 minutes
+
+# Columnar Analytics Engine Configuration (DuckDB over Parquet snapshots)
+ANALYTICS_ENGINES: list[str] = ["postgres", "duckdb"]
+ANALYTICS_DUCKDB_WORKERS: int = 4  # thread pool running DuckDB queries off the event loop
+ANALYTICS_DUCKDB_THREADS: int = 4  # DuckDB worker threads per query
+
+# Query Plan Capture Configuration
+# "off": never, "sampled": random fraction, "slow": queries above threshold,
+# "pre": EXPLAIN before execution (synchronous, for cost gating)
+QUERY_PLAN_CAPTURE_MODES: list[str] = ["off", "sampled", "slow", "pre"]
+QUERY_PLAN_CAPTURE_MODE: str = "slow"
+QUERY_PLAN_SAMPLE_RATE: float = 0.05  # fraction of queries explained in "sampled" mode
+SLOW_QUERY_THRESHOLD_MS: int = 2000
+
+# Analytics Query Log / Index Advisor Configuration (workload-driven index recommendations)
+ANALYTICS_QUERY_LOG_ENABLED: bool = False  # record executed SQL with timing (batched write)
+ANALYTICS_QUERY_LOG_SAMPLE_RATE: float = 0.1  # fraction of executions recorded
+ANALYTICS_QUERY_LOG_FLUSH_INTERVAL: float = 30.0  # seconds between batched writes
+ANALYTICS_QUERY_LOG_BATCH_SIZE: int = 500  # entries per INSERT batch
+ANALYTICS_QUERY_LOG_MAX_PENDING: int = 5000  # buffered entries (newer ones dropped beyond)
+ANALYTICS_INDEX_ADVISOR_LOG_LIMIT: int = 5000  # most recent executions analyzed
+ANALYTICS_INDEX_ADVISOR_MAX_CANDIDATES: int = 20  # candidates evaluated (by workload time)
+ANALYTICS_INDEX_ADVISOR_MAX_COLUMNS: int = 3  # columns in a composite candidate
+ANALYTICS_INDEX_ADVISOR_MIN_ROWS: int = 10000  # smaller tables are scanned cheaply
+ANALYTICS_INDEX_ADVISOR_MIN_IMPROVEMENT: float = 0.2  # min relative cost reduction of a query
+
+# Analytics Rollup Configuration (materialised pre-aggregations for hot GROUP BY shapes)
+ANALYTICS_ROLLUP_MIN_EXECUTIONS: int = 5  # logged executions before a shape gets a rollup
+ANALYTICS_ROLLUP_MAX: int = 10  # rollups created per detection run (by workload time)
+ANALYTICS_ROLLUP_MAX_RATIO: float = 0.1  # max rollup rows relative to its largest source table
+ANALYTICS_ROLLUP_PREFIX: str = "rollup_"  # rollup table name prefix (analytics schema)
+
+# Analytics Document Facts Configuration (commerce extracted fields as a typed, indexed table)
+ANALYTICS_DOCUMENT_FACTS_TABLE: str = "commerce_document_facts"  # analytics schema table
+ANALYTICS_DOCUMENT_FACTS_BATCH_SIZE: int = 500  # documents projected per transaction
+ANALYTICS_DOCUMENT_FACTS_OVERLAP_SECONDS: int = 300  # re-read window behind the watermark
+
+# Approximate Query Configuration (sample tables for exploratory questions)
+ANALYTICS_SAMPLE_FRACTION: float = 0.01  # rows kept in each sample table (Bernoulli sample)
+ANALYTICS_SAMPLE_MIN_ROWS: int = 100000  # smaller tables are always answered exactly
+ANALYTICS_SAMPLE_SUFFIX: str = "__sample"  # sample table name suffix (analytics schema)
+ANALYTICS_STATS_REFRESH_FRACTION: float = 0.1  # loaded rows (share of table) before a refresh
+ANALYTICS_APPROXIMATE_Z: float = 1.96  # normal quantile of the reported margins (95%)
+
+# Query Cost Guard Configuration (planner estimates from EXPLAIN, no ANALYZE)
+ANALYTICS_MAX_QUERY_COST: float = 1_000_000.0  # planner cost units
+ANALYTICS_MAX_PLAN_ROWS: float = 10_000_000.0  # largest row estimate of any plan node
+ANALYTICS_COST_RETRY_ATTEMPTS: int = 1  # planner regenerations with cost feedback
+
+# Analytics Result Cache Configuration (in-process, keyed by SQL + table data versions)
+ANALYTICS_RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64 MB (compressed)
+ANALYTICS_RESULT_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024  # 1 MB (compressed)
+
+# Analytics Query Template Configuration (parametrised SQL, bypasses LLM planning)
+ANALYTICS_TEMPLATE_MATCH_THRESHOLD: float = 0.92  # min cosine similarity to an exemplar question
+ANALYTICS_TEMPLATE_REFRESH_INTERVAL: int = 300  # seconds between template reloads
+ANALYTICS_TEMPLATE_PROMOTION: bool = True  # promote successful LLM plans with slots to templates
+ANALYTICS_TEMPLATE_PROMOTION_CONFIDENCE: float = 0.9  # min planner confidence for promotion
+
+# Analytics Follow-Up Configuration (per-thread retained result, answered locally)
+ANALYTICS_FOLLOWUP_TTL_SECONDS: int = 600  # 10 minutes
+ANALYTICS_FOLLOWUP_MAX_BYTES: int = 2 * 1024 * 1024  # 2 MB per retained result (serialized)
+ANALYTICS_FOLLOWUP_MAX_THREADS: int = 256  # retained results (LRU over threads)
+ANALYTICS_FOLLOWUP_MAX_QUERY_WORDS: int = 25  # longer questions go straight to the database
+
+# Analytics Result Pagination Configuration (result handles, first page inline with the answer)
+ANALYTICS_RESULT_PAGE_SIZE: int = 100  # rows per page (first page is sent with the answer)
+ANALYTICS_RESULT_MAX_PAGE_SIZE: int = 1000  # largest page_size accepted by the results endpoint
+ANALYTICS_RESULT_HANDLE_TTL_SECONDS: int = 1800  # 30 minutes
+ANALYTICS_RESULT_MAX_HANDLES: int = 1024  # open result handles (LRU)
+
+# Analytics Batch Configuration (reports answering many questions at once)
+ANALYTICS_BATCH_MAX_QUESTIONS: int = 100  # questions accepted per batch request
+ANALYTICS_BATCH_CONCURRENCY: int = 4  # questions in flight (below ANALYTICS_DB_POOL_SIZE)
+
+# Analytics Insights Configuration (LLM commentary on results, cached per result hash)
+ANALYTICS_INSIGHTS_TRIVIAL_MAX_COLUMNS: int = 2  # single-row results this narrow get no insights
+ANALYTICS_INSIGHTS_SAMPLE_ROWS: int = 5  # rows shown to the LLM
+ANALYTICS_INSIGHTS_CACHE_SIZE: int = 512  # cached insights (LRU over result hashes)
+ANALYTICS_INSIGHTS_TTL_SECONDS: int = 3600  # 1 hour
+ANALYTICS_INSIGHTS_WAIT_SECONDS: float = 30.0  # max wait for deferred insights (WebSocket frame)
+
+# Analytics Result Normalization Configuration
+NORMALIZER_TYPE_SAMPLE_SIZE: int = 20  # non-null values sampled per column for type inference
+ANALYTICS_CHART_MAX_POINTS: int = 500  # time series above this are downsampled (LTTB)
+
+# Analytics Ingestion Configuration
+INGESTION_MODES: list[str] = ["replace", "append", "upsert"]
+DEFAULT_INGESTION_MODE: str = "replace"
+INGESTION_STAGING_SUFFIX: str = "__staging"  # plus a per-run token (concurrent loads)
+INGESTION_ORDINAL_COLUMN: str = "__ingest_ordinal"  # staging row order (last duplicate key wins)
+
+# Analytics Column Statistics Configuration (computed at ingestion, shown to the planner)
+ANALYTICS_CATEGORICAL_MAX_DISTINCT: int = 50  # TEXT/BOOLEAN columns up to this get top values
+ANALYTICS_COLUMN_TOP_VALUES: int = 20  # most frequent values stored per categorical column
+ANALYTICS_COLUMN_VALUE_MAX_LENGTH: int = 80  # longer min/max/top values are truncated
+
+# Analytics Schema Catalog Configuration
+SCHEMA_CATALOG_REFRESH_INTERVAL: int = 30  # seconds between catalog version checks
+SCHEMA_PRUNING_TOP_K: int = 4  # most relevant tables kept in planner prompt (plus join neighbours)
 
 # Document Processing Configuration
 MAX_FILE_SIZE_MB: int = 10
@@ -68,6 +178,12 @@ DB_MAX_OVERFLOW: int = 10
 DB_POOL_TIMEOUT: int = 30  # seconds
 DB_POOL_RECYCLE: int = 3600  # 1 hour in seconds
 
+# Analytics Database Pool Configuration (separate read-only pool, optional replica)
+ANALYTICS_DB_POOL_SIZE: int = 5
+ANALYTICS_DB_MAX_OVERFLOW: int = 5
+ANALYTICS_DB_POOL_TIMEOUT: int = 10  # seconds (fail fast instead of queueing behind reports)
+ANALYTICS_DB_POOL_RECYCLE: int = 3600  # 1 hour in seconds
+
 # Embeddings Configuration
 EMBEDDING_DIMENSION: int = 1536  # OpenAI text-embedding-3-small dimension
 
@@ -28,7 +28,7 @@ Usage
 
 from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -43,6 +43,11 @@ class Settings(BaseSettings):
 
     Attributes:
         database_url: PostgreSQL database connection URL.
+        analytics_database_url: Connection URL for analytics SQL (e.g. read replica, optional).
+        analytics_engine: Default analytics SQL engine ("postgres" or "duckdb").
+        analytics_snapshot_path: Directory of Parquet snapshots read by the DuckDB engine.
+        analytics_parquet_snapshots: Write Parquet snapshots at ingestion (implied by
+            analytics_engine="duckdb").
         redis_url: Redis connection URL.
         rabbitmq_url: RabbitMQ connection URL.
         openai_api_key: OpenAI API key (required).
@@ -78,6 +83,16 @@ class Settings(BaseSettings):
     )
     debug: bool = Field(default=False, alias="DEBUG")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
+    analytics_database_url: Optional[str] = Field(default=None, alias="ANALYTICS_DATABASE_URL")
+    analytics_engine: Literal["postgres", "duckdb"] = Field(
+        default="postgres",
+        alias="ANALYTICS_ENGINE",
+    )
+    analytics_snapshot_path: str = Field(
+        default="./data/analytics_snapshots",
+        alias="ANALYTICS_SNAPSHOT_PATH",
+    )
+    analytics_parquet_snapshots: bool = Field(default=False, alias="ANALYTICS_PARQUET_SNAPSHOTS")
     openai_model: str = Field(default="gpt-4o-mini", alias="OPENAI_MODEL")
     openai_embedding_model: str = Field(
         default="text-embedding-3-small",
@@ -103,6 +103,7 @@ class SQLMetadata(BaseModel):
         execution_time_ms: Query execution time in milliseconds (optional).
         rows_returned: Number of rows returned (optional).
         query_plan: Query execution plan (optional).
+        approximate: Whether the result was estimated from a sample table.
     """
 
     sql: str = Field(..., description="Generated SQL query")
@@ -121,6 +122,10 @@ class SQLMetadata(BaseModel):
         None,
         description="Query execution plan (optional)",
     )
+    approximate: bool = Field(
+        False,
+        description="Whether the result was estimated from a sample table",
+    )
 
 
 class DocumentMetadata(BaseModel):
@@ -9,6 +9,8 @@ Overview
 Design
   - **Node Functions**: All nodes are async functions (state -> state).
   - **Error Handling**: Nodes handle errors gracefully without breaking graph execution.
+  - **Cancellation**: Cancellation (client disconnect) is never turned into an error answer;
+    it propagates after sessions are released, so in-flight queries stop.
   - **Dependency Injection**: Nodes obtain agent instances (singleton or DI).
   - **Logging**: Comprehensive logging for observability.
 
@@ -24,6 +26,7 @@ Usage
   >>> state = await knowledge_node(state)
 """
 
+import asyncio
 import logging
 from typing import Any
 
@@ -176,18 +179,19 @@ async def analytics_node(state: GraphState) -> GraphState:
         from app.agents.analytics import AnalyticsAgent
         from app.infrastructure.llm import get_llm_client
         from app.infrastructure.cache import get_cache_manager
-        from app.infrastructure.database.repositories import PostgreSQLAnalyticsRepository
-        from app.infrastructure.database.connection import get_db_session
-        from app.routing.allowlist import AllowlistValidator
+        from app.infrastructure.database.repositories import create_analytics_repository
+        from app.infrastructure.database.connection import get_analytics_session
+        from app.routing.allowlist import get_allowlist_validator
 
         # Get agent instance
         llm_client = get_llm_client()
         cache = get_cache_manager()
-        allowlist_validator = AllowlistValidator()
+        allowlist_validator = get_allowlist_validator()
 
-        # Get database session for repository
-        async with get_db_session() as session:
-            repository = PostgreSQLAnalyticsRepository(session)
+        # Get read-only analytics session for repository (separate pool); the
+        # engine is the per-query choice, or the deployment default
+        async with get_analytics_session() as session:
+            repository = create_analytics_repository(session, state.get("analytics_engine"))
             agent = AnalyticsAgent(llm_client, repository, allowlist_validator, cache)
 
             # Process state
@@ -209,6 +213,13 @@ async def analytics_node(state: GraphState) -> GraphState:
             )
 
             return updated_state
+    except asyncio.CancelledError:
+        # Session (and its connection) already released by the context manager
+        logger.info(
+            "Analytics node cancelled",
+            extra={"thread_id": state.get("thread_id"), "user_id": state.get("user_id")},
+        )
+        raise
     except Exception as e:
         logger.error(
             f"Analytics node failed: {e}",
@@ -61,6 +61,9 @@ class GraphState(TypedDict, total=False):
         suggestions: Suggestions from triage agent (optional).
         sql: SQL query for approval (optional, for analytics agent interrupts).
         agent: Current agent name (optional, for interrupts).
+        approximate: Approximate (sampled) analytics execution requested (optional).
+        analytics_engine: Analytics SQL engine requested (optional, "postgres" or "duckdb").
+        defer_insights: Deliver analytics insights after the answer (optional, streaming).
     """
 
     # Required fields
@@ -91,4 +94,7 @@ class GraphState(TypedDict, total=False):
     # Analytics agent specific fields (for interrupts)
     sql: Optional[str]
     agent: Optional[str]
+    approximate: Optional[bool]
+    analytics_engine: Optional[str]
+    defer_insights: Optional[bool]
 
@@ -10,6 +10,7 @@ Design
   - **Async Operations**: All database operations are async using asyncpg.
   - **Connection Pooling**: Configurable pool size and overflow.
   - **Session Management**: Context manager for automatic commit/rollback.
+  - **Analytics Pool**: Separate read-only pool (optionally a replica) for analytics SQL.
   - **Model Organization**: Models organized by domain (knowledge, analytics, commerce, conversation).
 
 Integration
@@ -27,6 +28,9 @@ Usage
 
 # Connection Management
 from app.infrastructure.database.connection import (
+    close_db_engines,
+    get_analytics_engine,
+    get_analytics_session,
     get_db_engine,
     get_db_session,
     init_db,
@@ -39,6 +43,9 @@ __all__ = [
     # Connection Management
     "get_db_session",
     "get_db_engine",
+    "get_analytics_session",
+    "get_analytics_engine",
+    "close_db_engines",
     "init_db",
     # Base Models
     "Base",
@@ -10,12 +10,16 @@ Design
   - **Async Engine**: Uses asyncpg driver for non-blocking database operations.
   - **Connection Pooling**: Configurable pool size and overflow for scalability.
   - **Session Management**: Context manager pattern for automatic commit/rollback.
+  - **Analytics Pool**: Separate engine for analytics SQL (own pool size and timeout,
+    optional read replica via ANALYTICS_DATABASE_URL, read-only connections), so long
+    analytical queries cannot starve chat persistence.
   - **Dependencies**: Requires app.config.settings for database URL and app.config.constants for pool settings.
 
 Integration
-  - Consumes: Database URL from settings, pool constants from app.config.constants.
-  - Returns: Async session context manager and engine.
-  - Used by: All repository classes and database operations.
+  - Consumes: Database URLs from settings, pool constants from app.config.constants.
+  - Returns: Async session context managers and engines.
+  - Used by: All repository classes and database operations (analytics SQL uses
+    get_analytics_session).
   - Observability: Connection pool metrics, query timing.
 
 Usage
@@ -23,8 +27,11 @@ Usage
   >>> async with get_db_session() as session:
   ...     result = await session.execute(select(User))
   ...     users = result.scalars().all()
+  >>> async with get_analytics_session() as session:
+  ...     rows = await PostgreSQLAnalyticsRepository(session).execute_sql(sql)
 """
 
+import asyncio
 import contextlib
 from typing import AsyncGenerator
 
@@ -36,6 +43,10 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from app.config.constants import (
+    ANALYTICS_DB_MAX_OVERFLOW,
+    ANALYTICS_DB_POOL_RECYCLE,
+    ANALYTICS_DB_POOL_SIZE,
+    ANALYTICS_DB_POOL_TIMEOUT,
     DB_MAX_OVERFLOW,
     DB_POOL_RECYCLE,
     DB_POOL_SIZE,
@@ -46,6 +57,20 @@ from app.config.settings import get_settings
 # Lazy initialization - engine created on first access
 _engine: AsyncEngine | None = None
 _AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+_analytics_engine: AsyncEngine | None = None
+_AnalyticsSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+
+def _to_async_url(database_url: str) -> str:
+    """Convert postgresql:// URL to postgresql+asyncpg:// for async driver.
+
+    Args:
+        database_url: PostgreSQL connection URL.
+
+    Returns:
+        Async driver connection URL.
+    """
+    return database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
 
 
 def _get_engine() -> AsyncEngine:
@@ -60,15 +85,9 @@ def _get_engine() -> AsyncEngine:
     global _engine
     if _engine is None:
         settings = get_settings()
-        # Convert postgresql:// to postgresql+asyncpg:// for async driver
-        database_url = settings.database_url.replace(
-            "postgresql://",
-            "postgresql+asyncpg://",
-            1,
-        )
         # Create async engine with connection pooling
         _engine = create_async_engine(
-            database_url,
+            _to_async_url(settings.database_url),
             pool_size=DB_POOL_SIZE,
             max_overflow=DB_MAX_OVERFLOW,
             pool_timeout=DB_POOL_TIMEOUT,
@@ -101,6 +120,54 @@ def _get_session_factory() -> async_sessionmaker[AsyncSession]:
     return _AsyncSessionLocal
 
 
+def _get_analytics_engine() -> AsyncEngine:
+    """Get or create async engine for analytics SQL.
+
+    Uses ANALYTICS_DATABASE_URL (e.g. a read replica) when set, otherwise
+    the primary database with a separate, smaller pool. Connections are
+    read-only at the server level (default_transaction_read_only).
+
+    Returns:
+        AsyncEngine: Async analytics engine.
+    """
+    global _analytics_engine
+    if _analytics_engine is None:
+        settings = get_settings()
+        _analytics_engine = create_async_engine(
+            _to_async_url(settings.analytics_database_url or settings.database_url),
+            pool_size=ANALYTICS_DB_POOL_SIZE,
+            max_overflow=ANALYTICS_DB_MAX_OVERFLOW,
+            pool_timeout=ANALYTICS_DB_POOL_TIMEOUT,
+            pool_recycle=ANALYTICS_DB_POOL_RECYCLE,
+            echo=settings.debug,
+            connect_args={
+                "server_settings": {
+                    "default_transaction_read_only": "on",
+                    "application_name": "analytics",
+                },
+            },
+        )
+    return _analytics_engine
+
+
+def _get_analytics_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Get or create async session factory for analytics SQL.
+
+    Returns:
+        async_sessionmaker: Async analytics session factory.
+    """
+    global _AnalyticsSessionLocal
+    if _AnalyticsSessionLocal is None:
+        _AnalyticsSessionLocal = async_sessionmaker(
+            bind=_get_analytics_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+        )
+    return _AnalyticsSessionLocal
+
+
 @contextlib.asynccontextmanager
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     """Get async database session with automatic commit/rollback.
@@ -125,6 +192,43 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     except Exception:
         await session.rollback()
         raise
+    finally:
+        # Shielded so a cancelled request still returns its connection to the pool
+        await asyncio.shield(session.close())
+
+
+@contextlib.asynccontextmanager
+async def get_analytics_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get read-only async session from the analytics pool.
+
+    Used for analytics SQL and analytics metadata reads. Writes fail
+    (read-only connections); use get_db_session for those.
+
+    Yields:
+        AsyncSession: Read-only database session.
+
+    Example:
+        >>> async with get_analytics_session() as session:
+        ...     rows = await PostgreSQLAnalyticsRepository(session).execute_sql(sql)
+    """
+    AnalyticsSessionLocal = _get_analytics_session_factory()
+    session = AnalyticsSessionLocal()
+    try:
+        yield session
+    finally:
+        # Nothing to commit: connections are read-only. Shielded so a cancelled
+        # request (client disconnect) still returns its connection to the pool.
+        await asyncio.shield(_release_session(session))
+
+
+async def _release_session(session: AsyncSession) -> None:
+    """Roll back and close a read-only session (returns its connection to the pool).
+
+    Args:
+        session: Analytics session.
+    """
+    try:
+        await session.rollback()
     finally:
         await session.close()
 
@@ -141,6 +245,25 @@ def get_db_engine() -> AsyncEngine:
     return _get_engine()
 
 
+def get_analytics_engine() -> AsyncEngine:
+    """Get async analytics engine.
+
+    Returns:
+        AsyncEngine: Global async analytics engine.
+    """
+    return _get_analytics_engine()
+
+
+async def close_db_engines() -> None:
+    """Dispose all created engines (primary and analytics) on shutdown."""
+    global _engine, _AsyncSessionLocal, _analytics_engine, _AnalyticsSessionLocal
+    for engine in (_engine, _analytics_engine):
+        if engine is not None:
+            await engine.dispose()
+    _engine, _AsyncSessionLocal = None, None
+    _analytics_engine, _AnalyticsSessionLocal = None, None
+
+
 async def init_db() -> None:
     """Initialize database by creating all tables.
 
@@ -29,8 +29,13 @@ from app.infrastructure.database.models.knowledge import Document, DocumentChunk
 
 # Analytics Models
 from app.infrastructure.database.models.analytics import (
+    AnalyticsCatalogVersion,
     AnalyticsColumn,
+    AnalyticsQueryLog,
+    AnalyticsQueryTemplate,
+    AnalyticsRollup,
     AnalyticsTable,
+    AnalyticsTemplateExemplar,
 )
 
 # Commerce Models
@@ -54,6 +59,11 @@ __all__ = [
     # Analytics Models
     "AnalyticsTable",
     "AnalyticsColumn",
+    "AnalyticsCatalogVersion",
+    "AnalyticsQueryTemplate",
+    "AnalyticsTemplateExemplar",
+    "AnalyticsQueryLog",
+    "AnalyticsRollup",
     # Commerce Models
     "CommerceDocument",
     # Conversation Models
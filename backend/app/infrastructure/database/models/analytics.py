@@ -11,12 +11,27 @@ Design
   - **Metadata Only**: These models store metadata, not the actual data tables.
   - **JSONB Schema**: Uses JSONB for flexible schema definition storage.
   - **Cascade Delete**: Deleting table metadata cascades to delete column metadata.
+  - **Schema Embeddings**: Table and column descriptions embedded at ingestion
+    (pgvector) for query-time schema pruning.
   - **Relationships**: Bidirectional relationships with back_populates.
+  - **Catalog Version**: Single-row version counter bumped on every schema change.
+  - **Data Version**: Per-table counter bumped on every load (result cache keys).
+  - **Column Statistics**: Distinct counts, min/max and top values per column (planner
+    literals and display suggestions).
+  - **Sample Fraction**: Fraction of rows in the table's sample table, if one was built
+    (approximate answers).
+  - **Query Templates**: Validated parametrised SQL with embedded exemplar questions
+    (planner bypass for recurring question shapes).
+  - **Query Log**: Executed analytics SQL with timing (workload for the index advisor).
+  - **Rollups**: Materialised pre-aggregations detected from the query log (the
+    materialised views themselves live in the analytics schema).
 
 Integration
-  - Consumes: None (pure metadata models).
-  - Returns: AnalyticsTable and AnalyticsColumn model classes.
-  - Used by: Analytics agent, schema builder, allowlist validation.
+  - Consumes: pgvector, constants.
+  - Returns: AnalyticsTable, AnalyticsColumn, AnalyticsCatalogVersion, AnalyticsQueryTemplate,
+    AnalyticsTemplateExemplar, AnalyticsQueryLog and AnalyticsRollup model classes.
+  - Used by: Analytics agent, schema builder, allowlist validation, template library,
+    index advisor, rollup manager.
   - Observability: N/A (models only).
 
 Usage
@@ -30,10 +45,12 @@ Note:
     processing CSVs. These models only store metadata about those tables.
 """
 
-from sqlalchemy import Boolean, Column, ForeignKey, Text
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, Text
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import relationship
 
+from app.config.constants import EMBEDDING_DIMENSION
 from app.infrastructure.database.models.base import BaseModel
 
 
@@ -50,6 +67,10 @@ class AnalyticsTable(BaseModel):
         schema_definition: Complete schema definition as JSON (columns, constraints, etc.).
         source_csv: Source CSV filename (optional).
         is_active: Whether table is active.
+        embedding: Embedding of table name, description and columns (optional).
+        data_version: Counter bumped by each ingestion that loads data into the table.
+        sample_fraction: Fraction of rows kept in the sample table (None if no sample).
+        rows_since_stats: Rows loaded since the sample and column statistics were refreshed.
         columns: Relationship to column metadata (one-to-many).
 
     Note:
@@ -64,6 +85,10 @@ class AnalyticsTable(BaseModel):
     schema_definition = Column(JSON, nullable=False)
     source_csv = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
+    embedding = Column(Vector(EMBEDDING_DIMENSION), nullable=True)
+    data_version = Column(Integer, default=1, nullable=False)
+    sample_fraction = Column(Float, nullable=True)
+    rows_since_stats = Column(Integer, default=0, nullable=False)
 
     # Relationships
     columns = relationship(
@@ -88,6 +113,12 @@ class AnalyticsColumn(BaseModel):
         is_foreign_key: Whether column is a foreign key.
         foreign_key_reference: Foreign key reference (e.g., "customers(customer_id)").
         is_indexed: Whether column has an index.
+        embedding: Embedding of column description (optional).
+        distinct_count: Number of distinct non-null values (computed at ingestion).
+        min_value: Smallest value as text (optional, computed at ingestion).
+        max_value: Largest value as text (optional, computed at ingestion).
+        top_values: Most frequent values of low-cardinality TEXT/BOOLEAN columns,
+            most frequent first (optional, computed at ingestion).
         table: Relationship to parent table metadata (many-to-one).
 
     Note:
@@ -108,7 +139,141 @@ class AnalyticsColumn(BaseModel):
     is_foreign_key = Column(Boolean, default=False, nullable=False)
     foreign_key_reference = Column(Text, nullable=True)
     is_indexed = Column(Boolean, default=False, nullable=False)
+    embedding = Column(Vector(EMBEDDING_DIMENSION), nullable=True)
+    distinct_count = Column(Integer, nullable=True)
+    min_value = Column(Text, nullable=True)
+    max_value = Column(Text, nullable=True)
+    top_values = Column(JSON, nullable=True)
 
     # Relationships
     table = relationship("AnalyticsTable", back_populates="columns")
 
+
+
+class AnalyticsCatalogVersion(BaseModel):
+    """Model for the analytics schema catalog version.
+
+    Single-row counter bumped by the AnalyticsSchemaBuilder whenever table
+    or column metadata changes. Lets in-process schema caches detect changes
+    with one cheap lookup instead of reloading the full catalog.
+
+    Attributes:
+        version: Monotonic catalog version (starts at 1).
+    """
+
+    __tablename__ = "analytics_catalog_versions"
+
+    version = Column(Integer, default=1, nullable=False)
+
+
+class AnalyticsQueryTemplate(BaseModel):
+    """Model for parametrised analytics SQL templates.
+
+    Stores validated SQL with named slots (":limit", ":date_from", ...)
+    that the template library fills from the question instead of asking
+    the LLM to plan it.
+
+    Attributes:
+        name: Template name (unique).
+        sql_template: SQL with named slot placeholders.
+        slots: Slot definitions as JSON ({name: {"type", "default", "values"}}).
+        explanation: Explanation shown with the answer.
+        tables_used: Tables referenced by the SQL.
+        columns_used: Columns referenced by the SQL.
+        source: "curated" (reviewed) or "promoted" (from a successful LLM plan).
+        is_active: Whether template is used for matching.
+        exemplars: Relationship to exemplar questions (one-to-many).
+
+    Note:
+        Deleting a template cascades to delete its exemplars.
+    """
+
+    __tablename__ = "analytics_query_templates"
+
+    name = Column(Text, nullable=False, unique=True)
+    sql_template = Column(Text, nullable=False)
+    slots = Column(JSON, nullable=False, default=dict)
+    explanation = Column(Text, nullable=True)
+    tables_used = Column(JSON, nullable=False, default=list)
+    columns_used = Column(JSON, nullable=False, default=list)
+    source = Column(Text, nullable=False, default="curated")
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    # Relationships
+    exemplars = relationship(
+        "AnalyticsTemplateExemplar",
+        back_populates="template",
+        cascade="all, delete-orphan",
+    )
+
+
+class AnalyticsTemplateExemplar(BaseModel):
+    """Model for exemplar questions of a query template.
+
+    Attributes:
+        template_id: Foreign key to parent template.
+        question: Exemplar question in natural language.
+        embedding: Embedding of the question (nearest neighbour matching).
+        template: Relationship to parent template (many-to-one).
+    """
+
+    __tablename__ = "analytics_template_exemplars"
+
+    template_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("analytics_query_templates.id"),
+        nullable=False,
+    )
+    question = Column(Text, nullable=False)
+    embedding = Column(Vector(EMBEDDING_DIMENSION), nullable=True)
+
+    # Relationships
+    template = relationship("AnalyticsQueryTemplate", back_populates="exemplars")
+
+
+class AnalyticsQueryLog(BaseModel):
+    """Model for executed analytics queries.
+
+    One row per database execution (result cache hits are not logged),
+    recorded off the response path by the AnalyticsExecutor.
+
+    Attributes:
+        sql: Executed SQL.
+        sql_hash: SHA-256 of the SQL (workload aggregation).
+        execution_time_ms: Execution time in milliseconds.
+        row_count: Rows returned.
+        query_plan: EXPLAIN plan when one was captured (optional).
+    """
+
+    __tablename__ = "analytics_query_log"
+
+    sql = Column(Text, nullable=False)
+    sql_hash = Column(Text, nullable=False, index=True)
+    execution_time_ms = Column(Float, nullable=False)
+    row_count = Column(Integer, nullable=False, default=0)
+    query_plan = Column(JSON, nullable=True)
+
+
+class AnalyticsRollup(BaseModel):
+    """Model for materialised rollup definitions.
+
+    One row per materialised view created by the RollupManager. The rollup
+    is also registered as an AnalyticsTable (same name) so the planner sees it.
+
+    Attributes:
+        name: Materialised view name in the analytics schema (unique).
+        sql: Defining SELECT statement.
+        source_tables: Tables the rollup aggregates (refreshed after their ingestion).
+        keys: Grouping keys as [{"name", "expression"}].
+        measures: Additive measures as [{"name", "function", "argument"}].
+        executions: Logged executions of the shape when the rollup was created.
+    """
+
+    __tablename__ = "analytics_rollups"
+
+    name = Column(Text, nullable=False, unique=True)
+    sql = Column(Text, nullable=False)
+    source_tables = Column(JSON, nullable=False)
+    keys = Column(JSON, nullable=False)
+    measures = Column(JSON, nullable=False)
+    executions = Column(Integer, nullable=False, default=0)
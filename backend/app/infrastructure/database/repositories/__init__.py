@@ -30,6 +30,11 @@ from app.infrastructure.database.repositories.commerce_repo import (
     CommerceRepository,
     PostgreSQLCommerceRepository,
 )
+from app.infrastructure.database.repositories.duckdb_analytics_repo import (
+    DuckDBAnalyticsRepository,
+    ParquetSnapshotStore,
+    create_analytics_repository,
+)
 from app.infrastructure.database.repositories.knowledge_repo import (
     KnowledgeRepository,
     PostgreSQLKnowledgeRepository,
@@ -40,6 +45,9 @@ __all__ = [
     "PostgreSQLKnowledgeRepository",
     "AnalyticsRepository",
     "PostgreSQLAnalyticsRepository",
+    "DuckDBAnalyticsRepository",
+    "ParquetSnapshotStore",
+    "create_analytics_repository",
     "CommerceRepository",
     "PostgreSQLCommerceRepository",
 ]
@@ -9,7 +9,18 @@ Overview
 Design
   - **Repository Pattern**: Abstract interface with PostgreSQL implementation.
   - **Secure Execution**: Read-only transactions, timeout, row limits.
+  - **Streaming**: Server-side cursor yields row batches with bounded memory (exports).
+  - **asyncpg Fast Path**: Unparameterized queries run on the pooled asyncpg connection
+    (transaction mode and timeout in one round trip, cached prepared statements, a
+    portal fetching at most SQL_MAX_ROWS rows).
+  - **Caller Transactions**: Read-only work never commits a transaction the caller has
+    open on the session; it runs on a separate pooled connection instead.
   - **Parameterized Queries**: Always uses parameterized queries for safety.
+  - **Cancellation**: Cancelling the calling task (client disconnect) cancels the running
+    statement on the server (asyncpg cancel request) instead of waiting for the timeout;
+    the connection is rolled back, or discarded, before it returns to the pool.
+  - **Query Log**: Executed SQL with timing; table statistics and HypoPG plans for the
+    index advisor.
 
 Integration
   - Consumes: Database models, SQLAlchemy async session, constants.
@@ -22,18 +33,36 @@ Usage
   >>> repo = PostgreSQLAnalyticsRepository(session)
   >>> tables = await repo.get_all_tables()
   >>> results = await repo.execute_sql("SELECT * FROM analytics.orders LIMIT 10")
+  >>> async for columns, rows in repo.stream_sql("SELECT * FROM analytics.orders"):
+  ...     write(rows)
 """
 
+import contextlib
+import hashlib
+import json
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple
 
-from sqlalchemy import select, text
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.config.constants import SQL_MAX_ROWS, SQL_TIMEOUT_MS
+from app.config.constants import (
+    ANALYTICS_ASYNCPG_FAST_PATH,
+    ANALYTICS_STREAM_BATCH_SIZE,
+    SQL_MAX_ROWS,
+    SQL_TIMEOUT_MS,
+)
 from app.config.exceptions import DatabaseException
-from app.infrastructure.database.models.analytics import AnalyticsColumn, AnalyticsTable
+from app.infrastructure.database.models.analytics import (
+    AnalyticsCatalogVersion,
+    AnalyticsColumn,
+    AnalyticsQueryLog,
+    AnalyticsQueryTemplate,
+    AnalyticsTable,
+    AnalyticsTemplateExemplar,
+)
 
 
 class AnalyticsRepository(ABC):
@@ -42,12 +71,21 @@ class AnalyticsRepository(ABC):
     Defines interface for analytics data access operations.
     Concrete implementations provide database-specific logic.
 
+    Attributes:
+        engine: Analytics engine the repository executes on ("postgres", "duckdb").
+
     Methods:
         get_all_tables: List all analytics tables.
         get_table_by_name: Get table by name.
+        get_catalog_version: Get current schema catalog version.
+        get_query_templates: List active query templates.
+        save_query_template: Create a template or add an exemplar to it.
         execute_sql: Execute SQL securely.
+        explain_sql: Get query plan securely.
     """
 
+    engine: str
+
     @abstractmethod
     async def get_all_tables(self) -> List[AnalyticsTable]:
         """Get all analytics tables.
@@ -69,6 +107,55 @@ class AnalyticsRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def get_catalog_version(self) -> int:
+        """Get current schema catalog version.
+
+        Returns:
+            Catalog version (0 if no schema has been built yet).
+        """
+        pass
+
+    @abstractmethod
+    async def get_query_templates(self) -> List[AnalyticsQueryTemplate]:
+        """Get all active query templates.
+
+        Returns:
+            List of AnalyticsQueryTemplate objects with exemplars loaded.
+        """
+        pass
+
+    @abstractmethod
+    async def save_query_template(
+        self,
+        name: str,
+        sql_template: str,
+        slots: Dict[str, Any],
+        question: str,
+        embedding: Optional[List[float]],
+        explanation: str = "",
+        tables_used: Optional[List[str]] = None,
+        columns_used: Optional[List[str]] = None,
+        source: str = "curated",
+    ) -> AnalyticsQueryTemplate:
+        """Create a query template, or add an exemplar to an existing one.
+
+        Args:
+            name: Template name (used when creating).
+            sql_template: SQL with named slot placeholders (identifies the template).
+            slots: Slot definitions.
+            question: Exemplar question.
+            embedding: Exemplar question embedding (optional).
+            explanation: Explanation shown with answers.
+            tables_used: Tables referenced by the SQL.
+            columns_used: Columns referenced by the SQL.
+            source: "curated" or "promoted".
+
+        Returns:
+            Created or updated AnalyticsQueryTemplate.
+        """
+        pass
+
     @abstractmethod
     async def execute_sql(
         self,
@@ -91,6 +178,119 @@ class AnalyticsRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def stream_sql(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+        batch_size: int = ANALYTICS_STREAM_BATCH_SIZE,
+        timeout_ms: int = SQL_TIMEOUT_MS,
+    ) -> AsyncIterator[Tuple[List[str], List[Tuple[Any, ...]]]]:
+        """Stream SQL results in batches (read-only, timeout, no row cap).
+
+        Callers bound the result size (e.g. LIMIT in the SQL).
+
+        Args:
+            sql: SQL query to execute.
+            params: Query parameters (optional).
+            batch_size: Rows per batch.
+            timeout_ms: Statement timeout in milliseconds.
+
+        Yields:
+            Tuples of (column names, row tuples) per batch.
+
+        Raises:
+            DatabaseException: If execution fails.
+        """
+        pass
+
+    @abstractmethod
+    async def explain_sql(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Get query plan securely (EXPLAIN without ANALYZE).
+
+        Args:
+            sql: SQL query to explain.
+            params: Query parameters (optional).
+
+        Returns:
+            Query plan dictionary, or None if unavailable.
+
+        Raises:
+            DatabaseException: If explain fails.
+        """
+        pass
+
+    @abstractmethod
+    async def record_queries(self, entries: List[Dict[str, Any]]) -> None:
+        """Record a batch of executed queries in the query log.
+
+        Args:
+            entries: Dictionaries with sql, execution_time_ms, row_count and
+                query_plan (optional).
+
+        Raises:
+            DatabaseException: If recording fails.
+        """
+        pass
+
+    @abstractmethod
+    async def get_query_log(self, limit: int) -> List[AnalyticsQueryLog]:
+        """Get the most recent query log entries.
+
+        Args:
+            limit: Maximum number of entries.
+
+        Returns:
+            List of AnalyticsQueryLog objects, newest first.
+        """
+        pass
+
+    @abstractmethod
+    async def prune_query_log(self, older_than_days: int) -> int:
+        """Delete query log entries older than the given age.
+
+        Args:
+            older_than_days: Age in days.
+
+        Returns:
+            Number of deleted entries.
+        """
+        pass
+
+    @abstractmethod
+    async def get_table_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Get planner statistics of analytics data tables.
+
+        Returns:
+            Dictionary mapping table name to {"row_estimate": float,
+            "indexes": list of indexed column lists}.
+        """
+        pass
+
+    @abstractmethod
+    async def explain_with_hypothetical_index(
+        self,
+        sql: str,
+        index_sql: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Get query plan as if an index existed (HypoPG extension).
+
+        Args:
+            sql: SQL query to explain.
+            index_sql: CREATE INDEX statement of the hypothetical index.
+
+        Returns:
+            Query plan dictionary, or None if empty.
+
+        Raises:
+            DatabaseException: If HypoPG is unavailable or explain fails.
+        """
+        pass
+
 
 class PostgreSQLAnalyticsRepository(AnalyticsRepository):
     """PostgreSQL implementation of analytics repository.
@@ -99,6 +299,8 @@ class PostgreSQLAnalyticsRepository(AnalyticsRepository):
     secure SQL execution (read-only, timeout, row limits).
     """
 
+    engine = "postgres"
+
     def __init__(self, session: AsyncSession) -> None:
         """Initialize PostgreSQL analytics repository.
 
@@ -155,6 +357,110 @@ class PostgreSQLAnalyticsRepository(AnalyticsRepository):
                 details={"error": str(e), "table_name": name},
             ) from e
 
+    async def get_catalog_version(self) -> int:
+        """Get current schema catalog version.
+
+        Single-row lookup used by the schema catalog to detect changes.
+
+        Returns:
+            Catalog version (0 if no schema has been built yet).
+        """
+        try:
+            result = await self._session.execute(
+                select(func.max(AnalyticsCatalogVersion.version)),
+            )
+            return result.scalar() or 0
+        except Exception as e:
+            raise DatabaseException(
+                message=f"Failed to retrieve catalog version: {str(e)}",
+                details={"error": str(e)},
+            ) from e
+
+    async def get_query_templates(self) -> List[AnalyticsQueryTemplate]:
+        """Get all active query templates.
+
+        Returns:
+            List of AnalyticsQueryTemplate objects with exemplars loaded.
+        """
+        try:
+            query = (
+                select(AnalyticsQueryTemplate)
+                .where(AnalyticsQueryTemplate.is_active == True)  # noqa: E712
+                .options(selectinload(AnalyticsQueryTemplate.exemplars))
+            )
+            result = await self._session.execute(query)
+            return list(result.scalars().all())
+        except Exception as e:
+            raise DatabaseException(
+                message=f"Failed to retrieve query templates: {str(e)}",
+                details={"error": str(e)},
+            ) from e
+
+    async def save_query_template(
+        self,
+        name: str,
+        sql_template: str,
+        slots: Dict[str, Any],
+        question: str,
+        embedding: Optional[List[float]],
+        explanation: str = "",
+        tables_used: Optional[List[str]] = None,
+        columns_used: Optional[List[str]] = None,
+        source: str = "curated",
+    ) -> AnalyticsQueryTemplate:
+        """Create a query template, or add an exemplar to an existing one.
+
+        Templates are identified by their SQL; an existing template only
+        gains the exemplar (if the question is new).
+
+        Args:
+            name: Template name (used when creating).
+            sql_template: SQL with named slot placeholders (identifies the template).
+            slots: Slot definitions.
+            question: Exemplar question.
+            embedding: Exemplar question embedding (optional).
+            explanation: Explanation shown with answers.
+            tables_used: Tables referenced by the SQL.
+            columns_used: Columns referenced by the SQL.
+            source: "curated" or "promoted".
+
+        Returns:
+            Created or updated AnalyticsQueryTemplate.
+        """
+        try:
+            result = await self._session.execute(
+                select(AnalyticsQueryTemplate)
+                .where(AnalyticsQueryTemplate.sql_template == sql_template)
+                .options(selectinload(AnalyticsQueryTemplate.exemplars)),
+            )
+            template = result.scalars().first()
+
+            if template is None:
+                template = AnalyticsQueryTemplate(
+                    name=name,
+                    sql_template=sql_template,
+                    slots=slots,
+                    explanation=explanation,
+                    tables_used=tables_used or [],
+                    columns_used=columns_used or [],
+                    source=source,
+                    exemplars=[],
+                )
+                self._session.add(template)
+
+            if all(exemplar.question != question for exemplar in template.exemplars):
+                template.exemplars.append(
+                    AnalyticsTemplateExemplar(question=question, embedding=embedding),
+                )
+
+            await self._session.flush()
+            return template
+        except Exception as e:
+            raise DatabaseException(
+                message=f"Failed to save query template: {str(e)}",
+                details={"error": str(e), "template_name": name},
+            ) from e
+
     async def execute_sql(
         self,
         sql: str,
@@ -164,6 +470,7 @@ class PostgreSQLAnalyticsRepository(AnalyticsRepository):
 
         Executes SQL in a read-only transaction with timeout and row limits
         for security and performance. Always uses parameterized queries.
+        Queries without parameters take the asyncpg fast path when available.
 
         Args:
             sql: SQL query to execute (must be SELECT only).
@@ -175,20 +482,15 @@ class PostgreSQLAnalyticsRepository(AnalyticsRepository):
         Raises:
             DatabaseException: If execution fails or query is invalid.
         """
-        try:
-            # Start transaction with read-only and timeout settings
-            async with self._session.begin():
-                # Set read-only transaction
-                await self._session.execute(
-                    text("SET LOCAL default_transaction_read_only = on"),
-                )
-                # Set statement timeout
-                await self._session.execute(
-                    text(f"SET LOCAL statement_timeout = {SQL_TIMEOUT_MS}"),
-                )
+        if ANALYTICS_ASYNCPG_FAST_PATH and not params:
+            rows = await self._execute_fast(sql)
+            if rows is not None:
+                return rows
 
+        try:
+            async with self._read_only_transaction() as connection:
                 # Execute SQL with parameters (parameterized query)
-                result = await self._session.execute(text(sql), params or {})
+                result = await connection.execute(text(sql), params or {})
 
                 # Fetch results with row limit (client-side)
                 rows = result.fetchmany(SQL_MAX_ROWS)
@@ -208,3 +510,356 @@ class PostgreSQLAnalyticsRepository(AnalyticsRepository):
                 details={"error": str(e), "sql": sql[:200]},
             ) from e
 
+    async def stream_sql(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+        batch_size: int = ANALYTICS_STREAM_BATCH_SIZE,
+        timeout_ms: int = SQL_TIMEOUT_MS,
+    ) -> AsyncGenerator[Tuple[List[str], List[Tuple[Any, ...]]], None]:
+        """Stream SQL results in batches through a server-side cursor.
+
+        Rows are fetched batch_size at a time inside a read-only transaction,
+        so memory stays bounded and the first batch is available as soon as
+        the database produces it. No client-side row cap is applied.
+
+        Args:
+            sql: SQL query to execute (must be SELECT only).
+            params: Query parameters for parameterized query (optional).
+            batch_size: Rows per batch.
+            timeout_ms: Statement timeout in milliseconds.
+
+        Yields:
+            Tuples of (column names, row tuples) per batch.
+
+        Raises:
+            DatabaseException: If execution fails.
+        """
+        try:
+            async with self._read_only_transaction(timeout_ms) as connection:
+                result = await connection.stream(text(sql), params or {})
+                columns = list(result.keys())
+                async for partition in result.partitions(batch_size):
+                    yield columns, [tuple(row) for row in partition]
+        except Exception as e:
+            raise DatabaseException(
+                message=f"Failed to stream SQL: {str(e)}",
+                details={"error": str(e), "sql": sql[:200]},
+            ) from e
+
+    async def explain_sql(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Get query plan with EXPLAIN (FORMAT JSON), without executing the query.
+
+        Runs in the same read-only transaction with timeout as execute_sql.
+
+        Args:
+            sql: SQL query to explain.
+            params: Query parameters (optional).
+
+        Returns:
+            Top-level plan dictionary ({"Plan": {...}, ...}), or None if empty.
+
+        Raises:
+            DatabaseException: If explain fails.
+        """
+        try:
+            async with self._read_only_transaction() as connection:
+                result = await connection.execute(
+                    text(f"EXPLAIN (FORMAT JSON) {sql}"),
+                    params or {},
+                )
+                plan_data = result.scalar()
+        except Exception as e:
+            raise DatabaseException(
+                message=f"Failed to explain SQL: {str(e)}",
+                details={"error": str(e), "sql": sql[:200]},
+            ) from e
+
+        return _parse_plan(plan_data)
+
+    async def record_queries(self, entries: List[Dict[str, Any]]) -> None:
+        """Record a batch of executed queries in the query log.
+
+        Args:
+            entries: Dictionaries with sql, execution_time_ms, row_count and
+                query_plan (optional).
+
+        Raises:
+            DatabaseException: If recording fails.
+        """
+        try:
+            self._session.add_all(
+                [
+                    AnalyticsQueryLog(
+                        sql=entry["sql"],
+                        sql_hash=hashlib.sha256(entry["sql"].encode()).hexdigest(),
+                        execution_time_ms=entry["execution_time_ms"],
+                        row_count=entry["row_count"],
+                        query_plan=entry.get("query_plan"),
+                    )
+                    for entry in entries
+                ],
+            )
+            await self._session.flush()
+        except Exception as e:
+            raise DatabaseException(
+                message=f"Failed to record queries: {str(e)}",
+                details={"error": str(e), "entries": len(entries)},
+            ) from e
+
+    async def get_query_log(self, limit: int) -> List[AnalyticsQueryLog]:
+        """Get the most recent query log entries.
+
+        Args:
+            limit: Maximum number of entries.
+
+        Returns:
+            List of AnalyticsQueryLog objects, newest first.
+        """
+        try:
+            result = await self._session.execute(
+                select(AnalyticsQueryLog)
+                .order_by(AnalyticsQueryLog.created_at.desc())
+                .limit(limit),
+            )
+            return list(result.scalars().all())
+        except Exception as e:
+            raise DatabaseException(
+                message=f"Failed to retrieve query log: {str(e)}",
+                details={"error": str(e)},
+            ) from e
+
+    async def prune_query_log(self, older_than_days: int) -> int:
+        """Delete query log entries older than the given age.
+
+        Args:
+            older_than_days: Age in days.
+
+        Returns:
+            Number of deleted entries.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        try:
+            result = await self._session.execute(
+                delete(AnalyticsQueryLog).where(AnalyticsQueryLog.created_at < cutoff),
+            )
+            return result.rowcount or 0
+        except Exception as e:
+            raise DatabaseException(
+                message=f"Failed to prune query log: {str(e)}",
+                details={"error": str(e)},
+            ) from e
+
+    async def get_table_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Get planner statistics of analytics data tables.
+
+        Row estimates come from pg_class.reltuples (-1 or 0 before the first
+        ANALYZE); indexes list their key columns in order (expression
+        columns omitted).
+
+        Returns:
+            Dictionary mapping table name to {"row_estimate": float,
+            "indexes": list of indexed column lists}.
+        """
+        try:
+            result = await self._session.execute(
+                text(
+                    """
+                    SELECT c.relname AS table_name,
+                           c.reltuples AS row_estimate,
+                           COALESCE(
+                               json_agg((
+                                   SELECT json_agg(a.attname ORDER BY k.ord)
+                                   FROM unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+                                   JOIN pg_attribute a
+                                     ON a.attrelid = c.oid AND a.attnum = k.attnum
+                               )) FILTER (WHERE i.indexrelid IS NOT NULL),
+                               '[]'::json
+                           ) AS indexes
+                    FROM pg_class c
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    LEFT JOIN pg_index i ON i.indrelid = c.oid
+                    WHERE n.nspname = 'analytics' AND c.relkind = 'r'
+                    GROUP BY c.oid, c.relname, c.reltuples
+                    """,
+                ),
+            )
+            statistics: Dict[str, Dict[str, Any]] = {}
+            for table_name, row_estimate, indexes in result.all():
+                if isinstance(indexes, str):
+                    indexes = json.loads(indexes)
+                statistics[table_name] = {
+                    "row_estimate": float(row_estimate or 0),
+                    "indexes": [columns for columns in indexes if columns],
+                }
+            return statistics
+        except Exception as e:
+            raise DatabaseException(
+                message=f"Failed to retrieve table statistics: {str(e)}",
+                details={"error": str(e)},
+            ) from e
+
+    async def explain_with_hypothetical_index(
+        self,
+        sql: str,
+        index_sql: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Get query plan as if an index existed (HypoPG extension).
+
+        Hypothetical indexes live in the backend connection only and are
+        never built; they are reset before and after use so a pooled
+        connection does not keep them.
+
+        Args:
+            sql: SQL query to explain.
+            index_sql: CREATE INDEX statement of the hypothetical index.
+
+        Returns:
+            Query plan dictionary, or None if empty.
+
+        Raises:
+            DatabaseException: If HypoPG is unavailable or explain fails.
+        """
+        try:
+            async with self._read_only_transaction() as connection:
+                await connection.execute(text("SELECT hypopg_reset()"))
+                await connection.execute(
+                    text("SELECT * FROM hypopg_create_index(:index_sql)"),
+                    {"index_sql": index_sql},
+                )
+                result = await connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                plan_data = result.scalar()
+                await connection.execute(text("SELECT hypopg_reset()"))
+        except Exception as e:
+            raise DatabaseException(
+                message=f"Failed to explain SQL with hypothetical index: {str(e)}",
+                details={"error": str(e), "sql": sql[:200], "index_sql": index_sql},
+            ) from e
+
+        return _parse_plan(plan_data)
+
+    async def _execute_fast(
+        self,
+        sql: str,
+        timeout_ms: int = SQL_TIMEOUT_MS,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Execute SQL directly on the pooled asyncpg connection.
+
+        Skips SQLAlchemy statement compilation and result wrapping. The
+        transaction mode and timeout are sent as one simple query, and the
+        statement runs through a cursor (portal) that fetches at most
+        SQL_MAX_ROWS rows, so large results are never materialized. Cursors
+        reuse asyncpg's per-connection prepared statement cache.
+
+        Args:
+            sql: SQL query to execute (must be SELECT only).
+            timeout_ms: Statement timeout in milliseconds.
+
+        Returns:
+            List of dictionaries (max SQL_MAX_ROWS rows), or None if the
+            session is not backed by asyncpg (caller uses the regular path).
+
+        Raises:
+            DatabaseException: If execution fails.
+        """
+        async with self._owned_connection() as connection:
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = getattr(raw_connection, "driver_connection", None)
+            if driver_connection is None or not hasattr(driver_connection, "cursor"):
+                return None
+
+            try:
+                await driver_connection.execute(
+                    f"BEGIN READ ONLY; SET LOCAL statement_timeout = {int(timeout_ms)}",
+                )
+                cursor = await driver_connection.cursor(sql)
+                records = await cursor.fetch(SQL_MAX_ROWS)
+                await driver_connection.execute("COMMIT")
+            except BaseException as e:
+                # On task cancellation asyncpg has already sent a cancel request for the
+                # statement; ROLLBACK waits for it, so the connection is reusable
+                try:
+                    await driver_connection.execute("ROLLBACK")
+                except BaseException:
+                    # Never return a connection with an open transaction to the pool
+                    await connection.invalidate()
+                if not isinstance(e, Exception):
+                    raise
+                raise DatabaseException(
+                    message=f"Failed to execute SQL: {str(e)}",
+                    details={"error": str(e), "sql": sql[:200]},
+                ) from e
+
+        return [dict(record) for record in records]
+
+    @contextlib.asynccontextmanager
+    async def _read_only_transaction(
+        self,
+        timeout_ms: int = SQL_TIMEOUT_MS,
+    ) -> AsyncGenerator[AsyncConnection, None]:
+        """Open read-only transaction with statement timeout.
+
+        Args:
+            timeout_ms: Statement timeout in milliseconds.
+
+        Yields:
+            Connection to run the queries on (see _owned_connection).
+        """
+        async with self._owned_connection() as connection:
+            # Make this transaction read-only
+            await connection.execute(text("SET TRANSACTION READ ONLY"))
+            # Set statement timeout
+            await connection.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+            yield connection
+
+    @contextlib.asynccontextmanager
+    async def _owned_connection(self) -> AsyncGenerator[AsyncConnection, None]:
+        """Get a connection in a transaction owned by this repository.
+
+        Uses the session's connection when the session has no transaction
+        open. Otherwise (metadata reads, or writes the caller has not
+        committed yet) a separate pooled connection from the session's
+        engine is used, so the caller's transaction is never committed,
+        rolled back or given read-only settings.
+
+        Yields:
+            Connection inside a transaction that ends with the context.
+
+        Raises:
+            DatabaseException: If the session has an open transaction and no bound engine.
+        """
+        if not self._session.in_transaction():
+            async with self._session.begin():
+                yield await self._session.connection()
+            return
+
+        engine = self._session.bind
+        if engine is None:
+            raise DatabaseException(
+                message="Cannot run read-only SQL: session has an open transaction",
+                details={"reason": "open_transaction"},
+            )
+        async with engine.connect() as connection:
+            async with connection.begin():
+                yield connection
+
+
+def _parse_plan(plan_data: Any) -> Optional[Dict[str, Any]]:
+    """Parse EXPLAIN (FORMAT JSON) output.
+
+    Args:
+        plan_data: Scalar returned by EXPLAIN (JSON string or decoded list).
+
+    Returns:
+        Top-level plan dictionary ({"Plan": {...}, ...}), or None if empty.
+    """
+    if isinstance(plan_data, str):
+        plan_data = json.loads(plan_data)
+    # EXPLAIN (FORMAT JSON) returns a single-element list
+    if isinstance(plan_data, list):
+        plan_data = plan_data[0] if plan_data else None
+    return plan_data
@@ -0,0 +1,1012 @@
+"""
+DuckDB analytics repository (columnar SQL execution over Parquet snapshots).
+
+Overview
+  Alternate AnalyticsRepository that executes allowlisted analytics SQL with
+  an embedded, vectorised engine (DuckDB) instead of PostgreSQL. The ingestion
+  pipeline writes a Parquet snapshot of each analytics table (and its sample)
+  plus a JSON sidecar with the table metadata; the engine loads the snapshots
+  into an in-memory columnar database and runs queries in a thread pool, off
+  the event loop. Aggregation-heavy questions scan compressed columns instead
+  of heap pages.
+
+Design
+  - **Snapshot Store**: <table>.parquet (+ <table>__sample.parquet) and <table>.json
+    (metadata, data version) per table, replaced atomically (sidecar written last).
+  - **Freshness**: With a metadata repository, only tables whose snapshot data version
+    matches the catalog are exposed, so stale snapshots are never planned against.
+  - **Local Mode**: Without a metadata repository the catalog comes from the sidecars
+    (dev and CI without PostgreSQL); templates and the query log are unavailable.
+  - **Locked Down**: Snapshots are loaded into memory, then external access (file
+    reads) and configuration changes are disabled on the database.
+  - **Reload on Change**: Snapshot signature (sidecar data versions) is checked per query;
+    a new database is built when it changes, in-flight queries keep the previous one.
+  - **Thread Pool**: Queries run on ANALYTICS_DUCKDB_WORKERS threads; timeouts and task
+    cancellation (client disconnect) interrupt the query, freeing the worker.
+  - **Streaming**: stream_sql keeps the cursor open and fetches one batch per pool step,
+    so exports never hold the whole result as Python rows.
+  - **Exact Numerics**: NUMERIC(p,s) snapshots as DECIMAL(p,s), never DOUBLE.
+  - **Selection**: create_analytics_repository picks the engine per deployment
+    (settings.analytics_engine) or per query (engine argument).
+
+Integration
+  - Consumes: duckdb (optional dependency), AnalyticsRepository (metadata), settings,
+    constants.
+  - Returns: Query results and catalog metadata (AnalyticsTable models).
+  - Used by: analytics_node and export routes (engine selection), AnalyticsSchemaBuilder
+    and snapshot scripts (snapshot writing).
+  - Observability: Logs snapshot writes and database reloads.
+
+Usage
+  >>> from app.infrastructure.database.repositories.duckdb_analytics_repo import (
+  ...     create_analytics_repository,
+  ... )
+  >>> repository = create_analytics_repository(session, engine="duckdb")
+  >>> rows = await repository.execute_sql("SELECT COUNT(*) FROM analytics.olist_orders")
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.constants import (
+    ANALYTICS_DUCKDB_THREADS,
+    ANALYTICS_DUCKDB_WORKERS,
+    ANALYTICS_ENGINES,
+    ANALYTICS_SAMPLE_SUFFIX,
+    ANALYTICS_STREAM_BATCH_SIZE,
+    SQL_MAX_ROWS,
+    SQL_TIMEOUT_MS,
+)
+from app.config.exceptions import DatabaseException, ValidationException
+from app.config.settings import get_settings
+from app.infrastructure.database.models.analytics import (
+    AnalyticsColumn,
+    AnalyticsQueryLog,
+    AnalyticsQueryTemplate,
+    AnalyticsTable,
+)
+from app.infrastructure.database.repositories.analytics_repo import (
+    AnalyticsRepository,
+    PostgreSQLAnalyticsRepository,
+)
+from app.routing.sql_analysis import dollar_parameters
+
+logger = logging.getLogger(__name__)
+
+# Try to import duckdb (optional, columnar engine)
+try:
+    import duckdb
+
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+    duckdb = None  # type: ignore
+
+T = TypeVar("T")
+
+# Catalog (PostgreSQL) types -> DuckDB types; NUMERIC keeps exact DECIMAL arithmetic
+_DUCKDB_TYPES = {
+    "TEXT": "VARCHAR",
+    "INTEGER": "BIGINT",
+    "BIGINT": "BIGINT",
+    "NUMERIC": "DECIMAL",
+    "DECIMAL": "DECIMAL",
+    "BOOLEAN": "BOOLEAN",
+    "DATE": "DATE",
+    "TIMESTAMP": "TIMESTAMP",
+    "TIMESTAMP WITH TIME ZONE": "TIMESTAMPTZ",
+}
+
+# Precision and scale of NUMERIC without a typmod (DuckDB caps precision at 38)
+_DEFAULT_DECIMAL = "DECIMAL(38,10)"
+
+# "(precision[, scale])" typmod of a catalog type
+_TYPMOD_PATTERN = re.compile(r"\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\)")
+
+# Column metadata kept in snapshot sidecars
+_COLUMN_FIELDS = (
+    "name",
+    "data_type",
+    "is_nullable",
+    "is_primary_key",
+    "is_foreign_key",
+    "foreign_key_reference",
+    "distinct_count",
+    "min_value",
+    "max_value",
+    "top_values",
+)
+
+
+class ParquetSnapshotStore:
+    """Directory of Parquet table snapshots with JSON metadata sidecars."""
+
+    def __init__(self, directory: Path) -> None:
+        """Initialize snapshot store.
+
+        Args:
+            directory: Snapshot directory (created on first write).
+        """
+        self._directory = directory
+
+    @property
+    def directory(self) -> Path:
+        """Get snapshot directory."""
+        return self._directory
+
+    def parquet_path(self, name: str) -> Path:
+        """Get Parquet file path of a table (or sample table) snapshot."""
+        return self._directory / f"{name}.parquet"
+
+    def metadata(self) -> Dict[str, Dict[str, Any]]:
+        """Read the sidecars of all complete snapshots.
+
+        Returns:
+            Dictionary of table name to sidecar metadata (tables whose Parquet
+            file is missing are skipped).
+        """
+        if not self._directory.is_dir():
+            return {}
+
+        snapshots: Dict[str, Dict[str, Any]] = {}
+        for path in sorted(self._directory.glob("*.json")):
+            try:
+                metadata = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable snapshot metadata {path.name}: {e}")
+                continue
+            if self.parquet_path(metadata["name"]).exists():
+                snapshots[metadata["name"]] = metadata
+        return snapshots
+
+    def signature(self) -> str:
+        """Get signature of the current snapshots (changes on every write).
+
+        Returns:
+            Sidecar names with modification times.
+        """
+        if not self._directory.is_dir():
+            return ""
+        return ";".join(
+            f"{path.name}:{path.stat().st_mtime_ns}"
+            for path in sorted(self._directory.glob("*.json"))
+        )
+
+    def write(
+        self,
+        table: AnalyticsTable,
+        csv_paths: Dict[str, Path],
+    ) -> None:
+        """Convert CSV exports of a table (and its sample) into Parquet snapshots.
+
+        Parquet files replace the previous snapshot atomically; the sidecar
+        is written last, so readers never pair new metadata with old data.
+
+        Args:
+            table: Table metadata (columns loaded).
+            csv_paths: CSV export (with header) by relation name (table and sample).
+
+        Raises:
+            DatabaseException: If duckdb is not installed or conversion fails.
+        """
+        columns = {column.name: _duckdb_type(column.data_type) for column in table.columns}
+        for name, csv_path in csv_paths.items():
+            self._write_parquet(
+                name,
+                f"read_csv({_literal(str(csv_path))}, header = true, columns = {_struct(columns)})",
+            )
+
+        self._write_metadata(
+            {
+                "name": table.name,
+                "description": table.description,
+                "data_version": table.data_version,
+                "sample_fraction": (
+                    table.sample_fraction
+                    if f"{table.name}{ANALYTICS_SAMPLE_SUFFIX}" in csv_paths
+                    else None
+                ),
+                "columns": [
+                    {field: getattr(column, field) for field in _COLUMN_FIELDS}
+                    for column in table.columns
+                ],
+            },
+        )
+
+    def write_from_csv(self, name: str, csv_path: Path) -> Dict[str, Any]:
+        """Snapshot a CSV file directly, inferring column types (local mode).
+
+        Args:
+            name: Table name.
+            csv_path: CSV file with header.
+
+        Returns:
+            Sidecar metadata written.
+
+        Raises:
+            DatabaseException: If duckdb is not installed or conversion fails.
+        """
+        self._write_parquet(name, f"read_csv_auto({_literal(str(csv_path))}, header = true)")
+
+        connection = _connect()
+        try:
+            described = connection.execute(
+                f"DESCRIBE SELECT * FROM read_parquet({_literal(str(self.parquet_path(name)))})",
+            ).fetchall()
+        finally:
+            connection.close()
+
+        previous = self.metadata().get(name, {})
+        metadata = {
+            "name": name,
+            "description": f"Table created from CSV: {csv_path.name}",
+            "data_version": previous.get("data_version", 0) + 1,
+            "sample_fraction": None,
+            "columns": [
+                {
+                    "name": column_name,
+                    "data_type": column_type,
+                    "is_nullable": null != "NO",
+                    "is_primary_key": False,
+                    "is_foreign_key": False,
+                }
+                for column_name, column_type, null, *_ in described
+            ],
+        }
+        self._write_metadata(metadata)
+        return metadata
+
+    def remove(self, name: str) -> None:
+        """Remove a table snapshot (sidecar first, then data files).
+
+        Args:
+            name: Table name.
+        """
+        for path in (
+            self._directory / f"{name}.json",
+            self.parquet_path(name),
+            self.parquet_path(f"{name}{ANALYTICS_SAMPLE_SUFFIX}"),
+        ):
+            path.unlink(missing_ok=True)
+
+    def _write_parquet(self, name: str, source_sql: str) -> None:
+        """Write query results to <name>.parquet atomically.
+
+        Args:
+            name: Relation name.
+            source_sql: DuckDB table expression producing the rows.
+
+        Raises:
+            DatabaseException: If duckdb is not installed or writing fails.
+        """
+        self._directory.mkdir(parents=True, exist_ok=True)
+        target = self.parquet_path(name)
+        partial = target.with_suffix(".parquet.partial")
+
+        connection = _connect()
+        try:
+            connection.execute(
+                f"COPY (SELECT * FROM {source_sql}) TO {_literal(str(partial))} "
+                "(FORMAT PARQUET, COMPRESSION ZSTD)",
+            )
+            os.replace(partial, target)
+        except Exception as e:
+            partial.unlink(missing_ok=True)
+            raise DatabaseException(
+                message=f"Failed to write Parquet snapshot: {str(e)}",
+                details={"table_name": name, "error": str(e)},
+            ) from e
+        finally:
+            connection.close()
+
+    def _write_metadata(self, metadata: Dict[str, Any]) -> None:
+        """Write a snapshot sidecar atomically.
+
+        Args:
+            metadata: Sidecar metadata (name, description, data_version, columns).
+        """
+        target = self._directory / f"{metadata['name']}.json"
+        partial = target.with_suffix(".json.partial")
+        metadata = {**metadata, "written_at": datetime.now(timezone.utc).isoformat()}
+        partial.write_text(json.dumps(metadata, default=str), encoding="utf-8")
+        os.replace(partial, target)
+        logger.info(
+            f"Wrote Parquet snapshot of {metadata['name']} "
+            f"(data version: {metadata['data_version']})",
+        )
+
+
+class DuckDBEngine:
+    """Process-wide DuckDB database loaded from the snapshot store.
+
+    The database is rebuilt (and swapped) whenever the snapshot signature
+    changes; cursors of in-flight queries keep the database they started on.
+    """
+
+    def __init__(
+        self,
+        store: ParquetSnapshotStore,
+        workers: int = ANALYTICS_DUCKDB_WORKERS,
+        threads: int = ANALYTICS_DUCKDB_THREADS,
+    ) -> None:
+        """Initialize DuckDB engine.
+
+        Args:
+            store: Snapshot store.
+            workers: Thread pool size (concurrent queries).
+            threads: DuckDB threads per query.
+        """
+        self._store = store
+        self._threads = threads
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="duckdb")
+        self._lock = threading.Lock()
+        self._connection: Any = None
+        self._signature: Optional[str] = None
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def store(self) -> ParquetSnapshotStore:
+        """Get snapshot store."""
+        return self._store
+
+    async def snapshots(self) -> Dict[str, Dict[str, Any]]:
+        """Get metadata of the loaded snapshots (reloading if they changed).
+
+        Returns:
+            Dictionary of table name to sidecar metadata.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._pool, self._current)
+        return self._snapshots
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        """Run a function in the engine's thread pool on a fresh cursor.
+
+        Args:
+            function: Function called with (cursor, *args).
+            *args: Extra arguments.
+
+        Returns:
+            Function result.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._call, function, args)
+
+    async def query(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]],
+        max_rows: Optional[int],
+        timeout_ms: int,
+    ) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """Execute SQL with a timeout.
+
+        Args:
+            sql: SQL query.
+            params: Named parameters (optional).
+            max_rows: Maximum rows fetched (None for all).
+            timeout_ms: Timeout in milliseconds (query is interrupted, as on cancellation).
+
+        Returns:
+            Tuple of (column names, row tuples).
+
+        Raises:
+            DatabaseException: If execution fails or times out.
+        """
+        cursors: List[Any] = []
+
+        def execute(cursor: Any) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+            cursors.append(cursor)
+            cursor.execute(*_statement(sql, params))
+            columns = [description[0] for description in cursor.description]
+            rows = cursor.fetchall() if max_rows is None else cursor.fetchmany(max_rows)
+            return columns, rows
+
+        return await self._guard(self.run(execute), cursors, sql, timeout_ms)
+
+    async def stream(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]],
+        batch_size: int,
+        timeout_ms: int,
+    ) -> AsyncIterator[Tuple[List[str], List[Tuple[Any, ...]]]]:
+        """Execute SQL and fetch its rows batch_size at a time.
+
+        The cursor stays open between batches and every step (execute, each
+        fetchmany) runs in the pool under the timeout, so rows are converted
+        to Python one batch at a time and no worker waits on the consumer.
+
+        Args:
+            sql: SQL query.
+            params: Named parameters (optional).
+            batch_size: Rows per batch.
+            timeout_ms: Timeout per step in milliseconds (query is interrupted).
+
+        Yields:
+            Tuples of (column names, row tuples) per batch.
+
+        Raises:
+            DatabaseException: If execution fails or times out.
+        """
+        loop = asyncio.get_running_loop()
+        cursor = (await loop.run_in_executor(self._pool, self._current)).cursor()
+        step: Optional["Future[Any]"] = None
+
+        def execute() -> List[str]:
+            cursor.execute(*_statement(sql, params))
+            return [description[0] for description in cursor.description]
+
+        try:
+            step = self._pool.submit(execute)
+            columns = await self._guard(asyncio.wrap_future(step), [cursor], sql, timeout_ms)
+            while True:
+                step = self._pool.submit(cursor.fetchmany, batch_size)
+                rows = await self._guard(asyncio.wrap_future(step), [cursor], sql, timeout_ms)
+                if not rows:
+                    break
+                yield columns, rows
+        finally:
+            # Close once the last step is done; an interrupted step may still be running
+            if step is None:
+                cursor.close()
+            else:
+                step.add_done_callback(lambda _: cursor.close())
+
+    async def _guard(
+        self,
+        step: Awaitable[T],
+        cursors: List[Any],
+        sql: str,
+        timeout_ms: int,
+    ) -> T:
+        """Await a pool step with a timeout, interrupting its cursor on timeout or cancellation.
+
+        Args:
+            step: Awaitable running in the pool.
+            cursors: Cursors the step uses (filled once it starts).
+            sql: SQL query (error details).
+            timeout_ms: Timeout in milliseconds.
+
+        Returns:
+            Step result.
+
+        Raises:
+            DatabaseException: If the step fails or times out.
+        """
+        try:
+            return await asyncio.wait_for(step, timeout_ms / 1000)
+        except asyncio.CancelledError:
+            for cursor in cursors:
+                cursor.interrupt()
+            raise
+        except asyncio.TimeoutError as e:
+            for cursor in cursors:
+                cursor.interrupt()
+            raise DatabaseException(
+                message=f"Query exceeded timeout of {timeout_ms}ms",
+                details={"sql": sql[:200], "timeout_ms": timeout_ms},
+            ) from e
+        except DatabaseException:
+            raise
+        except Exception as e:
+            raise DatabaseException(
+                message=f"Failed to execute SQL: {str(e)}",
+                details={"error": str(e), "sql": sql[:200]},
+            ) from e
+
+    def _call(self, function: Callable[..., T], args: Tuple[Any, ...]) -> T:
+        """Reload the database if needed and call function with a cursor.
+
+        Args:
+            function: Function to call.
+            args: Extra arguments.
+
+        Returns:
+            Function result.
+        """
+        cursor = self._current().cursor()
+        try:
+            return function(cursor, *args)
+        finally:
+            cursor.close()
+
+    def _current(self) -> Any:
+        """Get the database for the current snapshots, rebuilding it if they changed.
+
+        Returns:
+            DuckDB connection.
+
+        Raises:
+            DatabaseException: If duckdb is not installed.
+        """
+        signature = self._store.signature()
+        with self._lock:
+            if self._connection is None or signature != self._signature:
+                snapshots = self._store.metadata()
+                self._connection = self._load(snapshots)
+                self._snapshots = snapshots
+                self._signature = signature
+                logger.info(f"DuckDB analytics database loaded ({len(snapshots)} table(s))")
+            return self._connection
+
+    def _load(self, snapshots: Dict[str, Dict[str, Any]]) -> Any:
+        """Build an in-memory database from snapshots and lock it down.
+
+        Args:
+            snapshots: Sidecar metadata by table name.
+
+        Returns:
+            DuckDB connection.
+        """
+        connection = _connect(self._threads)
+        connection.execute("CREATE SCHEMA IF NOT EXISTS analytics")
+        for name, metadata in snapshots.items():
+            relations = [name]
+            if metadata.get("sample_fraction"):
+                relations.append(f"{name}{ANALYTICS_SAMPLE_SUFFIX}")
+            for relation in relations:
+                path = self._store.parquet_path(relation)
+                if path.exists():
+                    connection.execute(
+                        f'CREATE TABLE analytics."{relation}" AS '
+                        f"SELECT * FROM read_parquet({_literal(str(path))})",
+                    )
+        # Queries may only read the loaded tables
+        connection.execute("SET enable_external_access = false")
+        connection.execute("SET lock_configuration = true")
+        return connection
+
+
+class DuckDBAnalyticsRepository(AnalyticsRepository):
+    """DuckDB implementation of analytics repository.
+
+    Executes analytics SQL on the columnar engine; catalog, templates and the
+    query log come from the metadata repository (PostgreSQL) when given, or
+    from snapshot sidecars otherwise (local mode).
+    """
+
+    engine = "duckdb"
+
+    def __init__(
+        self,
+        metadata: Optional[AnalyticsRepository] = None,
+        engine: Optional[DuckDBEngine] = None,
+    ) -> None:
+        """Initialize DuckDB analytics repository.
+
+        Args:
+            metadata: Repository for catalog, templates and query log (optional,
+                local mode if None).
+            engine: DuckDB engine (optional, uses process-wide engine if None).
+        """
+        self._metadata = metadata
+        self._engine = engine or get_duckdb_engine()
+
+    async def get_all_tables(self) -> List[AnalyticsTable]:
+        """Get analytics tables with an up-to-date snapshot.
+
+        Returns:
+            List of AnalyticsTable objects with columns loaded.
+        """
+        snapshots = await self._engine.snapshots()
+        if self._metadata is None:
+            return [_table_from_snapshot(metadata) for metadata in snapshots.values()]
+
+        tables = await self._metadata.get_all_tables()
+        return [table for table in tables if _is_fresh(table, snapshots)]
+
+    async def get_table_by_name(self, name: str) -> Optional[AnalyticsTable]:
+        """Get analytics table by name (only if its snapshot is up to date).
+
+        Args:
+            name: Table name.
+
+        Returns:
+            AnalyticsTable object with columns loaded, or None if not found.
+        """
+        snapshots = await self._engine.snapshots()
+        if self._metadata is None:
+            return _table_from_snapshot(snapshots[name]) if name in snapshots else None
+
+        table = await self._metadata.get_table_by_name(name)
+        return table if table is not None and _is_fresh(table, snapshots) else None
+
+    async def get_catalog_version(self) -> int:
+        """Get catalog version combined with the snapshot data versions.
+
+        Changes when either the catalog or a snapshot changes, so schema
+        caches reload once a snapshot catches up with the catalog.
+
+        Returns:
+            Catalog version.
+        """
+        snapshots = await self._engine.snapshots()
+        base = await self._metadata.get_catalog_version() if self._metadata else 0
+        signature = ";".join(
+            f"{name}:{metadata['data_version']}" for name, metadata in sorted(snapshots.items())
+        )
+        return zlib.crc32(f"{base}|{signature}".encode()) & 0x7FFFFFFF
+
+    async def get_query_templates(self) -> List[AnalyticsQueryTemplate]:
+        """Get all active query templates (none in local mode).
+
+        Returns:
+            List of AnalyticsQueryTemplate objects with exemplars loaded.
+        """
+        if self._metadata is None:
+            return []
+        return await self._metadata.get_query_templates()
+
+    async def save_query_template(
+        self,
+        name: str,
+        sql_template: str,
+        slots: Dict[str, Any],
+        question: str,
+        embedding: Optional[List[float]],
+        explanation: str = "",
+        tables_used: Optional[List[str]] = None,
+        columns_used: Optional[List[str]] = None,
+        source: str = "curated",
+    ) -> AnalyticsQueryTemplate:
+        """Create a query template, or add an exemplar to an existing one.
+
+        Args:
+            name: Template name (used when creating).
+            sql_template: SQL with named slot placeholders (identifies the template).
+            slots: Slot definitions.
+            question: Exemplar question.
+            embedding: Exemplar question embedding (optional).
+            explanation: Explanation shown with answers.
+            tables_used: Tables referenced by the SQL.
+            columns_used: Columns referenced by the SQL.
+            source: "curated" or "promoted".
+
+        Returns:
+            Created or updated AnalyticsQueryTemplate.
+
+        Raises:
+            DatabaseException: In local mode (templates live in the metadata database).
+        """
+        if self._metadata is None:
+            raise DatabaseException(
+                message="Query templates require the metadata database",
+                details={"engine": self.engine, "template": name},
+            )
+        return await self._metadata.save_query_template(
+            name,
+            sql_template,
+            slots,
+            question,
+            embedding,
+            explanation,
+            tables_used,
+            columns_used,
+            source,
+        )
+
+    async def execute_sql(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Execute SQL on the columnar engine (timeout, row limit).
+
+        The database only holds snapshot tables and cannot read files, so
+        allowlisted SELECTs are the only thing it can run.
+
+        Args:
+            sql: SQL query to execute.
+            params: Query parameters (optional).
+
+        Returns:
+            List of dictionaries (max SQL_MAX_ROWS rows).
+
+        Raises:
+            DatabaseException: If execution fails.
+        """
+        columns, rows = await self._engine.query(sql, params, SQL_MAX_ROWS, SQL_TIMEOUT_MS)
+        return [dict(zip(columns, row)) for row in rows]
+
+    async def stream_sql(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+        batch_size: int = ANALYTICS_STREAM_BATCH_SIZE,
+        timeout_ms: int = SQL_TIMEOUT_MS,
+    ) -> AsyncIterator[Tuple[List[str], List[Tuple[Any, ...]]]]:
+        """Stream SQL results in batches (timeout, no row cap).
+
+        Rows are fetched batch_size at a time from an open cursor in the
+        worker thread, so only one batch is converted to Python at a time;
+        callers bound the result size.
+
+        Args:
+            sql: SQL query to execute.
+            params: Query parameters (optional).
+            batch_size: Rows per batch.
+            timeout_ms: Timeout per fetch in milliseconds.
+
+        Yields:
+            Tuples of (column names, row tuples) per batch.
+
+        Raises:
+            DatabaseException: If execution fails.
+        """
+        async for columns, rows in self._engine.stream(sql, params, batch_size, timeout_ms):
+            yield columns, rows
+
+    async def explain_sql(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Get query plan (unavailable: DuckDB has no comparable cost estimates).
+
+        The cost guard then relies on the query timeout, as when EXPLAIN fails.
+
+        Args:
+            sql: SQL query to explain.
+            params: Query parameters (optional).
+
+        Returns:
+            None.
+        """
+        return None
+
+    async def record_queries(self, entries: List[Dict[str, Any]]) -> None:
+        """Record executed queries in the metadata query log (no-op in local mode).
+
+        Args:
+            entries: Dictionaries with sql, execution_time_ms, row_count and
+                query_plan (optional).
+        """
+        if self._metadata is not None:
+            await self._metadata.record_queries(entries)
+
+    async def get_query_log(self, limit: int) -> List[AnalyticsQueryLog]:
+        """Get the most recent query log entries (none in local mode).
+
+        Args:
+            limit: Maximum number of entries.
+
+        Returns:
+            List of AnalyticsQueryLog objects, newest first.
+        """
+        if self._metadata is None:
+            return []
+        return await self._metadata.get_query_log(limit)
+
+    async def prune_query_log(self, older_than_days: int) -> int:
+        """Delete query log entries older than the given age (none in local mode).
+
+        Args:
+            older_than_days: Age in days.
+
+        Returns:
+            Number of deleted entries.
+        """
+        if self._metadata is None:
+            return 0
+        return await self._metadata.prune_query_log(older_than_days)
+
+    async def get_table_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Get statistics of snapshot tables (row counts, no indexes).
+
+        Returns:
+            Dictionary mapping table name to {"row_estimate": float, "indexes": []}.
+        """
+        snapshots = await self._engine.snapshots()
+
+        def count(cursor: Any) -> Dict[str, Dict[str, Any]]:
+            statistics: Dict[str, Dict[str, Any]] = {}
+            for name in snapshots:
+                cursor.execute(f'SELECT COUNT(*) FROM analytics."{name}"')
+                statistics[name] = {"row_estimate": float(cursor.fetchone()[0]), "indexes": []}
+            return statistics
+
+        return await self._engine.run(count)
+
+    async def explain_with_hypothetical_index(
+        self,
+        sql: str,
+        index_sql: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Get query plan as if an index existed (not supported by DuckDB).
+
+        Args:
+            sql: SQL query to explain.
+            index_sql: CREATE INDEX statement of the hypothetical index.
+
+        Raises:
+            DatabaseException: Always (columnar scans do not use secondary indexes).
+        """
+        raise DatabaseException(
+            message="Hypothetical indexes are not supported by the DuckDB engine",
+            details={"engine": self.engine, "index_sql": index_sql},
+        )
+
+
+def create_analytics_repository(
+    session: Optional[AsyncSession],
+    engine: Optional[str] = None,
+) -> AnalyticsRepository:
+    """Create the analytics repository for an engine.
+
+    Falls back to PostgreSQL (with a warning) if DuckDB is requested but
+    not installed.
+
+    Args:
+        session: Async database session (metadata; None for DuckDB local mode).
+        engine: "postgres" or "duckdb" (optional, uses settings.analytics_engine if None).
+
+    Returns:
+        AnalyticsRepository for the engine.
+
+    Raises:
+        ValidationException: If the engine is unknown, or PostgreSQL is requested
+            without a session.
+    """
+    engine = engine or get_settings().analytics_engine
+    if engine not in ANALYTICS_ENGINES:
+        raise ValidationException(
+            message=f"Invalid analytics engine: {engine}",
+            details={"engine": engine, "allowed_engines": ANALYTICS_ENGINES},
+        )
+
+    if engine == "duckdb":
+        if DUCKDB_AVAILABLE:
+            metadata = PostgreSQLAnalyticsRepository(session) if session is not None else None
+            return DuckDBAnalyticsRepository(metadata)
+        logger.warning("duckdb is not installed, running analytics SQL on PostgreSQL")
+
+    if session is None:
+        raise ValidationException(
+            message="PostgreSQL analytics engine requires a database session",
+            details={"engine": engine},
+        )
+    return PostgreSQLAnalyticsRepository(session)
+
+
+@lru_cache()
+def get_snapshot_store() -> ParquetSnapshotStore:
+    """Get singleton ParquetSnapshotStore instance (settings.analytics_snapshot_path).
+
+    Returns:
+        ParquetSnapshotStore singleton instance.
+    """
+    return ParquetSnapshotStore(Path(get_settings().analytics_snapshot_path).resolve())
+
+
+@lru_cache()
+def get_duckdb_engine() -> DuckDBEngine:
+    """Get singleton DuckDBEngine instance.
+
+    Returns:
+        DuckDBEngine singleton instance.
+    """
+    return DuckDBEngine(get_snapshot_store())
+
+
+def snapshots_enabled() -> bool:
+    """Check whether ingestion should write Parquet snapshots.
+
+    Returns:
+        True if snapshots are enabled (or DuckDB is the default engine) and
+        duckdb is installed.
+    """
+    settings = get_settings()
+    wanted = settings.analytics_parquet_snapshots or settings.analytics_engine == "duckdb"
+    return wanted and DUCKDB_AVAILABLE
+
+
+def _connect(threads: Optional[int] = None) -> Any:
+    """Open an in-memory DuckDB database.
+
+    Args:
+        threads: DuckDB worker threads (optional).
+
+    Returns:
+        DuckDB connection.
+
+    Raises:
+        DatabaseException: If duckdb is not installed.
+    """
+    if not DUCKDB_AVAILABLE:
+        raise DatabaseException(
+            message="duckdb is required for the columnar analytics engine",
+            details={"engine": "duckdb"},
+        )
+    config = {"threads": threads} if threads else {}
+    return duckdb.connect(":memory:", config=config)
+
+
+def _statement(sql: str, params: Optional[Dict[str, Any]]) -> Tuple[str, ...]:
+    """Convert SQLAlchemy-style ":name" parameters to DuckDB "$name" parameters.
+
+    Args:
+        sql: SQL query.
+        params: Named parameters (optional).
+
+    Returns:
+        Arguments for cursor.execute.
+    """
+    if not params:
+        return (sql,)
+    return (dollar_parameters(sql), params)  # type: ignore[return-value]
+
+
+def _duckdb_type(data_type: str) -> str:
+    """Map a catalog (PostgreSQL) type to a DuckDB type.
+
+    Args:
+        data_type: Catalog data type (e.g. "NUMERIC(10,2)").
+
+    Returns:
+        DuckDB type (VARCHAR for unknown types, DECIMAL(p,s) for NUMERIC).
+    """
+    base = data_type.upper().split("(")[0].strip()
+    duckdb_type = _DUCKDB_TYPES.get(base, "VARCHAR")
+    if duckdb_type != "DECIMAL":
+        return duckdb_type
+    typmod = _TYPMOD_PATTERN.search(data_type)
+    if typmod is None:
+        return _DEFAULT_DECIMAL
+    precision = min(int(typmod.group(1)), 38)
+    scale = min(int(typmod.group(2) or 0), precision)
+    return f"DECIMAL({precision},{scale})"
+
+
+def _literal(value: str) -> str:
+    """Quote a string literal for DuckDB SQL."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _struct(columns: Dict[str, str]) -> str:
+    """Build a DuckDB struct literal of column types for read_csv."""
+    fields = ", ".join(f"{_literal(name)}: {_literal(kind)}" for name, kind in columns.items())
+    return "{" + fields + "}"
+
+
+def _is_fresh(table: AnalyticsTable, snapshots: Dict[str, Dict[str, Any]]) -> bool:
+    """Check whether a catalog table has a snapshot of its current data version."""
+    snapshot = snapshots.get(table.name)
+    return snapshot is not None and snapshot.get("data_version") == table.data_version
+
+
+def _table_from_snapshot(metadata: Dict[str, Any]) -> AnalyticsTable:
+    """Build transient table metadata from a snapshot sidecar (local mode).
+
+    Args:
+        metadata: Sidecar metadata.
+
+    Returns:
+        AnalyticsTable (not attached to any session) with columns.
+    """
+    return AnalyticsTable(
+        name=metadata["name"],
+        description=metadata.get("description"),
+        schema_definition={"columns": metadata["columns"]},
+        is_active=True,
+        data_version=metadata["data_version"],
+        sample_fraction=metadata.get("sample_fraction"),
+        columns=[
+            AnalyticsColumn(
+                **{field: column.get(field) for field in _COLUMN_FIELDS if field in column},
+            )
+            for column in metadata["columns"]
+        ],
+    )
@@ -26,7 +26,7 @@ Usage
   >>> validator.validate_sql("SELECT * FROM orders LIMIT 10")
 """
 
-from app.routing.allowlist import AllowlistValidator
+from app.routing.allowlist import AllowlistValidator, get_allowlist_validator
 from app.routing.classifier import LLMClassifier
 from app.routing.router import Router, get_router
 
@@ -35,5 +35,6 @@ __all__ = [
     "get_router",
     "LLMClassifier",
     "AllowlistValidator",
+    "get_allowlist_validator",
 ]
 
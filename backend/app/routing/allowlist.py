@@ -9,11 +9,12 @@ Overview
 Design
   - **Security Validation**: Validates SQL against allowlist for security.
   - **NOT for Routing**: Allowlist is NEVER used for routing decisions.
-  - **SQL Parsing**: Uses sqlparse for SQL parsing (if available).
-  - **Comprehensive Validation**: Validates tables, columns, functions, operators.
+  - **Single Parse**: Uses the cached SQLAnalysis (shared with the planner's syntax check).
+  - **Comprehensive Validation**: Validates statement type, tables, schemas, functions and
+    qualified columns against precomputed sets; catalog tables allowed alongside the file.
 
 Integration
-  - Consumes: allowlist.json, sqlparse (optional).
+  - Consumes: allowlist.json, sql_analysis, SchemaCatalog schema_info (optional).
   - Returns: Validation results (raises exception if invalid).
   - Used by: Analytics Agent for SQL validation.
   - Observability: Logs validation results.
@@ -27,24 +28,16 @@ Usage
 
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
+from app.config.constants import SQL_ALLOWED_SCHEMAS
 from app.config.exceptions import ValidationException
+from app.routing.sql_analysis import analyze_sql
 
 logger = logging.getLogger(__name__)
 
-# Try to import sqlparse (optional)
-try:
-    import sqlparse
-    from sqlparse.sql import IdentifierList, Token
-    from sqlparse.tokens import Keyword, Name
-
-    SQLPARSE_AVAILABLE = True
-except ImportError:
-    SQLPARSE_AVAILABLE = False
-    sqlparse = None  # type: ignore
-
 
 class AllowlistValidator:
     """Allowlist validator for SQL queries.
@@ -84,6 +77,14 @@ class AllowlistValidator:
         # Validate structure
         self._validate_allowlist_structure()
 
+        # Precompute lookup sets (validation runs on every generated query)
+        self._allowed_tables = set(self.get_allowed_tables())
+        self._allowed_columns = {
+            table: set(self.get_allowed_columns(table)) for table in self._allowed_tables
+        }
+        self._allowed_functions = {name.lower() for name in self._allowlist["functions"]}
+        self._allowed_schemas = set(SQL_ALLOWED_SCHEMAS)
+
     def _validate_allowlist_structure(self) -> None:
         """Validate allowlist JSON structure.
 
@@ -110,17 +111,21 @@ class AllowlistValidator:
                 details={"allowlist": self._allowlist},
             )
 
-    def validate_sql(self, sql: str) -> None:
+    def validate_sql(self, sql: str, schema_info: Optional[Dict[str, Any]] = None) -> None:
         """Validate SQL against allowlist.
 
-        Validates that SQL only uses allowed tables, columns, functions, and operators.
-        Blocks dangerous operations (DROP, DELETE, etc.).
+        Validates that SQL is a single read-only SELECT that only uses allowed
+        tables, columns and functions. Tables and columns of the analytics
+        catalog (schema_info) are allowed in addition to the allowlist file;
+        column references are checked when they resolve to a table with a
+        known column list. Blocks dangerous operations (DROP, DELETE, etc.).
 
         Args:
             sql: SQL query to validate.
+            schema_info: Schema information from SchemaCatalog (optional).
 
         Raises:
-            ValidationException: If SQL is invalid (uses unauthorized tables/columns/functions/operators).
+            ValidationException: If SQL is invalid (uses unauthorized tables/columns/functions).
         """
         if not sql or not sql.strip():
             raise ValidationException(
@@ -128,102 +133,73 @@ class AllowlistValidator:
                 details={"sql": sql},
             )
 
-        sql_upper = sql.upper().strip()
-
-        # Step 1: Check for dangerous operations
-        dangerous_ops = ["DROP", "DELETE", "TRUNCATE", "ALTER", "CREATE", "INSERT", "UPDATE"]
-        for op in dangerous_ops:
-            if op in sql_upper:
-                raise ValidationException(
-                    message=f"SQL contains dangerous operation: {op}",
-                    details={"sql": sql[:200], "operation": op},
-                )
-
-        # Step 2: Parse SQL (if sqlparse available)
-        if SQLPARSE_AVAILABLE and sqlparse:
-            try:
-                self._validate_with_sqlparse(sql)
-            except Exception as e:
-                logger.warning(f"SQL parsing failed, using basic validation: {e}")
-                # Fallback to basic validation
-                self._validate_basic(sql)
-        else:
-            # Basic validation without sqlparse
-            self._validate_basic(sql)
-
-    def _validate_with_sqlparse(self, sql: str) -> None:
-        """Validate SQL using sqlparse.
-
-        Uses sqlparse to parse SQL and extract tables, columns, functions, operators.
+        # Step 1: Analyze SQL (single pass, cached by SQL text)
+        analysis = analyze_sql(sql)
 
-        Args:
-            sql: SQL query to validate.
+        # Step 2: Check for dangerous operations
+        if analysis.dangerous_keywords:
+            op = analysis.dangerous_keywords[0]
+            raise ValidationException(
+                message=f"SQL contains dangerous operation: {op}",
+                details={"sql": sql[:200], "operation": op},
+            )
 
-        Raises:
-            ValidationException: If SQL uses unauthorized elements.
-        """
-        parsed = sqlparse.parse(sql)
-        if not parsed:
+        if analysis.statement_count != 1 or analysis.statement_type != "SELECT":
             raise ValidationException(
-                message="SQL syntax is invalid (failed to parse)",
-                details={"sql": sql[:200]},
+                message="Only a single SELECT statement is allowed",
+                details={"sql": sql[:200], "statement_type": analysis.statement_type},
             )
 
-        # Extract tables and columns from parsed SQL
-        tables_used: set[str] = set()
-        columns_used: set[str] = set()
-        functions_used: set[str] = set()
-
-        for statement in parsed:
-            # Extract FROM clause tables
-            from_seen = False
-            for token in statement.flatten():
-                if token.ttype is Keyword and token.value.upper() == "FROM":
-                    from_seen = True
-                    continue
-
-                if from_seen and token.ttype is Name:
-                    tables_used.add(token.value.lower())
-
-        # Validate tables
-        allowed_tables = self.get_allowed_tables()
-        for table in tables_used:
-            if table not in allowed_tables:
+        # Step 3: Validate tables and schemas
+        catalog_columns = self._catalog_columns(schema_info)
+        for table in analysis.tables:
+            if table not in self._allowed_tables and table not in catalog_columns:
                 raise ValidationException(
                     message=f"Table '{table}' is not in allowlist",
-                    details={"sql": sql[:200], "table": table, "allowed_tables": allowed_tables},
+                    details={"sql": sql[:200], "table": table},
+                )
+
+        for schema in analysis.schemas:
+            if schema not in self._allowed_schemas:
+                raise ValidationException(
+                    message=f"Schema '{schema}' is not in allowlist",
+                    details={"sql": sql[:200], "schema": schema},
                 )
 
-        # Validate columns (basic check - can be improved)
-        # For now, we'll do basic validation
-        # Full column validation would require more sophisticated parsing
+        # Step 4: Validate functions
+        for function in analysis.functions:
+            if function not in self._allowed_functions:
+                raise ValidationException(
+                    message=f"Function '{function}' is not in allowlist",
+                    details={"sql": sql[:200], "function": function},
+                )
 
-    def _validate_basic(self, sql: str) -> None:
-        """Basic SQL validation without sqlparse.
+        # Step 5: Validate qualified columns of tables with known columns
+        for table, column in analysis.columns:
+            if table is None:
+                continue
+            known = catalog_columns.get(table) or self._allowed_columns.get(table)
+            if known and column not in known:
+                raise ValidationException(
+                    message=f"Column '{table}.{column}' is not in allowlist",
+                    details={"sql": sql[:200], "table": table, "column": column},
+                )
 
-        Performs basic validation by checking for table names in SQL.
+    def _catalog_columns(self, schema_info: Optional[Dict[str, Any]]) -> Dict[str, Set[str]]:
+        """Get column sets of catalog tables.
 
         Args:
-            sql: SQL query to validate.
+            schema_info: Schema information from SchemaCatalog (optional).
 
-        Raises:
-            ValidationException: If SQL uses unauthorized tables.
+        Returns:
+            Dictionary mapping table name to its column names.
         """
-        sql_lower = sql.lower()
-
-        # Get allowed tables
-        allowed_tables = self.get_allowed_tables()
-
-        # Check if SQL mentions any tables not in allowlist
-        # This is a basic check - full validation requires sqlparse
-        # For now, we'll check if any table name appears in SQL
-        for table in allowed_tables:
-            # If table is mentioned, it's allowed
-            if table in sql_lower:
-                continue
-
-        # Note: This is a simplified validation
-        # Full validation would require parsing SQL properly
+        if not schema_info:
+            return {}
+        return {
+            table["name"].lower(): {column["name"] for column in table.get("columns", [])}
+            for table in schema_info.get("tables", [])
+        }
 
     def get_allowed_tables(self) -> List[str]:
         """Get list of allowed table names.
@@ -250,3 +226,13 @@ class AllowlistValidator:
             return []
 
         return table_config.get("columns", [])
+
+
+@lru_cache()
+def get_allowlist_validator() -> AllowlistValidator:
+    """Get allowlist validator singleton (default allowlist file).
+
+    Returns:
+        AllowlistValidator instance.
+    """
+    return AllowlistValidator()
@@ -0,0 +1,824 @@
+"""
+SQL analysis (single-pass structural analysis of generated SQL).
+
+Overview
+  Tokenizes a SQL string once and extracts what validation needs: statement
+  type and count, referenced tables (and schemas), called functions, column
+  references (resolved through table aliases, and split out for WHERE and
+  JOIN ... ON predicates), CTE names, and dangerous keywords. Results are
+  cached by SQL text, so the allowlist validator and the planner's syntax
+  check share one analysis per statement.
+
+Design
+  - **Lexer**: One regex pass; comments, string literals (including dollar quotes)
+    and quoted identifiers are single tokens, so keywords are only matched as
+    whole unquoted words ("created_at" never matches CREATE).
+  - **Clause Tracking**: FROM counts as a table clause only after SELECT at the same
+    parenthesis depth (EXTRACT(YEAR FROM x) is not a table reference); JOIN always does.
+  - **TABLE Queries**: "TABLE name" (in set operations and subqueries) is a table
+    reference like FROM name.
+  - **CTE Awareness**: Names defined by WITH are not reported as tables.
+  - **Alias Resolution**: "o.order_id" resolved to the aliased table.
+  - **Caching**: lru_cache keyed by SQL text (SQL_ANALYSIS_CACHE_SIZE entries).
+  - **Clause Splitting**: split_clauses/split_list/split_alias/aggregate_calls expose
+    top-level clause texts, aliases and aggregate calls of plain SELECTs (rollup
+    detection, approximate rewrites).
+  - **Parameters**: dollar_parameters rewrites ":name" parameters as "$name" (DuckDB),
+    leaving literals and "::type" casts alone.
+  - **Row Limits**: outer_row_limit finds the outermost LIMIT/OFFSET/FETCH FIRST of any
+    query (set operations included), ignoring comments, literals and subqueries.
+  - **No Dependencies**: Pure standard library (no sqlparse required).
+
+Integration
+  - Consumes: constants.
+  - Returns: SQLAnalysis (frozen dataclass).
+  - Used by: AllowlistValidator, AnalyticsPlanner (syntax checks), IndexAdvisor (predicates),
+    rollup detection and sampling (clauses), QueryCostGuard (row limits),
+    DuckDBEngine (parameters).
+  - Observability: N/A (pure function).
+
+Usage
+  >>> from app.routing.sql_analysis import analyze_sql
+  >>> analysis = analyze_sql("SELECT o.order_id FROM analytics.orders o")
+  >>> analysis.tables, analysis.columns
+  (frozenset({'orders'}), frozenset({('orders', 'order_id')}))
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from app.config.constants import SQL_ANALYSIS_CACHE_SIZE
+from app.config.exceptions import ValidationException
+
+# Statements (or clauses) that write, change state or escape the read-only sandbox
+DANGEROUS_KEYWORDS = frozenset(
+    {
+        "DROP", "DELETE", "TRUNCATE", "ALTER", "CREATE", "INSERT", "UPDATE", "MERGE",
+        "GRANT", "REVOKE", "COPY", "CALL", "DO", "EXECUTE", "PREPARE", "VACUUM",
+        "REINDEX", "CLUSTER", "COMMENT", "LOCK", "SET", "RESET", "LISTEN", "NOTIFY",
+        "REFRESH", "INTO",
+    },
+)  # fmt: skip
+
+# Words followed by "(" that are not function calls
+_NON_FUNCTION_WORDS = frozenset(
+    {
+        "IN", "EXISTS", "ANY", "ALL", "SOME", "AS", "FROM", "JOIN", "ON", "USING",
+        "VALUES", "OVER", "FILTER", "WITHIN", "AND", "OR", "NOT", "SELECT", "WHERE",
+        "LATERAL", "ARRAY", "ROW", "WITH", "BY", "HAVING", "THEN", "ELSE", "WHEN",
+        "UNION", "INTERSECT", "EXCEPT", "IS", "LIKE", "ILIKE", "BETWEEN", "CASE",
+        "MATERIALIZED", "RECURSIVE", "LIMIT", "OFFSET", "GROUP", "DISTINCT",
+    },
+)  # fmt: skip
+
+# Reserved and clause words never reported as columns or aliases
+_KEYWORDS = _NON_FUNCTION_WORDS | DANGEROUS_KEYWORDS | frozenset(
+    {
+        "DISTINCT", "GROUP", "ORDER", "ASC", "DESC", "NULLS", "FIRST", "LAST", "NULL",
+        "TRUE", "FALSE", "END", "LEFT", "RIGHT", "FULL", "INNER", "OUTER", "CROSS",
+        "NATURAL", "ONLY", "PARTITION", "ROWS", "RANGE", "UNBOUNDED", "PRECEDING",
+        "FOLLOWING", "CURRENT", "CURRENT_DATE", "CURRENT_TIMESTAMP", "INTERVAL", "YEAR",
+        "MONTH", "DAY", "HOUR", "MINUTE", "SECOND", "WEEK", "QUARTER", "DOW", "DOY",
+        "EPOCH", "FETCH", "NEXT", "TIES", "TIME", "ZONE", "AT", "FOR", "SIMILAR", "TO",
+        "ESCAPE", "WINDOW", "DATE", "TIMESTAMP", "BOTH", "LEADING", "TRAILING", "TABLE",
+    },
+)  # fmt: skip
+
+# Words starting a clause (columns are attributed to the current clause)
+_CLAUSES = {
+    "SELECT": "SELECT",
+    "FROM": "FROM",
+    "JOIN": "FROM",
+    "WHERE": "WHERE",
+    "ON": "ON",
+    "USING": "FROM",
+    "GROUP": "GROUP",
+    "HAVING": "HAVING",
+    "WINDOW": "GROUP",
+    "ORDER": "ORDER",
+    "LIMIT": "ORDER",
+    "OFFSET": "ORDER",
+    "UNION": "",
+    "INTERSECT": "",
+    "EXCEPT": "",
+}
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+      (?P<space>\s+)
+    | (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<string>[eEbBxXnN]?'(?:[^']|'')*')
+    | (?P<dollar>\$(?P<tag>[A-Za-z_]\w*)?\$.*?\$(?P=tag)\$)
+    | (?P<ident>"(?:[^"]|"")+")
+    | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<param>:[A-Za-z_]\w*|\$\d+)
+    | (?P<op>::|<=|>=|<>|!=|\|\||[-+*/%<>=~!@#^&|?])
+    | (?P<punct>[(),;.\[\]])
+    | (?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+Token = Tuple[str, str]
+
+_AGGREGATES = frozenset({"COUNT", "SUM", "AVG", "MIN", "MAX"})
+
+# Row count part of "FETCH {FIRST | NEXT} [count] {ROW | ROWS} {ONLY | WITH TIES}"
+_FETCH_PATTERN = re.compile(
+    r"^(?:FIRST|NEXT)\s*(?P<count>.*?)\s*\bROWS?\s+(?P<ending>ONLY|WITH\s+TIES)$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+_ROW_LIMIT_WORDS = frozenset({"LIMIT", "OFFSET", "FETCH"})
+
+# "expression [AS] alias" at the end of a SELECT item
+_ALIAS_PATTERN = re.compile(
+    r'^(?P<expression>.+?)\s+(?P<as>AS\s+)?(?P<alias>"[^"]+"|[A-Za-z_]\w*)$',
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+@dataclass(frozen=True)
+class SQLAnalysis:
+    """Structural analysis of a SQL string.
+
+    Attributes:
+        statement_type: Type of the first statement ("SELECT" for SELECT/WITH queries,
+            otherwise its first keyword).
+        statement_count: Number of statements.
+        tables: Referenced tables (lowercase, unqualified, CTEs excluded).
+        schemas: Schemas qualifying table references (lowercase).
+        functions: Called functions (lowercase, unqualified).
+        columns: Column references as (table or None, column), qualifiers resolved
+            through aliases; None if unqualified or unresolvable.
+        filter_columns: Column references in WHERE clauses (same form as columns).
+        join_columns: Column references in JOIN ... ON conditions (same form as columns).
+        ctes: CTE names defined by WITH (lowercase).
+        dangerous_keywords: Dangerous keywords used as SQL words, in order.
+    """
+
+    statement_type: str
+    statement_count: int
+    tables: FrozenSet[str]
+    schemas: FrozenSet[str]
+    functions: FrozenSet[str]
+    columns: FrozenSet[Tuple[Optional[str], str]]
+    filter_columns: FrozenSet[Tuple[Optional[str], str]]
+    join_columns: FrozenSet[Tuple[Optional[str], str]]
+    ctes: FrozenSet[str]
+    dangerous_keywords: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class RowLimit:
+    """Outermost row limiting clauses of a query.
+
+    Attributes:
+        statement: Query without terminating semicolons and trailing comments.
+        body: Statement without its outermost LIMIT/OFFSET/FETCH clauses.
+        limit: Row count expression of LIMIT or FETCH FIRST as written ("ALL", a
+            number, a parameter...), or None if the query has none.
+        offset: OFFSET expression (without ROW/ROWS), or None.
+        with_ties: Whether FETCH FIRST ... WITH TIES is used.
+    """
+
+    statement: str
+    body: str
+    limit: Optional[str]
+    offset: Optional[str]
+    with_ties: bool = False
+
+
+@lru_cache(maxsize=SQL_ANALYSIS_CACHE_SIZE)
+def analyze_sql(sql: str) -> SQLAnalysis:
+    """Analyze SQL in a single pass (cached by SQL text).
+
+    Args:
+        sql: SQL string.
+
+    Returns:
+        SQLAnalysis for the SQL.
+
+    Raises:
+        ValidationException: If the SQL cannot be tokenized (unterminated quote)
+            or has unbalanced parentheses.
+    """
+    tokens = _tokenize(sql)
+    return _Analyzer(tokens, sql).analyze()
+
+
+def _tokenize(sql: str) -> List[Token]:
+    """Split SQL into (kind, value) tokens, dropping whitespace and comments.
+
+    Args:
+        sql: SQL string.
+
+    Returns:
+        List of tokens.
+
+    Raises:
+        ValidationException: If a quote is left unterminated.
+    """
+    return [(kind, value) for kind, value, _ in _scan(sql)]
+
+
+def _scan(sql: str) -> List[Tuple[str, str, int]]:
+    """Split SQL into (kind, value, start offset) tokens, dropping whitespace and comments.
+
+    Args:
+        sql: SQL string.
+
+    Returns:
+        List of tokens with their start offsets.
+
+    Raises:
+        ValidationException: If a quote is left unterminated.
+    """
+    tokens: List[Tuple[str, str, int]] = []
+    for match in _TOKEN_PATTERN.finditer(sql):
+        kind = match.lastgroup
+        if kind == "tag":
+            kind = "dollar"
+        if kind in ("space", "comment"):
+            continue
+        value = match.group(kind)  # type: ignore[arg-type]
+        if kind == "other" and value in ("'", '"', "$"):
+            raise ValidationException(
+                message="SQL syntax is invalid (unterminated quote)",
+                details={"sql": sql[:200]},
+            )
+        tokens.append((kind, value, match.start()))  # type: ignore[arg-type]
+    return tokens
+
+
+def split_clauses(sql: str) -> Optional[Dict[str, str]]:
+    """Split a plain SELECT statement into its top-level clause texts.
+
+    Args:
+        sql: SQL string.
+
+    Returns:
+        Dictionary of clause ("SELECT", "FROM", "WHERE", "GROUP BY", "HAVING",
+        "ORDER BY", "LIMIT", "OFFSET") to its text without the keyword, or None
+        for anything else (CTEs, set operations, several statements, invalid SQL).
+    """
+    try:
+        tokens = _scan(sql)
+    except ValidationException:
+        return None
+    while tokens and tokens[-1][:2] == ("punct", ";"):
+        tokens.pop()
+    if not tokens or tokens[0][1].upper() != "SELECT":
+        return None
+
+    # (clause, offset of its keyword, offset where its text starts)
+    starts: List[Tuple[str, int, int]] = []
+    depth = 0
+    for i, (kind, value, start) in enumerate(tokens):
+        if kind == "punct" and value == "(":
+            depth += 1
+        elif kind == "punct" and value == ")":
+            depth -= 1
+            if depth < 0:
+                return None
+        elif depth == 0 and kind == "punct" and value == ";":
+            return None
+        elif depth == 0 and kind == "word":
+            upper = value.upper()
+            if upper in ("UNION", "INTERSECT", "EXCEPT", "WINDOW", "FETCH", "FOR"):
+                return None
+            if upper in ("GROUP", "ORDER"):
+                following = tokens[i + 1] if i + 1 < len(tokens) else None
+                if following is None or following[1].upper() != "BY":
+                    return None
+                starts.append((f"{upper} BY", start, following[2] + len(following[1])))
+            elif upper in ("SELECT", "FROM", "WHERE", "HAVING", "LIMIT", "OFFSET"):
+                if any(clause == upper for clause, _, _ in starts):
+                    return None
+                starts.append((upper, start, start + len(value)))
+    if depth != 0:
+        return None
+
+    ends = [keyword_start for _, keyword_start, _ in starts[1:]] + [len(sql)]
+    return {
+        clause: sql[text_start:end].strip().rstrip(";").strip()
+        for (clause, _, text_start), end in zip(starts, ends)
+    }
+
+
+def normalize_sql(text: str) -> str:
+    """Normalize a SQL fragment for comparison.
+
+    Collapses whitespace and comments and lowercases unquoted words; literals
+    and quoted identifiers are kept as written.
+
+    Args:
+        text: SQL fragment.
+
+    Returns:
+        Normalized text (tokens separated by single spaces).
+
+    Raises:
+        ValidationException: If a quote is left unterminated.
+    """
+    return " ".join(
+        value.lower() if kind == "word" else value for kind, value, _ in _scan(text)
+    )
+
+
+def dollar_parameters(sql: str) -> str:
+    """Rewrite SQLAlchemy-style ":name" parameters as "$name".
+
+    Literals, quoted identifiers, comments and "::type" casts are single
+    tokens, so only real parameters are rewritten.
+
+    Args:
+        sql: SQL string.
+
+    Returns:
+        SQL with "$name" parameters.
+
+    Raises:
+        ValidationException: If a quote is left unterminated.
+    """
+    parts: List[str] = []
+    end = 0
+    for kind, value, start in _scan(sql):
+        if kind == "param" and value.startswith(":"):
+            parts.append(sql[end:start] + "$" + value[1:])
+            end = start + len(value)
+    return "".join(parts) + sql[end:]
+
+
+def split_list(text: str, separator: str = ",") -> List[str]:
+    """Split text at top-level separators (outside parentheses and literals).
+
+    Args:
+        text: SQL fragment.
+        separator: "," or a keyword such as "AND".
+
+    Returns:
+        Stripped parts (empty parts dropped).
+    """
+    parts: List[str] = []
+    depth = 0
+    begin = 0
+    between = False
+    for kind, value, start in _scan(text):
+        if kind == "punct" and value == "(":
+            depth += 1
+        elif kind == "punct" and value == ")":
+            depth -= 1
+        elif depth == 0 and value.upper() == "BETWEEN":
+            # The AND of "BETWEEN x AND y" does not separate conditions
+            between = True
+        elif depth == 0 and value.upper() == separator.upper():
+            if between and separator.upper() == "AND":
+                between = False
+                continue
+            parts.append(text[begin:start])
+            begin = start + len(value)
+    parts.append(text[begin:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def split_alias(item: str) -> Tuple[str, Optional[str]]:
+    """Split a SELECT item into its expression and alias.
+
+    Args:
+        item: SELECT list item ("expression [AS] alias").
+
+    Returns:
+        (expression, alias) with the alias unquoted and lowercase, or
+        (item, None) if the item has no alias.
+    """
+    match = _ALIAS_PATTERN.match(item.strip())
+    if match is None or (not match.group("as") and match.group("alias").upper() in _KEYWORDS):
+        # Implicit aliases are never keywords ("CASE ... END")
+        return item.strip(), None
+    return match.group("expression").strip(), match.group("alias").strip('"').lower()
+
+
+def aggregate_calls(text: str) -> List[Tuple[str, str, bool]]:
+    """Find aggregate function calls (COUNT, SUM, AVG, MIN, MAX) in a fragment.
+
+    Args:
+        text: SQL fragment.
+
+    Returns:
+        List of (function, argument text, plain) where plain is False for
+        DISTINCT, FILTER or window (OVER) aggregates.
+    """
+    tokens = _scan(text)
+    calls: List[Tuple[str, str, bool]] = []
+    for i, (kind, value, start) in enumerate(tokens):
+        upper = value.upper()
+        if (
+            kind != "word"
+            or upper not in _AGGREGATES
+            or i + 1 >= len(tokens)
+            or tokens[i + 1][:2] != ("punct", "(")
+        ):
+            continue
+        depth = 0
+        for j in range(i + 1, len(tokens)):
+            if tokens[j][:2] == ("punct", "("):
+                depth += 1
+            elif tokens[j][:2] == ("punct", ")"):
+                depth -= 1
+                if depth == 0:
+                    break
+        else:
+            continue
+        argument = text[tokens[i + 1][2] + 1 : tokens[j][2]].strip()
+        following = tokens[j + 1][1].upper() if j + 1 < len(tokens) else ""
+        plain = (
+            following not in ("FILTER", "OVER")
+            and tokens[i + 2][1].upper() != "DISTINCT"
+        )
+        calls.append((upper, argument, plain))
+    return calls
+
+
+def outer_row_limit(sql: str) -> Optional[RowLimit]:
+    """Find the outermost LIMIT/OFFSET/FETCH FIRST clauses of a query.
+
+    Only clauses at parenthesis depth 0 after the last set operator count,
+    so limits of subqueries and CTEs are ignored; comments and literals
+    never match.
+
+    Args:
+        sql: SQL string (one statement).
+
+    Returns:
+        RowLimit, or None if the SQL cannot be tokenized or its row limiting
+        clauses cannot be parsed (e.g. FETCH without ROWS).
+    """
+    try:
+        tokens = _scan(sql)
+    except ValidationException:
+        return None
+    while tokens and tokens[-1][:2] == ("punct", ";"):
+        tokens.pop()
+    if not tokens:
+        return None
+
+    statement = sql[: tokens[-1][2] + len(tokens[-1][1])]
+    # Offsets of depth 0 LIMIT/OFFSET/FETCH keywords after the last set operator
+    keywords: List[Tuple[str, int]] = []
+    depth = 0
+    for kind, value, start in tokens:
+        if kind == "punct" and value == "(":
+            depth += 1
+        elif kind == "punct" and value == ")":
+            depth -= 1
+        elif depth == 0 and kind == "word":
+            upper = value.upper()
+            if upper in ("UNION", "INTERSECT", "EXCEPT"):
+                keywords = []
+            elif upper in _ROW_LIMIT_WORDS:
+                keywords.append((upper, start))
+
+    if not keywords:
+        return RowLimit(statement=statement, body=statement, limit=None, offset=None)
+
+    limit: Optional[str] = None
+    offset: Optional[str] = None
+    with_ties = False
+    ends = [start for _, start in keywords[1:]] + [len(statement)]
+    for (keyword, start), end in zip(keywords, ends):
+        text = statement[start + len(keyword) : end].strip()
+        if keyword == "LIMIT":
+            limit = text
+        elif keyword == "OFFSET":
+            offset = re.sub(r"\s+ROWS?$", "", text, flags=re.IGNORECASE)
+        else:
+            match = _FETCH_PATTERN.match(text)
+            if match is None:
+                return None
+            limit = match.group("count") or "1"
+            with_ties = match.group("ending").upper() != "ONLY"
+        if not text:
+            return None
+
+    return RowLimit(
+        statement=statement,
+        body=statement[: keywords[0][1]].rstrip(),
+        limit=limit,
+        offset=offset,
+        with_ties=with_ties,
+    )
+
+
+def _name(token: Token) -> str:
+    """Get normalized name of a word or quoted identifier token.
+
+    Args:
+        token: Word or identifier token.
+
+    Returns:
+        Lowercase word, or unquoted identifier (case preserved).
+    """
+    kind, value = token
+    if kind == "ident":
+        return value[1:-1].replace('""', '"')
+    return value.lower()
+
+
+class _Analyzer:
+    """Single pass over tokens collecting SQLAnalysis facts."""
+
+    def __init__(self, tokens: List[Token], sql: str) -> None:
+        """Initialize analyzer.
+
+        Args:
+            tokens: Tokens from _tokenize.
+            sql: Original SQL (error details).
+        """
+        self._tokens = tokens
+        self._sql = sql
+        self._tables: Set[str] = set()
+        self._schemas: Set[str] = set()
+        self._functions: Set[str] = set()
+        self._ctes: Set[str] = set()
+        self._aliases: Dict[str, str] = {}
+        # Column references as (clause, qualifier or None, column)
+        self._references: List[Tuple[str, Optional[str], str]] = []
+        # Current clause per parenthesis depth (parentheses inherit it)
+        self._clauses: List[str] = [""]
+        self._dangerous: List[str] = []
+        # Token positions that are names, not column references
+        self._skip: Set[int] = set()
+
+    def analyze(self) -> SQLAnalysis:
+        """Run the analysis.
+
+        Returns:
+            SQLAnalysis.
+
+        Raises:
+            ValidationException: If parentheses are unbalanced.
+        """
+        tokens = self._tokens
+        # SELECT seen per parenthesis depth
+        select_seen: List[bool] = [False]
+        statement_count = 1 if tokens else 0
+
+        for i, (kind, value) in enumerate(tokens):
+            if kind == "punct":
+                if value == "(":
+                    select_seen.append(False)
+                    self._clauses.append(self._clauses[-1])
+                elif value == ")":
+                    if len(select_seen) == 1:
+                        self._unbalanced()
+                    select_seen.pop()
+                    self._clauses.pop()
+                elif value == ";" and len(select_seen) == 1:
+                    if any(token != ("punct", ";") for token in tokens[i + 1 :]):
+                        statement_count += 1
+                    select_seen[-1] = False
+                    self._clauses[-1] = ""
+                continue
+
+            if kind not in ("word", "ident"):
+                continue
+
+            upper = value.upper() if kind == "word" else ""
+            if upper in DANGEROUS_KEYWORDS:
+                self._dangerous.append(upper)
+            if upper in _CLAUSES and (upper != "FROM" or select_seen[-1]):
+                self._clauses[-1] = _CLAUSES[upper]
+            if upper == "SELECT":
+                select_seen[-1] = True
+            elif upper == "WITH":
+                self._read_ctes(i + 1)
+            elif upper == "JOIN" or (upper == "FROM" and select_seen[-1]):
+                self._read_table_refs(i + 1, allow_list=upper == "FROM")
+            elif upper == "TABLE":
+                # "TABLE name" query expression (SELECT * FROM name)
+                self._read_table_refs(i + 1, allow_list=False)
+
+            self._classify(i, upper)
+
+        if len(select_seen) != 1:
+            self._unbalanced()
+
+        references = [
+            (clause, self._resolve(qualifier) if qualifier else None, column)
+            for clause, qualifier, column in self._references
+        ]
+
+        return SQLAnalysis(
+            statement_type=self._statement_type(),
+            statement_count=statement_count,
+            tables=frozenset(self._tables - self._ctes),
+            schemas=frozenset(self._schemas),
+            functions=frozenset(self._functions),
+            columns=frozenset((table, column) for _, table, column in references),
+            filter_columns=frozenset(
+                (table, column) for clause, table, column in references if clause == "WHERE"
+            ),
+            join_columns=frozenset(
+                (table, column) for clause, table, column in references if clause == "ON"
+            ),
+            ctes=frozenset(self._ctes),
+            dangerous_keywords=tuple(self._dangerous),
+        )
+
+    def _classify(self, i: int, upper: str) -> None:
+        """Classify a word/identifier as function, qualifier or column.
+
+        Args:
+            i: Token index.
+            upper: Uppercase word ("" for quoted identifiers).
+        """
+        tokens = self._tokens
+        next_token = tokens[i + 1] if i + 1 < len(tokens) else None
+        previous = tokens[i - 1] if i > 0 else None
+
+        if next_token == ("punct", "(") and upper not in _NON_FUNCTION_WORDS:
+            if i not in self._skip:
+                self._functions.add(_name(tokens[i]))
+            return
+
+        if i in self._skip or upper in _KEYWORDS or previous == ("op", "::"):
+            return
+        # Output alias ("AS total") or qualified part handled by its qualifier
+        if previous is not None and (
+            previous[1].upper() == "AS" or previous == ("punct", ".")
+        ):
+            return
+
+        if next_token == ("punct", "."):
+            following = tokens[i + 2] if i + 2 < len(tokens) else None
+            if following is not None and following[0] in ("word", "ident"):
+                # Function qualified by schema ("pg_catalog.pg_sleep(")
+                if i + 3 < len(tokens) and tokens[i + 3] == ("punct", "("):
+                    return
+                self._references.append(
+                    (self._clauses[-1], _name(tokens[i]), _name(following)),
+                )
+            return
+
+        self._references.append((self._clauses[-1], None, _name(tokens[i])))
+
+    def _read_ctes(self, j: int) -> None:
+        """Record CTE names defined after WITH.
+
+        Args:
+            j: Index of the token after WITH.
+        """
+        tokens = self._tokens
+        if j < len(tokens) and tokens[j][1].upper() == "RECURSIVE":
+            j += 1
+
+        while j + 1 < len(tokens) and tokens[j][0] in ("word", "ident"):
+            name_index = j
+            j += 1
+            if tokens[j] == ("punct", "("):
+                column_list_end = self._matching(j)
+                self._skip.update(range(j, column_list_end + 1))
+                j = column_list_end + 1
+            if j >= len(tokens) or tokens[j][1].upper() != "AS":
+                # Not a CTE (e.g. "WITH TIME ZONE")
+                return
+
+            self._ctes.add(_name(tokens[name_index]))
+            self._skip.add(name_index)
+            j += 1
+            while j < len(tokens) and tokens[j][1].upper() in ("NOT", "MATERIALIZED"):
+                j += 1
+            if j >= len(tokens) or tokens[j] != ("punct", "("):
+                return
+            j = self._matching(j) + 1
+            if j >= len(tokens) or tokens[j] != ("punct", ","):
+                return
+            j += 1
+
+    def _read_table_refs(self, j: int, allow_list: bool) -> None:
+        """Record table references (and aliases) after FROM, JOIN or TABLE.
+
+        Args:
+            j: Index of the token after FROM/JOIN/TABLE.
+            allow_list: Whether a comma-separated list may follow (FROM).
+        """
+        tokens = self._tokens
+        while j < len(tokens):
+            while j < len(tokens) and tokens[j][1].upper() in ("ONLY", "LATERAL"):
+                j += 1
+            if j >= len(tokens):
+                return
+
+            table: Optional[str] = None
+            if tokens[j] == ("punct", "("):
+                # Derived table: its contents are scanned by the main loop
+                j = self._matching(j) + 1
+            elif tokens[j][0] in ("word", "ident") and tokens[j][1].upper() not in _KEYWORDS:
+                parts = [j]
+                while (
+                    parts[-1] + 2 < len(tokens)
+                    and tokens[parts[-1] + 1] == ("punct", ".")
+                    and tokens[parts[-1] + 2][0] in ("word", "ident")
+                ):
+                    parts.append(parts[-1] + 2)
+                j = parts[-1] + 1
+
+                if j < len(tokens) and tokens[j] == ("punct", "("):
+                    # Table function: recorded as a function by the main loop
+                    j = self._matching(j) + 1
+                else:
+                    table = _name(tokens[parts[-1]]).lower()
+                    self._tables.add(table)
+                    if len(parts) > 1:
+                        self._schemas.add(_name(tokens[parts[-2]]).lower())
+                    self._skip.update(parts)
+            else:
+                return
+
+            # Optional alias (and column alias list)
+            if j < len(tokens) and tokens[j][1].upper() == "AS":
+                j += 1
+            if (
+                j < len(tokens)
+                and tokens[j][0] in ("word", "ident")
+                and tokens[j][1].upper() not in _KEYWORDS
+            ):
+                if table is not None:
+                    self._aliases[_name(tokens[j])] = table
+                self._skip.add(j)
+                j += 1
+                if j < len(tokens) and tokens[j] == ("punct", "("):
+                    end = self._matching(j)
+                    self._skip.update(range(j, end + 1))
+                    j = end + 1
+
+            if not (allow_list and j < len(tokens) and tokens[j] == ("punct", ",")):
+                return
+            j += 1
+
+    def _matching(self, j: int) -> int:
+        """Find the index of the parenthesis closing the one at j.
+
+        Args:
+            j: Index of "(".
+
+        Returns:
+            Index of the matching ")".
+
+        Raises:
+            ValidationException: If it is never closed.
+        """
+        depth = 0
+        for k in range(j, len(self._tokens)):
+            if self._tokens[k] == ("punct", "("):
+                depth += 1
+            elif self._tokens[k] == ("punct", ")"):
+                depth -= 1
+                if depth == 0:
+                    return k
+        self._unbalanced()
+        return len(self._tokens)  # unreachable
+
+    def _resolve(self, qualifier: str) -> Optional[str]:
+        """Resolve a column qualifier to a table name.
+
+        Args:
+            qualifier: Alias or table name.
+
+        Returns:
+            Table name, or None if unknown (e.g. derived table alias).
+        """
+        if qualifier in self._aliases:
+            return self._aliases[qualifier]
+        if qualifier in self._tables and qualifier not in self._ctes:
+            return qualifier
+        return None
+
+    def _statement_type(self) -> str:
+        """Get type of the first statement.
+
+        Returns:
+            "SELECT" for SELECT/WITH queries, otherwise the first keyword ("" if empty).
+        """
+        for kind, value in self._tokens:
+            if kind == "word":
+                upper = value.upper()
+                return "SELECT" if upper in ("SELECT", "WITH") else upper
+            if kind != "punct":
+                break
+        return ""
+
+    def _unbalanced(self) -> None:
+        """Raise for unbalanced parentheses.
+
+        Raises:
+            ValidationException: Always.
+        """
+        raise ValidationException(
+            message="SQL syntax is invalid (unbalanced parentheses)",
+            details={"sql": self._sql[:200]},
+        )
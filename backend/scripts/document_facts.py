@@ -0,0 +1,97 @@
+"""
+Document facts script (commerce extracted fields as a typed analytics table).
+
+Overview
+  Administrative script that materialises processed commerce documents into
+  the document facts table of the analytics schema (created and registered in
+  the schema catalog on first run). Documents are materialised in the
+  background as they are processed; this script backfills existing documents
+  and catches up on documents changed since the last projected one.
+
+Design
+  - **Incremental by Default**: Projects documents changed since the watermark (all
+    documents on the first run).
+  - **Full Sync**: --full re-projects every document (e.g. after adding field aliases)
+    and removes facts of deleted documents.
+  - **Snapshots**: Rewrites the Parquet snapshot when snapshots are enabled.
+
+Integration
+  - Consumes: DocumentFactsMaterialiser, ParquetSnapshotStore, database session.
+  - Returns: Exit code (0 for success, 1 for failure).
+  - Used by: Administrative scripts (backfill, periodic catch-up).
+  - Observability: Logs projected and removed documents.
+
+Usage
+  >>> python scripts/document_facts.py
+  >>> python scripts/document_facts.py --full
+"""
+
+import asyncio
+import logging
+import sys
+
+from app.agents.analytics.document_facts import DocumentFactsMaterialiser
+from app.infrastructure.database.connection import get_db_session
+from app.infrastructure.database.repositories.duckdb_analytics_repo import (
+    get_snapshot_store,
+    snapshots_enabled,
+)
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def sync_document_facts(full: bool = False) -> int:
+    """Materialise commerce documents into the document facts table.
+
+    Args:
+        full: If True, re-project every document and remove facts of deleted ones.
+
+    Returns:
+        Exit code (0 for success, 1 for failure).
+    """
+    try:
+        async with get_db_session() as session:
+            materialiser = DocumentFactsMaterialiser(
+                session,
+                snapshot_store=get_snapshot_store() if snapshots_enabled() else None,
+            )
+            counts = await materialiser.sync(full=full)
+
+        logger.info(
+            f"✓ Document facts synced: {counts['projected']} projected, "
+            f"{counts['removed']} removed",
+        )
+        return 0
+    except Exception as e:
+        logger.error(f"✗ Document facts sync failed: {e}")
+        return 1
+
+
+def main() -> None:
+    """Main entry point for document facts script.
+
+    Parses command line arguments and syncs the document facts table.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Materialise commerce document fields into the analytics schema",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-project every document and remove facts of deleted documents",
+    )
+
+    args = parser.parse_args()
+    exit_code = asyncio.run(sync_document_facts(full=args.full))
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
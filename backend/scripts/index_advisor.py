@@ -0,0 +1,160 @@
+"""
+Index advisor script (workload-driven index recommendations).
+
+Overview
+  Administrative script that analyzes the analytics query log, prints
+  index recommendations with their estimated benefit and, on request,
+  creates them concurrently (no table locks blocking reads or loads).
+
+Design
+  - **Workload Driven**: Recommendations come from IndexAdvisor over the query log.
+  - **Concurrent Apply**: CREATE INDEX CONCURRENTLY on an autocommit connection; a
+    failed build's INVALID index is dropped so a rerun can retry.
+  - **Log Retention**: Option to prune old query log entries first.
+
+Integration
+  - Consumes: IndexAdvisor, AnalyticsRepository, database engine.
+  - Returns: Exit code (0 for success, 1 for failure).
+  - Used by: Administrative scripts for analytics tuning.
+  - Observability: Logs recommendations and index creation progress.
+
+Usage
+  >>> python scripts/index_advisor.py
+  >>> python scripts/index_advisor.py --apply
+  >>> python scripts/index_advisor.py --prune-days 30 --limit 10000
+"""
+
+import asyncio
+import logging
+import sys
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.agents.analytics.index_advisor import IndexAdvisor, IndexRecommendation
+from app.config.constants import ANALYTICS_INDEX_ADVISOR_LOG_LIMIT
+from app.infrastructure.database.connection import get_db_engine, get_db_session
+from app.infrastructure.database.repositories.analytics_repo import PostgreSQLAnalyticsRepository
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def create_index(recommendation: IndexRecommendation) -> None:
+    """Create a recommended index concurrently.
+
+    Args:
+        recommendation: Index recommendation.
+
+    Raises:
+        Exception: If index creation fails (the INVALID index is dropped).
+    """
+    async with get_db_engine().connect() as connection:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            await connection.execute(text(recommendation.ddl))
+        except Exception:
+            await connection.execute(
+                text(f'DROP INDEX CONCURRENTLY IF EXISTS analytics."{recommendation.name}"'),
+            )
+            raise
+
+
+async def run_advisor(
+    limit: int = ANALYTICS_INDEX_ADVISOR_LOG_LIMIT,
+    apply: bool = False,
+    prune_days: Optional[int] = None,
+) -> int:
+    """Recommend (and optionally create) indexes for the logged workload.
+
+    Args:
+        limit: Most recent query log entries analyzed.
+        apply: If True, create the recommended indexes.
+        prune_days: Delete query log entries older than this many days first (optional).
+
+    Returns:
+        Exit code (0 for success, 1 for failure).
+    """
+    try:
+        async with get_db_session() as session:
+            repository = PostgreSQLAnalyticsRepository(session)
+            if prune_days is not None:
+                deleted = await repository.prune_query_log(prune_days)
+                logger.info(f"✓ Pruned {deleted} query log entries older than {prune_days} days")
+
+            recommendations = await IndexAdvisor(repository).recommend(limit)
+    except Exception as e:
+        logger.error(f"✗ Index advisor failed: {e}")
+        return 1
+
+    if not recommendations:
+        logger.info("No index recommendations for the current workload")
+        return 0
+
+    for recommendation in recommendations:
+        logger.info(
+            f"{recommendation.ddl}\n"
+            f"    benefit ~{recommendation.estimated_benefit_ms:.0f}ms over "
+            f"{recommendation.query_count} execution(s) "
+            f"({recommendation.workload_time_ms:.0f}ms), cost "
+            f"{recommendation.cost_before:.0f} -> {recommendation.cost_after:.0f} "
+            f"({recommendation.method}, {recommendation.kind})",
+        )
+
+    if not apply:
+        return 0
+
+    failures = 0
+    for recommendation in recommendations:
+        try:
+            await create_index(recommendation)
+            logger.info(f"✓ Created index {recommendation.name}")
+        except Exception as e:
+            failures += 1
+            logger.error(f"✗ Failed to create index {recommendation.name}: {e}")
+
+    return 1 if failures else 0
+
+
+def main() -> None:
+    """Main entry point for index_advisor script.
+
+    Parses command line arguments and runs the index advisor.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Recommend indexes for analytics tables from the query log",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Create the recommended indexes (CREATE INDEX CONCURRENTLY)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=ANALYTICS_INDEX_ADVISOR_LOG_LIMIT,
+        help="Most recent query log entries analyzed",
+    )
+    parser.add_argument(
+        "--prune-days",
+        type=int,
+        default=None,
+        help="Delete query log entries older than this many days first",
+    )
+
+    args = parser.parse_args()
+    exit_code = asyncio.run(
+        run_advisor(limit=args.limit, apply=args.apply, prune_days=args.prune_days),
+    )
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,15 @@ Design
   - **Error Handling**: Continues processing even if individual CSVs fail.
   - **Progress Reporting**: Logs progress and provides final report.
   - **Dry Run**: Option to list files without processing.
+  - **Load Modes**: replace (full swap), append (new rows), upsert (merge by key).
+  - **Rollup Refresh**: Rollups over the loaded tables are refreshed (or rebuilt)
+    after the files are processed.
+  - **Parquet Snapshots**: Written per loaded table when enabled (ANALYTICS_PARQUET_SNAPSHOTS,
+    ANALYTICS_ENGINE=duckdb or --snapshots) for the DuckDB engine.
 
 Integration
-  - Consumes: AnalyticsSchemaBuilder, database connection.
+  - Consumes: AnalyticsSchemaBuilder, RollupManager, database connection, LLM client
+    (schema embeddings).
   - Returns: Exit code (0 for success, 1 for failure).
   - Used by: Administrative scripts for analytics database population.
   - Observability: Logs ingestion progress and errors.
@@ -24,6 +30,8 @@ Usage
   >>> python scripts/ingest_csvs.py <directory> --recursive
   >>> python scripts/ingest_csvs.py <directory> --dry-run
   >>> python scripts/ingest_csvs.py <directory> --schema-only
+  >>> python scripts/ingest_csvs.py <directory> --mode upsert
+  >>> python scripts/ingest_csvs.py <directory> --snapshots
 """
 
 import asyncio
@@ -32,8 +40,15 @@ import sys
 from pathlib import Path
 from typing import List
 
-from app.agents.analytics import AnalyticsSchemaBuilder
+from app.agents.analytics import AnalyticsSchemaBuilder, RollupManager
+from app.config.constants import DEFAULT_INGESTION_MODE, INGESTION_MODES
 from app.infrastructure.database.connection import get_db_session
+from app.infrastructure.database.repositories.duckdb_analytics_repo import (
+    DUCKDB_AVAILABLE,
+    get_snapshot_store,
+    snapshots_enabled,
+)
+from app.infrastructure.llm import get_llm_client
 
 # Setup logging
 logging.basicConfig(
@@ -98,6 +113,8 @@ async def ingest_csvs(
     recursive: bool = False,
     dry_run: bool = False,
     schema_only: bool = False,
+    mode: str = DEFAULT_INGESTION_MODE,
+    snapshots: bool = False,
 ) -> int:
     """Ingest CSVs from directory into analytics database.
 
@@ -106,6 +123,8 @@ async def ingest_csvs(
         recursive: If True, search recursively.
         dry_run: If True, only list files without processing.
         schema_only: If True, only create schemas without inserting data.
+        mode: Load mode ("replace", "append", or "upsert").
+        snapshots: If True, write Parquet snapshots even if not enabled in settings.
 
     Returns:
         Exit code (0 for success, 1 for failure).
@@ -143,11 +162,31 @@ async def ingest_csvs(
         processed_count = 0
         error_count = 0
         errors: List[tuple[Path, str]] = []
+        loaded_tables: List[str] = []
+
+        # LLM client is optional: without it tables are ingested without
+        # schema embeddings (always kept in planner prompts)
+        llm_client = None
+        try:
+            llm_client = get_llm_client()
+        except Exception as e:
+            logger.warning(f"⚠ LLM client unavailable, skipping schema embeddings: {e}")
+
+        snapshot_store = None
+        if snapshots and not DUCKDB_AVAILABLE:
+            logger.warning("⚠ duckdb is not installed, skipping Parquet snapshots")
+        elif snapshots or snapshots_enabled():
+            snapshot_store = get_snapshot_store()
+            logger.info(f"Writing Parquet snapshots to: {snapshot_store.directory}")
 
         async with get_db_session() as session:
-            builder = AnalyticsSchemaBuilder(session)
+            builder = AnalyticsSchemaBuilder(
+                session,
+                llm_client=llm_client,
+                snapshot_store=snapshot_store,
+            )
 
-            logger.info(f"Processing {len(csv_files)} CSV file(s)...")
+            logger.info(f"Processing {len(csv_files)} CSV file(s) (mode: {mode})...")
 
             for i, csv_file in enumerate(csv_files, 1):
                 try:
@@ -158,11 +197,12 @@ async def ingest_csvs(
                     )
 
                     # Build schema and create table
-                    table = await builder.build_schema_from_csv(csv_file)
+                    table = await builder.build_schema_from_csv(csv_file, mode=mode)
 
                     processed_count += 1
+                    loaded_tables.append(table.name)
                     logger.info(
-                        f"✓ Successfully ingested: {csv_file.name} (table: {table.table_name})",
+                        f"✓ Successfully ingested: {csv_file.name} (table: {table.name})",
                     )
                 except Exception as e:
                     error_count += 1
@@ -174,6 +214,12 @@ async def ingest_csvs(
                     )
                     # Continue with next CSV
 
+            # Refresh rollups over the loaded tables (failures only logged)
+            if loaded_tables:
+                refreshed = await RollupManager(session).refresh(loaded_tables)
+                if refreshed:
+                    logger.info(f"✓ Refreshed {len(refreshed)} rollup(s): {', '.join(refreshed)}")
+
         # Final report
         logger.info("=" * 60)
         logger.info("INGESTION REPORT")
@@ -230,6 +276,17 @@ def main() -> None:
         action="store_true",
         help="Only create schemas without inserting data (not implemented yet)",
     )
+    parser.add_argument(
+        "--mode",
+        choices=INGESTION_MODES,
+        default=DEFAULT_INGESTION_MODE,
+        help="Load mode: replace table, append new rows, or upsert by primary key",
+    )
+    parser.add_argument(
+        "--snapshots",
+        action="store_true",
+        help="Write Parquet snapshots for the DuckDB engine (requires duckdb)",
+    )
 
     args = parser.parse_args()
 
@@ -239,6 +296,8 @@ def main() -> None:
             recursive=args.recursive,
             dry_run=args.dry_run,
             schema_only=args.schema_only,
+            mode=args.mode,
+            snapshots=args.snapshots,
         ),
     )
     sys.exit(exit_code)
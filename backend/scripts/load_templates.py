@@ -0,0 +1,215 @@
+"""
+Query template loading script (loads curated analytics SQL templates).
+
+Overview
+  Administrative script for loading curated parametrised SQL templates into
+  the analytics template library. Validates each template (slot definitions
+  and allowlist), embeds its exemplar questions and stores template and
+  exemplars. Templates are picked up by running instances on their next
+  template reload (ANALYTICS_TEMPLATE_REFRESH_INTERVAL).
+
+Design
+  - **JSON Input**: List of {name, sql, slots, exemplars, explanation, tables_used,
+    columns_used}; slots as {name: {"type", "default", "values"}}.
+  - **Validation**: Placeholders must be declared slots; SQL rendered with sample
+    values must pass the allowlist (catalog tables allowed).
+  - **Idempotent**: Templates identified by SQL; reloading only adds new exemplars.
+  - **Dry Run**: Option to validate without storing.
+
+Integration
+  - Consumes: TemplateLibrary, AllowlistValidator, SchemaCatalog, AnalyticsRepository,
+    LLM client.
+  - Returns: Exit code (0 for success, 1 for failure).
+  - Used by: Administrative scripts for analytics setup.
+  - Observability: Logs validation and loading progress.
+
+Usage
+  >>> python scripts/load_templates.py templates.json
+  >>> python scripts/load_templates.py templates.json --dry-run
+
+Example template:
+  {
+    "name": "orders_per_month",
+    "sql": "SELECT date_trunc('month', order_purchase_timestamp) AS month, COUNT(*) AS orders
+            FROM analytics.olist_orders
+            WHERE order_purchase_timestamp >= :date_from AND order_purchase_timestamp < :date_to
+            GROUP BY 1 ORDER BY 1",
+    "slots": {"date_from": {"type": "date_from"}, "date_to": {"type": "date_to"}},
+    "exemplars": ["Pedidos por mês em 2017", "Quantos pedidos por mês em 2018?"],
+    "explanation": "Conta pedidos por mês no período.",
+    "tables_used": ["olist_orders"]
+  }
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.agents.analytics.catalog import get_schema_catalog
+from app.agents.analytics.templates import QueryTemplate, TemplateLibrary, placeholders
+from app.infrastructure.database.connection import get_analytics_session, get_db_session
+from app.infrastructure.database.repositories.analytics_repo import PostgreSQLAnalyticsRepository
+from app.infrastructure.llm import get_llm_client
+from app.routing.allowlist import AllowlistValidator, get_allowlist_validator
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Sample values used to render templates for validation
+SAMPLE_VALUES = {
+    "limit": 10,
+    "date_from": date(2000, 1, 1),
+    "date_to": date(2000, 1, 2),
+}
+
+
+def validate_template(
+    definition: Dict[str, Any],
+    library: TemplateLibrary,
+    allowlist_validator: AllowlistValidator,
+    schema_info: Dict[str, Any],
+) -> None:
+    """Validate a template definition.
+
+    Args:
+        definition: Template definition from the JSON file.
+        library: Template library (rendering).
+        allowlist_validator: Allowlist validator.
+        schema_info: Analytics catalog schema info (allowed tables and columns).
+
+    Raises:
+        ValueError: If the definition is incomplete or slots are inconsistent.
+        ValidationException: If the rendered SQL fails allowlist validation.
+    """
+    for key in ("name", "sql", "exemplars"):
+        if not definition.get(key):
+            raise ValueError(f"Missing '{key}'")
+
+    slots: Dict[str, Dict[str, Any]] = definition.get("slots") or {}
+    used = placeholders(definition["sql"])
+    if used != set(slots):
+        raise ValueError(f"Placeholders {sorted(used)} do not match slots {sorted(slots)}")
+
+    values: Dict[str, Any] = {}
+    for name, spec in slots.items():
+        slot_type = spec.get("type")
+        if slot_type == "category":
+            if not spec.get("values"):
+                raise ValueError(f"Category slot '{name}' needs 'values'")
+            values[name] = spec["values"][0]
+        elif slot_type in SAMPLE_VALUES:
+            values[name] = SAMPLE_VALUES[slot_type]
+        else:
+            raise ValueError(f"Unknown type for slot '{name}': {slot_type}")
+
+    template = QueryTemplate(
+        name=definition["name"],
+        sql_template=definition["sql"],
+        slots=slots,
+        explanation=definition.get("explanation", ""),
+        tables_used=definition.get("tables_used", []),
+        columns_used=definition.get("columns_used", []),
+        source="curated",
+    )
+    allowlist_validator.validate_sql(library.render(template, values), schema_info)
+
+
+async def load_templates(path: Path, dry_run: bool = False) -> int:
+    """Load curated query templates from a JSON file.
+
+    Args:
+        path: JSON file with a list of template definitions.
+        dry_run: If True, only validate templates.
+
+    Returns:
+        Exit code (0 for success, 1 for failure).
+    """
+    try:
+        definitions: List[Dict[str, Any]] = json.loads(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.error(f"✗ Failed to read templates file {path}: {e}")
+        return 1
+
+    library = TemplateLibrary()
+    allowlist_validator = get_allowlist_validator()
+
+    async with get_analytics_session() as session:
+        schema_info = await get_schema_catalog().get_schema_info(
+            PostgreSQLAnalyticsRepository(session),
+        )
+
+    valid: List[Dict[str, Any]] = []
+    for definition in definitions:
+        try:
+            validate_template(definition, library, allowlist_validator, schema_info)
+            valid.append(definition)
+            logger.info(f"✓ Valid template: {definition['name']}")
+        except Exception as e:
+            logger.error(f"✗ Invalid template {definition.get('name', '?')}: {e}")
+
+    if dry_run or not valid:
+        logger.info(f"{len(valid)}/{len(definitions)} template(s) valid")
+        return 0 if len(valid) == len(definitions) else 1
+
+    llm_client = get_llm_client()
+    exemplar_count = 0
+
+    async with get_db_session() as session:
+        repository = PostgreSQLAnalyticsRepository(session)
+
+        for definition in valid:
+            embeddings = await llm_client.generate_embeddings_batch(definition["exemplars"])
+            for question, embedding_response in zip(definition["exemplars"], embeddings):
+                await repository.save_query_template(
+                    name=definition["name"],
+                    sql_template=definition["sql"],
+                    slots=definition.get("slots") or {},
+                    question=question,
+                    embedding=embedding_response.embedding,
+                    explanation=definition.get("explanation", ""),
+                    tables_used=definition.get("tables_used"),
+                    columns_used=definition.get("columns_used"),
+                    source="curated",
+                )
+                exemplar_count += 1
+
+    logger.info(f"✓ Loaded {len(valid)} template(s) with {exemplar_count} exemplar(s)")
+    return 0 if len(valid) == len(definitions) else 1
+
+
+def main() -> None:
+    """Main entry point for load_templates script.
+
+    Parses command line arguments and runs template loading.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Load curated analytics query templates",
+    )
+    parser.add_argument(
+        "file",
+        type=Path,
+        help="JSON file with template definitions",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate templates without storing them",
+    )
+
+    args = parser.parse_args()
+    exit_code = asyncio.run(load_templates(args.file, dry_run=args.dry_run))
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
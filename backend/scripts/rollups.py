@@ -0,0 +1,177 @@
+"""
+Rollup script (materialised pre-aggregations for hot GROUP BY shapes).
+
+Overview
+  Administrative script that detects recurring GROUP BY shapes in the
+  analytics query log, prints them as rollup candidates and, on request,
+  materialises them and registers them in the schema catalog. Also
+  refreshes or drops existing rollups.
+
+Design
+  - **Workload Driven**: Candidates come from detect_rollups over the query log.
+  - **Dry Run by Default**: Candidates are only created with --apply.
+  - **Independent Rollups**: A failing rollup (e.g. too large) does not stop the others.
+  - **Maintenance**: --refresh rebuilds all rollups (ingestion refreshes affected ones),
+    --drop removes one.
+
+Integration
+  - Consumes: detect_rollups, RollupManager, AnalyticsRepository, database session.
+  - Returns: Exit code (0 for success, 1 for failure).
+  - Used by: Administrative scripts for analytics tuning.
+  - Observability: Logs candidates and rollup creation progress.
+
+Usage
+  >>> python scripts/rollups.py
+  >>> python scripts/rollups.py --apply
+  >>> python scripts/rollups.py --refresh
+  >>> python scripts/rollups.py --drop rollup_olist_orders_by_month
+"""
+
+import asyncio
+import logging
+import sys
+from typing import Optional
+
+from app.agents.analytics.rollups import RollupManager, detect_rollups
+from app.config.constants import (
+    ANALYTICS_INDEX_ADVISOR_LOG_LIMIT,
+    ANALYTICS_ROLLUP_MIN_EXECUTIONS,
+)
+from app.infrastructure.database.connection import get_db_session
+from app.infrastructure.database.repositories.analytics_repo import PostgreSQLAnalyticsRepository
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def run_rollups(
+    limit: int = ANALYTICS_INDEX_ADVISOR_LOG_LIMIT,
+    min_executions: int = ANALYTICS_ROLLUP_MIN_EXECUTIONS,
+    apply: bool = False,
+    refresh: bool = False,
+    drop: Optional[str] = None,
+) -> int:
+    """Detect (and optionally create), refresh or drop rollups.
+
+    Args:
+        limit: Most recent query log entries analyzed.
+        min_executions: Minimum logged executions of a shape.
+        apply: If True, create the detected rollups.
+        refresh: If True, refresh all existing rollups instead.
+        drop: Rollup to drop instead (optional).
+
+    Returns:
+        Exit code (0 for success, 1 for failure).
+    """
+    try:
+        async with get_db_session() as session:
+            manager = RollupManager(session)
+
+            if drop is not None:
+                if await manager.drop(drop):
+                    logger.info(f"✓ Dropped rollup {drop}")
+                    return 0
+                logger.error(f"✗ Rollup not found: {drop}")
+                return 1
+
+            if refresh:
+                rollups = await manager.list_rollups()
+                refreshed = await manager.refresh()
+                logger.info(f"✓ Refreshed {len(refreshed)}/{len(rollups)} rollup(s)")
+                return 0 if len(refreshed) == len(rollups) else 1
+
+            async with session.begin():
+                entries = await PostgreSQLAnalyticsRepository(session).get_query_log(limit)
+            existing = {rollup.name for rollup in await manager.list_rollups()}
+            candidates = [
+                candidate
+                for candidate in detect_rollups(entries, min_executions=min_executions)
+                if candidate.name not in existing
+            ]
+
+            if not candidates:
+                logger.info("No rollup candidates for the current workload")
+                return 0
+
+            for candidate in candidates:
+                logger.info(
+                    f"{candidate.name}: {candidate.executions} execution(s) "
+                    f"({candidate.total_time_ms:.0f}ms) over {len(candidate.queries)} "
+                    f"distinct quer(y/ies)\n    {candidate.sql}",
+                )
+
+            if not apply:
+                return 0
+
+            failures = 0
+            for candidate in candidates:
+                try:
+                    await manager.create(candidate)
+                    logger.info(f"✓ Created rollup {candidate.name}")
+                except Exception as e:
+                    failures += 1
+                    logger.error(f"✗ Failed to create rollup {candidate.name}: {e}")
+
+            return 1 if failures else 0
+    except Exception as e:
+        logger.error(f"✗ Rollup maintenance failed: {e}")
+        return 1
+
+
+def main() -> None:
+    """Main entry point for rollups script.
+
+    Parses command line arguments and runs rollup maintenance.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Detect, create, refresh or drop analytics rollups",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Create the detected rollups (materialised views)",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Refresh all existing rollups",
+    )
+    parser.add_argument(
+        "--drop",
+        default=None,
+        help="Drop the named rollup",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=ANALYTICS_INDEX_ADVISOR_LOG_LIMIT,
+        help="Most recent query log entries analyzed",
+    )
+    parser.add_argument(
+        "--min-executions",
+        type=int,
+        default=ANALYTICS_ROLLUP_MIN_EXECUTIONS,
+        help="Minimum logged executions of a query shape",
+    )
+
+    args = parser.parse_args()
+    exit_code = asyncio.run(
+        run_rollups(
+            limit=args.limit,
+            min_executions=args.min_executions,
+            apply=args.apply,
+            refresh=args.refresh,
+            drop=args.drop,
+        ),
+    )
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Snapshot script (Parquet snapshots for the DuckDB analytics engine).
+
+Overview
+  Administrative script that (re)writes the Parquet snapshots read by the
+  DuckDB analytics engine. By default exports every active analytics table
+  (and its sample) from PostgreSQL; with --from-csv, snapshots CSV files
+  directly, for local development without PostgreSQL.
+
+Design
+  - **Catalog Tables**: Rollups are skipped (they only exist in PostgreSQL).
+  - **Independent Tables**: A failing table does not stop the others.
+  - **Pruning**: Snapshots of tables no longer in the catalog are removed.
+  - **Local Mode**: --from-csv infers column types with DuckDB (no metadata database).
+
+Integration
+  - Consumes: AnalyticsSchemaBuilder (write_snapshot), ParquetSnapshotStore,
+    AnalyticsRepository, database session.
+  - Returns: Exit code (0 for success, 1 for failure).
+  - Used by: Administrative scripts (initial snapshots, enabling the DuckDB engine).
+  - Observability: Logs snapshot progress and errors.
+
+Usage
+  >>> python scripts/snapshots.py
+  >>> python scripts/snapshots.py --from-csv <directory>
+"""
+
+import asyncio
+import logging
+import sys
+from pathlib import Path
+from typing import Optional
+
+from app.agents.analytics import AnalyticsSchemaBuilder
+from app.infrastructure.database.connection import get_db_session
+from app.infrastructure.database.repositories.analytics_repo import PostgreSQLAnalyticsRepository
+from app.infrastructure.database.repositories.duckdb_analytics_repo import (
+    DUCKDB_AVAILABLE,
+    get_snapshot_store,
+)
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def write_snapshots(from_csv: Optional[Path] = None) -> int:
+    """Write Parquet snapshots of the analytics tables (or of CSV files).
+
+    Args:
+        from_csv: Directory of CSV files to snapshot directly (optional).
+
+    Returns:
+        Exit code (0 for success, 1 for failure).
+    """
+    if not DUCKDB_AVAILABLE:
+        logger.error("✗ duckdb is not installed (poetry install --extras columnar)")
+        return 1
+
+    store = get_snapshot_store()
+    logger.info(f"Writing Parquet snapshots to: {store.directory}")
+
+    if from_csv is not None:
+        if not from_csv.is_dir():
+            logger.error(f"✗ Path is not a directory: {from_csv}")
+            return 1
+
+        failures = 0
+        for csv_file in sorted(from_csv.glob("*.csv")):
+            try:
+                metadata = await asyncio.to_thread(store.write_from_csv, csv_file.stem, csv_file)
+                logger.info(
+                    f"✓ Snapshot of {csv_file.stem} ({len(metadata['columns'])} column(s))",
+                )
+            except Exception as e:
+                failures += 1
+                logger.error(f"✗ Failed to snapshot {csv_file.name}: {e}")
+        return 1 if failures else 0
+
+    try:
+        async with get_db_session() as session:
+            async with session.begin():
+                tables = await PostgreSQLAnalyticsRepository(session).get_all_tables()
+            tables = [
+                table for table in tables if not (table.schema_definition or {}).get("rollup")
+            ]
+
+            builder = AnalyticsSchemaBuilder(session, snapshot_store=store)
+            failures = 0
+            for table in tables:
+                if await builder.write_snapshot(table):
+                    logger.info(f"✓ Snapshot of {table.name} (data version {table.data_version})")
+                else:
+                    failures += 1
+                    logger.error(f"✗ Failed to snapshot {table.name}")
+
+        names = {table.name for table in tables}
+        for stale in set(store.metadata()) - names:
+            store.remove(stale)
+            logger.info(f"✓ Removed snapshot of {stale} (not in catalog)")
+
+        logger.info(f"✓ Wrote {len(tables) - failures}/{len(tables)} snapshot(s)")
+        return 1 if failures else 0
+    except Exception as e:
+        logger.error(f"✗ Snapshot writing failed: {e}")
+        return 1
+
+
+def main() -> None:
+    """Main entry point for snapshots script.
+
+    Parses command line arguments and writes snapshots.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Write Parquet snapshots for the DuckDB analytics engine",
+    )
+    parser.add_argument(
+        "--from-csv",
+        type=Path,
+        default=None,
+        help="Snapshot CSV files from a directory instead of PostgreSQL tables",
+    )
+
+    args = parser.parse_args()
+
+    exit_code = asyncio.run(write_snapshots(from_csv=args.from_csv))
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
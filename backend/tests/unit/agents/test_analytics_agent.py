@@ -32,6 +32,8 @@ class TestAnalyticsAgent:
         """Create mock analytics repository."""
         mock = MagicMock()
         mock.get_schema_info = AsyncMock(return_value={"tables": ["orders"]})
+        mock.get_catalog_version = AsyncMock(return_value=1)
+        mock.get_all_tables = AsyncMock(return_value=[])
         mock.execute_sql = AsyncMock(return_value=[{"count": 10}])
         return mock
 
@@ -0,0 +1,85 @@
+"""
+Unit tests for analytics batch questions.
+
+Tests for app.agents.analytics.batch question and plan deduplication and
+per-question error isolation.
+"""
+
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.agents.analytics.batch import AnalyticsBatch
+from app.config.exceptions import ValidationException
+
+SCHEMA_INFO: Dict[str, Any] = {"tables": [{"name": "orders", "data_version": 1}]}
+
+PLANS = {
+    "orders by status": "SELECT order_status, COUNT(*) FROM orders GROUP BY 1",
+    "order count by status": "SELECT order_status,  COUNT(*)\nFROM orders GROUP BY 1;",
+    "revenue": "SELECT SUM(price) FROM order_items",
+}
+
+
+@asynccontextmanager
+async def _session():
+    yield MagicMock()
+
+
+async def _plan(query: str, language: str, approximate: Any, schema_info: Any) -> Dict[str, Any]:
+    assert schema_info is SCHEMA_INFO
+    if query.casefold() not in PLANS:
+        raise ValidationException(message="Query references non-allowlisted tables")
+    return {
+        "plan": {"explanation": "", "tables_used": ["orders"]},
+        "cost_check": {"sql": PLANS[query.casefold()], "approximation": None},
+        "schema_info": schema_info,
+        "query_embedding": None,
+    }
+
+
+class TestAnalyticsBatch:
+    """Tests for AnalyticsBatch.run."""
+
+    @pytest.mark.asyncio
+    async def test_questions_and_plans_deduplicated(self) -> None:
+        """Test repeated questions plan once and equivalent plans execute once."""
+        catalog = MagicMock()
+        catalog.get_schema_info = AsyncMock(return_value=SCHEMA_INFO)
+        agent = MagicMock()
+        agent.plan = AsyncMock(side_effect=_plan)
+        executor = MagicMock()
+        executor.execute = AsyncMock(
+            return_value={"rows": [{"order_status": "delivered", "count": 3}], "row_count": 1},
+        )
+
+        with (
+            patch("app.agents.analytics.batch.get_analytics_session", _session),
+            patch(
+                "app.agents.analytics.batch.create_analytics_repository",
+                return_value=MagicMock(engine="postgres"),
+            ),
+            patch("app.agents.analytics.batch.get_schema_catalog", return_value=catalog),
+            patch("app.agents.analytics.batch.AnalyticsAgent", return_value=agent),
+            patch("app.agents.analytics.batch.AnalyticsExecutor", return_value=executor),
+        ):
+            report = await AnalyticsBatch(MagicMock(), MagicMock()).run(
+                ["Orders by status", "orders  BY status", "Order count by status", "Unknown"],
+                "en-US",
+            )
+
+        assert (report["question_count"], report["unique_questions"]) == (4, 3)
+        assert (report["unique_plans"], report["failed"]) == (1, 1)
+        assert agent.plan.await_count == 3
+        assert executor.execute.await_count == 1
+        catalog.get_schema_info.assert_awaited_once()
+
+        items = report["items"]
+        assert [item["question"] for item in items][1] == "orders  BY status"
+        assert items[0]["rows"] == items[1]["rows"] == items[2]["rows"]
+        assert [item["shared_plan"] for item in items[:3]] == [False, False, True]
+        assert items[3]["error"] == "Query references non-allowlisted tables"
+        assert items[3]["rows"] is None
+        assert items[0]["insights"] is None
@@ -0,0 +1,144 @@
+"""
+Unit tests for the analytics schema catalog.
+
+Tests for SchemaCatalog version-based reloads, stale snapshot fallback and
+embedding-based schema pruning.
+"""
+
+from types import SimpleNamespace
+from typing import Any, List, Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.agents.analytics.catalog import SchemaCatalog
+from app.config.exceptions import DatabaseException
+
+
+def _column(name: str, embedding: Optional[List[float]] = None, **kwargs: Any) -> Any:
+    return SimpleNamespace(
+        name=name,
+        data_type=kwargs.get("data_type", "TEXT"),
+        is_nullable=True,
+        is_primary_key=kwargs.get("is_primary_key", False),
+        is_foreign_key=kwargs.get("is_foreign_key", False),
+        foreign_key_reference=kwargs.get("foreign_key_reference"),
+        distinct_count=None,
+        min_value=None,
+        max_value=None,
+        top_values=None,
+        embedding=embedding,
+    )
+
+
+def _table(name: str, embedding: Optional[List[float]], columns: List[Any]) -> Any:
+    return SimpleNamespace(
+        name=name,
+        description=f"{name} table",
+        data_version=1,
+        sample_fraction=None,
+        embedding=embedding,
+        columns=columns,
+    )
+
+
+TABLES = [
+    _table("orders", [1.0, 0.0, 0.0], [_column("order_id", is_primary_key=True)]),
+    _table(
+        "order_items",
+        [0.0, 1.0, 0.0],
+        [
+            _column("order_id", foreign_key_reference="orders(order_id)", is_foreign_key=True),
+            _column("price", [0.0, 0.9, 0.1]),
+        ],
+    ),
+    _table("sellers", [0.0, 0.0, 1.0], [_column("seller_city")]),
+    _table("geolocation", None, [_column("zip_code_prefix")]),
+]
+
+
+def _repository(version: int = 1) -> MagicMock:
+    repository = MagicMock()
+    repository.get_catalog_version = AsyncMock(return_value=version)
+    repository.get_all_tables = AsyncMock(return_value=TABLES)
+    return repository
+
+
+class TestSchemaCatalogRefresh:
+    """Tests for SchemaCatalog.get_schema_info."""
+
+    @pytest.mark.asyncio
+    async def test_reloads_only_on_version_bump(self) -> None:
+        """Test tables are reloaded when the catalog version changes, not on every check."""
+        catalog = SchemaCatalog(refresh_interval=0)
+        repository = _repository(version=1)
+
+        first = await catalog.get_schema_info(repository)
+        second = await catalog.get_schema_info(repository)
+        assert second is first
+        assert repository.get_all_tables.await_count == 1
+        assert repository.get_catalog_version.await_count == 2
+
+        repository.get_catalog_version.return_value = 2
+        third = await catalog.get_schema_info(repository)
+        assert third is not first
+        assert (third["version"], catalog.version) == (2, 2)
+        assert repository.get_all_tables.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_fresh_snapshot_skips_version_check(self) -> None:
+        """Test snapshots within the refresh interval are served without database calls."""
+        catalog = SchemaCatalog(refresh_interval=60)
+        repository = _repository()
+
+        await catalog.get_schema_info(repository)
+        await catalog.get_schema_info(repository)
+
+        repository.get_catalog_version.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_serves_stale_snapshot(self) -> None:
+        """Test a failed revalidation keeps serving the last loaded snapshot."""
+        catalog = SchemaCatalog(refresh_interval=0)
+        repository = _repository()
+        snapshot = await catalog.get_schema_info(repository)
+
+        repository.get_catalog_version.side_effect = RuntimeError("connection refused")
+        assert await catalog.get_schema_info(repository) is snapshot
+        assert [t["name"] for t in snapshot["tables"]][:2] == ["orders", "order_items"]
+
+    @pytest.mark.asyncio
+    async def test_failed_first_load_raises(self) -> None:
+        """Test a failed first load raises instead of returning an empty schema."""
+        catalog = SchemaCatalog()
+        repository = _repository()
+        repository.get_all_tables.side_effect = RuntimeError("connection refused")
+
+        with pytest.raises(DatabaseException, match="schema catalog unavailable"):
+            await catalog.get_schema_info(repository)
+        assert catalog.version is None
+
+
+class TestSchemaPruning:
+    """Tests for SchemaCatalog.prune_schema_info."""
+
+    @pytest.mark.asyncio
+    async def test_keeps_top_tables_and_join_neighbours(self) -> None:
+        """Test pruning keeps the best match, its join neighbours and unembedded tables."""
+        catalog = SchemaCatalog()
+        schema_info = await catalog.get_schema_info(_repository())
+
+        pruned = catalog.prune_schema_info(schema_info, [0.0, 1.0, 0.05], top_k=1)
+
+        assert [t["name"] for t in pruned["tables"]] == ["orders", "order_items", "geolocation"]
+        assert pruned["version"] == schema_info["version"]
+
+    @pytest.mark.asyncio
+    async def test_no_embedding_or_small_schema_unpruned(self) -> None:
+        """Test pruning is skipped without a query embedding or when all tables fit."""
+        catalog = SchemaCatalog()
+        schema_info = await catalog.get_schema_info(_repository())
+
+        assert catalog.prune_schema_info(schema_info, None, top_k=1) is schema_info
+        assert catalog.prune_schema_info(schema_info, [1.0, 0.0, 0.0], top_k=4) is schema_info
+        assert catalog.prune_schema_info(schema_info, [0.0, 0.0, 0.0], top_k=1) is schema_info
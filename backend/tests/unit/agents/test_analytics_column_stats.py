@@ -0,0 +1,63 @@
+"""
+Unit tests for analytics column statistics.
+
+Tests for SchemaCatalog.column_stats lookups and their use in
+AnalyticsNormalizer display suggestions.
+"""
+
+from app.agents.analytics.catalog import SchemaCatalog
+from app.agents.analytics.normalizer import AnalyticsNormalizer
+
+TABLES = [
+    {
+        "name": "orders",
+        "columns": [
+            {"name": "order_id", "data_type": "TEXT", "top_values": None},
+            {
+                "name": "order_status",
+                "data_type": "TEXT",
+                "distinct_count": 3,
+                "top_values": ["delivered", "shipped", "canceled"],
+            },
+            {"name": "purchased_at", "data_type": "TIMESTAMP WITH TIME ZONE"},
+        ],
+    },
+    {
+        "name": "items",
+        "columns": [
+            {"name": "order_id", "data_type": "TEXT", "top_values": None},
+            {"name": "price", "data_type": "NUMERIC", "min_value": "0.85"},
+        ],
+    },
+]
+
+
+class TestColumnStats:
+    """Tests for column statistics lookups."""
+
+    def test_lookup_prefers_used_tables(self) -> None:
+        """Test ambiguous columns resolve only through the query's tables."""
+        catalog = SchemaCatalog()
+        catalog._columns = catalog._build_column_index(TABLES)
+
+        stats = catalog.column_stats(["order_id", "price", "total"], ["analytics.items"])
+        assert set(stats) == {"order_id", "price"}
+
+        stats = catalog.column_stats(["order_id", "order_status"])
+        assert set(stats) == {"order_status"}
+
+    def test_display_uses_categories(self) -> None:
+        """Test low-cardinality categories suggest bar charts beyond 20 rows."""
+        catalog = SchemaCatalog()
+        catalog._columns = catalog._build_column_index(TABLES)
+        rows = [{"order_status": f"status_{i}", "total": i} for i in range(30)]
+        sql = "SELECT order_status, COUNT(*) AS total FROM orders GROUP BY 1"
+
+        suggestion = AnalyticsNormalizer()._suggest_display(
+            rows,
+            sql,
+            catalog.column_stats(["order_status", "total"], ["orders"]),
+        )
+
+        assert suggestion["type"] == "bar_chart"
+        assert AnalyticsNormalizer()._suggest_display(rows, sql)["type"] == "table"
@@ -0,0 +1,113 @@
+"""
+Unit tests for the analytics cost guard.
+
+Tests for app.agents.analytics.cost_guard row bounds and cost thresholds.
+"""
+
+from typing import Any, Dict, Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.agents.analytics.cost_guard import QueryCostGuard
+from app.config.exceptions import ValidationException
+
+
+def _guard(plan: Optional[Dict[str, Any]] = None, **kwargs: Any) -> QueryCostGuard:
+    repository = MagicMock()
+    repository.explain_sql = AsyncMock(return_value=plan)
+    return QueryCostGuard(repository, max_cost=1000.0, max_plan_rows=10_000, max_rows=100, **kwargs)
+
+
+class TestEnforceLimit:
+    """Tests for QueryCostGuard.enforce_limit."""
+
+    @pytest.mark.parametrize(
+        ("sql", "bounded"),
+        [
+            ("SELECT * FROM t;", "SELECT * FROM t\nLIMIT 100"),
+            ("SELECT * FROM t LIMIT 10;", "SELECT * FROM t LIMIT 10"),
+            ("SELECT * FROM t LIMIT 5000 OFFSET 20", "SELECT * FROM t\nLIMIT 100 OFFSET 20"),
+            ("SELECT * FROM t LIMIT ALL", "SELECT * FROM t\nLIMIT 100"),
+            ("SELECT * FROM t OFFSET 20 LIMIT 5000", "SELECT * FROM t\nLIMIT 100 OFFSET 20"),
+            ("SELECT * FROM t OFFSET 20", "SELECT * FROM t\nLIMIT 100 OFFSET 20"),
+            (
+                "SELECT * FROM t ORDER BY a FETCH FIRST 5000 ROWS ONLY",
+                "SELECT * FROM t ORDER BY a\nLIMIT 100",
+            ),
+            (
+                "SELECT * FROM t ORDER BY a FETCH FIRST 10 ROWS ONLY",
+                "SELECT * FROM t ORDER BY a FETCH FIRST 10 ROWS ONLY",
+            ),
+            ("SELECT * FROM t LIMIT 10 -- top ten\n;", "SELECT * FROM t LIMIT 10"),
+            ("SELECT * FROM t -- everything", "SELECT * FROM t\nLIMIT 100"),
+            (
+                "SELECT * FROM (SELECT * FROM t LIMIT 5) AS s",
+                "SELECT * FROM (SELECT * FROM t LIMIT 5) AS s\nLIMIT 100",
+            ),
+            ("SELECT 'LIMIT 5' AS label FROM t", "SELECT 'LIMIT 5' AS label FROM t\nLIMIT 100"),
+        ],
+    )
+    def test_outermost_limit_bounded(self, sql: str, bounded: str) -> None:
+        """Test missing, large and unbounded limits are replaced exactly once."""
+        assert _guard().enforce_limit(sql) == bounded
+
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            "SELECT * FROM t LIMIT :row_count",
+            "SELECT * FROM t ORDER BY a FETCH FIRST 10 ROWS WITH TIES",
+        ],
+    )
+    def test_incomparable_limit_wrapped(self, sql: str) -> None:
+        """Test parameter limits and WITH TIES are kept inside a bounded subquery."""
+        assert _guard().enforce_limit(sql) == f"SELECT * FROM (\n{sql}\n) AS bounded\nLIMIT 100"
+
+
+class TestCostThresholds:
+    """Tests for QueryCostGuard.check."""
+
+    @pytest.mark.asyncio
+    async def test_cheap_plan_accepted(self) -> None:
+        """Test plans under both thresholds pass with bounded SQL and their estimates."""
+        plan = {"Plan": {"Total Cost": 50.0, "Plan Rows": 10, "Plans": [{"Plan Rows": 900}]}}
+        guard = _guard(plan)
+
+        checked = await guard.check("SELECT * FROM t")
+
+        assert checked["sql"] == "SELECT * FROM t\nLIMIT 100"
+        assert (checked["total_cost"], checked["plan_rows"]) == (50.0, 900)
+        assert checked["query_plan"] is plan
+
+    @pytest.mark.asyncio
+    async def test_expensive_plan_rejected(self) -> None:
+        """Test plans above the cost threshold are rejected with feedback details."""
+        guard = _guard({"Plan": {"Total Cost": 5000.0, "Plan Rows": 10}})
+
+        with pytest.raises(ValidationException, match="too expensive") as error:
+            await guard.check("SELECT * FROM t")
+        assert error.value.details["reason"] == "cost"
+
+    @pytest.mark.asyncio
+    async def test_row_explosion_rejected(self) -> None:
+        """Test any plan node above the row threshold rejects the query."""
+        plan = {"Plan": {"Total Cost": 10.0, "Plan Rows": 100, "Plans": [{"Plan Rows": 50_000}]}}
+
+        with pytest.raises(ValidationException, match="too many rows") as error:
+            await _guard(plan).check("SELECT * FROM a CROSS JOIN b")
+        assert error.value.details["reason"] == "rows"
+
+    @pytest.mark.asyncio
+    async def test_explain_failure_degrades(self) -> None:
+        """Test a failed EXPLAIN lets the bounded query run without estimates."""
+        guard = _guard()
+        guard._repository.explain_sql.side_effect = RuntimeError("EXPLAIN failed")
+
+        checked = await guard.check("SELECT * FROM t LIMIT 5")
+
+        assert checked == {
+            "sql": "SELECT * FROM t LIMIT 5",
+            "total_cost": None,
+            "plan_rows": None,
+            "query_plan": None,
+        }
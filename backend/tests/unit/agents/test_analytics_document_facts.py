@@ -0,0 +1,63 @@
+"""
+Unit tests for analytics document facts.
+
+Tests for app.agents.analytics.document_facts field projection.
+"""
+
+import datetime
+from decimal import Decimal
+
+from app.agents.analytics.document_facts import project_document
+
+
+class TestDocumentFacts:
+    """Tests for project_document."""
+
+    def test_portuguese_invoice_projected(self) -> None:
+        """Test aliased, formatted and nested fields become typed facts."""
+        facts = project_document(
+            {
+                "Valor Total": "R$ 1.234,56",
+                "valor_subtotal": "1.100,00",
+                "Impostos": 134.555,
+                "Data de Emissão": "05/03/2024",
+                "vencimento": "2024-04-05T00:00:00",
+                "emitente": {"nome": "  Loja  Exemplo LTDA ", "cnpj": "12.345.678/0001-90"},
+            },
+            {"document_type": "Invoice"},
+        )
+
+        assert facts == {
+            "document_type": "invoice",
+            "issuer_name": "Loja Exemplo LTDA",
+            "issuer_tax_id": "12345678000190",
+            "issue_date": datetime.date(2024, 3, 5),
+            "due_date": datetime.date(2024, 4, 5),
+            "subtotal": Decimal("1100.00"),
+            "tax": Decimal("134.56"),
+            "total": Decimal("1234.56"),
+        }
+
+    def test_unparseable_values_become_null(self) -> None:
+        """Test English formats parse and missing or invalid values are None."""
+        facts = project_document(
+            {
+                "amount": "$1,234.50",
+                "tax": "n/a",
+                "date": "31/02/2024",
+                "supplier": "ACME Corp",
+                "tax_id": "US-123",
+                "items": [{"total": 10}],
+            },
+        )
+
+        assert facts is not None
+        assert facts["total"] == Decimal("1234.50")
+        assert facts["tax"] is None and facts["subtotal"] is None
+        assert facts["issue_date"] is None
+        assert (facts["issuer_name"], facts["issuer_tax_id"]) == ("ACME Corp", "US-123")
+        assert facts["document_type"] is None
+        assert project_document({}) is None
+        assert project_document({"total": True, "subtotal": "1,234"})["subtotal"] == Decimal(
+            "1234.00",
+        )
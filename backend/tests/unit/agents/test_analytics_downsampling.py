@@ -0,0 +1,76 @@
+"""
+Unit tests for analytics time-series downsampling.
+
+Tests for app.agents.analytics.downsampling and line chart payloads of
+AnalyticsNormalizer.
+"""
+
+import datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.agents.analytics.downsampling import build_chart, lttb_indices
+from app.agents.analytics.normalizer import AnalyticsNormalizer
+
+
+class TestDownsampling:
+    """Tests for lttb_indices and build_chart."""
+
+    def test_lttb_keeps_extremes_and_bounds(self) -> None:
+        """Test LTTB keeps first/last points and each series' spikes."""
+        x = np.arange(1000, dtype=np.float64)
+        y = np.zeros((1000, 2))
+        y[300, 0] = 50.0
+        y[700, 1] = -8.0
+
+        indices = lttb_indices(x, y, 100)
+
+        assert len(indices) == 100
+        assert indices[0] == 0 and indices[-1] == 999
+        assert {300, 700} <= set(indices.tolist())
+        assert np.all(np.diff(indices) > 0)
+        assert len(lttb_indices(x[:50], y[:50], 100)) == 50
+
+    def test_chart_sorted_and_downsampled(self) -> None:
+        """Test chart points are sorted by time, JSON-ready and bounded."""
+        start = datetime.date(2017, 1, 1)
+        rows = [
+            {"day": start + datetime.timedelta(days=i), "orders": i % 7, "revenue": Decimal(i)}
+            for i in reversed(range(730))
+        ]
+
+        chart = build_chart(rows, "day", max_points=200)
+
+        assert chart is not None
+        assert chart["series"] == ["orders", "revenue"]
+        assert (chart["downsampled"], chart["source_points"], chart["method"]) == (
+            True,
+            730,
+            "lttb",
+        )
+        assert len(chart["points"]) == 200
+        assert chart["points"][0] == ["2017-01-01", 0, 0.0]
+        assert chart["points"][-1][0] == "2018-12-31"
+        assert build_chart([{"day": start, "state": "SP", "orders": 1}], "day") is None
+
+    @pytest.mark.asyncio
+    async def test_long_time_series_charted(self) -> None:
+        """Test aggregated daily histories beyond 20 rows get a line chart payload."""
+        start = datetime.datetime(2018, 1, 1)
+        rows = [
+            {"purchase_date": start + datetime.timedelta(days=i), "orders": i}
+            for i in range(400)
+        ]
+        sql = (
+            "SELECT DATE(purchased_at) AS purchase_date, COUNT(*) AS orders "
+            "FROM orders GROUP BY 1"
+        )
+
+        normalized = await AnalyticsNormalizer().normalize(rows, sql, "en-US")
+
+        assert normalized["display_suggestions"]["type"] == "line_chart"
+        assert normalized["chart"]["x"] == "purchase_date"
+        assert normalized["chart"]["downsampled"] is False
+        assert len(normalized["chart"]["points"]) == 400
@@ -0,0 +1,216 @@
+"""
+Unit tests for the analytics executor.
+
+Tests for app.agents.analytics.executor plan capture policy, summary
+pushdown SQL and the batched query log.
+"""
+
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.agents.analytics.executor import AnalyticsExecutor, QueryLogBuffer
+from app.config.exceptions import ValidationException
+
+PLAN: Dict[str, Any] = {"Plan": {"Total Cost": 42.0, "Plan Rows": 10}}
+
+
+def _repository() -> MagicMock:
+    repository = MagicMock()
+    repository.execute_sql = AsyncMock(return_value=[{"status": "delivered", "count": 3}])
+    repository.explain_sql = AsyncMock(return_value=PLAN)
+    return repository
+
+
+class TestPlanCapture:
+    """Tests for AnalyticsExecutor plan capture modes."""
+
+    def test_invalid_mode_rejected(self) -> None:
+        """Test unknown capture modes are rejected at construction."""
+        with pytest.raises(ValidationException, match="Invalid plan capture mode"):
+            AnalyticsExecutor(_repository(), plan_capture_mode="always")
+
+    def test_should_capture_plan(self) -> None:
+        """Test only "sampled" and "slow" select queries for background capture."""
+        repository = _repository()
+        slow = AnalyticsExecutor(repository, plan_capture_mode="slow", slow_query_threshold_ms=500)
+        assert slow._should_capture_plan(500.0) is True
+        assert slow._should_capture_plan(499.9) is False
+
+        always = AnalyticsExecutor(repository, plan_capture_mode="sampled", plan_sample_rate=1.0)
+        never = AnalyticsExecutor(repository, plan_capture_mode="sampled", plan_sample_rate=0.0)
+        assert always._should_capture_plan(1.0) is True
+        assert never._should_capture_plan(1.0) is False
+
+        for mode in ("off", "pre"):
+            executor = AnalyticsExecutor(repository, plan_capture_mode=mode)
+            assert executor._should_capture_plan(10_000.0) is False
+
+    @pytest.mark.asyncio
+    async def test_pre_mode_reuses_cost_check_plan(self) -> None:
+        """Test "pre" mode returns the cost guard's plan without a second EXPLAIN."""
+        repository = _repository()
+        executor = AnalyticsExecutor(repository, plan_capture_mode="pre", query_log=False)
+
+        result = await executor.execute("SELECT 1", query_plan=PLAN)
+
+        assert result["query_plan"] is PLAN
+        repository.explain_sql.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_pre_mode_explains_without_plan(self) -> None:
+        """Test "pre" mode explains before execution when no plan is given."""
+        repository = _repository()
+        executor = AnalyticsExecutor(repository, plan_capture_mode="pre", query_log=False)
+
+        result = await executor.execute("SELECT 1")
+
+        assert result["query_plan"] == PLAN
+        repository.explain_sql.assert_awaited_once_with("SELECT 1", None)
+
+    @pytest.mark.asyncio
+    async def test_background_capture_skipped_when_off(self) -> None:
+        """Test "off" mode schedules nothing when the query log is disabled."""
+        executor = AnalyticsExecutor(_repository(), plan_capture_mode="off", query_log=False)
+
+        with patch.object(executor, "_schedule_background") as schedule:
+            result = await executor.execute("SELECT 1", query_plan=PLAN)
+
+        schedule.assert_not_called()
+        assert result["query_plan"] is None
+
+    @pytest.mark.asyncio
+    async def test_slow_query_hands_known_plan_to_background(self) -> None:
+        """Test slow queries pass the known plan to the background capture."""
+        executor = AnalyticsExecutor(
+            _repository(),
+            plan_capture_mode="slow",
+            slow_query_threshold_ms=0,
+            query_log=False,
+        )
+
+        with patch.object(executor, "_schedule_background") as schedule:
+            await executor.execute("SELECT 1", query_plan=PLAN)
+
+        args = schedule.call_args.args
+        assert (args[4], args[5], args[6]) == (PLAN, True, False)
+
+    @pytest.mark.asyncio
+    async def test_background_logs_known_plan_without_explain(self) -> None:
+        """Test background capture only explains when no plan is known."""
+        from app.agents.analytics import executor as executor_module
+
+        capture = AsyncMock(return_value=PLAN)
+        with patch.object(executor_module, "_capture_plan", capture):
+            await executor_module._after_execution("SELECT 1", None, 900.0, 1, PLAN, True, False)
+            capture.assert_not_awaited()
+
+            await executor_module._after_execution("SELECT 1", None, 900.0, 1, None, True, False)
+            capture.assert_awaited_once_with("SELECT 1", None)
+
+
+class TestSummaryPushdown:
+    """Tests for AnalyticsExecutor.build_summary_sql."""
+
+    @pytest.mark.parametrize(
+        ("sql", "inner"),
+        [
+            ("SELECT * FROM t ORDER BY a\nLIMIT 1000;", "SELECT * FROM t ORDER BY a"),
+            ("SELECT * FROM t LIMIT 1000 OFFSET 20", "SELECT * FROM t\nOFFSET 20"),
+            ("SELECT * FROM t FETCH FIRST 1000 ROWS ONLY", "SELECT * FROM t"),
+            (
+                "SELECT * FROM (SELECT * FROM t LIMIT 5) AS s",
+                "SELECT * FROM (SELECT * FROM t LIMIT 5) AS s",
+            ),
+        ],
+    )
+    def test_outer_row_cap_removed(self, sql: str, inner: str) -> None:
+        """Test the outermost LIMIT is dropped so aggregates cover the full result."""
+        executor = AnalyticsExecutor(_repository(), query_log=False)
+
+        summary_sql = executor.build_summary_sql(sql, ["total"])
+
+        assert summary_sql.startswith(f"WITH result AS (\n{inner}\n)\n")
+        assert "LIMIT 1000" not in summary_sql and "FETCH FIRST" not in summary_sql
+        assert 'SUM("total")' in summary_sql
+
+    def test_requested_limit_kept(self) -> None:
+        """Test keep_limit preserves a limit the user asked for."""
+        executor = AnalyticsExecutor(_repository(), query_log=False)
+
+        summary_sql = executor.build_summary_sql("SELECT * FROM t LIMIT 10", [], keep_limit=True)
+
+        assert summary_sql.startswith("WITH result AS (\nSELECT * FROM t LIMIT 10\n)\n")
+
+
+class TestQueryLog:
+    """Tests for query log sampling and QueryLogBuffer batching."""
+
+    def test_sampling_and_exclusions(self) -> None:
+        """Test only sampled, unparameterized, exact executions are recorded."""
+        executor = AnalyticsExecutor(_repository(), query_log=True, query_log_sample_rate=1.0)
+        assert executor._should_record(None, False) is True
+        assert executor._should_record({"x": 1}, False) is False
+        assert executor._should_record(None, True) is False
+
+        never = AnalyticsExecutor(_repository(), query_log=True, query_log_sample_rate=0.0)
+        disabled = AnalyticsExecutor(_repository(), query_log=False, query_log_sample_rate=1.0)
+        assert never._should_record(None, False) is False
+        assert disabled._should_record(None, False) is False
+
+    @pytest.mark.asyncio
+    async def test_record_without_plan_capture_buffers_in_place(self) -> None:
+        """Test recording alone schedules no per-query task and no database write."""
+        executor = AnalyticsExecutor(
+            _repository(),
+            plan_capture_mode="off",
+            query_log=True,
+            query_log_sample_rate=1.0,
+        )
+        buffer = MagicMock()
+
+        with patch.object(executor, "_schedule_background") as schedule, patch(
+            "app.agents.analytics.executor.get_query_log_buffer",
+            return_value=buffer,
+        ):
+            await executor.execute("SELECT 1", query_plan=PLAN)
+
+        schedule.assert_not_called()
+        buffer.add.assert_called_once()
+        assert buffer.add.call_args.args[0] == "SELECT 1"
+
+    @pytest.mark.asyncio
+    async def test_buffer_bounded_and_flushed_in_batches(self) -> None:
+        """Test entries beyond the buffer are dropped and flushes write batches in one session."""
+        buffer = QueryLogBuffer(flush_interval=3600, batch_size=2, max_pending=3)
+        for i in range(5):
+            buffer.add(f"SELECT {i}", 1.0, 1)
+        assert buffer.pending == 3
+
+        repository = MagicMock(record_queries=AsyncMock())
+        sessions = []
+
+        @asynccontextmanager
+        async def get_db_session():
+            sessions.append(object())
+            yield sessions[-1]
+
+        with patch(
+            "app.infrastructure.database.connection.get_db_session",
+            get_db_session,
+        ), patch(
+            "app.infrastructure.database.repositories.analytics_repo."
+            "PostgreSQLAnalyticsRepository",
+            return_value=repository,
+        ):
+            assert await buffer.flush() == 3
+
+        batches = [call.args[0] for call in repository.record_queries.await_args_list]
+        assert [[entry["sql"] for entry in batch] for batch in batches] == [
+            ["SELECT 0", "SELECT 1"],
+            ["SELECT 2"],
+        ]
+        assert len(sessions) == 1 and buffer.pending == 0
+        buffer._flush_task.cancel()  # type: ignore[union-attr]
@@ -0,0 +1,189 @@
+"""
+Unit tests for the analytics follow-up engine.
+
+Tests for app.agents.analytics.followup result retention, the refinement
+gate, local SQL execution and the SQLite authorizer.
+"""
+
+import sqlite3
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.agents.analytics.followup import (
+    FollowUpEngine,
+    RetainedResult,
+    ThreadResultStore,
+    _authorize,
+    looks_like_refinement,
+)
+
+ROWS: List[Dict[str, Any]] = [
+    {"customer_state": "SP", "total_sales": 300.0},
+    {"customer_state": "RJ", "total_sales": 120.0},
+    {"customer_state": "MG", "total_sales": 210.0},
+]
+
+
+def _retained() -> RetainedResult:
+    store = ThreadResultStore()
+    store.retain("t1", "vendas por estado", "SELECT ...", ROWS)
+    retained = store.get("t1")
+    assert retained is not None
+    return retained
+
+
+def _engine(decision: Dict[str, Any]) -> FollowUpEngine:
+    llm_client = MagicMock()
+    llm_client.generate_structured = AsyncMock(return_value=decision)
+    return FollowUpEngine(llm_client)
+
+
+class TestThreadResultStore:
+    """Tests for ThreadResultStore retention policy."""
+
+    def test_retain_stores_columnar_result(self) -> None:
+        """Test results are kept per thread as one list per column."""
+        retained = _retained()
+
+        assert retained.columns == ["customer_state", "total_sales"]
+        assert retained.data["customer_state"] == ["SP", "RJ", "MG"]
+        assert retained.row_count == 3
+
+    def test_empty_and_oversized_results_discard_previous(self) -> None:
+        """Test empty or oversized results are not retained and drop the old entry."""
+        store = ThreadResultStore(max_bytes=10_000)
+        store.retain("t1", "q", "SELECT 1", ROWS)
+
+        assert store.retain("t1", "q", "SELECT 1", []) is False
+        assert store.get("t1") is None
+
+        store.retain("t1", "q", "SELECT 1", ROWS)
+        assert store.retain("t1", "q", "SELECT 1", [{"text": "x" * 20_000}]) is False
+        assert store.get("t1") is None
+
+    def test_results_without_thread_not_retained(self) -> None:
+        """Test results without a thread ID take no LRU slot."""
+        store = ThreadResultStore(max_threads=1)
+        store.retain("t1", "q", "SELECT 1", ROWS)
+
+        assert store.retain(None, "q", "SELECT 1", ROWS) is False
+        assert store.retain("", "q", "SELECT 1", ROWS) is False
+        assert store.get("t1") is not None
+
+    def test_expired_and_least_recent_entries_dropped(self) -> None:
+        """Test entries expire after the TTL and the least recent thread is evicted."""
+        store = ThreadResultStore(ttl_seconds=60, max_threads=2)
+        with patch("app.agents.analytics.followup.time.monotonic", return_value=0.0):
+            store.retain("a", "q", "SELECT 1", ROWS)
+            store.retain("b", "q", "SELECT 1", ROWS)
+            assert store.get("a") is not None  # "b" is now least recently used
+            store.retain("c", "q", "SELECT 1", ROWS)
+
+            assert store.get("b") is None
+            assert store.get("a") is not None and store.get("c") is not None
+
+        with patch("app.agents.analytics.followup.time.monotonic", return_value=61.0):
+            assert store.get("a") is None
+        assert store.get(None) is None
+
+
+class TestRefinementGate:
+    """Tests for looks_like_refinement."""
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "e por estado?",
+            "ordene pelo maior",
+            "mostre apenas os três primeiros",
+            "only the ones above 200",
+            "qual estado tem o maior total_sales?",
+            "e o ticket médio?",
+            "which state has the highest sales",
+        ],
+    )
+    def test_refinements_pass(self, query: str) -> None:
+        """Test connectives, refinement keywords and column names pass the gate."""
+        assert looks_like_refinement(query, _retained()) is True
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "quantos pedidos foram entregues em 2018?",
+            "qual a categoria de produto mais vendida",
+            "average freight value per seller",
+        ],
+    )
+    def test_new_questions_skip(self, query: str) -> None:
+        """Test unrelated questions skip the follow-up LLM call."""
+        assert looks_like_refinement(query, _retained()) is False
+
+    @pytest.mark.asyncio
+    async def test_gated_question_makes_no_llm_call(self) -> None:
+        """Test the engine does not ask the LLM for questions failing the gate."""
+        engine = _engine({"answerable": True, "sql": "SELECT 1", "explanation": ""})
+
+        assert await engine.answer("quantos pedidos em 2018?", _retained(), "pt-BR") is None
+        engine._llm_client.generate_structured.assert_not_awaited()
+
+
+class TestFollowUpEngine:
+    """Tests for FollowUpEngine.answer local execution."""
+
+    @pytest.mark.asyncio
+    async def test_answerable_refinement_runs_locally(self) -> None:
+        """Test answerable refinements run their SQL over previous_result."""
+        engine = _engine(
+            {
+                "answerable": True,
+                "sql": "SELECT customer_state FROM previous_result ORDER BY total_sales DESC;",
+                "explanation": "Estados ordenados por vendas",
+            },
+        )
+
+        result = await engine.answer("ordene pelo maior", _retained(), "pt-BR")
+
+        assert result is not None
+        assert [row["customer_state"] for row in result["rows"]] == ["SP", "MG", "RJ"]
+        assert result["columns_used"] == ["customer_state", "total_sales"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "decision",
+        [
+            {"answerable": False, "sql": "", "explanation": ""},
+            {"answerable": True, "sql": "DELETE FROM previous_result", "explanation": ""},
+            {
+                "answerable": True,
+                "sql": "SELECT 1; SELECT 2",
+                "explanation": "",
+            },
+        ],
+    )
+    async def test_unanswerable_or_unsafe_sql_rejected(self, decision: Dict[str, Any]) -> None:
+        """Test unanswerable decisions and non-single-SELECT SQL fall back to the database."""
+        assert await _engine(decision).answer("ordene pelo maior", _retained(), "pt-BR") is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            "SELECT name FROM sqlite_master",
+            "SELECT * FROM previous_result, pragma_table_info('previous_result')",
+        ],
+    )
+    async def test_authorizer_denies_other_tables(self, sql: str) -> None:
+        """Test SQL reading anything but previous_result is denied by the authorizer."""
+        engine = _engine({"answerable": True, "sql": sql, "explanation": ""})
+
+        assert await engine.answer("ordene pelo maior", _retained(), "pt-BR") is None
+
+    def test_authorize_actions(self) -> None:
+        """Test the authorizer allows reads of previous_result only."""
+        assert _authorize(sqlite3.SQLITE_SELECT, None, None) == sqlite3.SQLITE_OK
+        assert _authorize(sqlite3.SQLITE_READ, "previous_result", "x") == sqlite3.SQLITE_OK
+        assert _authorize(sqlite3.SQLITE_READ, "sqlite_master", "name") == sqlite3.SQLITE_DENY
+        assert _authorize(sqlite3.SQLITE_INSERT, "previous_result", None) == sqlite3.SQLITE_DENY
+        assert _authorize(sqlite3.SQLITE_ATTACH, ":memory:", None) == sqlite3.SQLITE_DENY
@@ -0,0 +1,183 @@
+"""
+Unit tests for the analytics index advisor.
+
+Tests for app.agents.analytics.index_advisor workload aggregation, candidate
+generation and benefit estimation (HypoPG and heuristic).
+"""
+
+import hashlib
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.agents.analytics.index_advisor import IndexAdvisor, IndexRecommendation
+from app.config.exceptions import DatabaseException
+
+STATISTICS: Dict[str, Dict[str, Any]] = {
+    "orders": {"row_estimate": 100_000.0, "indexes": [["order_id"]]},
+    "order_items": {"row_estimate": 500_000.0, "indexes": []},
+    "sellers": {"row_estimate": 500.0, "indexes": []},
+}
+TABLE_COLUMNS = {
+    "orders": {"order_id", "status", "customer_state", "purchased_at"},
+    "order_items": {"order_id", "seller_id", "price"},
+    "sellers": {"seller_id", "seller_state"},
+}
+
+BY_STATUS = "SELECT COUNT(*) FROM orders WHERE status = 'delivered'"
+BY_STATUS_AND_STATE = (
+    "SELECT COUNT(*) FROM orders WHERE status = 'delivered' AND customer_state = 'SP'"
+)
+JOINED = (
+    "SELECT s.seller_state, SUM(i.price) FROM order_items i "
+    "JOIN sellers s ON s.seller_id = i.seller_id GROUP BY 1"
+)
+
+
+def _entry(sql: str, execution_time_ms: float) -> Any:
+    return SimpleNamespace(
+        sql=sql,
+        sql_hash=hashlib.sha256(sql.encode()).hexdigest(),
+        execution_time_ms=execution_time_ms,
+    )
+
+
+def _seq_scan_plan(cost: float, table: str = "orders", filter_: str = "(status = 'x')") -> Any:
+    return {
+        "Plan": {
+            "Node Type": "Seq Scan",
+            "Relation Name": table,
+            "Filter": filter_,
+            "Total Cost": cost,
+            "Plan Rows": 100.0,
+        },
+    }
+
+
+def _repository(entries: List[Any], hypothetical_cost: Optional[float] = 10.0) -> MagicMock:
+    repository = MagicMock()
+    repository.get_query_log = AsyncMock(return_value=entries)
+    repository.get_table_statistics = AsyncMock(return_value=STATISTICS)
+    repository.get_all_tables = AsyncMock(
+        return_value=[
+            SimpleNamespace(name=name, columns=[SimpleNamespace(name=c) for c in columns])
+            for name, columns in TABLE_COLUMNS.items()
+        ],
+    )
+    repository.explain_sql = AsyncMock(return_value=_seq_scan_plan(1000.0))
+    if hypothetical_cost is None:
+        repository.explain_with_hypothetical_index = AsyncMock(
+            side_effect=DatabaseException(message="function hypopg_reset() does not exist"),
+        )
+    else:
+        repository.explain_with_hypothetical_index = AsyncMock(
+            return_value={"Plan": {"Total Cost": hypothetical_cost}},
+        )
+    return repository
+
+
+class TestWorkload:
+    """Tests for IndexAdvisor.aggregate and candidates."""
+
+    def test_aggregate_groups_executions(self) -> None:
+        """Test entries are grouped by SQL and unparseable SQL is skipped."""
+        advisor = IndexAdvisor(MagicMock())
+        entries = [_entry(BY_STATUS, 100.0), _entry(BY_STATUS, 50.0), _entry("SELEC oops (", 1.0)]
+
+        workload = advisor.aggregate(entries)
+
+        assert [(q.sql, q.executions, q.total_time_ms) for q in workload] == [
+            (BY_STATUS, 2, 150.0),
+        ]
+
+    def test_candidates_from_filters_and_joins(self) -> None:
+        """Test filter (single and composite) and join candidates on large tables only."""
+        advisor = IndexAdvisor(MagicMock(), min_rows=10_000)
+        workload = advisor.aggregate(
+            [_entry(BY_STATUS, 300.0), _entry(BY_STATUS_AND_STATE, 200.0), _entry(JOINED, 50.0)],
+        )
+
+        candidates = {
+            (c.table, c.columns, c.kind): c
+            for c in advisor.candidates(workload, STATISTICS, TABLE_COLUMNS)
+        }
+
+        assert set(candidates) == {
+            ("orders", ("status",), "filter"),
+            ("orders", ("customer_state",), "filter"),
+            ("orders", ("status", "customer_state"), "filter"),
+            ("order_items", ("seller_id",), "join"),
+        }
+        # status is filtered by both queries, so it leads the composite
+        assert candidates[("orders", ("status",), "filter")].workload_time_ms == 500.0
+
+    def test_existing_index_and_unknown_columns_skipped(self) -> None:
+        """Test columns leading an existing index or missing from the catalog are skipped."""
+        advisor = IndexAdvisor(MagicMock(), min_rows=10_000)
+        workload = advisor.aggregate(
+            [
+                _entry("SELECT * FROM orders WHERE order_id = 'a'", 10.0),
+                _entry("SELECT * FROM orders WHERE ghost = 1", 10.0),
+            ],
+        )
+
+        assert advisor.candidates(workload, STATISTICS, TABLE_COLUMNS) == []
+
+
+class TestRecommend:
+    """Tests for IndexAdvisor.recommend benefit estimation."""
+
+    @pytest.mark.asyncio
+    async def test_hypopg_estimates_benefit(self) -> None:
+        """Test hypothetical index costs drive the estimated benefit."""
+        repository = _repository([_entry(BY_STATUS, 400.0), _entry(BY_STATUS, 600.0)])
+
+        recommendations = await IndexAdvisor(repository, min_rows=10_000).recommend()
+
+        assert len(recommendations) == 1
+        recommendation = recommendations[0]
+        assert (recommendation.table, recommendation.columns) == ("orders", ["status"])
+        assert recommendation.method == "hypopg"
+        assert recommendation.query_count == 2
+        assert recommendation.estimated_benefit_ms == pytest.approx(1000.0 * 0.99)
+        repository.explain_sql.assert_awaited_once_with(BY_STATUS)
+
+    @pytest.mark.asyncio
+    async def test_small_improvement_not_recommended(self) -> None:
+        """Test candidates below the minimum relative improvement are dropped."""
+        repository = _repository([_entry(BY_STATUS, 400.0)], hypothetical_cost=900.0)
+
+        assert await IndexAdvisor(repository, min_rows=10_000).recommend() == []
+
+    @pytest.mark.asyncio
+    async def test_heuristic_fallback_without_hypopg(self) -> None:
+        """Test missing HypoPG switches to plan heuristics, which skip join candidates."""
+        repository = _repository([_entry(BY_STATUS, 400.0), _entry(JOINED, 400.0)], None)
+
+        recommendations = await IndexAdvisor(repository, min_rows=10_000).recommend()
+
+        assert [(r.table, r.columns, r.method) for r in recommendations] == [
+            ("orders", ["status"], "heuristic"),
+        ]
+        repository.explain_with_hypothetical_index.assert_awaited_once()
+
+    def test_recommendation_ddl(self) -> None:
+        """Test recommendations render concurrent, idempotent CREATE INDEX statements."""
+        recommendation = IndexRecommendation(
+            table="orders",
+            columns=["status", "customer_state"],
+            kind="filter",
+            query_count=1,
+            workload_time_ms=1.0,
+            cost_before=1.0,
+            cost_after=0.5,
+            estimated_benefit_ms=0.5,
+            method="hypopg",
+        )
+
+        assert recommendation.ddl == (
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix_orders_status_customer_state" '
+            'ON analytics."orders" ("status", "customer_state")'
+        )
@@ -0,0 +1,73 @@
+"""
+Unit tests for analytics insights.
+
+Tests for app.agents.analytics.insights policy and caching.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.agents.analytics.insights import InsightsEngine, needs_insights
+
+
+class TestInsightsEngine:
+    """Tests for needs_insights and InsightsEngine."""
+
+    @pytest.fixture
+    def llm_client(self) -> MagicMock:
+        """Create mock LLM client answering after a short delay."""
+
+        async def generate(prompt: str) -> SimpleNamespace:
+            await asyncio.sleep(0.01)
+            return SimpleNamespace(text="Entregas concentradas em SP.")
+
+        client = MagicMock()
+        client.generate = AsyncMock(side_effect=generate)
+        return client
+
+    def test_trivial_results_skipped(self) -> None:
+        """Test empty results and single narrow rows need no insights."""
+        assert not needs_insights([])
+        assert not needs_insights([{"count": 99441}])
+        assert not needs_insights([{"state": "SP", "orders": 41746}])
+        assert needs_insights([{"state": "SP", "orders": 41746}, {"state": "RJ", "orders": 12852}])
+        assert needs_insights([{"orders": 1, "revenue": 2.0, "avg_ticket": 2.0}])
+
+    @pytest.mark.asyncio
+    async def test_cached_and_shared_per_result(self, llm_client: MagicMock) -> None:
+        """Test concurrent and repeated requests for one result make one LLM call."""
+        engine = InsightsEngine()
+        rows = [{"state": "SP", "orders": 41746}, {"state": "RJ", "orders": 12852}]
+        sql = "SELECT state, COUNT(*) AS orders FROM customers GROUP BY 1"
+
+        first, second = await asyncio.gather(
+            engine.generate(llm_client, rows, sql, "pt-BR"),
+            engine.generate(llm_client, rows, sql, "pt-BR"),
+        )
+        key = engine.start(llm_client, rows, sql, "pt-BR")
+
+        assert first == second
+        assert first["descriptive"] == "Entregas concentradas em SP."
+        assert await engine.wait(key) == first
+        assert llm_client.generate.await_count == 1
+        assert engine.start(llm_client, [{"count": 1}], sql, "pt-BR") is None
+
+    def test_result_hash_covers_whole_result(self) -> None:
+        """Test results differing past the prompt sample or SQL prefix get their own key."""
+        engine = InsightsEngine()
+        rows = [{"state": f"S{i}", "orders": i} for i in range(10)]
+        changed = [*rows[:-1], {"state": "S9", "orders": 1000}]
+        sql = "SELECT state, COUNT(*) AS orders FROM customers " + " " * 200
+
+        keys = {
+            engine._result_key(rows, sql, "pt-BR", None),
+            engine._result_key(changed, sql, "pt-BR", None),
+            engine._result_key(rows, sql + "WHERE state <> 'SP'", "pt-BR", None),
+            engine._result_key(rows, sql, "pt-BR", {"row_count": 5000}),
+        }
+
+        assert len(keys) == 4
+        assert engine._result_key(rows, sql, "pt-BR", None) in keys
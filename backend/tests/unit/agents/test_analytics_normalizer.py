@@ -0,0 +1,151 @@
+"""
+Unit tests for the analytics normalizer.
+
+Tests for app.agents.analytics.normalizer columnar formatting, result
+shape and insights elision.
+"""
+
+import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.agents.analytics.insights import InsightsEngine
+from app.agents.analytics.normalizer import AnalyticsNormalizer
+
+ROWS: List[Dict[str, Any]] = [
+    {
+        "state": "SP",
+        "orders": 1234,
+        "revenue": Decimal("1234.5"),
+        "first_order": datetime.date(2024, 3, 5),
+        "active": True,
+        "note": None,
+    },
+    {
+        "state": "RJ",
+        "orders": 56,
+        "revenue": Decimal("78.25"),
+        "first_order": "2024-01-02",
+        "active": False,
+        "note": "x",
+    },
+]
+SQL = "SELECT state, COUNT(*) AS orders FROM customers GROUP BY 1"
+
+
+class TestNormalizerShape:
+    """Tests for AnalyticsNormalizer.normalize output."""
+
+    @pytest.mark.asyncio
+    async def test_columns_formatted_per_locale(self) -> None:
+        """Test every column is formatted by kind and the summary covers numeric columns."""
+        result = await AnalyticsNormalizer().normalize(ROWS, SQL, "pt-BR")
+
+        assert set(result) == {
+            "formatted_data",
+            "summary",
+            "insights",
+            "insights_key",
+            "display_suggestions",
+            "chart",
+        }
+        assert result["formatted_data"] == [
+            {
+                "state": "SP",
+                "orders": "1.234",
+                "revenue": "1.234,50",
+                "first_order": "05/03/2024",
+                "active": "Sim",
+                "note": None,
+            },
+            {
+                "state": "RJ",
+                "orders": "56",
+                "revenue": "78,25",
+                "first_order": "02/01/2024",
+                "active": "Não",
+                "note": "x",
+            },
+        ]
+        assert result["summary"] == {
+            "row_count": 2,
+            "numeric_columns": {
+                "orders": {"sum": 1290.0, "avg": 645.0, "min": 56.0, "max": 1234.0},
+                "revenue": {"sum": 1312.75, "avg": 656.375, "min": 78.25, "max": 1234.5},
+            },
+        }
+        assert result["display_suggestions"]["type"] == "bar_chart"
+        assert (result["insights"], result["insights_key"], result["chart"]) == (None, None, None)
+
+    @pytest.mark.asyncio
+    async def test_english_formatting_and_database_summary(self) -> None:
+        """Test en-US separators and ISO dates, with a database summary kept as given."""
+        summary = {"row_count": 27, "source": "database"}
+
+        result = await AnalyticsNormalizer().normalize(ROWS, SQL, "en-US", summary=summary)
+
+        assert result["formatted_data"][0]["orders"] == "1,234"
+        assert result["formatted_data"][0]["revenue"] == "1,234.50"
+        assert result["formatted_data"][1]["first_order"] == "2024-01-02"
+        assert result["formatted_data"][1]["active"] == "No"
+        assert result["summary"] is summary
+
+    @pytest.mark.asyncio
+    async def test_empty_result(self) -> None:
+        """Test empty results keep the same keys with a table suggestion."""
+        result = await AnalyticsNormalizer().normalize([], SQL, "pt-BR")
+
+        assert result["formatted_data"] == []
+        assert result["summary"] == {"row_count": 0}
+        assert result["display_suggestions"]["type"] == "table"
+
+
+class TestNormalizerInsights:
+    """Tests for insights skipped, inline or deferred by the normalizer."""
+
+    @pytest.fixture
+    def llm_client(self) -> MagicMock:
+        """Create mock LLM client."""
+        client = MagicMock()
+        client.generate = AsyncMock(return_value=SimpleNamespace(text="SP lidera."))
+        return client
+
+    @pytest.mark.asyncio
+    async def test_trivial_result_makes_no_llm_call(self, llm_client: MagicMock) -> None:
+        """Test single narrow rows are answered without insights."""
+        normalizer = AnalyticsNormalizer(llm_client, InsightsEngine())
+
+        result = await normalizer.normalize([{"count": 99441}], "SELECT COUNT(*)", "pt-BR")
+
+        assert (result["insights"], result["insights_key"]) == (None, None)
+        llm_client.generate.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_deferred_insights_delivered_later(self, llm_client: MagicMock) -> None:
+        """Test deferred insights return a key instead of holding back the answer."""
+        engine = InsightsEngine()
+        normalizer = AnalyticsNormalizer(llm_client, engine)
+
+        deferred = await normalizer.normalize(ROWS, SQL, "pt-BR", defer_insights=True)
+        inline = await normalizer.normalize(ROWS, SQL, "pt-BR")
+
+        assert deferred["insights"] is None and deferred["insights_key"] is not None
+        assert (await engine.wait(deferred["insights_key"]))["descriptive"] == "SP lidera."
+        assert inline["insights"]["descriptive"] == "SP lidera."
+        assert inline["insights_key"] is None
+        assert llm_client.generate.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_prompt_carries_numeric_summary(self, llm_client: MagicMock) -> None:
+        """Test insights start after the summary is computed, so the prompt includes it."""
+        normalizer = AnalyticsNormalizer(llm_client, InsightsEngine())
+
+        await normalizer.normalize(ROWS, SQL, "pt-BR")
+
+        prompt = llm_client.generate.await_args.args[0]
+        assert '"numeric_summary": null' not in prompt
+        assert '"numeric_summary": {' in prompt
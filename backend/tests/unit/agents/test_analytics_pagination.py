@@ -0,0 +1,257 @@
+"""
+Unit tests for analytics result pagination.
+
+Tests for app.agents.analytics.pagination keyset ordering, page SQL and handles.
+"""
+
+import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.agents.analytics.pagination import (
+    ResultPager,
+    _decode_cursor,
+    build_page_sql,
+    keyset_order,
+)
+
+SCHEMA_INFO = {
+    "tables": [
+        {
+            "name": "orders",
+            "data_version": 3,
+            "columns": [
+                {"name": "order_id", "is_primary_key": True},
+                {"name": "order_status", "is_primary_key": False},
+            ],
+        },
+        {"name": "customers", "data_version": 1, "columns": []},
+    ],
+}
+
+
+class TestKeysetPagination:
+    """Tests for keyset_order, build_page_sql and ResultPager."""
+
+    def test_keyset_order_derived(self) -> None:
+        """Test ORDER BY items come first, then the unique key."""
+        assert keyset_order(
+            "SELECT c.state, COUNT(*) AS orders FROM customers c GROUP BY c.state "
+            "ORDER BY orders DESC",
+            ["state", "orders"],
+            SCHEMA_INFO,
+        ) == [("orders", True, True), ("state", False, False)]
+        assert keyset_order(
+            "SELECT o.order_id, o.order_status FROM orders o WHERE o.order_status = 'x'",
+            ["order_id", "order_status"],
+            SCHEMA_INFO,
+        ) == [("order_id", False, False)]
+        assert keyset_order(
+            "SELECT DISTINCT state, city FROM customers ORDER BY 2",
+            ["state", "city"],
+            SCHEMA_INFO,
+        ) == [("city", False, False), ("state", False, False)]
+
+    def test_unkeyable_queries_rejected(self) -> None:
+        """Test queries without a derivable unique key are not keyset-paged."""
+        # No primary key selected, join, inner LIMIT, alias shadowing a grouped column
+        assert keyset_order(
+            "SELECT order_status FROM orders",
+            ["order_status"],
+            SCHEMA_INFO,
+        ) is None
+        assert keyset_order(
+            "SELECT o.order_id FROM orders o JOIN customers c ON c.id = o.customer_id",
+            ["order_id"],
+            SCHEMA_INFO,
+        ) is None
+        assert keyset_order(
+            "SELECT order_id FROM orders ORDER BY order_id LIMIT 5000",
+            ["order_id"],
+            SCHEMA_INFO,
+        ) is None
+        assert keyset_order(
+            "SELECT date_trunc('month', created_at) AS created_at, COUNT(*) AS n "
+            "FROM orders GROUP BY created_at",
+            ["created_at", "n"],
+            SCHEMA_INFO,
+        ) is None
+
+    def test_page_sql_binds_cursor(self) -> None:
+        """Test the cursor condition is lexicographic, NULL-aware and parameterized."""
+        sql, params = build_page_sql(
+            "SELECT state, COUNT(*) AS orders FROM customers GROUP BY 1;",
+            [("orders", True, False), ("state", False, False)],
+            [120, None],
+            101,
+        )
+
+        assert sql == (
+            "SELECT * FROM (\nSELECT state, COUNT(*) AS orders FROM customers GROUP BY 1\n)"
+            ' AS result\nWHERE (("orders" < :after_0 OR "orders" IS NULL))\n'
+            'ORDER BY "orders" DESC NULLS LAST, "state" ASC NULLS LAST\nLIMIT 101'
+        )
+        assert params == {"after_0": 120}
+
+    def test_nulls_placement_kept(self) -> None:
+        """Test explicit NULLS FIRST/LAST are kept and DESC defaults to the engine's placement."""
+        sql = (
+            "SELECT c.state, MAX(c.score) AS score, MIN(c.rank) AS rank FROM customers c "
+            "GROUP BY c.state ORDER BY score DESC, rank NULLS FIRST"
+        )
+        columns = ["state", "score", "rank"]
+
+        assert keyset_order(sql, columns, SCHEMA_INFO) == [
+            ("score", True, True),
+            ("rank", False, True),
+            ("state", False, False),
+        ]
+        assert keyset_order(sql, columns, SCHEMA_INFO, "duckdb")[0] == ("score", True, False)
+        assert keyset_order(
+            sql.replace("DESC", "DESC NULLS LAST"),
+            columns,
+            SCHEMA_INFO,
+        )[0] == ("score", True, False)
+
+    def test_page_sql_desc_nulls_first(self) -> None:
+        """Test DESC NULLS FIRST cursors neither repeat NULL rows nor stop on a NULL."""
+        order = [("score", True, True), ("state", False, False)]
+
+        sql, params = build_page_sql("SELECT state, score FROM t", order, [7, "SP"], 11)
+
+        # NULL scores precede 7, so they are not after it
+        assert (
+            '\nWHERE ("score" < :after_0) OR '
+            '("score" = :after_0 AND ("state" > :after_1 OR "state" IS NULL))\n'
+            'ORDER BY "score" DESC NULLS FIRST, "state" ASC NULLS LAST'
+        ) in sql
+        assert params == {"after_0": 7, "after_1": "SP"}
+
+        sql, params = build_page_sql("SELECT state, score FROM t", order, [None, "SP"], 11)
+
+        # Every non-NULL score follows a NULL one
+        assert (
+            '\nWHERE ("score" IS NOT NULL) OR '
+            '("score" IS NULL AND ("state" > :after_1 OR "state" IS NULL))\n'
+        ) in sql
+        assert params == {"after_1": "SP"}
+
+    @pytest.mark.asyncio
+    async def test_desc_nulls_paged_once(self) -> None:
+        """Test NULL rows on a PostgreSQL DESC first page are not served again on page two."""
+        pager = ResultPager()
+        scores = [None, None, 9, 8, 8]
+        rows = [{"order_id": f"o{i}", "score": score} for i, score in enumerate(scores)]
+        repository = MagicMock(engine="postgres")
+        repository.explain_sql = AsyncMock(return_value=None)
+        repository.execute_sql = AsyncMock(return_value=[rows[2]])
+
+        page = await pager.open(
+            repository,
+            rows,
+            truncated=True,
+            sql="SELECT order_id, score FROM orders ORDER BY score DESC",
+            schema_info=SCHEMA_INFO,
+            page_size=2,
+        )
+        assert page["rows"] == [["o0", None], ["o1", None]]
+
+        catalog = MagicMock()
+        catalog.get_schema_info = AsyncMock(return_value=SCHEMA_INFO)
+        with patch("app.agents.analytics.pagination.get_schema_catalog", return_value=catalog):
+            await pager.page(pager.get(page["handle"]), page["next_cursor"], 2, repository)
+
+        executed_sql, params = repository.execute_sql.await_args.args
+        assert '\nWHERE ("score" IS NOT NULL)\n' in executed_sql
+        assert 'ORDER BY "score" DESC NULLS FIRST, "order_id" ASC NULLS LAST' in executed_sql
+        assert params is None
+
+    @pytest.mark.asyncio
+    async def test_pages_served_from_rows_and_keyset(self) -> None:
+        """Test complete results page locally and truncated ones re-execute by keyset."""
+        pager = ResultPager()
+        rows = [{"order_id": f"o{i}", "order_status": "delivered"} for i in range(5)]
+
+        first = await pager.open(MagicMock(engine="postgres"), rows, page_size=2)
+        handle = pager.get(first["handle"])
+        second = await pager.page(handle, first["next_cursor"], 2)
+        last = await pager.page(handle, second["next_cursor"], 2)
+
+        assert (first["mode"], first["complete"], first["total_rows"]) == ("rows", True, 5)
+        assert [row[0] for row in second["rows"]] == ["o2", "o3"]
+        assert last["next_cursor"] is None
+
+        assert pager.get("unknown") is None
+
+    @pytest.mark.asyncio
+    async def test_first_keyset_page_built_from_fetched_rows(self) -> None:
+        """Test opening a keyset handle runs no query and page two resumes after its ORDER BY."""
+        pager = ResultPager()
+        days = [datetime.date(2018, 1, day) for day in (2, 3, 4, 4)]
+        rows = [{"order_id": f"o{i}", "day": day} for i, day in enumerate(days)]
+        repository = MagicMock(engine="postgres")
+        repository.explain_sql = AsyncMock(return_value=None)
+        repository.execute_sql = AsyncMock(return_value=[rows[2], rows[3]])
+        sql = "SELECT order_id, day FROM orders ORDER BY day"
+
+        page = await pager.open(
+            repository,
+            rows,
+            truncated=True,
+            sql=sql,
+            schema_info=SCHEMA_INFO,
+            page_size=2,
+        )
+
+        assert page["mode"] == "keyset"
+        assert page["rows"] == [["o0", "2018-01-02"], ["o1", "2018-01-03"]]
+        assert _decode_cursor(page["next_cursor"]) == {"k": [{"d": "2018-01-03"}]}
+        repository.explain_sql.assert_not_awaited()
+        repository.execute_sql.assert_not_awaited()
+
+        catalog = MagicMock()
+        catalog.get_schema_info = AsyncMock(return_value=SCHEMA_INFO)
+        with patch("app.agents.analytics.pagination.get_schema_catalog", return_value=catalog):
+            second = await pager.page(
+                pager.get(page["handle"]),
+                page["next_cursor"],
+                2,
+                repository,
+            )
+
+        executed_sql, params = repository.execute_sql.await_args.args
+        assert second["rows"] == [["o2", "2018-01-04"], ["o3", "2018-01-04"]]
+        assert second["next_cursor"] is None
+        assert 'WHERE (("day" > :after_0 OR "day" IS NULL))' in executed_sql
+        assert executed_sql.endswith(
+            'ORDER BY "day" ASC NULLS LAST, "order_id" ASC NULLS LAST\nLIMIT 3',
+        )
+        assert params == {"after_0": datetime.date(2018, 1, 3)}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            "SELECT order_id, day FROM orders",  # no ORDER BY
+            "SELECT order_id, day FROM orders ORDER BY day",  # ties longer than a page
+        ],
+    )
+    async def test_no_first_page_boundary_pages_fetched_rows(self, sql: str) -> None:
+        """Test results whose first page cannot end at an ORDER BY change page stored rows."""
+        rows = [{"order_id": f"o{i}", "day": datetime.date(2018, 1, 2)} for i in range(4)]
+        repository = MagicMock(engine="postgres")
+        repository.execute_sql = AsyncMock()
+
+        page = await ResultPager().open(
+            repository,
+            rows,
+            truncated=True,
+            sql=sql,
+            schema_info=SCHEMA_INFO,
+            page_size=2,
+        )
+
+        assert (page["mode"], page["complete"]) == ("rows", False)
+        assert _decode_cursor(page["next_cursor"]) == {"o": 2}
+        repository.execute_sql.assert_not_awaited()
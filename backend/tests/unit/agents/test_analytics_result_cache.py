@@ -0,0 +1,130 @@
+"""
+Unit tests for the analytics result cache.
+
+Tests for app.agents.analytics.result_cache canonical keys, data version
+invalidation and byte-budget LRU eviction.
+"""
+
+from typing import Any, Dict, List
+
+from app.agents.analytics.result_cache import ResultCache
+
+SCHEMA_INFO: Dict[str, Any] = {
+    "tables": [
+        {"name": "orders", "data_version": 3},
+        {"name": "order_items", "data_version": 7},
+        {"name": "sellers", "data_version": 1},
+    ],
+}
+
+
+def _rows(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    # Distinct values per seed so entries do not compress to the same size
+    return [{"id": f"{seed}-{i}-{i * 7919 % 104729}", "value": i * seed} for i in range(count)]
+
+
+class TestCanonicalKey:
+    """Tests for ResultCache.canonicalize and make_key."""
+
+    def test_formatting_variants_share_key(self) -> None:
+        """Test case, whitespace, comments and semicolons do not change the key."""
+        cache = ResultCache()
+        variants = [
+            "SELECT status, COUNT(*) FROM orders WHERE status = 'Shipped' GROUP BY 1",
+            "select status,count( * )\n  from ORDERS -- by status\nwhere status = 'Shipped'"
+            " group by 1;",
+        ]
+
+        assert cache.canonicalize(variants[0]) == cache.canonicalize(variants[1])
+        assert cache.make_key(variants[0], None, {"orders": 3}) == cache.make_key(
+            variants[1],
+            None,
+            {"orders": 3},
+        )
+
+    def test_literals_and_parameters_distinguish_keys(self) -> None:
+        """Test literal text and parameters stay part of the key."""
+        cache = ResultCache()
+
+        assert "'Shipped  Late'" in cache.canonicalize("SELECT 1 WHERE s = 'Shipped  Late'")
+        assert cache.make_key("SELECT 1 WHERE s = 'A'", None, {}) != cache.make_key(
+            "SELECT 1 WHERE s = 'a'",
+            None,
+            {},
+        )
+        assert cache.make_key("SELECT :x", {"x": 1}, {}) != cache.make_key(
+            "SELECT :x",
+            {"x": 2},
+            {},
+        )
+
+
+class TestDataVersions:
+    """Tests for ResultCache.referenced_versions invalidation."""
+
+    def test_referenced_tables_resolved(self) -> None:
+        """Test only catalog tables named in the SQL contribute versions."""
+        cache = ResultCache()
+
+        versions = cache.referenced_versions(
+            "SELECT o.status FROM analytics.Orders o JOIN order_items i USING (order_id)",
+            SCHEMA_INFO,
+        )
+
+        assert versions == {"orders": 3, "order_items": 7}
+        assert cache.referenced_versions("SELECT 1", SCHEMA_INFO) == {}
+
+    def test_version_bump_misses(self) -> None:
+        """Test a data version bump of a referenced table changes the key."""
+        cache = ResultCache()
+        sql = "SELECT COUNT(*) FROM orders"
+        key = cache.make_key(sql, None, cache.referenced_versions(sql, SCHEMA_INFO))
+        cache.set(key, [{"count": 10}])
+
+        bumped = {"tables": [{"name": "orders", "data_version": 4}]}
+        new_key = cache.make_key(sql, None, cache.referenced_versions(sql, bumped))
+
+        assert cache.get(key) == [{"count": 10}]
+        assert new_key != key and cache.get(new_key) is None
+
+
+class TestEviction:
+    """Tests for ResultCache byte budgets."""
+
+    def test_least_recently_used_evicted_within_budget(self) -> None:
+        """Test entries beyond the byte budget evict the least recently used first."""
+        probe = ResultCache()
+        probe.set("probe", _rows(50, seed=1))
+        entry_size = probe.size
+
+        cache = ResultCache(max_bytes=int(entry_size * 2.5), max_entry_bytes=entry_size * 2)
+        cache.set("a", _rows(50, seed=1))
+        cache.set("b", _rows(50, seed=2))
+        assert cache.get("a") is not None  # "b" is now least recently used
+
+        cache.set("c", _rows(50, seed=3))
+
+        assert cache.get("b") is None
+        assert cache.get("a") == _rows(50, seed=1)
+        assert cache.get("c") is not None
+        assert cache.size <= int(entry_size * 2.5)
+
+    def test_oversized_entry_not_cached(self) -> None:
+        """Test entries above the per-entry budget are skipped without evicting others."""
+        cache = ResultCache(max_bytes=10_000_000, max_entry_bytes=200)
+        cache.set("small", [{"count": 1}])
+        cache.set("large", _rows(500, seed=5))
+
+        assert cache.get("large") is None
+        assert cache.get("small") == [{"count": 1}]
+
+    def test_overwrite_and_delete_track_size(self) -> None:
+        """Test replacing and deleting entries keeps the size accounting exact."""
+        cache = ResultCache()
+        cache.set("a", _rows(20, seed=1))
+        size = cache.size
+        cache.set("a", _rows(20, seed=1))
+        assert cache.size == size
+
+        cache.delete("a")
+        assert cache.size == 0 and cache.get("a") is None
@@ -0,0 +1,53 @@
+"""
+Unit tests for analytics rollups.
+
+Tests for app.agents.analytics.rollups shape detection.
+"""
+
+from types import SimpleNamespace
+
+from app.agents.analytics.rollups import detect_rollups, rollup_shape
+
+
+class TestRollupShape:
+    """Tests for rollup_shape and detect_rollups."""
+
+    def test_equality_filter_becomes_key(self) -> None:
+        """Test equality filters are kept as rollup keys and AVG is split."""
+        shape = rollup_shape(
+            "SELECT date_trunc('month', o.ts) AS month, AVG(o.price) FROM orders o "
+            "WHERE o.status = 'delivered' AND o.ts >= '2017-01-01' GROUP BY 1",
+        )
+
+        assert shape is not None
+        assert [key.name for key in shape.keys] == ["month", "status"]
+        assert set(shape.measures) == {"row_count", "sum_price", "count_price"}
+        assert "WHERE" not in shape.sql
+
+    def test_non_additive_queries_ineligible(self) -> None:
+        """Test distinct counts and unkeyed range filters are rejected."""
+        assert rollup_shape("SELECT state, COUNT(DISTINCT id) FROM customers GROUP BY 1") is None
+        assert (
+            rollup_shape("SELECT status, COUNT(*) FROM orders WHERE ts > '2017-01-01' GROUP BY 1")
+            is None
+        )
+        assert rollup_shape("SELECT COUNT(*) FROM orders") is None
+
+    def test_detect_folds_subset_shapes(self) -> None:
+        """Test shapes with a subset of keys fold into the wider rollup."""
+        entries = [
+            SimpleNamespace(
+                sql="SELECT status, COUNT(*) FROM orders GROUP BY status",
+                execution_time_ms=10.0,
+            ),
+            SimpleNamespace(
+                sql="SELECT status, state, SUM(total) FROM orders GROUP BY 1, 2",
+                execution_time_ms=20.0,
+            ),
+        ] * 3
+
+        candidates = detect_rollups(entries, min_executions=5)
+
+        assert len(candidates) == 1
+        assert candidates[0].executions == 6
+        assert candidates[0].name == "rollup_orders_by_status_state"
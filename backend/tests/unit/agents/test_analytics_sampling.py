@@ -0,0 +1,51 @@
+"""
+Unit tests for analytics approximate queries.
+
+Tests for app.agents.analytics.sampling rewrites.
+"""
+
+from app.agents.analytics.sampling import approximate_sql
+
+SCHEMA_INFO = {
+    "tables": [
+        {"name": "orders", "sample_fraction": 0.01},
+        {"name": "customers", "sample_fraction": None},
+    ],
+}
+
+
+class TestApproximateSQL:
+    """Tests for approximate_sql."""
+
+    def test_count_scaled_with_margin(self) -> None:
+        """Test COUNT reads the sample, is scaled and gets a margin column."""
+        approximation = approximate_sql(
+            "SELECT status, COUNT(*) FROM orders GROUP BY 1",
+            SCHEMA_INFO,
+        )
+
+        assert approximation is not None
+        assert approximation.table == "orders"
+        assert 'analytics."orders__sample" AS "orders"' in approximation.sql
+        assert 'ROUND(COUNT(*) / 0.01) AS "count"' in approximation.sql
+        assert approximation.margins == {"count": "count_margin"}
+
+    def test_joined_tables_keep_alias(self) -> None:
+        """Test only the sampled table is replaced and keeps its alias."""
+        approximation = approximate_sql(
+            "SELECT c.state, AVG(o.total) AS ticket FROM orders o "
+            "JOIN customers c ON c.id = o.customer_id GROUP BY 1",
+            SCHEMA_INFO,
+        )
+
+        assert approximation is not None
+        assert 'analytics."orders__sample" AS o JOIN customers c' in approximation.sql
+        assert 'AVG(o.total) AS "ticket"' in approximation.sql
+        assert approximation.margins == {"ticket": "ticket_margin"}
+
+    def test_ineligible_queries_run_exactly(self) -> None:
+        """Test non-estimable aggregates and unsampled tables are rejected."""
+        assert approximate_sql("SELECT MAX(total) FROM orders", SCHEMA_INFO) is None
+        assert approximate_sql("SELECT COUNT(DISTINCT id) FROM orders", SCHEMA_INFO) is None
+        assert approximate_sql("SELECT COUNT(*) FROM customers", SCHEMA_INFO) is None
+        assert approximate_sql("SELECT * FROM orders", SCHEMA_INFO) is None
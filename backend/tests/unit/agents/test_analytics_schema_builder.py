@@ -0,0 +1,250 @@
+"""
+Unit tests for analytics CSV ingestion.
+
+Tests for app.agents.analytics.schema_builder load modes (replace, append,
+upsert), staging table naming and sample/statistics refresh.
+"""
+
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.agents.analytics.schema_builder import AnalyticsSchemaBuilder
+from app.config.exceptions import ValidationException
+
+SCHEMA_DEFINITION: Dict[str, Any] = {
+    "columns": [
+        {"name": "order_id", "data_type": "TEXT"},
+        {"name": "status", "data_type": "TEXT"},
+        {"name": "total", "data_type": "NUMERIC"},
+    ],
+    "primary_keys": ["order_id"],
+}
+CSV_COLUMNS: List[str] = ["order_id", "status", "total"]
+
+
+class _RecordingSession:
+    """Async session stub recording executed SQL."""
+
+    def __init__(self, reltuples: float = 0.0, counts: Tuple[int, int] = (0, 0)) -> None:
+        self.statements: List[str] = []
+        self._reltuples = reltuples
+        self._counts = counts
+
+    @asynccontextmanager
+    async def begin(self):
+        yield
+
+    async def execute(self, statement: Any, params: Any = None) -> MagicMock:
+        self.statements.append(str(statement))
+        result = MagicMock(rowcount=2)
+        result.scalar.return_value = self._reltuples
+        result.one.return_value = self._counts
+        return result
+
+
+class TestMergeSQL:
+    """Tests for AnalyticsSchemaBuilder._build_merge_sql."""
+
+    def _sql(self, mode: str) -> str:
+        builder = AnalyticsSchemaBuilder(MagicMock())
+        return builder._build_merge_sql(
+            "orders",
+            "orders__staging_ab12cd34",
+            SCHEMA_DEFINITION,
+            CSV_COLUMNS,
+            mode,
+        )
+
+    def test_replace_inserts_all_rows_cast(self) -> None:
+        """Test replace copies every staging row with typed casts and no conflict clause."""
+        sql = self._sql("replace")
+
+        assert sql.startswith('INSERT INTO analytics."orders" ("order_id", "status", "total") ')
+        assert 'NULLIF(btrim("total"), \'\')::NUMERIC AS "total"' in sql
+        assert 'FROM analytics."orders__staging_ab12cd34"' in sql
+        assert "ON CONFLICT" not in sql and "DISTINCT ON" not in sql
+
+    def test_append_skips_existing_keys(self) -> None:
+        """Test append keeps existing rows on key conflicts."""
+        assert self._sql("append").endswith(" ON CONFLICT DO NOTHING;")
+
+    def test_upsert_last_duplicate_key_wins(self) -> None:
+        """Test upsert dedups keys by descending ingest ordinal and updates non-key columns."""
+        sql = self._sql("upsert")
+
+        assert 'SELECT DISTINCT ON ("order_id") "order_id", "status", "total" FROM (' in sql
+        assert '"__ingest_ordinal" FROM analytics."orders__staging_ab12cd34"' in sql
+        assert 'ORDER BY "order_id", "__ingest_ordinal" DESC' in sql
+        assert sql.endswith(
+            ' ON CONFLICT ("order_id") DO UPDATE SET '
+            '"status" = EXCLUDED."status", "total" = EXCLUDED."total";',
+        )
+
+
+class TestStagedLoad:
+    """Tests for staging names and load mode handling."""
+
+    def test_staging_name_unique_per_run(self) -> None:
+        """Test each load gets its own staging table within the identifier limit."""
+        builder = AnalyticsSchemaBuilder(MagicMock())
+
+        first, second = builder._staging_name("orders"), builder._staging_name("orders")
+        assert first != second
+        assert first.startswith("orders__staging_")
+        assert len(builder._staging_name("x" * 80)) <= 63
+
+    @pytest.mark.asyncio
+    async def test_staging_table_records_ingest_ordinal(self) -> None:
+        """Test the staging table has an identity ordinal left out of COPY."""
+        session = _RecordingSession()
+        copy_to_table = AsyncMock()
+        raw_connection = MagicMock()
+        raw_connection.driver_connection.copy_to_table = copy_to_table
+        connection = MagicMock()
+        connection.get_raw_connection = AsyncMock(return_value=raw_connection)
+        session.connection = AsyncMock(return_value=connection)  # type: ignore[attr-defined]
+
+        builder = AnalyticsSchemaBuilder(session)  # type: ignore[arg-type]
+        await builder._load_staging_table("orders__staging_1", CSV_COLUMNS, Path("orders.csv"))
+
+        assert '"__ingest_ordinal" BIGINT GENERATED ALWAYS AS IDENTITY' in session.statements[-1]
+        assert copy_to_table.await_args.kwargs["columns"] == CSV_COLUMNS
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["replace", "append", "upsert"])
+    async def test_merge_drops_target_on_replace_only(self, mode: str) -> None:
+        """Test replace detaches rollups and drops the target; merges keep it."""
+        session = _RecordingSession()
+        builder = AnalyticsSchemaBuilder(session)  # type: ignore[arg-type]
+        builder._create_table = AsyncMock()  # type: ignore[method-assign]
+        builder._upsert_metadata = AsyncMock(  # type: ignore[method-assign]
+            return_value=MagicMock(columns=[]),
+        )
+        builder._bump_catalog_version = AsyncMock()  # type: ignore[method-assign]
+        rollups = MagicMock(detach=AsyncMock(return_value=[]))
+
+        with patch("app.agents.analytics.schema_builder.RollupManager", return_value=rollups):
+            await builder._merge_staging_table(
+                "orders",
+                "orders__staging_1",
+                SCHEMA_DEFINITION,
+                CSV_COLUMNS,
+                mode,
+                Path("orders.csv"),
+            )
+
+        drop_sql = 'DROP TABLE IF EXISTS analytics."orders" CASCADE;'
+        assert (drop_sql in session.statements) is (mode == "replace")
+        # Sample and column statistics are refreshed after the swap transaction
+        assert not any(
+            "TABLESAMPLE" in sql or "COUNT(DISTINCT" in sql for sql in session.statements
+        )
+        assert rollups.detach.await_count == (1 if mode == "replace" else 0)
+        assert builder._upsert_metadata.await_args.kwargs["replace_columns"] is (mode == "replace")
+        assert any(sql.startswith('INSERT INTO analytics."orders"') for sql in session.statements)
+
+    @pytest.mark.asyncio
+    async def test_upsert_requires_primary_keys(self, tmp_path: Path) -> None:
+        """Test upsert into a table without primary keys is rejected before loading."""
+        csv_path = tmp_path / "events.csv"
+        csv_path.write_text("name,value\na,1\na,1\n")
+        builder = AnalyticsSchemaBuilder(MagicMock())
+        builder._get_existing_table = AsyncMock(return_value=None)  # type: ignore[method-assign]
+        builder._load_staging_table = AsyncMock()  # type: ignore[method-assign]
+
+        with pytest.raises(ValidationException, match="Upsert requires primary key"):
+            await builder.build_schema_from_csv(csv_path, mode="upsert")
+
+        builder._load_staging_table.assert_not_awaited()
+
+
+class TestStatisticsRefresh:
+    """Tests for sample and column statistics refresh after loads."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("mode", "rows_since_stats", "expected"),
+        [
+            ("replace", 0, True),
+            ("append", 50, False),
+            ("upsert", 150, True),
+        ],
+    )
+    async def test_refresh_on_replace_or_enough_new_rows(
+        self,
+        mode: str,
+        rows_since_stats: int,
+        expected: bool,
+    ) -> None:
+        """Test incremental loads refresh only past the refresh fraction of the table."""
+        session = _RecordingSession(reltuples=1000.0)
+        builder = AnalyticsSchemaBuilder(session)  # type: ignore[arg-type]
+        table = MagicMock(rows_since_stats=rows_since_stats)
+        table.name = "orders"
+
+        with patch("app.agents.analytics.schema_builder.ANALYTICS_STATS_REFRESH_FRACTION", 0.1):
+            assert await builder._needs_stats_refresh(table, mode) is expected
+
+    @pytest.mark.asyncio
+    async def test_sample_swapped_in_last(self) -> None:
+        """Test the sample is built under a temporary name, then the old one dropped and renamed."""
+        session = _RecordingSession(reltuples=500_000.0, counts=(5_000, 500_000))
+        builder = AnalyticsSchemaBuilder(session)  # type: ignore[arg-type]
+
+        fraction = await builder._build_sample("orders")
+
+        assert fraction == 0.01
+        prefixes = ("CREATE TABLE", 'DROP TABLE IF EXISTS analytics."orders__sample"', "ALTER")
+        create, drop, rename = (
+            next(i for i, sql in enumerate(session.statements) if sql.startswith(prefix))
+            for prefix in prefixes
+        )
+        assert create < drop < rename == len(session.statements) - 1
+        building = session.statements[create].split('"')[1]
+        assert building.startswith("orders__sample_") and building in session.statements[rename]
+        assert session.statements[rename].endswith('RENAME TO "orders__sample";')
+
+    @pytest.mark.asyncio
+    async def test_small_table_drops_sample(self) -> None:
+        """Test tables below the sample threshold lose their sample without building one."""
+        session = _RecordingSession(reltuples=10.0)
+        builder = AnalyticsSchemaBuilder(session)  # type: ignore[arg-type]
+
+        assert await builder._build_sample("orders") is None
+        assert session.statements[-1] == 'DROP TABLE IF EXISTS analytics."orders__sample";'
+        assert not any("TABLESAMPLE" in sql for sql in session.statements)
+
+    @pytest.mark.asyncio
+    async def test_load_order_merge_refresh_snapshot(self, tmp_path: Path) -> None:
+        """Test loads merge, then refresh statistics, then snapshot; refresh failures are logged."""
+        csv_path = tmp_path / "orders.csv"
+        csv_path.write_text("order_id,total\na,1\nb,2\n")
+        calls: List[str] = []
+        merged, refreshed = MagicMock(name="merged"), MagicMock(name="refreshed")
+
+        def _record(name: str, result: Any = None) -> AsyncMock:
+            return AsyncMock(side_effect=lambda *args, **kwargs: calls.append(name) or result)
+
+        builder = AnalyticsSchemaBuilder(MagicMock(), snapshot_store=MagicMock())
+        builder._get_existing_table = AsyncMock(return_value=None)  # type: ignore[method-assign]
+        builder._load_staging_table = AsyncMock()  # type: ignore[method-assign]
+        builder._drop_staging_table = AsyncMock()  # type: ignore[method-assign]
+        builder._merge_staging_table = _record("merge", merged)  # type: ignore[method-assign]
+        builder._needs_stats_refresh = AsyncMock(return_value=True)  # type: ignore[method-assign]
+        builder.refresh_statistics = _record("refresh", refreshed)  # type: ignore[method-assign]
+        builder.write_snapshot = _record("snapshot", True)  # type: ignore[method-assign]
+
+        assert await builder.build_schema_from_csv(csv_path) is refreshed
+        assert calls == ["merge", "refresh", "snapshot"]
+        builder.write_snapshot.assert_awaited_once_with(refreshed)
+
+        calls.clear()
+        builder.refresh_statistics = AsyncMock(  # type: ignore[method-assign]
+            side_effect=RuntimeError("lock timeout"),
+        )
+        assert await builder.build_schema_from_csv(csv_path) is merged
+        assert calls == ["merge", "snapshot"]
@@ -0,0 +1,221 @@
+"""
+Unit tests for the analytics template library.
+
+Tests for app.agents.analytics.templates slot extraction, template filling
+and promotion of planned SQL into templates.
+"""
+
+from datetime import date
+from typing import Any, Dict, Optional
+
+import pytest
+
+from app.agents.analytics.templates import QueryTemplate, TemplateLibrary, extract_slots
+
+PERIOD_SQL = (
+    "SELECT COUNT(*) FROM olist_orders "
+    "WHERE order_purchase_timestamp >= :date_from AND order_purchase_timestamp < :date_to"
+)
+
+
+def _template(
+    sql_template: str,
+    slots: Dict[str, Dict[str, Any]],
+    source: str = "curated",
+    shape: Optional[str] = None,
+) -> QueryTemplate:
+    return QueryTemplate(
+        name="test",
+        sql_template=sql_template,
+        slots=slots,
+        explanation="",
+        tables_used=["olist_orders"],
+        columns_used=[],
+        source=source,
+        shapes={shape} if shape else set(),
+    )
+
+
+class TestSlotExtraction:
+    """Tests for extract_slots."""
+
+    @pytest.mark.parametrize(
+        ("question", "date_from", "date_to"),
+        [
+            ("pedidos em 2017", date(2017, 1, 1), date(2018, 1, 1)),
+            ("pedidos em março de 2018", date(2018, 3, 1), date(2018, 4, 1)),
+            ("orders in February 2016", date(2016, 2, 1), date(2016, 3, 1)),
+            ("pedidos em 2018-02-28", date(2018, 2, 28), date(2018, 3, 1)),
+            ("pedidos entre 2017 e 2018", date(2017, 1, 1), date(2019, 1, 1)),
+        ],
+    )
+    def test_periods_are_half_open_ranges(
+        self,
+        question: str,
+        date_from: date,
+        date_to: date,
+    ) -> None:
+        """Test years, months and ISO dates become [date_from, date_to) ranges."""
+        values, shape = extract_slots(question)
+
+        assert (values["date_from"], values["date_to"]) == (date_from, date_to)
+        assert "<period>" in shape and not any(char.isdigit() for char in shape)
+
+    @pytest.mark.parametrize(
+        ("question", "limit"),
+        [
+            ("top 10 produtos", 10),
+            ("os 5 maiores vendedores", 5),
+            ("primeiros 3 estados", 3),
+            ("first 20 sellers", 20),
+        ],
+    )
+    def test_limits_extracted(self, question: str, limit: int) -> None:
+        """Test "top N" and "N maiores" style limits are extracted and masked."""
+        values, shape = extract_slots(question)
+
+        assert values == {"limit": limit}
+        assert "<limit>" in shape
+
+    def test_unrelated_numbers_left_in_shape(self) -> None:
+        """Test numbers that are not slots stay in the shape."""
+        values, shape = extract_slots("pedidos acima de 500 reais")
+
+        assert values == {}
+        assert "500" in shape
+
+
+class TestTemplateFill:
+    """Tests for TemplateLibrary._fill."""
+
+    def test_period_and_limit_rendered(self) -> None:
+        """Test extracted slots are rendered as typed literals."""
+        template = _template(
+            f"{PERIOD_SQL} LIMIT :limit",
+            {
+                "date_from": {"type": "date_from"},
+                "date_to": {"type": "date_to"},
+                "limit": {"type": "limit", "default": 10},
+            },
+        )
+
+        sql = TemplateLibrary()._fill("top 5 pedidos em 2017", template)
+
+        assert sql == (
+            "SELECT COUNT(*) FROM olist_orders WHERE order_purchase_timestamp >= '2017-01-01' "
+            "AND order_purchase_timestamp < '2018-01-01' LIMIT 5"
+        )
+
+    def test_defaults_and_limit_cap(self) -> None:
+        """Test missing slots use defaults and limits are capped to SQL_MAX_ROWS."""
+        from app.config.constants import SQL_MAX_ROWS
+
+        template = _template(
+            "SELECT * FROM olist_orders LIMIT :limit",
+            {"limit": {"type": "limit", "default": 10}},
+        )
+        library = TemplateLibrary()
+
+        assert library._fill("pedidos", template) == "SELECT * FROM olist_orders LIMIT 10"
+        assert library._fill("top 9999 pedidos", template) == (
+            f"SELECT * FROM olist_orders LIMIT {SQL_MAX_ROWS}"
+        )
+
+    @pytest.mark.parametrize(
+        "question",
+        [
+            "pedidos em 2017 acima de 500 reais",  # number outside any slot
+            "top 5 pedidos em 2017",  # limit the template cannot express
+        ],
+    )
+    def test_unexpressible_numbers_rejected(self, question: str) -> None:
+        """Test questions with numbers the template cannot express fall back to the LLM."""
+        template = _template(
+            PERIOD_SQL,
+            {"date_from": {"type": "date_from"}, "date_to": {"type": "date_to"}},
+        )
+
+        assert TemplateLibrary()._fill(question, template) is None
+
+    def test_required_slot_without_value_rejected(self) -> None:
+        """Test slots without a value or default reject the match."""
+        template = _template(
+            PERIOD_SQL,
+            {"date_from": {"type": "date_from"}, "date_to": {"type": "date_to"}},
+        )
+
+        assert TemplateLibrary()._fill("quantos pedidos", template) is None
+
+    def test_category_coerced_to_declared_value(self) -> None:
+        """Test categories match accent/case-insensitively and render the declared value."""
+        template = _template(
+            "SELECT COUNT(*) FROM olist_orders WHERE order_status = :status",
+            {
+                "status": {
+                    "type": "category",
+                    "values": ["delivered", "canceled"],
+                    "default": "delivered",
+                },
+            },
+        )
+        library = TemplateLibrary()
+
+        assert library._fill("pedidos CANCELED", template).endswith("= 'canceled'")
+        assert library._fill("pedidos", template).endswith("= 'delivered'")
+
+    def test_promoted_template_requires_exemplar_shape(self) -> None:
+        """Test promoted templates only match questions shaped like their exemplar."""
+        template = _template(
+            PERIOD_SQL,
+            {"date_from": {"type": "date_from"}, "date_to": {"type": "date_to"}},
+            source="promoted",
+            shape="pedidos em <period>",
+        )
+        library = TemplateLibrary()
+
+        assert library._fill("pedidos em 2018", template) is not None
+        assert library._fill("pedidos cancelados em 2018", template) is None
+
+
+class TestParametrize:
+    """Tests for TemplateLibrary.parametrize."""
+
+    def test_outer_limit_and_period_parametrised(self) -> None:
+        """Test the outer LIMIT and period literals become slots."""
+        sql = (
+            "SELECT seller_id, SUM(price) FROM olist_order_items "
+            "WHERE shipping_limit_date >= '2017-01-01' AND shipping_limit_date < '2018-01-01' "
+            "GROUP BY 1 ORDER BY 2 DESC\nFETCH FIRST 10 ROWS ONLY;"
+        )
+
+        sql_template, slots = TemplateLibrary().parametrize("top 10 vendedores em 2017", sql)
+
+        assert sql_template.endswith("ORDER BY 2 DESC\nLIMIT :limit")
+        assert ">= :date_from AND shipping_limit_date < :date_to" in sql_template
+        assert set(slots) == {"limit", "date_from", "date_to"}
+
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            "SELECT * FROM (SELECT * FROM t LIMIT 10) AS s",  # limit of a subquery
+            "SELECT * FROM t LIMIT 20",  # different number
+            "SELECT * FROM t LIMIT 10 OFFSET 10",  # offset cannot be expressed
+            "SELECT 'LIMIT 10' AS label FROM t",  # limit inside a string
+        ],
+    )
+    def test_limit_must_be_outer_and_equal(self, sql: str) -> None:
+        """Test only the outermost LIMIT with the question's number is parametrised."""
+        assert TemplateLibrary().parametrize("top 10 produtos", sql) is None
+
+    def test_year_used_outside_date_literals_rejected(self) -> None:
+        """Test periods used as EXTRACT(YEAR ...) comparisons are not parametrised."""
+        sql = "SELECT COUNT(*) FROM t WHERE EXTRACT(YEAR FROM d) = 2017"
+
+        assert TemplateLibrary().parametrize("pedidos em 2017", sql) is None
+
+    def test_question_without_slots_not_parametrised(self) -> None:
+        """Test questions without slot values (or with stray numbers) are skipped."""
+        library = TemplateLibrary()
+
+        assert library.parametrize("quantos pedidos", "SELECT COUNT(*) FROM t") is None
+        assert library.parametrize("pedidos acima de 500 em 2017", "SELECT 1") is None
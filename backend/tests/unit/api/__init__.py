@@ -0,0 +1,3 @@
+"""
+API unit tests (unit tests for API routes).
+"""
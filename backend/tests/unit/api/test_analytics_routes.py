@@ -0,0 +1,146 @@
+"""
+Unit tests for analytics API routes.
+
+Tests for app.api.routes.analytics export validation, streaming error
+trailers and result page lookups.
+"""
+
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Tuple
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.api.routes import analytics as routes
+from app.api.schemas.analytics import AnalyticsExportRequest
+from app.config.exceptions import NotFoundException, ValidationException
+
+SCHEMA_INFO = {"tables": [{"name": "orders", "data_version": 1}], "version": 1}
+
+
+@asynccontextmanager
+async def _session():
+    yield MagicMock()
+
+
+def _repository(batches: List[Any]) -> MagicMock:
+    """Repository whose stream_sql yields batches (an exception item is raised)."""
+
+    async def stream_sql(sql: str, **kwargs: Any) -> AsyncIterator[Tuple[List[str], List[Any]]]:
+        for batch in batches:
+            if isinstance(batch, Exception):
+                raise batch
+            yield ["status", "total"], batch
+
+    repository = MagicMock(engine="postgres")
+    repository.stream_sql = stream_sql
+    return repository
+
+
+async def _collect(output_format: str, batches: List[Any]) -> str:
+    with (
+        patch.object(routes, "get_analytics_session", _session),
+        patch.object(routes, "create_analytics_repository", return_value=_repository(batches)),
+    ):
+        return "".join([chunk async for chunk in routes._stream_rows("SELECT 1", output_format)])
+
+
+class TestExportValidation:
+    """Tests for POST /analytics/export SQL validation."""
+
+    async def _export(self, sql: str, validator: MagicMock, guard: MagicMock) -> Any:
+        catalog = MagicMock(get_schema_info=AsyncMock(return_value=SCHEMA_INFO))
+        with (
+            patch.object(routes, "get_analytics_session", _session),
+            patch.object(routes, "create_analytics_repository", return_value=_repository([])),
+            patch.object(routes, "get_schema_catalog", return_value=catalog),
+            patch.object(routes, "get_allowlist_validator", return_value=validator),
+            patch.object(routes, "QueryCostGuard", return_value=guard),
+        ):
+            return await routes.export_results(
+                AnalyticsExportRequest(sql=sql, format="csv"),
+                MagicMock(),
+                MagicMock(),
+            )
+
+    @pytest.mark.asyncio
+    async def test_provided_sql_validated_and_cost_checked(self) -> None:
+        """Test client SQL passes allowlist, syntax and cost checks before streaming."""
+        validator = MagicMock()
+        guard = MagicMock(check=AsyncMock(return_value={"sql": "SELECT 1 LIMIT 100000"}))
+
+        response = await self._export("SELECT status FROM orders", validator, guard)
+
+        validator.validate_sql.assert_called_once_with("SELECT status FROM orders", SCHEMA_INFO)
+        guard.check.assert_awaited_once_with("SELECT status FROM orders")
+        assert response.media_type == "text/csv"
+
+    @pytest.mark.asyncio
+    async def test_disallowed_sql_rejected(self) -> None:
+        """Test allowlist rejections stop the export before the cost guard."""
+        validator = MagicMock()
+        validator.validate_sql.side_effect = ValidationException(message="Table not allowed")
+        guard = MagicMock(check=AsyncMock())
+
+        with pytest.raises(ValidationException, match="Table not allowed"):
+            await self._export("SELECT * FROM users", validator, guard)
+        guard.check.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_planner_syntax_checks_apply(self) -> None:
+        """Test the planner's syntax validation rejects SQL the allowlist let through."""
+        guard = MagicMock(check=AsyncMock())
+
+        with pytest.raises(ValidationException, match="dangerous operation"):
+            await self._export("SELECT * INTO copy FROM orders", MagicMock(), guard)
+        guard.check.assert_not_awaited()
+
+
+class TestExportStreaming:
+    """Tests for _stream_rows encoding and error trailers."""
+
+    @pytest.mark.asyncio
+    async def test_complete_export_has_no_trailer(self) -> None:
+        """Test a complete CSV export is the header plus all rows."""
+        body = await _collect("csv", [[("delivered", 10)], [("shipped", 2)]])
+
+        assert body.splitlines() == ["status,total", "delivered,10", "shipped,2"]
+
+    @pytest.mark.asyncio
+    async def test_ndjson_failure_ends_with_error_line(self) -> None:
+        """Test a failure after the first chunk ends NDJSON with an error record."""
+        body = await _collect("ndjson", [[("delivered", 10)], RuntimeError("connection lost")])
+
+        lines = [json.loads(line) for line in body.splitlines()]
+        assert lines[0] == {"status": "delivered", "total": 10}
+        assert lines[-1]["error"]["rows_sent"] == 1
+        assert "connection lost" not in body
+
+    @pytest.mark.asyncio
+    async def test_csv_failure_ends_with_comment_line(self) -> None:
+        """Test a failure after the first chunk ends CSV with an error comment."""
+        body = await _collect("csv", [[("delivered", 10)], RuntimeError("connection lost")])
+
+        lines = body.splitlines()
+        assert lines[:2] == ["status,total", "delivered,10"]
+        assert lines[-1].startswith("# error: Export failed after 1 row(s)")
+
+
+class TestResultPages:
+    """Tests for GET /analytics/results/{handle}."""
+
+    @pytest.mark.asyncio
+    async def test_invalid_page_size_rejected(self) -> None:
+        """Test page sizes outside the allowed range are rejected."""
+        with pytest.raises(ValidationException, match="page_size"):
+            await routes.get_result_page("handle", page_size=0)
+
+    @pytest.mark.asyncio
+    async def test_unknown_handle_not_found(self) -> None:
+        """Test unknown or expired handles return 404."""
+        pager = MagicMock(get=MagicMock(return_value=None))
+
+        with patch.object(routes, "get_result_pager", return_value=pager):
+            with pytest.raises(NotFoundException):
+                await routes.get_result_page("missing")
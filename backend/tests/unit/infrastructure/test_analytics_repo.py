@@ -0,0 +1,186 @@
+"""
+Unit tests for the PostgreSQL analytics repository.
+
+Tests for app.infrastructure.database.repositories.analytics_repo asyncpg
+fast path, its fallback and isolation from caller transactions.
+"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, List, Optional
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.config.constants import SQL_MAX_ROWS
+from app.config.exceptions import DatabaseException
+from app.infrastructure.database.repositories import analytics_repo
+from app.infrastructure.database.repositories.analytics_repo import (
+    PostgreSQLAnalyticsRepository,
+)
+
+
+def _driver(records: Optional[List[Any]] = None) -> MagicMock:
+    cursor = MagicMock()
+    cursor.fetch = AsyncMock(return_value=records or [])
+    driver = MagicMock()
+    driver.execute = AsyncMock()
+    driver.cursor = AsyncMock(return_value=cursor)
+    return driver
+
+
+def _connection(driver: Any) -> MagicMock:
+    result = MagicMock()
+    result.fetchmany.return_value = [("SP", 3)]
+    result.keys.return_value = ["state", "count"]
+
+    @asynccontextmanager
+    async def begin():
+        yield
+
+    connection = MagicMock()
+    connection.get_raw_connection = AsyncMock(
+        return_value=SimpleNamespace(driver_connection=driver),
+    )
+    connection.execute = AsyncMock(return_value=result)
+    connection.invalidate = AsyncMock()
+    connection.begin = begin
+    return connection
+
+
+def _session(connection: MagicMock, in_transaction: bool = False) -> MagicMock:
+    @asynccontextmanager
+    async def begin():
+        yield
+
+    session = MagicMock()
+    session.in_transaction.return_value = in_transaction
+    session.begin = begin
+    session.connection = AsyncMock(return_value=connection)
+    session.commit = AsyncMock()
+    return session
+
+
+def _statements(mock: AsyncMock) -> List[str]:
+    return [str(call.args[0]) for call in mock.await_args_list]
+
+
+@pytest.fixture(autouse=True)
+def _fast_path_enabled():
+    with patch.object(analytics_repo, "ANALYTICS_ASYNCPG_FAST_PATH", True):
+        yield
+
+
+class TestFastPath:
+    """Tests for PostgreSQLAnalyticsRepository._execute_fast."""
+
+    @pytest.mark.asyncio
+    async def test_cursor_fetches_at_most_max_rows(self) -> None:
+        """Test the fast path fetches through a bounded cursor in one read-only transaction."""
+        driver = _driver([{"state": "SP", "count": 3}])
+        repository = PostgreSQLAnalyticsRepository(_session(_connection(driver)))
+
+        rows = await repository.execute_sql("SELECT state, count FROM t")
+
+        assert rows == [{"state": "SP", "count": 3}]
+        driver.cursor.assert_awaited_once_with("SELECT state, count FROM t")
+        driver.cursor.return_value.fetch.assert_awaited_once_with(SQL_MAX_ROWS)
+        statements = _statements(driver.execute)
+        assert statements[0].startswith("BEGIN READ ONLY; SET LOCAL statement_timeout = ")
+        assert statements[-1] == "COMMIT"
+
+    @pytest.mark.asyncio
+    async def test_failure_rolls_back(self) -> None:
+        """Test failed statements are rolled back and raised as DatabaseException."""
+        driver = _driver()
+        driver.cursor.side_effect = RuntimeError("division by zero")
+        connection = _connection(driver)
+        repository = PostgreSQLAnalyticsRepository(_session(connection))
+
+        with pytest.raises(DatabaseException, match="division by zero"):
+            await repository.execute_sql("SELECT 1 / 0")
+
+        assert _statements(driver.execute)[-1] == "ROLLBACK"
+        connection.invalidate.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_rollback_invalidates_connection(self) -> None:
+        """Test a connection that cannot be rolled back is discarded, not pooled."""
+        driver = _driver()
+        driver.cursor.side_effect = RuntimeError("connection lost")
+        driver.execute.side_effect = [None, RuntimeError("connection lost")]
+        connection = _connection(driver)
+        repository = PostgreSQLAnalyticsRepository(_session(connection))
+
+        with pytest.raises(DatabaseException):
+            await repository.execute_sql("SELECT 1")
+
+        connection.invalidate.assert_awaited_once()
+
+
+class TestFallback:
+    """Tests for the SQLAlchemy execution path."""
+
+    @pytest.mark.asyncio
+    async def test_non_asyncpg_driver_uses_regular_path(self) -> None:
+        """Test drivers without asyncpg cursors fall back to SQLAlchemy execution."""
+        connection = _connection(SimpleNamespace())
+        repository = PostgreSQLAnalyticsRepository(_session(connection))
+
+        rows = await repository.execute_sql("SELECT state, count FROM t")
+
+        assert rows == [{"state": "SP", "count": 3}]
+        statements = _statements(connection.execute)
+        assert statements[:2] == [
+            "SET TRANSACTION READ ONLY",
+            f"SET LOCAL statement_timeout = {analytics_repo.SQL_TIMEOUT_MS}",
+        ]
+        connection.execute.return_value.fetchmany.assert_called_once_with(SQL_MAX_ROWS)
+
+    @pytest.mark.asyncio
+    async def test_parameterized_query_skips_fast_path(self) -> None:
+        """Test queries with parameters always take the SQLAlchemy path."""
+        driver = _driver()
+        connection = _connection(driver)
+        repository = PostgreSQLAnalyticsRepository(_session(connection))
+
+        await repository.execute_sql("SELECT * FROM t WHERE state = :state", {"state": "SP"})
+
+        driver.cursor.assert_not_awaited()
+        assert connection.execute.await_args.args[1] == {"state": "SP"}
+
+
+class TestCallerTransaction:
+    """Tests for isolation from transactions open on the session."""
+
+    @pytest.mark.asyncio
+    async def test_open_transaction_not_committed(self) -> None:
+        """Test an open session transaction is left alone and a pooled connection is used."""
+        driver = _driver([{"count": 1}])
+        pooled = _connection(driver)
+
+        @asynccontextmanager
+        async def connect():
+            yield pooled
+
+        session = _session(_connection(_driver()), in_transaction=True)
+        session.bind = SimpleNamespace(connect=connect)
+        repository = PostgreSQLAnalyticsRepository(session)
+
+        assert await repository.execute_sql("SELECT 1") == [{"count": 1}]
+        assert await repository.explain_sql("SELECT 1") is not None
+
+        session.commit.assert_not_awaited()
+        session.connection.assert_not_awaited()
+        assert "SET TRANSACTION READ ONLY" in _statements(pooled.execute)
+
+    @pytest.mark.asyncio
+    async def test_open_transaction_without_engine_fails(self) -> None:
+        """Test read-only work fails loudly if it cannot leave the caller's transaction alone."""
+        session = _session(_connection(_driver()), in_transaction=True)
+        session.bind = None
+        repository = PostgreSQLAnalyticsRepository(session)
+
+        with pytest.raises(DatabaseException, match="open transaction"):
+            await repository.execute_sql("SELECT 1")
+        session.commit.assert_not_awaited()
@@ -0,0 +1,112 @@
+"""
+Unit tests for database connections.
+
+Tests for app.infrastructure.database.connection analytics session release
+and read-only engine configuration.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.infrastructure.database import connection
+
+
+def _session() -> MagicMock:
+    session = MagicMock()
+    session.rollback = AsyncMock()
+    session.close = AsyncMock()
+    return session
+
+
+def _factory(session: MagicMock) -> Any:
+    return patch.object(
+        connection,
+        "_get_analytics_session_factory",
+        return_value=lambda: session,
+    )
+
+
+class TestAnalyticsSession:
+    """Tests for get_analytics_session release."""
+
+    @pytest.mark.asyncio
+    async def test_released_after_use(self) -> None:
+        """Test the session is rolled back and closed when the block exits."""
+        session = _session()
+        with _factory(session):
+            async with connection.get_analytics_session() as yielded:
+                assert yielded is session
+                session.close.assert_not_awaited()
+
+        session.rollback.assert_awaited_once()
+        session.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_released_on_error(self) -> None:
+        """Test errors in the block propagate after the session is released."""
+        session = _session()
+        with _factory(session):
+            with pytest.raises(RuntimeError, match="query failed"):
+                async with connection.get_analytics_session():
+                    raise RuntimeError("query failed")
+
+        session.rollback.assert_awaited_once()
+        session.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_released_when_cancelled(self) -> None:
+        """Test a cancelled request still returns its connection (shielded release)."""
+        session = _session()
+        entered = asyncio.Event()
+
+        async def request() -> None:
+            async with connection.get_analytics_session():
+                entered.set()
+                await asyncio.sleep(60)
+
+        with _factory(session):
+            task = asyncio.create_task(request())
+            await entered.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        session.rollback.assert_awaited_once()
+        session.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_closed_when_rollback_fails(self) -> None:
+        """Test the session is closed even if the rollback fails."""
+        session = _session()
+        session.rollback.side_effect = RuntimeError("connection lost")
+
+        with pytest.raises(RuntimeError, match="connection lost"):
+            await connection._release_session(session)
+        session.close.assert_awaited_once()
+
+
+class TestAnalyticsEngine:
+    """Tests for the analytics engine configuration."""
+
+    def test_replica_url_and_read_only_connections(self) -> None:
+        """Test the analytics pool targets the replica URL with read-only connections."""
+        settings = SimpleNamespace(
+            analytics_database_url="postgresql://replica/db",
+            database_url="postgresql://primary/db",
+            debug=False,
+        )
+        with (
+            patch.object(connection, "_analytics_engine", None),
+            patch.object(connection, "get_settings", return_value=settings),
+            patch.object(connection, "create_async_engine") as create_engine,
+        ):
+            connection._get_analytics_engine()
+
+        url = create_engine.call_args.args[0]
+        server_settings = create_engine.call_args.kwargs["connect_args"]["server_settings"]
+        assert url.startswith("postgresql+asyncpg://replica/")
+        assert server_settings["default_transaction_read_only"] == "on"
@@ -0,0 +1,140 @@
+"""
+Unit tests for the DuckDB analytics repository.
+
+Tests for app.infrastructure.database.repositories.duckdb_analytics_repo
+(snapshot store and local-mode repository).
+"""
+
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from app.config.exceptions import DatabaseException
+from app.infrastructure.database.models.analytics import AnalyticsColumn, AnalyticsTable
+from app.infrastructure.database.repositories.duckdb_analytics_repo import (
+    DUCKDB_AVAILABLE,
+    DuckDBAnalyticsRepository,
+    DuckDBEngine,
+    ParquetSnapshotStore,
+    _duckdb_type,
+    _statement,
+)
+
+
+class TestDuckDBAnalyticsRepository:
+    """Tests for DuckDBAnalyticsRepository in local mode (no metadata database)."""
+
+    @pytest.fixture
+    def repository(self) -> DuckDBAnalyticsRepository:
+        """Create repository over a snapshot of a small CSV file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = Path(tmpdir) / "orders.csv"
+            rows = [f"o{i},{'delivered' if i % 4 else 'canceled'},{i}.5" for i in range(40)]
+            csv_path.write_text("\n".join(["order_id,order_status,total", *rows]) + "\n")
+            store = ParquetSnapshotStore(Path(tmpdir) / "snapshots")
+            store.write_from_csv("orders", csv_path)
+            yield DuckDBAnalyticsRepository(engine=DuckDBEngine(store, workers=1, threads=1))
+
+    def test_named_parameters_converted(self) -> None:
+        """Test :name parameters become $name and casts are left alone."""
+        sql, params = _statement("SELECT total::int FROM t WHERE id = :id", {"id": 1})
+
+        assert sql == "SELECT total::int FROM t WHERE id = $id"
+        assert params == {"id": 1}
+        assert _statement("SELECT 1", None) == ("SELECT 1",)
+
+    def test_parameters_inside_literals_left_alone(self) -> None:
+        """Test ":name" inside literals, quoted identifiers and comments is not rewritten."""
+        sql, _ = _statement(
+            "SELECT ':label' AS \":col\", x::numeric -- :note\nFROM t WHERE a = :a",
+            {"a": 1},
+        )
+
+        assert sql == "SELECT ':label' AS \":col\", x::numeric -- :note\nFROM t WHERE a = $a"
+
+    @pytest.mark.parametrize(
+        ("data_type", "expected"),
+        [
+            ("NUMERIC(10,2)", "DECIMAL(10,2)"),
+            ("numeric(12)", "DECIMAL(12,0)"),
+            ("DECIMAL(60, 4)", "DECIMAL(38,4)"),
+            ("NUMERIC", "DECIMAL(38,10)"),
+            ("INTEGER", "BIGINT"),
+            ("character varying(20)", "VARCHAR"),
+        ],
+    )
+    def test_numeric_types_stay_exact(self, data_type: str, expected: str) -> None:
+        """Test NUMERIC maps to DECIMAL(p,s) (not DOUBLE) and unknown types to VARCHAR."""
+        assert _duckdb_type(data_type) == expected
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not DUCKDB_AVAILABLE, reason="duckdb library not available")
+    async def test_stream_fetches_in_batches(self, repository: DuckDBAnalyticsRepository) -> None:
+        """Test streaming yields batch_size rows per batch from one open cursor."""
+        batches = [
+            rows
+            async for _, rows in repository.stream_sql(
+                "SELECT order_id FROM analytics.orders ORDER BY total",
+                batch_size=15,
+            )
+        ]
+
+        assert [len(rows) for rows in batches] == [15, 15, 10]
+        assert batches[0][0] == ("o0",)
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not DUCKDB_AVAILABLE, reason="duckdb library not available")
+    async def test_stream_errors_raised(self, repository: DuckDBAnalyticsRepository) -> None:
+        """Test failures while streaming surface as DatabaseException."""
+        with pytest.raises(DatabaseException):
+            async for _ in repository.stream_sql("SELECT * FROM analytics.missing"):
+                pass
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not DUCKDB_AVAILABLE, reason="duckdb library not available")
+    async def test_numeric_snapshot_sums_exactly(self) -> None:
+        """Test catalog NUMERIC columns are snapshotted as DECIMAL and aggregate exactly."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = Path(tmpdir) / "items.csv"
+            csv_path.write_text("price\n" + "0.10\n" * 3)
+            table = AnalyticsTable(
+                name="items",
+                description="",
+                data_version=1,
+                columns=[AnalyticsColumn(name="price", data_type="NUMERIC(10,2)")],
+            )
+            store = ParquetSnapshotStore(Path(tmpdir) / "snapshots")
+            store.write(table, {"items": csv_path})
+            repository = DuckDBAnalyticsRepository(engine=DuckDBEngine(store, workers=1))
+
+            rows = await repository.execute_sql("SELECT SUM(price) AS total FROM analytics.items")
+
+        assert rows == [{"total": Decimal("0.30")}]
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not DUCKDB_AVAILABLE, reason="duckdb library not available")
+    async def test_catalog_and_execution(self, repository: DuckDBAnalyticsRepository) -> None:
+        """Test snapshot tables are listed and queried with parameters."""
+        tables = await repository.get_all_tables()
+        rows = await repository.execute_sql(
+            "SELECT COUNT(*) AS orders FROM analytics.orders WHERE order_status = :status",
+            {"status": "canceled"},
+        )
+
+        assert [table.name for table in tables] == ["orders"]
+        assert [column.name for column in tables[0].columns] == [
+            "order_id",
+            "order_status",
+            "total",
+        ]
+        assert rows == [{"orders": 10}]
+        assert await repository.explain_sql("SELECT 1") is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not DUCKDB_AVAILABLE, reason="duckdb library not available")
+    async def test_file_access_blocked(self, repository: DuckDBAnalyticsRepository) -> None:
+        """Test queries cannot read files outside the loaded snapshots."""
+        with pytest.raises(DatabaseException):
+            await repository.execute_sql("SELECT * FROM read_csv_auto('/etc/passwd')")
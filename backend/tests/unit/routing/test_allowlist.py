@@ -25,12 +25,12 @@ class TestAllowlistValidator:
                 "orders": {"allowed": True, "columns": ["id", "total", "date"]},
                 "users": {"allowed": True, "columns": ["id", "name", "email"]},
             },
-            "functions": ["COUNT", "SUM", "AVG", "MAX", "MIN"],
+            "functions": ["COUNT", "SUM", "AVG", "MAX", "MIN", "PERCENTILE_CONT"],
             "operators": ["=", "!=", ">", "<", ">=", "<=", "AND", "OR"],
         }
         with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
             json.dump(allowlist, f)
-            yield Path(f.name)
+        yield Path(f.name)
         Path(f.name).unlink()
 
     @pytest.fixture
@@ -59,6 +59,60 @@ class TestAllowlistValidator:
         with pytest.raises(ValidationException):
             validator.validate_sql("DELETE FROM orders")
 
+    def test_validate_sql_keyword_inside_identifier(self, validator: AllowlistValidator) -> None:
+        """Test dangerous keywords only match whole SQL words."""
+        # Should not raise (created_at, 'DROP' literal)
+        validator.validate_sql("SELECT o.id, 'DROP' AS created_at FROM orders o")
+
+    def test_validate_sql_multiple_statements(self, validator: AllowlistValidator) -> None:
+        """Test validation blocks stacked statements."""
+        with pytest.raises(ValidationException):
+            validator.validate_sql("SELECT * FROM orders; SELECT * FROM users")
+
+    def test_validate_sql_table_not_allowed(self, validator: AllowlistValidator) -> None:
+        """Test validation blocks tables outside allowlist and catalog."""
+        with pytest.raises(ValidationException) as exc_info:
+            validator.validate_sql("SELECT * FROM orders o JOIN secrets s ON s.id = o.id")
+        assert "secrets" in exc_info.value.message
+
+    def test_validate_sql_catalog_table(self, validator: AllowlistValidator) -> None:
+        """Test catalog tables and columns are allowed via schema_info."""
+        schema_info = {"tables": [{"name": "sales", "columns": [{"name": "amount"}]}]}
+        validator.validate_sql("SELECT SUM(s.amount) FROM analytics.sales s", schema_info)
+        with pytest.raises(ValidationException):
+            validator.validate_sql("SELECT s.cost FROM sales s", schema_info)
+
+    def test_validate_sql_function_not_allowed(self, validator: AllowlistValidator) -> None:
+        """Test validation blocks functions outside allowlist."""
+        with pytest.raises(ValidationException):
+            validator.validate_sql("SELECT pg_sleep(10) FROM orders")
+
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            "SELECT id FROM orders UNION ALL TABLE public.conversations",
+            "SELECT id FROM orders WHERE EXISTS (TABLE pg_catalog.pg_authid)",
+            "SELECT id FROM orders WHERE id IN (TABLE pg_user)",
+        ],
+    )
+    def test_validate_sql_table_query_checked(
+        self,
+        validator: AllowlistValidator,
+        sql: str,
+    ) -> None:
+        """Test "TABLE name" query expressions are checked like FROM references."""
+        with pytest.raises(ValidationException):
+            validator.validate_sql(sql)
+
+    def test_validate_sql_ordered_set_aggregate(self, validator: AllowlistValidator) -> None:
+        """Test WITHIN GROUP, FILTER and OVER are not treated as function calls."""
+        # Should not raise
+        validator.validate_sql(
+            "SELECT percentile_cont(0.5) WITHIN GROUP (ORDER BY total), "
+            "COUNT(*) FILTER (WHERE total > 0), SUM(total) OVER (PARTITION BY id), "
+            "COUNT(DISTINCT(id)) FROM orders",
+        )
+
     def test_validate_sql_empty(self, validator: AllowlistValidator) -> None:
         """Test validation of empty SQL."""
         with pytest.raises(ValidationException):